@@ -0,0 +1,87 @@
+#!/usr/bin/env python
+
+"""Benchmark database vs. -subject blastn searches for sccmec-type.
+
+Times typing a synthetic sequence of increasing size with the bundled
+mec + ccr references, either by building a BLAST database (makeblastdb,
+blastn -db, index cleanup) or by passing the FASTA directly as
+``blastn -subject``.  The crossover guides ``DEFAULT_SUBJECT_MAX_SIZE`` in
+``type_sccmec.py``.
+
+Usage:
+    python benchmarks/bench_subject_mode.py [--sizes 20000 70000 ...] [--repeats 3]
+"""
+
+import argparse
+import os
+import random
+import tempfile
+import time
+
+from Bio import SeqIO
+
+from sccmecextractor.type_sccmec import SCCmecTyper
+
+DEFAULT_SIZES = [20_000, 70_000, 250_000, 500_000, 1_000_000, 2_800_000, 5_000_000]
+
+
+def _write_sequence(path: str, size: int, insert: str, seed: int = 1):
+    """Write a random sequence of *size* bp with *insert* in the middle."""
+    rng = random.Random(seed)
+    seq = "".join(rng.choice("ACGT") for _ in range(max(size - len(insert), 0)))
+    mid = len(seq) // 2
+    seq = seq[:mid] + insert + seq[mid:]
+    with open(path, "w") as f:
+        f.write(">bench_contig\n")
+        for i in range(0, len(seq), 80):
+            f.write(seq[i:i + 80] + "\n")
+
+
+def _time_search(typer: SCCmecTyper, fasta: str, repeats: int) -> float:
+    """Best-of-*repeats* wall time for one typing search of *fasta*."""
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        typer.search_file(fasta)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES,
+                        help="Sequence sizes (bp) to benchmark")
+    parser.add_argument("--repeats", type=int, default=3,
+                        help="Repeats per size; the fastest is reported")
+    args = parser.parse_args()
+
+    db_typer = SCCmecTyper(subject_max_size=0)
+    subject_typer = SCCmecTyper(subject_max_size=max(args.sizes) * 2)
+
+    # Embed a real mecA so the search reports a hit
+    with open(db_typer._query_fasta) as f:
+        mec_a = next(str(r.seq) for r in SeqIO.parse(f, "fasta") if r.id == "mecA")
+
+    print(f"{'size_bp':>10}  {'db_s':>8}  {'subject_s':>9}  faster")
+    crossover = None
+    with tempfile.TemporaryDirectory(prefix="sccmec_bench_") as tmp_dir:
+        for size in sorted(args.sizes):
+            fasta = os.path.join(tmp_dir, f"seq_{size}.fasta")
+            _write_sequence(fasta, size, mec_a)
+
+            db_time = _time_search(db_typer, fasta, args.repeats)
+            subject_time = _time_search(subject_typer, fasta, args.repeats)
+            faster = "subject" if subject_time < db_time else "db"
+            if faster == "db" and crossover is None:
+                crossover = size
+
+            print(f"{size:>10}  {db_time:>8.3f}  {subject_time:>9.3f}  {faster}")
+
+    if crossover is None:
+        print("\n-subject was faster at every size tested")
+    else:
+        print(f"\nDatabase search first faster at {crossover:,} bp")
+
+
+if __name__ == "__main__":
+    main()
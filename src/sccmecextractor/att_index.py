@@ -0,0 +1,151 @@
+#!/usr/bin/env python
+
+"""SQLite sidecar index for att-site TSV files.
+
+A merged att-site TSV for a large collection can hold millions of rows, and
+scanning it once per genome makes batch extraction quadratic. The index is
+stored next to the TSV (``<tsv>.idx.sqlite``) and keyed by ``Input_File`` so
+one genome's sites load in time proportional to its own rows.
+
+The TSV stays the source of truth: the index records how many bytes of it
+have been ingested and picks up rows appended since (locate-att appends to a
+shared TSV in batch runs), rebuilding from scratch if the file was rewritten.
+"""
+
+import os
+import sqlite3
+import threading
+import zlib
+
+from typing import List, Tuple
+
+INDEX_SUFFIX = ".idx.sqlite"
+
+# Bytes before the ingested offset checksummed to detect rewritten files
+_CHECK_BYTES = 4096
+
+# (pattern, contig, start, end) as recorded in the TSV
+SiteRow = Tuple[str, str, int, int]
+
+
+def index_path(tsv_file: str) -> str:
+    """Return the sidecar index path for an att-site TSV."""
+    return str(tsv_file) + INDEX_SUFFIX
+
+
+def has_index(tsv_file: str) -> bool:
+    return os.path.exists(index_path(tsv_file))
+
+
+class AttSiteIndex:
+    """Per-genome lookup of att sites from a TSV written by sccmec-locate-att.
+
+    Opening the index brings it up to date with the TSV. A single connection
+    is shared between threads behind a lock.
+    """
+
+    def __init__(self, tsv_file: str):
+        self.tsv_file = str(tsv_file)
+        self.path = index_path(tsv_file)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, timeout=600, check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.executescript(
+                """
+                CREATE TABLE IF NOT EXISTS meta (
+                    key TEXT PRIMARY KEY,
+                    value INTEGER
+                );
+                CREATE TABLE IF NOT EXISTS sites (
+                    input_file TEXT NOT NULL,
+                    pattern TEXT, contig TEXT, start INTEGER, end INTEGER
+                );
+                CREATE INDEX IF NOT EXISTS sites_input ON sites (input_file);
+                """
+            )
+        self.refresh()
+
+    def refresh(self):
+        """Ingest TSV rows added since the index was last updated.
+
+        Only complete lines are ingested, so a TSV being appended to
+        concurrently is never indexed mid-row.
+        """
+        with self._lock:
+            # IMMEDIATE: concurrent extract processes wait rather than all
+            # ingesting the same rows
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._ingest()
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def _ingest(self):
+        meta = dict(self._conn.execute("SELECT key, value FROM meta").fetchall())
+        offset = meta.get("offset", 0)
+        stat = os.stat(self.tsv_file)
+
+        with open(self.tsv_file, "rb") as tsv:
+            # A shrunken or rewritten file cannot be resumed from the old offset
+            if (
+                stat.st_size < offset
+                or stat.st_ino != meta.get("inode", stat.st_ino)
+                or self._checksum(tsv, offset) != meta.get("checksum", 0)
+            ):
+                self._conn.execute("DELETE FROM sites")
+                offset = 0
+
+            if stat.st_size == offset:
+                return
+
+            rows = []
+            tsv.seek(offset)
+            for raw in tsv:
+                if not raw.endswith(b"\n"):
+                    break
+                offset += len(raw)
+                columns = raw.decode().rstrip("\r\n").split("\t")
+                # Skip header lines (repeated in concatenated batch files)
+                if len(columns) < 5 or columns[0] == "Input_File":
+                    continue
+                rows.append(
+                    (columns[0], columns[1], columns[2], int(columns[3]), int(columns[4]))
+                )
+
+            checksum = self._checksum(tsv, offset)
+
+        self._conn.executemany("INSERT INTO sites VALUES (?, ?, ?, ?, ?)", rows)
+        self._conn.executemany(
+            "INSERT OR REPLACE INTO meta VALUES (?, ?)",
+            [("offset", offset), ("inode", stat.st_ino), ("checksum", checksum)],
+        )
+
+    @staticmethod
+    def _checksum(tsv, offset: int) -> int:
+        """CRC of the bytes just before *offset* (0 at the start of file)."""
+        start = max(offset - _CHECK_BYTES, 0)
+        tsv.seek(start)
+        return zlib.crc32(tsv.read(offset - start))
+
+    def sites_for(self, input_file: str) -> List[SiteRow]:
+        """Return one genome's sites in TSV order."""
+        with self._lock:
+            return self._conn.execute(
+                "SELECT pattern, contig, start, end FROM sites "
+                "WHERE input_file = ? ORDER BY rowid",
+                (input_file,),
+            ).fetchall()
+
+    def input_files(self) -> List[str]:
+        """Return every indexed genome name in first-seen order."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT input_file FROM sites GROUP BY input_file ORDER BY MIN(rowid)"
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
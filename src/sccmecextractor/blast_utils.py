@@ -3,7 +3,9 @@
 """Shared BLAST utilities for SCCmecExtractor.
 
 Provides BlastRunner for executing BLAST+ commands, BlastResult for parsed hits
-and helper functions for filtering and resolving overlapping hits.
+and helper functions for filtering and resolving overlapping hits. BLAST+
+commands can be given a time limit (``configure_blast``, ``blast_deadline``)
+after which they are killed.
 """
 
 import os
@@ -11,12 +13,94 @@ import csv
 import shutil
 import subprocess
 import tempfile
+import threading
+import time
 
 from contextlib import contextmanager
 from dataclasses import dataclass
+from functools import lru_cache
 from importlib.resources import files, as_file
 from pathlib import Path
-from typing import Dict, List, Optional, Tuple
+from typing import BinaryIO, Callable, Dict, List, Optional, Tuple
+
+
+# Process-wide BLAST resource limits, set with configure_blast
+_BLAST_THREADS = 1
+_MAKEBLASTDB_LIMIT = None
+_BLAST_TIMEOUT = None
+
+# Per-thread deadline (time.monotonic()) for BLAST commands, see blast_deadline
+_DEADLINE = threading.local()
+
+
+def configure_blast(num_threads: int = 1, makeblastdb_limit=None,
+                    timeout: Optional[float] = None):
+    """Set BLAST resource limits for every BlastRunner in this process.
+
+    Args:
+        num_threads: ``-num_threads`` for blastn database searches.
+        makeblastdb_limit: Maximum concurrent makeblastdb runs: an int, a
+            semaphore (e.g. a ``multiprocessing`` one shared with worker
+            processes) or None for no limit.
+        timeout: Seconds a single makeblastdb or blastn run may take before
+            it is killed (BlastTimeoutError), or None for no limit.
+    """
+    global _BLAST_THREADS, _MAKEBLASTDB_LIMIT, _BLAST_TIMEOUT
+    if isinstance(makeblastdb_limit, int):
+        makeblastdb_limit = threading.BoundedSemaphore(makeblastdb_limit)
+    _BLAST_THREADS = max(int(num_threads), 1)
+    _MAKEBLASTDB_LIMIT = makeblastdb_limit
+    _BLAST_TIMEOUT = timeout
+
+
+def blast_settings() -> Tuple[int, object, Optional[float]]:
+    """Return the current ``(num_threads, makeblastdb_limit, timeout)``."""
+    return _BLAST_THREADS, _MAKEBLASTDB_LIMIT, _BLAST_TIMEOUT
+
+
+@contextmanager
+def blast_deadline(deadline: Optional[float]):
+    """Kill BLAST commands run by this thread at *deadline* (a
+    ``time.monotonic()`` value; None for none), e.g. a genome's time limit."""
+    previous = getattr(_DEADLINE, "value", None)
+    _DEADLINE.value = deadline
+    try:
+        yield
+    finally:
+        _DEADLINE.value = previous
+
+
+def _command_timeout(cmd: List[str]) -> Optional[float]:
+    """Time *cmd* may run: the configured timeout, cut short by this
+    thread's deadline. Raises BlastTimeoutError if the deadline has passed."""
+    timeout = _BLAST_TIMEOUT
+    deadline = getattr(_DEADLINE, "value", None)
+    if deadline is not None:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            raise BlastTimeoutError(cmd[0], 0, deadline=True)
+        if timeout is None or remaining < timeout:
+            return remaining
+    return timeout
+
+
+def _run_command(cmd: List[str]):
+    """Run a BLAST+ command, killing it if it runs past its time limit."""
+    timeout = _command_timeout(cmd)
+    try:
+        subprocess.run(cmd, check=True, capture_output=True, text=True, timeout=timeout)
+    except subprocess.TimeoutExpired:
+        raise BlastTimeoutError(cmd[0], timeout, deadline=timeout != _BLAST_TIMEOUT)
+
+
+@contextmanager
+def _makeblastdb_slot():
+    limit = _MAKEBLASTDB_LIMIT
+    if limit is None:
+        yield
+        return
+    with limit:
+        yield
 
 
 class BlastNotFoundError(RuntimeError):
@@ -25,6 +109,25 @@ class BlastNotFoundError(RuntimeError):
     pass
 
 
+class BlastTimeoutError(BaseException):
+    """Raised when a BLAST+ command is killed for running past its time limit.
+
+    A BaseException, like KeyboardInterrupt, so that handlers for failed
+    searches (``except Exception``) do not carry on without its hits: the
+    caller abandons the whole genome.
+    """
+
+    def __init__(self, tool: str, timeout: Optional[float], deadline: bool = False):
+        self.tool = tool
+        self.timeout = timeout
+        self.deadline = deadline
+        if deadline:
+            message = f"{tool} stopped at the genome's time limit"
+        else:
+            message = f"{tool} killed after {timeout:g}s"
+        super().__init__(message)
+
+
 @dataclass
 class BlastResult:
     """Represents a single BLAST outfmt 6 hit (all 12 standard columns)."""
@@ -158,6 +261,99 @@ def get_best_non_overlapping_hits(
     return selected
 
 
+def project_hits(
+    hits: List[BlastResult],
+    contig: str,
+    start: int,
+    end: int,
+    reverse_complement: bool,
+    record_id: str,
+    contig_length: Optional[int] = None,
+) -> List[BlastResult]:
+    """Project genome-level hits onto an extracted region of one contig.
+
+    The region uses the same slice coordinates as
+    ``GenomeSequences.extract_region``: forward regions cover ``seq[start:end]``
+    and reverse-complement regions cover ``seq[end:start]`` read on the
+    opposite strand.  Hits are kept when they overlap the region, clipped to
+    its boundaries (shortening the alignment length accordingly, as a BLAST
+    search of the extracted sequence would), and re-expressed in 1-based
+    coordinates on the extracted element with ``sseqid`` set to *record_id*.
+
+    Args:
+        hits: Hits against the whole genome.
+        contig: Contig the region was extracted from.
+        start: Slice start passed to ``extract_region``.
+        end: Slice end passed to ``extract_region``.
+        reverse_complement: Whether the region was reverse complemented.
+        record_id: ID of the extracted sequence record.
+        contig_length: Length of a circular contig whose region runs past
+            the contig end (spans the origin); hits near the contig start
+            are then also matched one contig length on.
+
+    Returns:
+        Projected list of BlastResult objects.
+    """
+    if reverse_complement:
+        region_lo, region_hi = end + 1, start
+    else:
+        region_lo, region_hi = start + 1, end
+
+    offsets = (0,)
+    if contig_length and region_hi > contig_length:
+        offsets = (0, contig_length)
+
+    projected = []
+
+    for hit in hits:
+        if hit.sseqid != contig:
+            continue
+
+        for offset in offsets:
+            hit_lo = min(hit.sstart, hit.send) + offset
+            hit_hi = max(hit.sstart, hit.send) + offset
+            if hit_hi < region_lo or hit_lo > region_hi:
+                continue
+
+            clip_lo = max(region_lo - hit_lo, 0)
+            clip_hi = max(hit_hi - region_hi, 0)
+            lo = hit_lo + clip_lo
+            hi = hit_hi - clip_hi
+
+            # Map clipped subject ends back onto the query ends they align to
+            qstart, qend = hit.qstart, hit.qend
+            if hit.sstart <= hit.send:
+                qstart, qend = qstart + clip_lo, qend - clip_hi
+                sstart, send = lo, hi
+            else:
+                qstart, qend = qstart + clip_hi, qend - clip_lo
+                sstart, send = hi, lo
+
+            if reverse_complement:
+                sstart, send = start - sstart + 1, start - send + 1
+            else:
+                sstart, send = sstart - start, send - start
+
+            projected.append(
+                BlastResult(
+                    qseqid=hit.qseqid,
+                    sseqid=record_id,
+                    pident=hit.pident,
+                    length=hit.length - clip_lo - clip_hi,
+                    mismatch=hit.mismatch,
+                    gapopen=hit.gapopen,
+                    qstart=qstart,
+                    qend=qend,
+                    sstart=sstart,
+                    send=send,
+                    evalue=hit.evalue,
+                    bitscore=hit.bitscore,
+                )
+            )
+
+    return projected
+
+
 @contextmanager
 def get_default_ref(filename: str):
     """Locate a bundled reference FASTA and yield a real filesystem path.
@@ -176,6 +372,18 @@ def get_default_ref(filename: str):
         yield path
 
 
+@lru_cache(maxsize=None)
+def get_ref_lengths(fasta_path: str) -> Dict[str, int]:
+    """Return ``{sequence ID: length}`` for a reference FASTA.
+
+    Cached per path, so each process parses a reference once however many
+    genomes it checks against it. Callers must not mutate the result.
+    """
+    from Bio import SeqIO
+
+    return {record.id: len(record.seq) for record in SeqIO.parse(fasta_path, "fasta")}
+
+
 class BlastRunner:
     """Wrapper for BLAST+ command-line tools."""
 
@@ -211,39 +419,115 @@ class BlastRunner:
             "-out",
             str(db_prefix),
         ]
-        subprocess.run(cmd, check=True, capture_output=True, text=True)
+        with _makeblastdb_slot():
+            _run_command(cmd)
+        return db_prefix
+
+    def create_db_from_stream(
+        self, write_fasta: Callable[[BinaryIO], None], db_prefix: str, title: str
+    ) -> str:
+        """Create a BLAST nucleotide database from FASTA streamed to makeblastdb.
+
+        Lets an in-memory genome be indexed without writing a FASTA copy.
+
+        Args:
+            write_fasta: Called with makeblastdb's binary stdin; writes FASTA.
+            db_prefix: Output database prefix path.
+            title: Database title (required when reading from stdin).
+
+        Returns:
+            The db_prefix path for use in subsequent blastn calls.
+        """
+        cmd = [
+            "makeblastdb",
+            "-in",
+            "-",
+            "-dbtype",
+            "nucl",
+            "-title",
+            str(title),
+            "-out",
+            str(db_prefix),
+        ]
+        with _makeblastdb_slot(), tempfile.TemporaryFile() as stderr:
+            timeout = _command_timeout(cmd)
+            proc = subprocess.Popen(
+                cmd, stdin=subprocess.PIPE, stdout=subprocess.DEVNULL, stderr=stderr,
+            )
+            # Writing blocks if makeblastdb hangs, so the limit is a timer
+            killer = None
+            expired = threading.Event()
+            if timeout is not None:
+                def expire():
+                    expired.set()
+                    proc.kill()
+
+                killer = threading.Timer(timeout, expire)
+                killer.start()
+            try:
+                write_fasta(proc.stdin)
+            except BrokenPipeError:
+                pass  # makeblastdb exited early; its status is reported below
+            except BaseException:
+                proc.kill()
+                proc.wait()
+                raise
+            finally:
+                try:
+                    proc.stdin.close()
+                except BrokenPipeError:
+                    pass
+            returncode = proc.wait()
+            if killer is not None:
+                killer.cancel()
+            if expired.is_set() and returncode != 0:
+                raise BlastTimeoutError(cmd[0], timeout, deadline=timeout != _BLAST_TIMEOUT)
+            if returncode != 0:
+                stderr.seek(0)
+                raise subprocess.CalledProcessError(
+                    returncode, cmd, stderr=stderr.read().decode(errors="replace"),
+                )
         return db_prefix
 
     def run_blastn(
         self,
         query: str,
-        db: str,
+        db: Optional[str],
         output: Optional[str] = None,
         evalue: float = 10,
         word_size: int = 28,
+        subject: Optional[str] = None,
     ) -> str:
         """Run blastn with project-standard parameters.
 
         Args:
             query: Path to the query FASTA file.
-            db: Path to the BLAST database prefix.
+            db: Path to the BLAST database prefix (None when *subject* is given).
             output: Path for the output file. If None, a temp file is created.
             evalue: E-value threshold.
             word_size: Word size for blastn.
+            subject: Search this FASTA directly with ``-subject`` instead of
+                a database. Avoids makeblastdb for small sequences.
+
+        Database searches use the ``-num_threads`` set by configure_blast
+        (blastn ignores it for ``-subject`` searches).
 
         Returns:
             Path to the output results file.
         """
+        if (db is None) == (subject is None):
+            raise ValueError("Exactly one of db or subject must be given")
+
         if output is None:
             fd, output = tempfile.mkstemp(suffix=".blast6", prefix="sccmec_")
             os.close(fd)
 
+        target = ["-db", str(db)] if subject is None else ["-subject", str(subject)]
         cmd = [
             "blastn",
             "-query",
             str(query),
-            "-db",
-            str(db),
+            *target,
             "-out",
             str(output),
             "-evalue",
@@ -263,7 +547,9 @@ class BlastRunner:
             "-outfmt",
             "6",
         ]
-        subprocess.run(cmd, check=True, capture_output=True, text=True)
+        if subject is None and _BLAST_THREADS > 1:
+            cmd += ["-num_threads", str(_BLAST_THREADS)]
+        _run_command(cmd)
         return output
 
     @staticmethod
@@ -0,0 +1,97 @@
+#!/usr/bin/env python
+
+"""Splitting a CPU budget between pipeline workers and BLAST.
+
+A pipeline genome alternates between BLAST subprocesses (makeblastdb and
+blastn) and Python work (att scanning, extraction, typing). Sizing only the
+worker pool either oversubscribes a node, when every worker's BLAST calls
+run at once, or leaves cores idle, when there are fewer genomes than cores.
+``plan_cpu_budget`` turns a core count and the share of genome time spent in
+BLAST into worker counts, blastn ``-num_threads`` and a cap on concurrent
+makeblastdb runs. The share defaults to ``DEFAULT_BLAST_SHARE`` and can be
+measured on the first few genomes of a run.
+"""
+
+import math
+import os
+
+from dataclasses import dataclass
+from typing import Optional
+
+# Share of genome time spent in BLAST when not measured
+DEFAULT_BLAST_SHARE = 0.5
+
+# Genomes processed with the default split before an auto budget is re-planned
+CALIBRATION_GENOMES = 3
+
+
+@dataclass
+class CpuPlan:
+    """How a budget of *cpus* cores is used.
+
+    *workers* are genome workers (genome scheduler) or analysis workers
+    (staged scheduler); *blast_workers* are concurrent genome searches in
+    staged mode. Each database blastn uses *blast_threads* threads and at
+    most *makeblastdb_slots* databases are built at once.
+    """
+
+    cpus: int
+    workers: int
+    blast_workers: int
+    blast_threads: int
+    makeblastdb_slots: int
+    blast_share: float
+
+    def describe(self) -> str:
+        return (
+            f"{self.cpus} CPU(s): {self.workers} worker(s), "
+            f"{self.blast_workers} BLAST worker(s) x {self.blast_threads} thread(s), "
+            f"{self.makeblastdb_slots} concurrent makeblastdb, "
+            f"BLAST share {self.blast_share:.0%}"
+        )
+
+
+def available_cpus() -> int:
+    """Cores this process may run on (respects affinity masks and cgroups
+    that restrict them)."""
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+def plan_cpu_budget(cpus: int, staged: bool = False,
+                    blast_share: float = DEFAULT_BLAST_SHARE,
+                    genomes: Optional[int] = None) -> CpuPlan:
+    """Split *cpus* cores for the genome or staged scheduler.
+
+    Genome scheduler: one worker per core, each running its own BLAST calls
+    single-threaded. With fewer *genomes* than cores, the spare cores go to
+    blastn threads instead. Workers start in step, so makeblastdb runs are
+    capped at the BLAST share of the workers to stagger BLAST and Python
+    phases across them.
+
+    Staged scheduler: the BLAST share of the cores runs searches and the
+    rest runs analysis (at least one core each). Searches get extra blastn
+    threads only when there are fewer genomes than search cores.
+    """
+    if cpus < 1:
+        raise ValueError(f"CPU budget must be at least 1 (got {cpus})")
+    blast_share = min(max(blast_share, 0.0), 1.0)
+    limit = genomes if genomes else cpus
+
+    if not staged:
+        workers = max(min(cpus, limit), 1)
+        blast_threads = max(cpus // workers, 1)
+        slots = max(math.ceil(workers * blast_share), 1)
+        return CpuPlan(cpus, workers, workers, blast_threads, slots, blast_share)
+
+    if cpus == 1:
+        return CpuPlan(cpus, 1, 1, 1, 1, blast_share)
+    blast_cores = min(max(round(cpus * blast_share), 1), cpus - 1)
+    workers = max(min(cpus - blast_cores, limit), 1)
+    blast_workers = max(min(blast_cores, limit), 1)
+    blast_threads = max(blast_cores // blast_workers, 1)
+    return CpuPlan(cpus, workers, blast_workers, blast_threads, blast_workers,
+                   blast_share)
+
@@ -2,19 +2,26 @@
 
 import argparse
 import os
+import re
 import sys
 import logging
 import tempfile
 
+from bisect import bisect_left, bisect_right
 from dataclasses import dataclass, field
 from typing import Dict, List, Optional, Tuple
 from pathlib import Path
 from Bio import SeqIO
+from Bio.Seq import Seq
 from collections import defaultdict
 
+from sccmecextractor.att_index import AttSiteIndex, has_index
 from sccmecextractor.blast_utils import (
-    BlastRunner, get_default_ref, parse_blast_output, filter_hits
+    BlastRunner, get_default_ref, get_ref_lengths, parse_blast_output, filter_hits
 )
+from sccmecextractor.fasta_index import FastaIndexError, IndexedFasta
+from sccmecextractor.fasta_shards import RecordCollector, ShardWriter
+from sccmecextractor.genome_buffer import as_genome_buffer
 
 class InputValidator:
     """Check input files are valid"""
@@ -144,6 +151,52 @@ class AmbiguousHitReport:
         ])
 
 
+@dataclass
+class ExtractedRegion:
+    """Genomic interval of a successfully extracted element.
+
+    ``start``/``end`` are the slice coordinates passed to
+    ``GenomeSequences.extract_region``; ``record_id`` is the ID written to
+    the output FASTA. ``contig_length`` is set when the element spans the
+    origin of a circular contig, whose region then runs past the contig end.
+    """
+    contig: str
+    start: int
+    end: int
+    reverse_complement: bool
+    record_id: str
+    contig_length: Optional[int] = None
+
+
+@dataclass
+class ElementCoordinates:
+    """One element interval written in coordinates-only mode.
+
+    The first six columns are BED6: ``start``/``end`` are 0-based half-open
+    genome coordinates and ``name`` is the record ID the element's FASTA
+    would have, so sequences can be materialised later (e.g. ``bedtools
+    getfasta -s -nameOnly``). An origin-spanning element is written as
+    two rows with the same name, ordered so that their stranded sequences
+    joined in file order give the element.
+    """
+    contig: str
+    start: int
+    end: int
+    name: str
+    strand: str
+    input_file: str
+    interval: str  # "element" or, for composite extractions, "composite"/"inner"
+    contig_length: int
+
+    HEADER = "#Contig\tStart\tEnd\tName\tScore\tStrand\tInput_File\tInterval\tContig_Length"
+
+    def to_tsv_row(self) -> str:
+        return "\t".join([
+            self.contig, str(self.start), str(self.end), self.name, "0",
+            self.strand, self.input_file, self.interval, str(self.contig_length),
+        ])
+
+
 def _count_distinct_loci(coords):
     """Count distinct genomic loci from a collection of overlapping coordinates.
 
@@ -202,9 +255,12 @@ class RlmHBlastAdapter:
     rlmH detection instead of GFF3 parsing.
     """
 
-    def __init__(self, fasta_file: str, rlmh_ref: str = None):
+    def __init__(self, fasta_file: str, rlmh_ref: str = None,
+                 genome_db_prefix: str = None):
         from sccmecextractor.locate_att_sites import RlmHBlastDetector
-        self._detector = RlmHBlastDetector(fasta_file, rlmh_ref)
+        self._detector = RlmHBlastDetector(
+            fasta_file, rlmh_ref, genome_db_prefix=genome_db_prefix
+        )
         self.rlmH_positions = self._build_positions()
         self.multi_rlmH_contigs = {
             contig: _count_distinct_loci(coords)
@@ -316,13 +372,97 @@ class GeneAnnotations:
         return ""
 
 
+class _ContigSites:
+    """Sites on one contig, with attL sites sorted for binary search.
+
+    Entries are ``(order, site)`` pairs where ``order`` is the site's
+    position in the TSV, used to break ties the way a linear scan would.
+    """
+
+    def __init__(self, entries: List[Tuple[int, AttSite]]):
+        self.sites = [site for _, site in entries]
+        self.rights = [(order, site) for order, site in entries if site.is_right]
+        lefts = [(order, site) for order, site in entries if site.is_left]
+
+        # Unique attL end coordinates, each with its earliest site
+        first_by_end = {}
+        for order, site in lefts:
+            first_by_end.setdefault(site.end, (order, site))
+        self.left_ends = sorted(first_by_end)
+        self._first_by_end = first_by_end
+
+        by_start = sorted(lefts, key=lambda entry: (entry[1].start, entry[0]))
+        self.left_starts = [site.start for _, site in by_start]
+        self._by_start = by_start
+
+    def closest_left(self, position: int, min_distance: int
+                     ) -> Optional[Tuple[int, int, AttSite]]:
+        """Nearest attL (by end) at least *min_distance* from *position*.
+
+        Returns ``(distance, order, site)`` or None.
+        """
+        best = None
+        # Largest end <= position - min_distance
+        i = bisect_right(self.left_ends, position - min_distance) - 1
+        if i >= 0:
+            best = self._candidate(position, self.left_ends[i])
+        # Smallest end >= position + min_distance
+        j = bisect_left(self.left_ends, position + min_distance)
+        if j < len(self.left_ends):
+            above = self._candidate(position, self.left_ends[j])
+            if best is None or above[:2] < best[:2]:
+                best = above
+        return best
+
+    def _candidate(self, position: int, end: int) -> Tuple[int, int, AttSite]:
+        order, site = self._first_by_end[end]
+        return abs(position - end), order, site
+
+    def left_with_max_start(self) -> AttSite:
+        """Earliest-listed attL among those with the largest start."""
+        i = bisect_left(self.left_starts, self.left_starts[-1])
+        return self._by_start[i][1]
+
+    def left_with_min_start(self) -> AttSite:
+        """Earliest-listed attL among those with the smallest start."""
+        return self._by_start[0][1]
+
+
+def append_report_rows(reports: list, report_file: str):
+    """Append report rows (all of one report class) to a TSV.
+
+    Writes the class header first if the file is new or empty.
+    """
+    if not reports:
+        return
+    output_path = Path(report_file)
+    write_header = not output_path.exists() or output_path.stat().st_size == 0
+
+    with open(report_file, 'a') as f:
+        if write_header:
+            f.write(type(reports[0]).HEADER + "\n")
+        for report in reports:
+            f.write(report.to_tsv_row() + "\n")
+
+
 class AttSiteCollection:
     """Manages a collection of att sites and provides analysis methods."""
     
-    def __init__(self, tsv_file: str, target_file: str):
+    def __init__(self, tsv_file: str, target_file: str,
+                 index: Optional[AttSiteIndex] = None):
         self.tsv_file = tsv_file
         self.target_file = target_file
-        self.sites = self._parse_att_sites()
+        if index is not None:
+            self.sites = self._load_indexed_sites(index)
+        else:
+            self.sites = self._parse_att_sites()
+
+    def _load_indexed_sites(self, index: AttSiteIndex) -> List[AttSite]:
+        """Load the target file's sites from an att-site index."""
+        sites = [AttSite(*row) for row in index.sites_for(self.target_file)]
+        if not sites:
+            print(f"Warning: No entries found for {self.target_file} in {self.tsv_file}", file=sys.stderr)
+        return sites
     
     def _parse_att_sites(self) -> List[AttSite]:
         """Parse TSV file to extract att sites for the target file."""
@@ -362,35 +502,47 @@ class AttSiteCollection:
         """Get all left att sites (attL, cattL)."""
         return [site for site in self.sites if site.is_left]
     
+    def _contig_index(self) -> Dict[str, '_ContigSites']:
+        """Per-contig, coordinate-sorted view of ``self.sites``.
+
+        Built once per site list (rebuilt if ``sites`` is replaced).
+        """
+        if getattr(self, "_indexed_sites", None) is not self.sites:
+            by_contig = {}
+            for order, site in enumerate(self.sites):
+                by_contig.setdefault(site.contig, []).append((order, site))
+            self._index = {
+                contig: _ContigSites(entries) for contig, entries in by_contig.items()
+            }
+            self._indexed_sites = self.sites
+        return self._index
+
     def find_closest_pair(self, min_distance: int = 0) -> Optional[Tuple[AttSite, AttSite]]:
         """Find the closest attR-attL pair on the same contig.
 
+        For each attR only the nearest qualifying attL end on either side
+        needs checking, found by binary search over the contig's sorted
+        attL ends. Ties keep the earliest attR, then attL, in TSV order.
+
         Parameters
         ----------
         min_distance : int
             Minimum element size (distance) between att sites. Pairs closer
             than this are skipped (e.g. overlapping patterns at attB).
         """
-        right_sites = self.get_right_sites()
-        left_sites = self.get_left_sites()
-
-        if not right_sites or not left_sites:
-            return None
+        best = None  # (distance, right order, left order, right, left)
 
-        best_pair = None
-        best_dist = float('inf')
-
-        for right in right_sites:
-            for left in left_sites:
-                if right.contig == left.contig:
-                    distance = right.distance_to(left)
-                    if distance < min_distance:
-                        continue
-                    if distance < best_dist:
-                        best_dist = distance
-                        best_pair = (right, left)
+        for contig_sites in self._contig_index().values():
+            for right_order, right in contig_sites.rights:
+                candidate = contig_sites.closest_left(right.start, min_distance)
+                if candidate is None:
+                    continue
+                distance, left_order, left = candidate
+                key = (distance, right_order, left_order)
+                if best is None or key < best[:3]:
+                    best = key + (right, left)
 
-        return best_pair
+        return None if best is None else (best[3], best[4])
     
     def has_valid_sites(self) -> bool:
         """Check if we have both right and left sites."""
@@ -398,7 +550,8 @@ class AttSiteCollection:
 
     def get_sites_on_contig(self, contig: str) -> List[AttSite]:
         """Return all att sites on a specific contig."""
-        return [site for site in self.sites if site.contig == contig]
+        contig_sites = self._contig_index().get(contig)
+        return list(contig_sites.sites) if contig_sites else []
 
     def find_outer_left_site(
         self, closest_pair: Tuple['AttSite', 'AttSite'], rlmH_start: int
@@ -413,36 +566,22 @@ class AttSiteCollection:
         (only one left site on the contig, or no site beyond the inner).
         """
         att_right, att_left_inner = closest_pair
-        contig = att_right.contig
-
-        left_sites_on_contig = [
-            s for s in self.get_sites_on_contig(contig) if s.is_left
-        ]
+        contig_sites = self._contig_index().get(att_right.contig)
 
-        if len(left_sites_on_contig) <= 1:
+        if contig_sites is None or len(contig_sites.left_starts) <= 1:
             return None
 
         # Determine orientation: is rlmH upstream (forward) or downstream (reverse)?
         if rlmH_start < att_left_inner.start:
             # Forward orientation: rlmH ... attR ... attL_inner ... attL_outer
             # Outer = largest start coordinate, beyond inner
-            candidates = [
-                s for s in left_sites_on_contig
-                if s.start > att_left_inner.start
-            ]
-            if not candidates:
-                return None
-            return max(candidates, key=lambda s: s.start)
+            outer = contig_sites.left_with_max_start()
+            return outer if outer.start > att_left_inner.start else None
         else:
             # Reverse orientation: attL_outer ... attL_inner ... attR ... rlmH
             # Outer = smallest start coordinate, beyond inner
-            candidates = [
-                s for s in left_sites_on_contig
-                if s.start < att_left_inner.start
-            ]
-            if not candidates:
-                return None
-            return min(candidates, key=lambda s: s.start)
+            outer = contig_sites.left_with_min_start()
+            return outer if outer.start < att_left_inner.start else None
 
     def diagnose_partial(self) -> str:
         """Diagnose why extraction failed (no valid pair on same contig).
@@ -474,6 +613,17 @@ class AttSiteCollection:
         return "unknown"
 
 
+# Header tags marking a complete circular replicon (Unicycler/Trycycler
+# ``circular=true``, NCBI/Bakta ``[topology=circular]``)
+_CIRCULAR_HEADER = re.compile(r"\b(?:circular=(?:true|yes)|topology=circular)\b",
+                              re.IGNORECASE)
+
+
+def is_circular_header(description: Optional[str]) -> bool:
+    """Return True if a FASTA header declares a circular topology."""
+    return bool(description and _CIRCULAR_HEADER.search(description))
+
+
 class GenomeSequences:
     """Handles genome sequence data and extraction operations."""
     
@@ -493,26 +643,146 @@ class GenomeSequences:
             return len(self.sequences[contig].seq)
         return None
 
+    def get_description(self, contig: str) -> Optional[str]:
+        """Return the contig's full FASTA header line (without ``>``)."""
+        record = self.sequences.get(contig)
+        return record.description if record is not None else None
+
     def get_sequence(self, contig: str):
         """Get sequence for a specific contig."""
         return self.sequences.get(contig)
     
-    def extract_region(self, contig: str, start: int, end: int, reverse_complement: bool = False):
-        """Extract a genomic region from a contig."""
+    def extract_region(self, contig: str, start: int, end: int, reverse_complement: bool = False,
+                       circular: bool = False):
+        """Extract a genomic region from a contig.
+
+        With *circular*, a region whose upper slice bound lies past the
+        contig end continues from the start of the contig (an element
+        spanning the origin of a circular chromosome).
+        """
 
         if contig not in self.sequences:
             raise ValueError(f"Contig {contig} not found in sequences")
-        
+
+        seq = self.sequences[contig].seq
         if reverse_complement:
             # Extract with end as start and reverse complement extracted sequence
-            sequence = self.sequences[contig].seq[end:start]
+            start, end = end, start
+
+        if circular and end > len(seq):
+            sequence = seq[start:] + seq[:end - len(seq)]
+        else:
+            sequence = seq[start:end]
+
+        if reverse_complement:
             sequence = sequence.reverse_complement()
-        
+
+        return sequence
+
+
+class IndexedGenomeSequences:
+    """GenomeSequences backend reading regions from a memory-mapped FASTA.
+
+    Contig lengths come from a ``.fai`` index (built or reused) and
+    ``extract_region`` reads only the requested bytes, so memory use is
+    bounded by the extracted element rather than the assembly.
+    """
+
+    def __init__(self, fasta_file: str):
+        self.fasta_file = fasta_file
+        self._fasta = IndexedFasta(fasta_file)
+
+    def get_contig_length(self, contig: str) -> Optional[int]:
+        """Return the length of a contig, or None if not found."""
+        return self._fasta.length(contig)
+
+    def get_sequence(self, contig: str):
+        """Get sequence for a specific contig."""
+        if contig not in self._fasta:
+            return None
+        return SeqIO.SeqRecord(self.extract_region(contig, 0, self._fasta.length(contig)),
+                         id=contig, description="")
+
+    def get_description(self, contig: str) -> Optional[str]:
+        """Return the contig's full FASTA header line (without ``>``)."""
+        if contig not in self._fasta:
+            return None
+        return self._fasta.header(contig)
+
+    def extract_region(self, contig: str, start: int, end: int, reverse_complement: bool = False,
+                       circular: bool = False):
+        """Extract a genomic region from a contig (same slicing as GenomeSequences)."""
+        if contig not in self._fasta:
+            raise ValueError(f"Contig {contig} not found in sequences")
+
+        if reverse_complement:
+            start, end = end, start
+
+        length = self._fasta.length(contig)
+        if circular and end > length:
+            region = (self._fasta.fetch(contig, start, length)
+                      + self._fasta.fetch(contig, 0, end - length))
         else:
-            sequence = self.sequences[contig].seq[start:end]
+            region = self._fasta.fetch(contig, start, end)
+
+        sequence = Seq(region.decode())
+        if reverse_complement:
+            sequence = sequence.reverse_complement()
 
         return sequence
 
+    def close(self):
+        self._fasta.close()
+
+
+class ContigLengths:
+    """Contig lengths and headers of a FASTA, read without keeping sequence.
+
+    Backend for coordinates-only extraction from FASTAs that cannot be
+    ``.fai``-indexed; it cannot extract regions.
+    """
+
+    def __init__(self, fasta_file: str):
+        self.fasta_file = fasta_file
+        self.lengths: Dict[str, int] = {}
+        self.headers: Dict[str, str] = {}
+        name = None
+
+        with open(fasta_file) as fasta:
+            for line in fasta:
+                if line.startswith(">"):
+                    header = line[1:].rstrip()
+                    name = header.split(None, 1)[0] if header else ""
+                    self.headers[name] = header
+                    self.lengths[name] = 0
+                elif name is not None:
+                    self.lengths[name] += len(line.strip())
+
+    def get_contig_length(self, contig: str) -> Optional[int]:
+        """Return the length of a contig, or None if not found."""
+        return self.lengths.get(contig)
+
+    def get_description(self, contig: str) -> Optional[str]:
+        """Return the contig's full FASTA header line (without ``>``)."""
+        return self.headers.get(contig)
+
+
+def load_genome_sequences(fasta_file: str, lengths_only: bool = False):
+    """Return an indexed genome when the FASTA layout allows, else parse it.
+
+    Gzipped or irregularly wrapped FASTAs cannot be ``.fai``-indexed and are
+    loaded into memory with GenomeSequences, or only scanned for contig
+    lengths with *lengths_only*.
+    """
+    if not str(fasta_file).endswith(".gz"):
+        try:
+            return IndexedGenomeSequences(fasta_file)
+        except FastaIndexError:
+            pass
+    if lengths_only:
+        return ContigLengths(fasta_file)
+    return GenomeSequences(fasta_file)
+
 
 class SCCmecExtractor:
     """Main class that coordinates SCCmec extraction from genomic data."""
@@ -520,20 +790,55 @@ class SCCmecExtractor:
     def __init__(self, fasta_file: str, gff3_file: str = None, tsv_file: str = "",
                  composite: bool = False, blast_rlmh: bool = False,
                  rlmh_ref: str = None, rlmh_positions=None,
-                 genome_sequences=None, genome_db_prefix: str = None):
+                 genome_sequences=None, genome_db_prefix: str = None,
+                 ccr_hits=None, att_index: AttSiteIndex = None,
+                 collect_reports: bool = False, circular: bool = False,
+                 coordinates_only: bool = False, bundle=None,
+                 sample_name: str = None):
         self.fasta_file = fasta_file
-        self.target_file = self._get_input_filename(fasta_file)
+        # A multi-sample FASTA's genomes are named by sample ID
+        self.target_file = sample_name or self._get_input_filename(fasta_file)
         self.composite = composite
+
+        # Treat every contig as circular; otherwise only contigs whose
+        # header declares a circular topology are
+        self.circular = circular
+        self._circular_lengths: Dict[str, Optional[int]] = {}
         self._genome_db_prefix = genome_db_prefix
 
+        # Raw genome-wide ccr hits (bundled ccr reference); searched at most
+        # once per genome when not supplied by the caller
+        self._ccr_hits = ccr_hits
+        self._filtered_ccr_hits = None
+
+        # Set when extraction succeeds
+        self.extracted_region: Optional[ExtractedRegion] = None
+
+        # With collect_reports, report rows are kept here for a single
+        # writer (batch mode) instead of being appended to the report files
+        self.collect_reports = collect_reports
+        self.reports: List[ExtractionReport] = []
+        self.ambiguous_reports: List[AmbiguousHitReport] = []
+        self.coordinates: List[ElementCoordinates] = []
+
+        # Record element intervals instead of writing FASTA files
+        self.coordinates_only = coordinates_only
+
+        # Bundled output (ShardWriter or RecordCollector): elements are
+        # added to it under target_file instead of written one per file
+        self.bundle = bundle
+
         # Initialise component objects
-        self.genome = genome_sequences if genome_sequences is not None else GenomeSequences(fasta_file)
+        if genome_sequences is None:
+            self.genome = load_genome_sequences(fasta_file, lengths_only=coordinates_only)
+        else:
+            self.genome = as_genome_buffer(genome_sequences)
 
         # rlmH detection: pre-computed > BLAST > GFF
         if rlmh_positions is not None:
             self.genes = PrecomputedRlmH(rlmh_positions)
         elif blast_rlmh:
-            self.genes = RlmHBlastAdapter(fasta_file, rlmh_ref)
+            self.genes = RlmHBlastAdapter(fasta_file, rlmh_ref, genome_db_prefix)
         elif gff3_file:
             self.genes = GeneAnnotations(gff3_file)
         else:
@@ -542,12 +847,45 @@ class SCCmecExtractor:
                 "for rlmH detection"
             )
 
-        self.att_sites = AttSiteCollection(tsv_file, self.target_file)
+        # Use the TSV's sidecar index when one has been built
+        if att_index is None and tsv_file and has_index(tsv_file):
+            att_index = AttSiteIndex(tsv_file)
+            try:
+                self.att_sites = AttSiteCollection(tsv_file, self.target_file, att_index)
+            finally:
+                att_index.close()
+        else:
+            self.att_sites = AttSiteCollection(tsv_file, self.target_file, att_index)
 
     def _get_input_filename(self, fna_path: str) -> str:
         """Extract the base filename without extension from the input path."""
         return Path(fna_path).stem
 
+    def _circular_length(self, contig: str) -> Optional[int]:
+        """Return the contig's length if it is circular, else None."""
+        if contig not in self._circular_lengths:
+            length = None
+            if self.circular or is_circular_header(self.genome.get_description(contig)):
+                length = self.genome.get_contig_length(contig)
+            self._circular_lengths[contig] = length
+        return self._circular_lengths[contig]
+
+    def _wrap_length(self, contig: str, pos_a: int, pos_b: int) -> Optional[int]:
+        """Return the contig length if the shorter path between two positions
+        on a circular contig crosses its origin, else None."""
+        length = self._circular_length(contig)
+        distance = abs(pos_a - pos_b)
+        if length and distance > length - distance:
+            return length
+        return None
+
+    def _distance(self, contig: str, pos_a: int, pos_b: int) -> int:
+        """Distance between two positions, going across the origin of a
+        circular contig when that is shorter."""
+        length = self._wrap_length(contig, pos_a, pos_b)
+        distance = abs(pos_a - pos_b)
+        return length - distance if length else distance
+
     @staticmethod
     def _check_contig_edge(site: AttSite, contig_length: int,
                            threshold: int = 500) -> bool:
@@ -592,15 +930,12 @@ class SCCmecExtractor:
         contigs = sorted(self.genes.rlmH_positions.keys())
         return ", ".join(contigs) if contigs else "-"
 
-    @staticmethod
-    def _write_ambiguous_report(report: 'AmbiguousHitReport', report_file: str):
+    def _write_ambiguous_report(self, report: 'AmbiguousHitReport', report_file: str):
         """Append one row to the ambiguous report TSV. Writes header if file is new/empty."""
-        output_path = Path(report_file)
-        write_header = not output_path.exists() or output_path.stat().st_size == 0
-        with open(report_file, 'a') as f:
-            if write_header:
-                f.write(AmbiguousHitReport.HEADER + "\n")
-            f.write(report.to_tsv_row() + "\n")
+        if self.collect_reports:
+            self.ambiguous_reports.append(report)
+            return
+        append_report_rows([report], report_file)
 
     def _build_ambiguous_report(self, reason: str, notes: str,
                                 element_size: str = "-") -> 'AmbiguousHitReport':
@@ -615,18 +950,8 @@ class SCCmecExtractor:
             notes=notes,
         )
 
-    def _detect_ccr_between(self, contig: str, pos_a: int, pos_b: int) -> bool:
-        """Check if ccr genes exist between two positions on a contig.
-
-        Uses BLAST to detect ccr genes in the genome, then checks if any
-        hit falls between pos_a and pos_b on the specified contig.
-
-        Returns True if at least one valid ccr gene (ccrA+ccrB pair or ccrC)
-        is found in the region.
-        """
-        region_start = min(pos_a, pos_b)
-        region_end = max(pos_a, pos_b)
-
+    def _search_genome_ccr(self):
+        """BLAST the bundled ccr reference against the genome (raw hits)."""
         runner = BlastRunner()
 
         # Reuse shared DB when provided, otherwise create a temporary one
@@ -645,35 +970,9 @@ class SCCmecExtractor:
             with get_default_ref("ccr_genes.fasta") as ref_path:
                 results_file = runner.run_blastn(str(ref_path), db_prefix)
                 hits = parse_blast_output(results_file)
-
-                # Get reference lengths for coverage calculation
-                ref_lengths = {}
-                for record in SeqIO.parse(str(ref_path), "fasta"):
-                    ref_lengths[record.id] = len(record.seq)
-
                 runner.cleanup_file(results_file)
 
-            # Filter hits: 70% identity (novel threshold), 75% coverage
-            filtered = filter_hits(hits, min_pident=70.0, min_coverage=0.75,
-                                   ref_lengths=ref_lengths)
-
-            # Check which hits are on our contig and within the region
-            ccr_in_region = set()
-            for hit in filtered:
-                if hit.sseqid != contig:
-                    continue
-                hit_start = min(hit.sstart, hit.send)
-                hit_end = max(hit.sstart, hit.send)
-                # Hit overlaps the region
-                if hit_start <= region_end and hit_end >= region_start:
-                    # Extract gene type: ccrA, ccrB, or ccrC
-                    gene_type = hit.qseqid.rstrip('0123456789')
-                    ccr_in_region.add(gene_type)
-
-            # Valid ccr: (ccrA AND ccrB) OR ccrC
-            has_AB = 'ccrA' in ccr_in_region and 'ccrB' in ccr_in_region
-            has_C = 'ccrC' in ccr_in_region
-            return has_AB or has_C
+            return hits
 
         finally:
             if owns_db:
@@ -683,66 +982,89 @@ class SCCmecExtractor:
                 except OSError:
                     pass
 
-    MAX_ATTL_RLMH_DISTANCE = 120_000
-
-    def _classify_ccr_status(self) -> str:
-        """Classify ccr gene status in the genome.
+    def _get_ccr_hits(self):
+        """Return genome-wide ccr hits passing the novel thresholds.
 
-        Returns:
-            "valid"       — functional ccr pair (ccrA+ccrB) or ccrC found
-            "no_ccr_pair" — lone ccrA or lone ccrB without partner (and no ccrC)
-            "no_ccr"      — no ccr genes detected at all
+        The search runs at most once per extractor; composite checks and
+        failure diagnosis all reuse the same hits.
         """
-        runner = BlastRunner()
+        if self._filtered_ccr_hits is None:
+            if self._ccr_hits is None:
+                self._ccr_hits = self._search_genome_ccr()
 
-        owns_db = self._genome_db_prefix is None
-        if owns_db:
-            tmp_dir = tempfile.mkdtemp(prefix="sccmec_ccr_")
-            db_prefix = os.path.join(tmp_dir, "genome_db")
-        else:
-            tmp_dir = None
-            db_prefix = self._genome_db_prefix
+            # Get reference lengths for coverage calculation
+            with get_default_ref("ccr_genes.fasta") as ref_path:
+                ref_lengths = get_ref_lengths(str(ref_path))
 
-        try:
-            if owns_db:
-                runner.create_db(self.fasta_file, db_prefix)
+            # Filter hits: 70% identity (novel threshold), 75% coverage
+            self._filtered_ccr_hits = filter_hits(
+                self._ccr_hits, min_pident=70.0, min_coverage=0.75,
+                ref_lengths=ref_lengths,
+            )
+        return self._filtered_ccr_hits
 
-            with get_default_ref("ccr_genes.fasta") as ref_path:
-                results_file = runner.run_blastn(str(ref_path), db_prefix)
-                hits = parse_blast_output(results_file)
+    def _detect_ccr_between(self, contig: str, pos_a: int, pos_b: int) -> bool:
+        """Check if ccr genes exist between two positions on a contig.
 
-                ref_lengths = {}
-                for record in SeqIO.parse(str(ref_path), "fasta"):
-                    ref_lengths[record.id] = len(record.seq)
+        Uses BLAST to detect ccr genes in the genome, then checks if any
+        hit falls between pos_a and pos_b on the specified contig.
 
-                runner.cleanup_file(results_file)
+        Returns True if at least one valid ccr gene (ccrA+ccrB pair or ccrC)
+        is found in the region.
+        """
+        region_start = min(pos_a, pos_b)
+        region_end = max(pos_a, pos_b)
 
-            filtered = filter_hits(hits, min_pident=70.0, min_coverage=0.75,
-                                   ref_lengths=ref_lengths)
+        # On a circular contig the region may run through the origin
+        wrap_length = self._wrap_length(contig, pos_a, pos_b)
+        if wrap_length:
+            regions = [(region_end, wrap_length), (1, region_start)]
+        else:
+            regions = [(region_start, region_end)]
 
-            ccr_types = set()
-            for hit in filtered:
+        # Check which hits are on our contig and within the region
+        ccr_in_region = set()
+        for hit in self._get_ccr_hits():
+            if hit.sseqid != contig:
+                continue
+            hit_start = min(hit.sstart, hit.send)
+            hit_end = max(hit.sstart, hit.send)
+            # Hit overlaps the region
+            if any(hit_start <= r_end and hit_end >= r_start for r_start, r_end in regions):
+                # Extract gene type: ccrA, ccrB, or ccrC
                 gene_type = hit.qseqid.rstrip('0123456789')
-                ccr_types.add(gene_type)
+                ccr_in_region.add(gene_type)
 
-            if not ccr_types:
-                return "no_ccr"
+        # Valid ccr: (ccrA AND ccrB) OR ccrC
+        has_AB = 'ccrA' in ccr_in_region and 'ccrB' in ccr_in_region
+        has_C = 'ccrC' in ccr_in_region
+        return has_AB or has_C
 
-            has_AB = 'ccrA' in ccr_types and 'ccrB' in ccr_types
-            has_C = 'ccrC' in ccr_types
-            if has_AB or has_C:
-                return "valid"
+    MAX_ATTL_RLMH_DISTANCE = 120_000
 
-            # Has some ccr gene(s) but not a valid pair
-            return "no_ccr_pair"
+    def _classify_ccr_status(self) -> str:
+        """Classify ccr gene status in the genome.
 
-        finally:
-            if owns_db:
-                runner.cleanup_db(db_prefix)
-                try:
-                    os.rmdir(tmp_dir)
-                except OSError:
-                    pass
+        Returns:
+            "valid"       — functional ccr pair (ccrA+ccrB) or ccrC found
+            "no_ccr_pair" — lone ccrA or lone ccrB without partner (and no ccrC)
+            "no_ccr"      — no ccr genes detected at all
+        """
+        ccr_types = set()
+        for hit in self._get_ccr_hits():
+            gene_type = hit.qseqid.rstrip('0123456789')
+            ccr_types.add(gene_type)
+
+        if not ccr_types:
+            return "no_ccr"
+
+        has_AB = 'ccrA' in ccr_types and 'ccrB' in ccr_types
+        has_C = 'ccrC' in ccr_types
+        if has_AB or has_C:
+            return "valid"
+
+        # Has some ccr gene(s) but not a valid pair
+        return "no_ccr_pair"
 
     def _has_ccr_in_genome(self) -> bool:
         """Check if valid ccr genes exist anywhere in the genome.
@@ -758,7 +1080,8 @@ class SCCmecExtractor:
 
     def _attempt_left_only_recovery(self, report: ExtractionReport,
                                      output_dir: str, report_file: str = None,
-                                     ambiguous_report_file: str = None) -> bool:
+                                     ambiguous_report_file: str = None,
+                                     coordinates_file: str = None) -> bool:
         """Attempt extraction when only attL is found (no attR).
 
         Assumes attR is within rlmH. Validates by checking:
@@ -783,7 +1106,7 @@ class SCCmecExtractor:
                 print(f"Warning: {rlmH_warning} for {self.target_file}", file=sys.stderr)
 
             # Check 2: distance <= 120kb
-            distance = abs(rlmH_start - att_left.end)
+            distance = self._distance(contig, rlmH_start, att_left.end)
             if distance > self.MAX_ATTL_RLMH_DISTANCE:
                 continue
 
@@ -793,7 +1116,7 @@ class SCCmecExtractor:
 
             # All checks passed — proceed with extraction
             output_file = os.path.join(output_dir, f"{self.target_file}_SCCmec.fasta")
-            if os.path.exists(output_file):
+            if self._output_exists(output_file):
                 report.status = "skipped"
                 report.notes = "Output file already exists (left_only recovery)"
                 if rlmH_warning:
@@ -819,10 +1142,15 @@ class SCCmecExtractor:
             report.attl_start = str(att_left.start)
             report.attl_end = str(att_left.end)
 
+            wrap_length = self._wrap_length(contig, rlmH_start, att_left.end)
+
             try:
-                # Composite detection (reuse existing logic)
+                # Composite detection (reuse existing logic); not attempted
+                # for elements spanning the origin of a circular contig
                 best_pair = (inferred_attr, att_left)
-                outer_left = self.att_sites.find_outer_left_site(best_pair, rlmH_start)
+                outer_left = None
+                if not wrap_length:
+                    outer_left = self.att_sites.find_outer_left_site(best_pair, rlmH_start)
                 if outer_left:
                     report.outer_attl_pattern = outer_left.pattern
                     report.outer_attl_start = str(outer_left.start)
@@ -830,7 +1158,7 @@ class SCCmecExtractor:
 
                 # Composite size sanity check — discard mispaired outer attL
                 if outer_left:
-                    composite_size = abs(rlmH_start - outer_left.end)
+                    composite_size = self._distance(contig, rlmH_start, outer_left.end)
                     if composite_size > self.MAX_COMPOSITE_SIZE:
                         outer_left = None
                         report.notes = (f"Outer attL discarded: composite size {composite_size} bp "
@@ -852,21 +1180,20 @@ class SCCmecExtractor:
                         report.notes = "Composite downgraded: no ccr genes in outer region"
 
                 # Determine coordinates (att_right param is unused internally)
-                start_extract, end_extract, reverse_complement = \
-                    self._determine_extraction_coordinates(
-                        rlmH_start, inferred_attr, extract_left
-                    )
-
-                # Extract sequence
-                extracted_seq = self.genome.extract_region(
-                    contig, start_extract, end_extract, reverse_complement
+                coordinates = self._determine_extraction_coordinates(
+                    rlmH_start, inferred_attr, extract_left, wrap_length
                 )
+                inner_coordinates = None
+                if extract_left is not att_left:
+                    inner_coordinates = self._determine_extraction_coordinates(
+                        rlmH_start, inferred_attr, att_left
+                    )
 
                 # Element size
-                element_size = abs(rlmH_start - att_left.end)
+                element_size = self._distance(contig, rlmH_start, att_left.end)
                 report.element_size = str(element_size)
                 if outer_left:
-                    composite_size = abs(rlmH_start - outer_left.end)
+                    composite_size = self._distance(contig, rlmH_start, outer_left.end)
                     report.composite_size = str(composite_size)
 
                 # Size sanity check — always use element_size (inner element
@@ -886,7 +1213,8 @@ class SCCmecExtractor:
                                 report.notes = (
                                     f"Probable origin-spanning element on circular chromosome "
                                     f"(contig {contig_len} bp). Linear distance {element_size} bp "
-                                    f"but wrap-around distance ~{wrap_around} bp")
+                                    f"but wrap-around distance ~{wrap_around} bp; "
+                                    f"rerun with --circular to extract it")
                     if rlmH_warning:
                         report.notes = f"{rlmH_warning}; {report.notes}" if report.notes != "-" else rlmH_warning
                     if report_file:
@@ -898,24 +1226,23 @@ class SCCmecExtractor:
                         self._write_ambiguous_report(amb, ambiguous_report_file)
                     return False
 
-                # Edge flags
+                # Edge flags (the ends of an origin-spanning contig are joined)
                 contig_len = self.genome.get_contig_length(contig)
-                if contig_len:
+                if contig_len and not wrap_length:
                     sites_on_contig = self.att_sites.get_sites_on_contig(contig)
                     report.contig_edge_flags = self._build_edge_flags(
                         sites_on_contig, contig_len
                     )
 
-                # Create record and write
-                record = self._create_sequence_record(
-                    extracted_seq, inferred_attr, extract_left,
-                    start_extract, end_extract
+                # Write the element (or its coordinates)
+                element_length = self._save_element(
+                    inferred_attr, extract_left, coordinates, wrap_length,
+                    output_file, coordinates_file, inner_coordinates,
                 )
 
-                with open(output_file, "w") as fasta_output:
-                    SeqIO.write([record], fasta_output, "fasta")
-
                 left_only_note = "Left-only recovery: attR inferred from rlmH, validated by ccr"
+                if wrap_length:
+                    left_only_note = f"{self._origin_note(contig, wrap_length)}; {left_only_note}"
                 if report.notes != "-":
                     report.notes = f"{report.notes}; {left_only_note}"
                 else:
@@ -923,7 +1250,7 @@ class SCCmecExtractor:
                 if rlmH_warning:
                     report.notes = f"{rlmH_warning}; {report.notes}"
                 print(f"Successfully processed {self.target_file} (left-only recovery): "
-                      f"Extracted sequence of length {len(extracted_seq)} bp")
+                      f"{self._success_verb()} of length {element_length} bp")
 
                 if report_file:
                     self._write_report(report, report_file)
@@ -943,36 +1270,50 @@ class SCCmecExtractor:
         # No valid left site passed all checks
         return False
 
-    @staticmethod
-    def _write_report(report: ExtractionReport, report_file: str):
+    def _write_report(self, report: ExtractionReport, report_file: str):
         """Append one row to the report TSV. Writes header if file is new/empty."""
-        output_path = Path(report_file)
-        write_header = not output_path.exists() or output_path.stat().st_size == 0
-
-        with open(report_file, 'a') as f:
-            if write_header:
-                f.write(ExtractionReport.HEADER + "\n")
-            f.write(report.to_tsv_row() + "\n")
+        if self.collect_reports:
+            self.reports.append(report)
+            return
+        append_report_rows([report], report_file)
     
-    def _determine_extraction_coordinates(self, rlmH_start: int, att_right: AttSite, att_left: AttSite) -> Tuple[int, int, bool]:
-        """Determine the coordinates for SCCmec extraction."""
+    def _determine_extraction_coordinates(self, rlmH_start: int, att_right: AttSite, att_left: AttSite,
+                                          contig_length: Optional[int] = None) -> Tuple[int, int, bool]:
+        """Determine the coordinates for SCCmec extraction.
+
+        With *contig_length* (the element spans the origin of a circular
+        contig) the lower of rlmH and attL is moved one contig length on, so
+        the region runs past the contig end for ``extract_region(circular=True)``.
+        """
+        att_left_end = att_left.end
+        if contig_length:
+            if rlmH_start < att_left_end:
+                rlmH_start += contig_length
+            else:
+                att_left_end += contig_length
+
         # Default extraction with padding
         start_extract = rlmH_start - 30
-        end_extract = att_left.end + 30
+        end_extract = att_left_end + 30
         reverse_complement = False
         
         # Check if we need reverse complement (SCCmec on reverse strand)
         if start_extract > end_extract:
             start_extract = rlmH_start + 600
-            end_extract = att_left.end - 60
+            end_extract = att_left_end - 60
             reverse_complement = True
         
         return start_extract, end_extract, reverse_complement
+
+    @staticmethod
+    def _origin_note(contig: str, contig_length: int) -> str:
+        return (f"Origin-spanning element extracted across the start of circular "
+                f"contig {contig} ({contig_length} bp)")
     
     def _create_sequence_record(self, sequence, att_right: AttSite, att_left: AttSite, 
                               start: int, end: int):
         """Create a SeqRecord with appropriate ID and description."""
-        record_id = f"{self.target_file}_{att_right.contig}_{start}_{end}"
+        record_id = self._record_id(att_right.contig, start, end)
         description = f"attR:{att_right}_attL:{att_left}"
         
         return SeqIO.SeqRecord(
@@ -980,9 +1321,98 @@ class SCCmecExtractor:
             id=record_id,
             description=description
         )
+
+    def _record_id(self, contig: str, start: int, end: int) -> str:
+        return f"{self.target_file}_{contig}_{start}_{end}"
+
+    def _output_exists(self, output_file: str) -> bool:
+        """Whether this genome's element was already written (never in
+        coordinates-only mode)."""
+        if self.coordinates_only:
+            return False
+        if self.bundle is not None:
+            return self.target_file in self.bundle
+        return os.path.exists(output_file)
+
+    def _success_verb(self) -> str:
+        return "Located element" if self.coordinates_only else "Extracted sequence"
+
+    def _save_element(self, att_right: AttSite, att_left: AttSite,
+                      coordinates: Tuple[int, int, bool], wrap_length: Optional[int],
+                      output_file: str, coordinates_file: Optional[str],
+                      inner_coordinates: Optional[Tuple[int, int, bool]] = None) -> int:
+        """Write the extracted element and set ``extracted_region``.
+
+        In coordinates-only mode the element's interval (plus the inner
+        element's, for composites) is written to *coordinates_file* instead
+        of slicing the genome and writing a FASTA; with ``bundle`` the record
+        is added to the bundle. Returns the element length in bp.
+        """
+        contig = att_right.contig
+        start, end, reverse_complement = coordinates
+
+        if self.coordinates_only:
+            rows = self._element_coordinates(
+                contig, coordinates, wrap_length,
+                "composite" if inner_coordinates else "element",
+            )
+            record_id = rows[0].name
+            length = sum(row.end - row.start for row in rows)
+            if inner_coordinates:
+                rows += self._element_coordinates(contig, inner_coordinates, None, "inner")
+            if self.collect_reports:
+                self.coordinates.extend(rows)
+            elif coordinates_file:
+                append_report_rows(rows, coordinates_file)
+        else:
+            sequence = self.genome.extract_region(
+                contig, start, end, reverse_complement,
+                circular=wrap_length is not None,
+            )
+            record = self._create_sequence_record(sequence, att_right, att_left, start, end)
+            if self.bundle is not None:
+                self.bundle.add(self.target_file, record)
+            else:
+                with open(output_file, "w") as fasta_output:
+                    SeqIO.write([record], fasta_output, "fasta")
+            record_id = record.id
+            length = len(sequence)
+
+        self.extracted_region = ExtractedRegion(
+            contig, start, end, reverse_complement, record_id, wrap_length,
+        )
+        return length
+
+    def _element_coordinates(self, contig: str, coordinates: Tuple[int, int, bool],
+                             wrap_length: Optional[int],
+                             interval: str) -> List[ElementCoordinates]:
+        """BED intervals covered by ``extract_region`` for the given
+        coordinates: one, or two for an element spanning the origin (the
+        part after the origin first on the minus strand, so stranded
+        sequences join in row order)."""
+        start, end, reverse_complement = coordinates
+        lo, hi = (end, start) if reverse_complement else (start, end)
+        contig_length = self.genome.get_contig_length(contig)
+        lo = max(lo, 0)
+        if not wrap_length:
+            hi = min(hi, contig_length)
+        spans = [(lo, hi)]
+        if hi > contig_length:
+            spans = [(lo, contig_length), (0, hi - contig_length)]
+            if reverse_complement:
+                spans.reverse()
+        return [
+            ElementCoordinates(
+                contig, span_start, span_end, self._record_id(contig, start, end),
+                "-" if reverse_complement else "+", self.target_file, interval,
+                contig_length,
+            )
+            for span_start, span_end in spans
+        ]
     
     def extract_sccmec(self, output_dir: str, report_file: str = None,
-                        ambiguous_report_file: str = None) -> bool:
+                        ambiguous_report_file: str = None,
+                        coordinates_file: str = None) -> bool:
         """Extract SCCmec sequence and save to file.
 
         Parameters
@@ -996,6 +1426,9 @@ class SCCmecExtractor:
             Path to TSV file for actionable failure details. When provided,
             a row listing all found att sites is appended for every genome
             that fails extraction for an actionable reason.
+        coordinates_file : str, optional
+            BED file the element intervals are appended to in
+            coordinates-only mode (no FASTA is written).
         """
         os.makedirs(output_dir, exist_ok=True)
         report = ExtractionReport(input_file=self.target_file)
@@ -1009,6 +1442,7 @@ class SCCmecExtractor:
                 recovery_result = self._attempt_left_only_recovery(
                     report, output_dir, report_file,
                     ambiguous_report_file=ambiguous_report_file,
+                    coordinates_file=coordinates_file,
                 )
                 if recovery_result:
                     return True
@@ -1084,6 +1518,7 @@ class SCCmecExtractor:
                 recovery_result = self._attempt_left_only_recovery(
                     report, output_dir, report_file,
                     ambiguous_report_file=ambiguous_report_file,
+                    coordinates_file=coordinates_file,
                 )
                 if recovery_result:
                     return True
@@ -1148,7 +1583,7 @@ class SCCmecExtractor:
         output_file = os.path.join(output_dir, f"{self.target_file}_SCCmec.fasta")
 
         # --- Skip: output already exists ---
-        if os.path.exists(output_file):
+        if self._output_exists(output_file):
             print(f"Skipping {self.target_file}: Output file already exists", file=sys.stderr)
             report.status = "skipped"
             report.notes = "Output file already exists"
@@ -1156,9 +1591,15 @@ class SCCmecExtractor:
                 self._write_report(report, report_file)
             return False
 
+        # Elements spanning the origin of a circular contig are extracted
+        # across it; composite detection is not attempted for them
+        wrap_length = self._wrap_length(contig, att_right.start, att_left.end)
+
         try:
             # Composite detection
-            outer_left = self.att_sites.find_outer_left_site(best_pair, rlmH_start)
+            outer_left = None
+            if not wrap_length:
+                outer_left = self.att_sites.find_outer_left_site(best_pair, rlmH_start)
             if outer_left:
                 report.outer_attl_pattern = outer_left.pattern
                 report.outer_attl_start = str(outer_left.start)
@@ -1205,7 +1646,7 @@ class SCCmecExtractor:
                 report.outer_attl_end = "-"
             else:
                 # Scenario 4: No CCR anywhere
-                element_size = abs(att_right.start - att_left.end)
+                element_size = self._distance(contig, att_right.start, att_left.end)
                 report.element_size = str(element_size)
                 report.status = "no_ccr_element"
                 report.notes = "Valid att site pair but no ccr genes detected in element"
@@ -1221,17 +1662,17 @@ class SCCmecExtractor:
                 return False
 
             # Determine extraction coordinates
-            start_extract, end_extract, reverse_complement = self._determine_extraction_coordinates(
-                rlmH_start, att_right, extract_left
-            )
-
-            # Extract sequence
-            extracted_seq = self.genome.extract_region(
-                contig, start_extract, end_extract, reverse_complement
+            coordinates = self._determine_extraction_coordinates(
+                rlmH_start, att_right, extract_left, wrap_length
             )
+            inner_coordinates = None
+            if report.is_composite == "True":
+                inner_coordinates = self._determine_extraction_coordinates(
+                    rlmH_start, att_right, att_left
+                )
 
             # Element sizes
-            element_size = abs(att_right.start - extract_left.end)
+            element_size = self._distance(contig, att_right.start, extract_left.end)
             report.element_size = str(element_size)
             if report.status == "composite_extracted" and outer_left:
                 composite_size = abs(att_right.start - outer_left.end)
@@ -1254,7 +1695,8 @@ class SCCmecExtractor:
                             report.notes = (
                                 f"Probable origin-spanning element on circular chromosome "
                                 f"(contig {contig_len} bp). Linear distance {element_size} bp "
-                                f"but wrap-around distance ~{wrap_around} bp")
+                                f"but wrap-around distance ~{wrap_around} bp; "
+                                f"rerun with --circular to extract it")
                 if rlmH_warning:
                     report.notes = f"{rlmH_warning}; {report.notes}" if report.notes != "-" else rlmH_warning
                 if report_file:
@@ -1266,21 +1708,22 @@ class SCCmecExtractor:
                     self._write_ambiguous_report(amb, ambiguous_report_file)
                 return False
 
-            # Contig-edge flags
+            # Contig-edge flags (the ends of an origin-spanning contig are joined)
             contig_len = self.genome.get_contig_length(contig)
-            if contig_len:
+            if contig_len and not wrap_length:
                 sites_on_contig = self.att_sites.get_sites_on_contig(contig)
                 report.contig_edge_flags = self._build_edge_flags(sites_on_contig, contig_len)
 
-            # Create record and write
-            record = self._create_sequence_record(
-                extracted_seq, att_right, extract_left, start_extract, end_extract
+            # Write the element (or its coordinates)
+            element_length = self._save_element(
+                att_right, extract_left, coordinates, wrap_length,
+                output_file, coordinates_file, inner_coordinates,
             )
+            if wrap_length:
+                origin_note = self._origin_note(contig, wrap_length)
+                report.notes = origin_note if report.notes == "-" else f"{report.notes}; {origin_note}"
 
-            with open(output_file, "w") as fasta_output:
-                SeqIO.write([record], fasta_output, "fasta")
-
-            print(f"Successfully processed {self.target_file}: Extracted sequence of length {len(extracted_seq)} bp")
+            print(f"Successfully processed {self.target_file}: {self._success_verb()} of length {element_length} bp")
             if rlmH_warning:
                 report.notes = f"{rlmH_warning}; {report.notes}" if report.notes != "-" else rlmH_warning
             if report_file:
@@ -1298,14 +1741,249 @@ class SCCmecExtractor:
             return False
 
 
+FASTA_EXTENSIONS = (".fna", ".fasta", ".fa")
+
+# Written to the SCCmec output directory in coordinates-only mode
+COORDINATES_FILENAME = "sccmec_coordinates.bed"
+
+
+@dataclass
+class BatchResult:
+    """Outcome of extracting one genome in batch mode."""
+    target: str
+    success: bool
+    reports: List[ExtractionReport] = field(default_factory=list)
+    ambiguous_reports: List[AmbiguousHitReport] = field(default_factory=list)
+    coordinates: List[ElementCoordinates] = field(default_factory=list)
+    # (input name, element record) pairs for the parent's ShardWriter
+    records: List[Tuple[str, SeqIO.SeqRecord]] = field(default_factory=list)
+    error: str = ""
+
+
+# Per-process state for batch workers, set by _init_batch_worker
+_BATCH_STATE: Dict = {}
+
+
+def _init_batch_worker(att_tsv: str, options: dict):
+    """Open the shared att-site index once per worker process."""
+    _BATCH_STATE["att_tsv"] = att_tsv
+    _BATCH_STATE["att_index"] = AttSiteIndex(att_tsv)
+    _BATCH_STATE.update(options)
+
+
+def _extract_batch_genome(fasta_path: str) -> BatchResult:
+    """Extract one genome using the worker's shared state.
+
+    When BLAST is used for rlmH, one genome database serves both rlmH
+    detection and the ccr checks. Report rows are returned to the caller
+    rather than written, so a single process writes the report files.
+    """
+    state = _BATCH_STATE
+    target = Path(fasta_path).stem
+    gff_path = None
+    if state["gff_dir"]:
+        candidate = os.path.join(state["gff_dir"], f"{target}.gff3")
+        if os.path.isfile(candidate):
+            gff_path = candidate
+    elif state["gff"]:
+        gff_path = state["gff"]
+    use_blast = state["blast_rlmh"] or gff_path is None
+
+    tmp_dir = None
+    db_prefix = None
+    bundle = RecordCollector(state["bundled"]) if state["bundled"] is not None else None
+    try:
+        if use_blast:
+            tmp_dir = tempfile.mkdtemp(prefix="sccmec_extract_")
+            db_prefix = os.path.join(tmp_dir, "genome_db")
+            BlastRunner().create_db(fasta_path, db_prefix)
+
+        extractor = SCCmecExtractor(
+            fasta_path, gff3_file=gff_path, tsv_file=state["att_tsv"],
+            composite=state["composite"], blast_rlmh=use_blast,
+            rlmh_ref=state["rlmh_ref"], genome_db_prefix=db_prefix,
+            att_index=state["att_index"], collect_reports=True,
+            circular=state["circular"], coordinates_only=state["coordinates_only"],
+            bundle=bundle,
+        )
+        success = extractor.extract_sccmec(
+            state["sccmec_dir"], report_file=state["report"],
+            ambiguous_report_file=state["ambiguous_report"],
+        )
+        return BatchResult(target, success, extractor.reports,
+                           extractor.ambiguous_reports, extractor.coordinates,
+                           bundle.records if bundle is not None else [])
+    except Exception as e:
+        return BatchResult(target, False, error=str(e))
+    finally:
+        if db_prefix is not None:
+            BlastRunner.cleanup_db(db_prefix)
+            try:
+                os.rmdir(tmp_dir)
+            except OSError:
+                pass
+
+
+def collect_genomes(paths: List[str], manifest: str = None,
+                    att_index: AttSiteIndex = None) -> List[str]:
+    """Resolve genome FASTA paths for batch extraction.
+
+    Parameters
+    ----------
+    paths : list of str
+        FASTA files and/or directories of FASTA files.
+    manifest : str, optional
+        File listing one FASTA path per line (``#`` comments allowed).
+    att_index : AttSiteIndex, optional
+        When given, every genome in the att-site index is extracted; *paths*
+        are then the directories its FASTA files are looked up in.
+    """
+    files = []
+    dirs = []
+    for p in paths or []:
+        if os.path.isdir(p):
+            dirs.append(p)
+            if att_index is None:
+                files.extend(
+                    str(f) for f in sorted(Path(p).iterdir())
+                    if f.suffix in FASTA_EXTENSIONS
+                )
+        else:
+            files.append(p)
+
+    if manifest:
+        with open(manifest) as f:
+            for line in f:
+                line = line.strip()
+                if line and not line.startswith("#"):
+                    files.append(line)
+
+    if att_index is not None:
+        by_stem = {Path(f).stem: f for f in files}
+        for d in dirs:
+            for f in Path(d).iterdir():
+                if f.suffix in FASTA_EXTENSIONS:
+                    by_stem.setdefault(f.stem, str(f))
+        resolved = []
+        for stem in att_index.input_files():
+            if stem in by_stem:
+                resolved.append(by_stem[stem])
+            else:
+                print(f"Warning: No FASTA found for {stem} in the att TSV", file=sys.stderr)
+        return resolved
+
+    return files
+
+
+def run_batch(fasta_files: List[str], att_tsv: str, sccmec_dir: str,
+              report_file: str = None, gff: str = None, gff_dir: str = None,
+              composite: bool = False, blast_rlmh: bool = False,
+              rlmh_ref: str = None, threads: int = 1,
+              circular: bool = False,
+              coordinates_only: bool = False,
+              bundle: bool = False) -> List[BatchResult]:
+    """Extract SCCmec from many genomes, writing reports from this process.
+
+    Workers (``threads`` > 1 uses a process pool) share the att TSV's sidecar
+    index, which is built or updated once here. Report rows are written in
+    input order as results arrive; with *coordinates_only*, so are the
+    element intervals (to ``COORDINATES_FILENAME`` in *sccmec_dir*). With
+    *bundle*, elements are returned to this process and appended to bgzip
+    shards in *sccmec_dir* (see ``fasta_shards``).
+
+    A single *gff* annotates one genome only; several genomes are matched
+    to annotations by stem through *gff_dir*.
+    """
+    if gff and len(fasta_files) > 1:
+        raise ValueError(
+            f"One GFF ({gff}) cannot annotate {len(fasta_files)} genomes; use gff_dir"
+        )
+    AttSiteIndex(att_tsv).close()
+
+    ambiguous_report = None
+    if report_file:
+        report_dir = os.path.dirname(report_file) or "."
+        ambiguous_report = os.path.join(report_dir, "ambiguous_att_sites.tsv")
+
+    options = dict(
+        sccmec_dir=sccmec_dir, report=report_file,
+        ambiguous_report=ambiguous_report, gff=gff, gff_dir=gff_dir,
+        composite=composite, blast_rlmh=blast_rlmh, rlmh_ref=rlmh_ref,
+        circular=circular, coordinates_only=coordinates_only,
+    )
+    writer = ShardWriter(sccmec_dir) if bundle and not coordinates_only else None
+    options["bundled"] = writer.stored_inputs() if writer is not None else None
+    coordinates_file = os.path.join(sccmec_dir, COORDINATES_FILENAME)
+    if coordinates_only:
+        os.makedirs(sccmec_dir, exist_ok=True)
+
+    if threads > 1:
+        from concurrent.futures import ProcessPoolExecutor
+
+        pool = ProcessPoolExecutor(
+            max_workers=threads, initializer=_init_batch_worker,
+            initargs=(att_tsv, options),
+        )
+        outcomes = pool.map(_extract_batch_genome, fasta_files)
+    else:
+        pool = None
+        _init_batch_worker(att_tsv, options)
+        outcomes = map(_extract_batch_genome, fasta_files)
+
+    results = []
+    try:
+        for result in outcomes:
+            if result.error:
+                print(f"Error processing {result.target}: {result.error}", file=sys.stderr)
+            if report_file:
+                append_report_rows(result.reports, report_file)
+                append_report_rows(result.ambiguous_reports, ambiguous_report)
+            append_report_rows(result.coordinates, coordinates_file)
+            for input_name, record in result.records:
+                writer.add(input_name, record)
+            results.append(result)
+    finally:
+        if writer is not None:
+            writer.close()
+        if pool is not None:
+            pool.shutdown()
+        else:
+            _BATCH_STATE["att_index"].close()
+            _BATCH_STATE.clear()
+
+    return results
+
+
 def main():
     parser = argparse.ArgumentParser(description="Extract SCCmec sequences based on att sites")
-    parser.add_argument("-f", "--fna", required=True, help=".fasta or .fna file containing genome sequence")
-    parser.add_argument("-g", "--gff", help=".gff3 file containing gene annotation information")
+    parser.add_argument("-f", "--fna", nargs="+",
+                        help=".fasta or .fna file(s) containing genome sequence, or "
+                             "directories of them")
+    parser.add_argument("--fna-list",
+                        help="File listing genome FASTA paths, one per line")
+    parser.add_argument("--all-in-att", action="store_true",
+                        help="Extract every genome in the att TSV, finding FASTA "
+                             "files by stem in the --fna directories")
+    gff_group = parser.add_mutually_exclusive_group()
+    gff_group.add_argument("-g", "--gff",
+                           help=".gff3 file containing gene annotation information "
+                                "(single genome; use --gff-dir for several)")
+    gff_group.add_argument("--gff-dir",
+                           help="Directory of .gff3 files matched to genomes by stem name")
     parser.add_argument("-a", "--att", required=True, help=".tsv file containing att site location information")
     parser.add_argument("-s", "--sccmec", required=True, help="Output directory for SCCmec sequences")
     parser.add_argument("--composite", action="store_true",
                         help="Extract to outermost boundary for composite elements")
+    parser.add_argument("--circular", action="store_true",
+                        help="Treat every contig as circular so elements spanning the "
+                             "origin are extracted (contigs with circular=true or "
+                             "topology=circular in their header always are)")
+    parser.add_argument("--coordinates-only", action="store_true",
+                        help=f"Write element intervals to {COORDINATES_FILENAME} in the "
+                             f"-s directory (BED) instead of extracting sequences")
+    parser.add_argument("--bundle", action="store_true",
+                        help="Append elements to indexed bgzip multi-FASTA shards in "
+                             "the -s directory instead of writing one file per genome")
     parser.add_argument("-r", "--report", default=None,
                         help="Output TSV file for extraction report (appends for batch)")
     parser.add_argument(
@@ -1318,22 +1996,56 @@ def main():
         "--rlmh-ref",
         help="Custom rlmH reference FASTA for BLAST detection (optional)",
     )
+    parser.add_argument(
+        "--index-att",
+        action="store_true",
+        help="Build (or update) a sidecar index next to the att TSV so "
+             "per-genome lookups do not rescan it; an existing index is "
+             "always used (batch runs always build one)",
+    )
+    parser.add_argument("-t", "--threads", type=int, default=1,
+                        help="Worker processes for batch extraction (default: 1)")
     args = parser.parse_args()
 
+    if not args.fna and not args.fna_list:
+        parser.error("one of -f/--fna or --fna-list is required")
+
     # Validate inputs
     validator = InputValidator()
 
-    validator.validate_fasta_file(args.fna)
-
     if args.gff:
         validator.validate_gff_file(args.gff)
 
     if args.att:
         validator.validate_tsv_file(args.att)
 
+    batch = (
+        args.fna_list or args.all_in_att or args.gff_dir or args.threads > 1
+        or len(args.fna or []) > 1 or any(os.path.isdir(p) for p in args.fna or [])
+    )
+
+    if batch:
+        att_index = AttSiteIndex(args.att) if args.all_in_att else None
+        fasta_files = collect_genomes(args.fna, args.fna_list, att_index)
+        if att_index is not None:
+            att_index.close()
+    else:
+        fasta_files = list(args.fna)
+
+    if not fasta_files:
+        print("ERROR: No genome FASTA files found", file=sys.stderr)
+        sys.exit(1)
+
+    if args.gff and len(fasta_files) > 1:
+        parser.error("-g/--gff annotates a single genome; use --gff-dir for "
+                     f"{len(fasta_files)} genomes")
+
+    for fasta_file in fasta_files:
+        validator.validate_fasta_file(fasta_file)
+
     # Auto-enable BLAST rlmH when no GFF provided
     blast_rlmh = args.blast_rlmh
-    if not args.gff and not blast_rlmh:
+    if not args.gff and not args.gff_dir and not blast_rlmh:
         try:
             from sccmecextractor.blast_utils import BlastRunner
             BlastRunner._check_blast_installed()
@@ -1347,26 +2059,52 @@ def main():
             )
             sys.exit(1)
 
+    if batch:
+        results = run_batch(
+            fasta_files, args.att, args.sccmec, report_file=args.report,
+            gff=args.gff, gff_dir=args.gff_dir, composite=args.composite,
+            blast_rlmh=blast_rlmh, rlmh_ref=args.rlmh_ref, threads=args.threads,
+            circular=args.circular, coordinates_only=args.coordinates_only,
+            bundle=args.bundle,
+        )
+        extracted = sum(1 for r in results if r.success)
+        print(f"\nExtracted SCCmec from {extracted} of {len(results)} genome(s)")
+        return
+
+    att_index = AttSiteIndex(args.att) if args.index_att else None
+
     # Derive ambiguous report path from report path
     ambiguous_report = None
     if args.report:
         report_dir = os.path.dirname(args.report) or "."
         ambiguous_report = os.path.join(report_dir, "ambiguous_att_sites.tsv")
 
+    bundle = None
+    if args.bundle and not args.coordinates_only:
+        bundle = ShardWriter(args.sccmec)
+
     # Create extractor and process
     extractor = SCCmecExtractor(
-        args.fna, gff3_file=args.gff, tsv_file=args.att,
+        fasta_files[0], gff3_file=args.gff, tsv_file=args.att,
         composite=args.composite, blast_rlmh=blast_rlmh,
-        rlmh_ref=args.rlmh_ref,
-    )
-    success = extractor.extract_sccmec(
-        args.sccmec, report_file=args.report,
-        ambiguous_report_file=ambiguous_report,
+        rlmh_ref=args.rlmh_ref, att_index=att_index, circular=args.circular,
+        coordinates_only=args.coordinates_only, bundle=bundle,
     )
+    if att_index is not None:
+        att_index.close()
+    try:
+        success = extractor.extract_sccmec(
+            args.sccmec, report_file=args.report,
+            ambiguous_report_file=ambiguous_report,
+            coordinates_file=os.path.join(args.sccmec, COORDINATES_FILENAME),
+        )
+    finally:
+        if bundle is not None:
+            bundle.close()
 
     if not success:
         sys.exit(1)
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
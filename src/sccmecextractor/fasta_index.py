@@ -0,0 +1,187 @@
+#!/usr/bin/env python
+
+"""samtools-style ``.fai`` indexing and random access for FASTA files.
+
+An index records, per contig, its length, the byte offset of its first base
+and its line layout, so any region can be located with arithmetic and read
+without parsing the rest of the file. Indexes are compatible with
+``samtools faidx`` (which can build or reuse them) and are written next to
+the FASTA when the directory allows it.
+"""
+
+import mmap
+import os
+
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+
+@dataclass
+class FaiEntry:
+    """One ``.fai`` line: contig name, length and line layout."""
+
+    name: str
+    length: int
+    offset: int
+    line_bases: int
+    line_width: int
+
+    def byte_offset(self, position: int) -> int:
+        """File offset of the 0-based base *position* on this contig."""
+        if self.line_bases == 0:
+            return self.offset
+        lines, column = divmod(position, self.line_bases)
+        return self.offset + lines * self.line_width + column
+
+
+class FastaIndexError(ValueError):
+    """Raised when a FASTA cannot be indexed (e.g. ragged line lengths)."""
+
+    pass
+
+
+def fai_path(fasta_file: str) -> str:
+    return str(fasta_file) + ".fai"
+
+
+def build_fai(fasta_file: str) -> List[FaiEntry]:
+    """Scan a FASTA and return its index entries.
+
+    Raises FastaIndexError for layouts ``.fai`` cannot describe: sequence
+    lines of differing lengths within a record (other than the last), or
+    data before the first header.
+    """
+    entries = []
+    current = None
+    last_line_short = False
+    offset = 0
+
+    with open(fasta_file, "rb") as fasta:
+        for line in fasta:
+            line_start = offset
+            offset += len(line)
+
+            if line.startswith(b">"):
+                name = line[1:].split(None, 1)[0].decode() if line[1:].strip() else ""
+                current = FaiEntry(name, 0, offset, 0, 0)
+                entries.append(current)
+                last_line_short = False
+                continue
+
+            bases = len(line.rstrip(b"\r\n"))
+            if current is None:
+                if bases:
+                    raise FastaIndexError(f"{fasta_file}: sequence before first header")
+                continue
+            if bases == 0:
+                # Blank lines are only allowed after a record's sequence
+                last_line_short = True
+                continue
+
+            if current.line_bases == 0:
+                current.offset = line_start
+                current.line_bases = bases
+                current.line_width = len(line)
+            elif (last_line_short or bases > current.line_bases
+                  or (bases == current.line_bases and len(line) != current.line_width)):
+                raise FastaIndexError(
+                    f"{fasta_file}: contig {current.name} has irregular line lengths"
+                )
+            if bases < current.line_bases:
+                last_line_short = True
+            current.length += bases
+
+    return entries
+
+
+def write_fai(entries: List[FaiEntry], path: str):
+    with open(path, "w") as f:
+        for e in entries:
+            f.write(f"{e.name}\t{e.length}\t{e.offset}\t{e.line_bases}\t{e.line_width}\n")
+
+
+def read_fai(path: str) -> List[FaiEntry]:
+    entries = []
+    with open(path) as f:
+        for line in f:
+            fields = line.rstrip("\n").split("\t")
+            if len(fields) < 5:
+                continue
+            entries.append(FaiEntry(fields[0], *(int(v) for v in fields[1:5])))
+    return entries
+
+
+def load_fai(fasta_file: str, write: bool = True) -> List[FaiEntry]:
+    """Return the FASTA's index, reusing an up-to-date ``.fai`` if present.
+
+    A new index is written next to the FASTA when *write* is set and the
+    directory is writable; otherwise it is kept in memory only.
+    """
+    path = fai_path(fasta_file)
+    if os.path.exists(path) and os.path.getmtime(path) >= os.path.getmtime(fasta_file):
+        return read_fai(path)
+
+    entries = build_fai(fasta_file)
+    if write:
+        try:
+            write_fai(entries, path)
+        except OSError:
+            pass
+    return entries
+
+
+class IndexedFasta:
+    """Memory-mapped FASTA with ``.fai`` random access.
+
+    Only the pages backing requested regions are read, so resident memory
+    scales with what is extracted rather than with the assembly. Raises
+    ValueError for duplicate contig IDs, like ``GenomeBuffer.from_fasta``.
+    """
+
+    def __init__(self, fasta_file: str, write_index: bool = True):
+        self.fasta_file = fasta_file
+        self.entries: Dict[str, FaiEntry] = {}
+        for entry in load_fai(fasta_file, write=write_index):
+            if entry.name in self.entries:
+                raise ValueError(f"{fasta_file}: duplicate contig ID {entry.name!r}")
+            self.entries[entry.name] = entry
+        self._mmap: Optional[mmap.mmap] = None
+        if os.path.getsize(fasta_file) > 0:
+            with open(fasta_file, "rb") as f:
+                self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def __contains__(self, contig: str) -> bool:
+        return contig in self.entries
+
+    def length(self, contig: str) -> Optional[int]:
+        entry = self.entries.get(contig)
+        return entry.length if entry is not None else None
+
+    def header(self, contig: str) -> str:
+        """Return the contig's full header line (without ``>``)."""
+        entry = self.entries[contig]
+        # The header is the last line starting with '>' before the bases
+        line_start = self._mmap.rfind(b"\n>", 0, entry.offset) + 1
+        line_end = self._mmap.find(b"\n", line_start)
+        if line_end < 0:
+            line_end = len(self._mmap)
+        return self._mmap[line_start + 1:line_end].rstrip().decode()
+
+    def fetch(self, contig: str, start: int, end: int) -> bytes:
+        """Return bases ``[start:end]`` of *contig* with Python slice semantics.
+
+        Negative and out-of-range bounds behave exactly as slicing the
+        full sequence would.
+        """
+        entry = self.entries[contig]
+        start, end, _ = slice(start, end).indices(entry.length)
+        if end <= start:
+            return b""
+        first = entry.byte_offset(start)
+        last = entry.byte_offset(end - 1) + 1
+        return self._mmap[first:last].translate(None, b"\r\n")
+
+    def close(self):
+        if self._mmap is not None:
+            self._mmap.close()
+            self._mmap = None
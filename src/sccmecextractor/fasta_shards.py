@@ -0,0 +1,288 @@
+#!/usr/bin/env python
+
+"""Bundled output: extracted elements in a few bgzip multi-FASTA shards.
+
+Writing one ``{stem}_SCCmec.fasta`` per genome puts hundreds of thousands
+of small files in one directory. In bundled mode elements are instead
+appended to ``sccmec_NNNNN.fasta.gz`` shards of up to
+``DEFAULT_RECORDS_PER_SHARD`` records. Each finished shard gets a
+samtools-compatible ``.fai`` and ``.gzi`` index (``samtools faidx`` works on
+it directly), and ``sccmec_records.tsv`` maps every input genome to its
+record ID and shard.
+"""
+
+import csv
+import gzip
+import os
+import shutil
+import struct
+import threading
+
+from bisect import bisect_right
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from Bio import bgzf
+from Bio.Seq import Seq
+from Bio.SeqRecord import SeqRecord
+
+from sccmecextractor.fasta_index import FaiEntry, read_fai, write_fai
+
+RECORD_MAP_FILENAME = "sccmec_records.tsv"
+SHARD_PREFIX = "sccmec_"
+SHARD_SUFFIX = ".fasta.gz"
+DEFAULT_RECORDS_PER_SHARD = 10_000
+
+RECORD_MAP_HEADER = ["Input_File", "Record_ID", "Shard"]
+
+
+@dataclass
+class RecordLocation:
+    """Where one input genome's element is stored."""
+
+    input_file: str
+    record_id: str
+    shard: str
+
+
+def shard_paths(directory: str) -> List[str]:
+    """Return the finished shards in a directory, in write order."""
+    return sorted(
+        str(p) for p in Path(directory).glob(f"{SHARD_PREFIX}*{SHARD_SUFFIX}")
+        if os.path.exists(str(p) + ".fai")
+    )
+
+
+def read_record_map(directory: str) -> Dict[str, RecordLocation]:
+    """Read ``sccmec_records.tsv`` (later rows win for repeated inputs)."""
+    path = os.path.join(directory, RECORD_MAP_FILENAME)
+    locations = {}
+    if not os.path.exists(path):
+        return locations
+    with open(path, newline="") as f:
+        for row in csv.DictReader(f, delimiter="\t"):
+            locations[row["Input_File"]] = RecordLocation(
+                row["Input_File"], row["Record_ID"], row["Shard"],
+            )
+    return locations
+
+
+def write_gzi(blocks: List[Tuple[int, int]], path: str):
+    """Write a bgzip ``.gzi`` index from ``(compressed, uncompressed)``
+    block offsets (the first block, at 0/0, is implicit)."""
+    entries = [block for block in blocks if block != (0, 0)]
+    with open(path, "wb") as f:
+        f.write(struct.pack("<Q", len(entries)))
+        for compressed, uncompressed in entries:
+            f.write(struct.pack("<QQ", compressed, uncompressed))
+
+
+def read_gzi(path: str) -> List[Tuple[int, int]]:
+    """Read a ``.gzi`` index, including the implicit first block."""
+    with open(path, "rb") as f:
+        (count,) = struct.unpack("<Q", f.read(8))
+        data = f.read(16 * count)
+    return [(0, 0)] + [struct.unpack_from("<QQ", data, 16 * i) for i in range(count)]
+
+
+def _block_offsets(shard: str) -> List[Tuple[int, int]]:
+    """Compressed and uncompressed start offsets of every BGZF block."""
+    blocks = []
+    uncompressed = 0
+    with open(shard, "rb") as handle:
+        for start, _, _, data_len in bgzf.BgzfBlocks(handle):
+            if data_len:
+                blocks.append((start, uncompressed))
+            uncompressed += data_len
+    return blocks
+
+
+class ShardWriter:
+    """Appends extracted elements to bgzip shards in *directory*.
+
+    Thread-safe; one writer per directory. Shards already present are left
+    untouched and new ones are numbered after them. Map rows for a shard
+    are written once it is finished and indexed, so an interrupted run
+    never maps inputs to an incomplete shard.
+    """
+
+    def __init__(self, directory: str,
+                 records_per_shard: int = DEFAULT_RECORDS_PER_SHARD,
+                 line_width: int = 60):
+        self.directory = directory
+        self.records_per_shard = records_per_shard
+        self.line_width = line_width
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+
+        self._existing = set(read_record_map(directory))
+        existing_shards = shard_paths(directory)
+        self._next_index = len(existing_shards)
+        if existing_shards:
+            last = Path(existing_shards[-1]).name
+            self._next_index = int(last[len(SHARD_PREFIX):-len(SHARD_SUFFIX)]) + 1
+
+        self._shard: Optional[str] = None
+        self._writer: Optional[bgzf.BgzfWriter] = None
+        self._offset = 0
+        self._entries: List[FaiEntry] = []
+        self._rows: List[RecordLocation] = []
+
+    def __contains__(self, input_file: str) -> bool:
+        with self._lock:
+            return input_file in self._existing
+
+    def stored_inputs(self) -> set:
+        """Names of every input already stored (previous runs included)."""
+        with self._lock:
+            return set(self._existing)
+
+    def discard(self, input_file: str):
+        """Allow an input's element to be stored again, e.g. when a
+        genome is reprocessed; the new map row supersedes the old one."""
+        with self._lock:
+            self._existing.discard(input_file)
+
+    def add(self, input_file: str, record: SeqRecord):
+        """Append one input's element to the current shard."""
+        with self._lock:
+            if input_file in self._existing:
+                raise ValueError(f"{input_file} is already stored in {self.directory}")
+            if self._writer is None:
+                self._open_shard()
+
+            header = f">{record.id} {record.description}".rstrip() + "\n"
+            seq = bytes(record.seq)
+            width = self.line_width
+            lines = b"".join(
+                seq[i:i + width] + b"\n" for i in range(0, len(seq), width)
+            )
+            self._writer.write(header.encode() + lines)
+
+            self._entries.append(FaiEntry(
+                record.id, len(seq), self._offset + len(header),
+                width if seq else 0, width + 1 if seq else 0,
+            ))
+            self._offset += len(header) + len(lines)
+            self._rows.append(RecordLocation(input_file, record.id, Path(self._shard).name))
+            self._existing.add(input_file)
+
+            if len(self._entries) >= self.records_per_shard:
+                self._finish_shard()
+
+    def close(self):
+        with self._lock:
+            if self._writer is not None:
+                self._finish_shard()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _open_shard(self):
+        name = f"{SHARD_PREFIX}{self._next_index:05d}{SHARD_SUFFIX}"
+        self._next_index += 1
+        self._shard = os.path.join(self.directory, name)
+        self._writer = bgzf.BgzfWriter(self._shard, "wb")
+        self._offset = 0
+        self._entries = []
+        self._rows = []
+
+    def _finish_shard(self):
+        self._writer.close()
+        self._writer = None
+        write_gzi(_block_offsets(self._shard), self._shard + ".gzi")
+        write_fai(self._entries, self._shard + ".fai")
+
+        map_path = os.path.join(self.directory, RECORD_MAP_FILENAME)
+        write_header = not os.path.exists(map_path) or os.path.getsize(map_path) == 0
+        with open(map_path, "a") as f:
+            if write_header:
+                f.write("\t".join(RECORD_MAP_HEADER) + "\n")
+            for row in self._rows:
+                f.write(f"{row.input_file}\t{row.record_id}\t{row.shard}\n")
+        self._rows = []
+
+
+class RecordCollector:
+    """Stand-in for ShardWriter in worker processes.
+
+    Records are kept in ``records`` for the process that owns the writer;
+    *existing* lets workers skip inputs that are already stored.
+    """
+
+    def __init__(self, existing=()):
+        self.existing = set(existing)
+        self.records: List[Tuple[str, SeqRecord]] = []
+
+    def __contains__(self, input_file: str) -> bool:
+        return input_file in self.existing
+
+    def add(self, input_file: str, record: SeqRecord):
+        self.records.append((input_file, record))
+
+
+def shard_source(shard_path: str, record_id: str) -> str:
+    """Hit-store source naming one record within a shard."""
+    return f"{shard_path}#{record_id}"
+
+
+def split_source(source: str) -> Tuple[str, Optional[str]]:
+    """Split a hit-store source into ``(path, record_id or None)``."""
+    path, sep, record_id = source.partition("#")
+    return path, (record_id if sep else None)
+
+
+class ShardReader:
+    """Random and sequential access to a directory of shards."""
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        self.locations = read_record_map(directory)
+        self._indexes: Dict[str, Tuple[Dict[str, FaiEntry], List[Tuple[int, int]]]] = {}
+
+    def input_files(self) -> List[str]:
+        return list(self.locations)
+
+    def shards(self) -> List[str]:
+        """Shard names holding at least one current record, in write order."""
+        return sorted({loc.shard for loc in self.locations.values()})
+
+    def _index(self, shard: str):
+        if shard not in self._indexes:
+            path = os.path.join(self.directory, shard)
+            entries = {e.name: e for e in read_fai(path + ".fai")}
+            self._indexes[shard] = (entries, read_gzi(path + ".gzi"))
+        return self._indexes[shard]
+
+    def fetch(self, input_file: str) -> SeqRecord:
+        """Return one input's element, decompressing only its blocks."""
+        location = self.locations[input_file]
+        entries, blocks = self._index(location.shard)
+        entry = entries[location.record_id]
+
+        start = entry.offset
+        end = entry.byte_offset(entry.length - 1) + 1 if entry.length else start
+        i = bisect_right([u for _, u in blocks], start) - 1
+        compressed, uncompressed = blocks[i]
+
+        with bgzf.BgzfReader(os.path.join(self.directory, location.shard), "rb") as reader:
+            reader.seek(bgzf.make_virtual_offset(compressed, start - uncompressed))
+            data = reader.read(end - start)
+        seq = data.replace(b"\n", b"").replace(b"\r", b"").decode()
+        return SeqRecord(Seq(seq), id=location.record_id, description="")
+
+    def decompress_shard(self, shard: str, out_path: str):
+        """Write a shard's records as a plain multi-FASTA."""
+        with gzip.open(os.path.join(self.directory, shard), "rb") as src, \
+                open(out_path, "wb") as dst:
+            shutil.copyfileobj(src, dst)
+
+    def records_in_shard(self, shard: str) -> Iterator[RecordLocation]:
+        """Current map entries stored in *shard*, in map order."""
+        for location in self.locations.values():
+            if location.shard == shard:
+                yield location
@@ -0,0 +1,214 @@
+#!/usr/bin/env python
+
+"""Single in-memory copy of a genome shared by every pipeline stage.
+
+GenomeBuffer stores all contigs back to back in one ``bytearray`` with a
+table of ``(offset, length)`` spans. att-site scanning runs bytes regexes
+over the buffer in place, extraction slices only the requested region, and
+BLAST databases are built by streaming the buffer to ``makeblastdb``, so a
+genome is parsed once and never duplicated as per-contig strings.
+
+For process pools, SharedGenome places the buffer in a
+``multiprocessing.shared_memory`` block; workers receive only the small
+GenomeDescriptor and attach to the block without copying the sequence.
+"""
+
+import hashlib
+import sys
+
+from dataclasses import dataclass, field
+from multiprocessing import shared_memory
+from typing import BinaryIO, Dict, List, Optional, Tuple, Union
+
+from Bio.Seq import Seq
+from Bio.SeqRecord import SeqRecord
+
+
+class GenomeBuffer:
+    """Contig sequences of one genome in a single contiguous buffer.
+
+    Provides the GenomeSequences interface (``get_contig_length``,
+    ``get_sequence``, ``extract_region``) plus zero-copy views for scanning.
+    """
+
+    def __init__(self, data: bytearray, spans: Dict[str, Tuple[int, int]],
+                 fasta_file: Optional[str] = None,
+                 headers: Optional[Dict[str, str]] = None):
+        self.data = data
+        self.spans = spans
+        self.fasta_file = fasta_file
+        self.headers = headers or {}
+        self._shm: Optional[shared_memory.SharedMemory] = None
+
+    @classmethod
+    def attach(cls, descriptor: "GenomeDescriptor") -> "GenomeBuffer":
+        """Open a genome placed in shared memory by SharedGenome (no copy)."""
+        if sys.version_info >= (3, 13):
+            # The creating process owns the block's lifetime
+            shm = shared_memory.SharedMemory(name=descriptor.shm_name, track=False)
+        else:
+            shm = shared_memory.SharedMemory(name=descriptor.shm_name)
+        genome = cls(shm.buf[:descriptor.size], dict(descriptor.spans),
+                     descriptor.fasta_file, dict(descriptor.headers))
+        genome._shm = shm
+        return genome
+
+    def close(self):
+        """Detach from shared memory (no-op for private buffers)."""
+        if self._shm is not None:
+            self.data.release()
+            try:
+                self._shm.close()
+            except BufferError:
+                pass  # a view is still alive; closed when it is collected
+            self._shm = None
+
+    @classmethod
+    def from_fasta(cls, fasta_file: str) -> "GenomeBuffer":
+        """Parse a FASTA file into a buffer (contig names are the first
+        word of each header, as ``SeqIO`` record IDs).
+
+        Raises ValueError if a contig name appears twice.
+        """
+        data = bytearray()
+        spans = {}
+        headers = {}
+        name = None
+        start = 0
+
+        with open(fasta_file, "rb") as fasta:
+            for line in fasta:
+                if line.startswith(b">"):
+                    if name is not None:
+                        spans[name] = (start, len(data) - start)
+                    fields = line[1:].split(None, 1)
+                    name = fields[0].decode() if fields else ""
+                    if name in headers:
+                        raise ValueError(f"{fasta_file}: duplicate contig ID {name!r}")
+                    headers[name] = line[1:].rstrip().decode()
+                    start = len(data)
+                elif name is not None:
+                    data += line.strip()
+        if name is not None:
+            spans[name] = (start, len(data) - start)
+
+        return cls(data, spans, fasta_file, headers)
+
+    @property
+    def contigs(self) -> List[str]:
+        return list(self.spans)
+
+    def __contains__(self, contig: str) -> bool:
+        return contig in self.spans
+
+    def view(self, contig: str) -> memoryview:
+        """Zero-copy view of one contig's bases."""
+        offset, length = self.spans[contig]
+        return memoryview(self.data)[offset:offset + length]
+
+    def get_contig_length(self, contig: str) -> Optional[int]:
+        """Return the length of a contig, or None if not found."""
+        span = self.spans.get(contig)
+        return span[1] if span is not None else None
+
+    def get_description(self, contig: str) -> Optional[str]:
+        """Return the contig's full FASTA header line (without ``>``)."""
+        if contig not in self.spans:
+            return None
+        return self.headers.get(contig, contig)
+
+    def get_sequence(self, contig: str):
+        """Get sequence for a specific contig."""
+        if contig not in self.spans:
+            return None
+        return SeqRecord(Seq(bytes(self.view(contig))), id=contig, description="")
+
+    def extract_region(self, contig: str, start: int, end: int,
+                       reverse_complement: bool = False, circular: bool = False):
+        """Extract a genomic region (same slice semantics as GenomeSequences,
+        including *circular* regions that run past the contig end)."""
+        if contig not in self.spans:
+            raise ValueError(f"Contig {contig} not found in sequences")
+
+        seq = self.view(contig)
+        lo, hi = (end, start) if reverse_complement else (start, end)
+        if circular and hi > len(seq):
+            region = bytes(seq[lo:]) + bytes(seq[:hi - len(seq)])
+        else:
+            region = bytes(seq[lo:hi])
+
+        if reverse_complement:
+            return Seq(region).reverse_complement()
+        return Seq(region)
+
+    def digest(self) -> str:
+        """Hash of the contig names and sequences (independent of line
+        wrapping and header descriptions)."""
+        h = hashlib.blake2b(digest_size=16)
+        for contig in self.spans:
+            h.update(contig.encode() + b"\0")
+            h.update(self.view(contig))
+            h.update(b"\n")
+        return h.hexdigest()
+
+    def write_fasta(self, stream: BinaryIO, line_width: int = 80):
+        """Write the genome as FASTA to a binary stream, view by view."""
+        for contig in self.spans:
+            seq = self.view(contig)
+            stream.write(b">" + contig.encode() + b"\n")
+            for i in range(0, len(seq), line_width):
+                stream.write(seq[i:i + line_width])
+                stream.write(b"\n")
+
+
+@dataclass(frozen=True)
+class GenomeDescriptor:
+    """Picklable handle to a genome in shared memory: the block name plus
+    contig names, offsets, lengths and header lines."""
+
+    shm_name: str
+    size: int
+    spans: Dict[str, Tuple[int, int]]
+    fasta_file: Optional[str] = None
+    headers: Dict[str, str] = field(default_factory=dict)
+
+
+class SharedGenome:
+    """Owner of a genome copied into a shared memory block.
+
+    Created in the coordinating process; pass ``descriptor`` to workers and
+    call ``close()`` (or use as a context manager) once they are done, which
+    frees the block.
+    """
+
+    def __init__(self, genome: GenomeBuffer):
+        size = len(genome.data)
+        self._shm = shared_memory.SharedMemory(create=True, size=max(size, 1))
+        self._shm.buf[:size] = genome.data
+        self.descriptor = GenomeDescriptor(
+            self._shm.name, size, dict(genome.spans), genome.fasta_file,
+            dict(genome.headers),
+        )
+
+    @classmethod
+    def from_fasta(cls, fasta_file: str) -> "SharedGenome":
+        return cls(GenomeBuffer.from_fasta(fasta_file))
+
+    def close(self):
+        if self._shm is not None:
+            self._shm.close()
+            self._shm.unlink()
+            self._shm = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def as_genome_buffer(genome: Union[GenomeBuffer, GenomeDescriptor]) -> GenomeBuffer:
+    """Return *genome* as a GenomeBuffer, attaching to shared memory if needed."""
+    if isinstance(genome, GenomeDescriptor):
+        return GenomeBuffer.attach(genome)
+    return genome
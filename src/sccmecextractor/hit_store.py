@@ -0,0 +1,217 @@
+#!/usr/bin/env python
+
+"""SQLite sidecar store of raw typing BLAST hits.
+
+SCCmecTyper can save the unfiltered hits found for each input so typing can
+later be re-derived (new thresholds, new ccr complex types) in pure Python
+without repeating the BLAST search.
+"""
+
+import sqlite3
+import threading
+
+from dataclasses import astuple, dataclass
+from typing import Dict, List, Optional, Tuple
+
+from sccmecextractor.blast_utils import BlastResult
+
+
+@dataclass
+class StoredRegion:
+    """Extraction interval the stored genome hits are projected onto.
+
+    ``contig_length`` is set for intervals spanning the origin of a circular
+    contig.
+    """
+
+    contig: str
+    start: int
+    end: int
+    reverse_complement: bool
+    record_id: str
+    contig_length: Optional[int] = None
+
+
+_HIT_COLUMNS = (
+    "qseqid", "sseqid", "pident", "length", "mismatch", "gapopen",
+    "qstart", "qend", "sstart", "send", "evalue", "bitscore",
+)
+
+
+class HitStore:
+    """Raw BLAST hits keyed by typing ``Input_File`` name.
+
+    Hits are stored in the coordinates of the sequence that was searched
+    (the genome, for pipeline element typing) together with the optional
+    extraction region they are projected onto, so stored entries replay
+    exactly through ``SCCmecTyper.type_stored``.
+
+    The store also records the reference sequences (by hash) the hits were
+    searched with, so later reference additions can be searched on their
+    own (``SCCmecTyper.update_references``).
+
+    A single connection is shared between threads behind a lock; worker
+    processes each open their own and wait for one another's writes.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=600, check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.executescript(
+                """
+                CREATE TABLE IF NOT EXISTS inputs (
+                    input_file TEXT PRIMARY KEY,
+                    source TEXT,
+                    region_contig TEXT,
+                    region_start INTEGER,
+                    region_end INTEGER,
+                    region_reverse INTEGER,
+                    region_record_id TEXT,
+                    region_contig_length INTEGER
+                );
+                CREATE TABLE IF NOT EXISTS hits (
+                    input_file TEXT NOT NULL,
+                    qseqid TEXT, sseqid TEXT, pident REAL, length INTEGER,
+                    mismatch INTEGER, gapopen INTEGER, qstart INTEGER,
+                    qend INTEGER, sstart INTEGER, send INTEGER,
+                    evalue REAL, bitscore REAL
+                );
+                CREATE INDEX IF NOT EXISTS hits_input ON hits (input_file);
+                CREATE TABLE IF NOT EXISTS refs (
+                    seq_hash TEXT PRIMARY KEY,
+                    seq_id TEXT
+                );
+                """
+            )
+            # Stores written before origin-spanning regions were supported
+            columns = [row[1] for row in self._conn.execute("PRAGMA table_info(inputs)")]
+            if "region_contig_length" not in columns:
+                self._conn.execute(
+                    "ALTER TABLE inputs ADD COLUMN region_contig_length INTEGER"
+                )
+
+    def save(
+        self,
+        input_name: str,
+        hits: List[BlastResult],
+        source: Optional[str] = None,
+        region: Optional[StoredRegion] = None,
+    ):
+        """Store (replacing any previous entry) the raw hits for one input."""
+        if region is None:
+            region_values = (None, None, None, None, None, None)
+        else:
+            region_values = (
+                region.contig, region.start, region.end,
+                int(region.reverse_complement), region.record_id,
+                region.contig_length,
+            )
+
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM hits WHERE input_file = ?", (input_name,))
+            # Update in place so a re-saved input keeps its position
+            updated = self._conn.execute(
+                "UPDATE inputs SET source = ?, region_contig = ?, "
+                "region_start = ?, region_end = ?, region_reverse = ?, "
+                "region_record_id = ?, region_contig_length = ? "
+                "WHERE input_file = ?",
+                (source,) + region_values + (input_name,),
+            ).rowcount
+            if not updated:
+                self._conn.execute(
+                    "INSERT INTO inputs VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    (input_name, source) + region_values,
+                )
+            self._conn.executemany(
+                f"INSERT INTO hits VALUES (?{', ?' * len(_HIT_COLUMNS)})",
+                [(input_name,) + astuple(hit) for hit in hits],
+            )
+
+    def add_hits(self, input_name: str, hits: List[BlastResult]):
+        """Append hits to an existing input (e.g. from newly added references)."""
+        with self._lock, self._conn:
+            self._conn.executemany(
+                f"INSERT INTO hits VALUES (?{', ?' * len(_HIT_COLUMNS)})",
+                [(input_name,) + astuple(hit) for hit in hits],
+            )
+
+    def references(self) -> Dict[str, str]:
+        """Return the reference set the stored hits were searched with.
+
+        Maps sequence hash to reference ID; empty for stores written before
+        references were recorded.
+        """
+        with self._lock:
+            rows = self._conn.execute("SELECT seq_hash, seq_id FROM refs").fetchall()
+        return dict(rows)
+
+    def set_references(self, ref_hashes: Dict[str, str]):
+        """Record the reference set (reference ID -> sequence hash).
+
+        Stored hits follow their sequences: hits of a renamed reference
+        take its new ID, and hits of references no longer in the set are
+        deleted (they are searched again if the sequence comes back).
+        """
+        with self._lock, self._conn:
+            stored = dict(self._conn.execute("SELECT seq_hash, seq_id FROM refs"))
+            if stored:
+                # One statement, so swapped names do not collide
+                self._conn.execute(
+                    "CREATE TEMP TABLE IF NOT EXISTS ref_renames "
+                    "(old_id TEXT PRIMARY KEY, new_id TEXT)"
+                )
+                self._conn.execute("DELETE FROM ref_renames")
+                current = {seq_hash: ref_id for ref_id, seq_hash in ref_hashes.items()}
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO ref_renames VALUES (?, ?)",
+                    [(old_id, current.get(seq_hash))
+                     for seq_hash, old_id in stored.items()],
+                )
+                self._conn.execute(
+                    "UPDATE hits SET qseqid = (SELECT new_id FROM ref_renames "
+                    "WHERE old_id = hits.qseqid) "
+                    "WHERE qseqid IN (SELECT old_id FROM ref_renames)"
+                )
+                self._conn.execute("DELETE FROM hits WHERE qseqid IS NULL")
+            self._conn.execute("DELETE FROM refs")
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO refs VALUES (?, ?)",
+                [(seq_hash, ref_id) for ref_id, seq_hash in ref_hashes.items()],
+            )
+
+    def input_names(self) -> List[str]:
+        """Return stored input names in the order they were first saved."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT input_file FROM inputs ORDER BY rowid"
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    def load(
+        self, input_name: str
+    ) -> Tuple[List[BlastResult], Optional[str], Optional[StoredRegion]]:
+        """Return ``(hits, source, region)`` for one stored input."""
+        with self._lock:
+            entry = self._conn.execute(
+                "SELECT * FROM inputs WHERE input_file = ?", (input_name,)
+            ).fetchone()
+            if entry is None:
+                raise KeyError(f"No stored hits for {input_name}")
+            rows = self._conn.execute(
+                f"SELECT {', '.join(_HIT_COLUMNS)} FROM hits WHERE input_file = ?",
+                (input_name,),
+            ).fetchall()
+
+        hits = [BlastResult(*row) for row in rows]
+        _, source, contig, start, end, reverse, record_id, contig_length = entry
+        region = None
+        if contig is not None:
+            region = StoredRegion(contig, start, end, bool(reverse), record_id,
+                                  contig_length)
+        return hits, source, region
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
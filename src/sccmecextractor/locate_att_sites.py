@@ -130,7 +130,31 @@ class GeneAnnotationParser:
         return False
 
 
-class RlmHBlastDetector:
+class RlmHPositions:
+    """rlmH gene locations already detected (e.g. by an earlier pipeline
+    stage), as ``{contig: {(start, end), ...}}``."""
+
+    def __init__(self, rlmH_genes: Dict[str, Set[Tuple[int, int]]]):
+        self.rlmH_genes = rlmH_genes
+
+    def is_within_rlmH(self, site, tolerance: int = 100) -> bool:
+        """Check if an AttSite falls within an rlmH gene (with tolerance).
+
+        Tolerance is applied symmetrically to both boundaries because the
+        att site sits at the 3' end of rlmH — which maps to the lower
+        genomic coordinate on the complement strand.
+        """
+        if site.contig not in self.rlmH_genes:
+            return False
+
+        for gene_start, gene_end in self.rlmH_genes[site.contig]:
+            if (gene_start - tolerance) <= site.start and site.end <= (gene_end + tolerance):
+                return True
+
+        return False
+
+
+class RlmHBlastDetector(RlmHPositions):
     """Detect rlmH gene locations using BLAST instead of GFF3 annotation.
 
     Creates a temporary BLAST database from the genome FASTA, then BLASTs
@@ -218,26 +242,9 @@ class RlmHBlastDetector:
     @staticmethod
     def _get_ref_lengths(fasta_path: str) -> Dict[str, int]:
         """Get sequence lengths from a FASTA file."""
-        lengths = {}
-        for record in SeqIO.parse(fasta_path, "fasta"):
-            lengths[record.id] = len(record.seq)
-        return lengths
+        from sccmecextractor.blast_utils import get_ref_lengths
+        return get_ref_lengths(str(fasta_path))
 
-    def is_within_rlmH(self, site, tolerance: int = 100) -> bool:
-        """Check if an AttSite falls within an rlmH gene (with tolerance).
-
-        Tolerance is applied symmetrically to both boundaries because the
-        att site sits at the 3' end of rlmH — which maps to the lower
-        genomic coordinate on the complement strand.
-        """
-        if site.contig not in self.rlmH_genes:
-            return False
-
-        for gene_start, gene_end in self.rlmH_genes[site.contig]:
-            if (gene_start - tolerance) <= site.start and site.end <= (gene_end + tolerance):
-                return True
-
-        return False
 
 
 class AttSiteFinder:
@@ -245,12 +252,27 @@ class AttSiteFinder:
 
     def __init__(self, fasta_file: str, gff3_file: str = None,
                  blast_rlmh: bool = False, rlmh_ref: str = None,
-                 sequences=None, genome_db_prefix: str = None):
+                 sequences=None, genome_db_prefix: str = None,
+                 genome_buffer=None, sample_name: str = None,
+                 rlmh_positions: Dict[str, Set[Tuple[int, int]]] = None):
         self.fasta_file = fasta_file
-        self.sequences = sequences if sequences is not None else self._parse_fasta()
+        # Input_File name in the results (a multi-sample FASTA's sample ID)
+        self.input_name = sample_name or Path(fasta_file).stem
+        # A GenomeBuffer (or shared-memory descriptor) is scanned in place;
+        # otherwise contigs are str
+        if genome_buffer is not None:
+            from sccmecextractor.genome_buffer import as_genome_buffer
+            genome_buffer = as_genome_buffer(genome_buffer)
+        self.genome_buffer = genome_buffer
+        if genome_buffer is not None:
+            self.sequences = None
+        else:
+            self.sequences = sequences if sequences is not None else self._parse_fasta()
 
-        # Determine rlmH detection strategy
-        if blast_rlmh:
+        # Determine rlmH detection strategy: pre-computed > BLAST > GFF
+        if rlmh_positions is not None:
+            self.gene_parser = RlmHPositions(rlmh_positions)
+        elif blast_rlmh:
             self.gene_parser = RlmHBlastDetector(fasta_file, rlmh_ref, genome_db_prefix=genome_db_prefix)
         elif gff3_file:
             self.gene_parser = GeneAnnotationParser(gff3_file)
@@ -298,26 +320,47 @@ class AttSiteFinder:
         
         return sequences
     
+    def _scan_targets(self):
+        """Yield ``(contig, text, pos, endpos, patterns)`` to search.
+
+        A GenomeBuffer is searched in place with bytes patterns bounded to
+        each contig's span, so no per-contig copy is made.
+        """
+        if self.genome_buffer is None:
+            for contig, sequence in self.sequences.items():
+                yield contig, sequence, 0, len(sequence), self.patterns
+            return
+
+        byte_patterns = {
+            name: re.compile(pattern.pattern.encode())
+            for name, pattern in self.patterns.items()
+        }
+        for contig, (offset, length) in self.genome_buffer.spans.items():
+            yield contig, self.genome_buffer.data, offset, offset + length, byte_patterns
+
     def find_all_sites(self) -> List[AttSite]:
         """Search for all att sites in all sequences."""
         sites = []
         
-        for contig, sequence in self.sequences.items():
+        for contig, text, pos, endpos, patterns in self._scan_targets():
             print(f"Processing contig: {contig}")
             
-            for pattern_name, compiled_pattern in self.patterns.items():
-                matches = list(compiled_pattern.finditer(sequence))
+            for pattern_name, compiled_pattern in patterns.items():
+                matches = list(compiled_pattern.finditer(text, pos, endpos))
                 
                 if matches:
                     print(f"  Pattern {pattern_name}: {len(matches)} matches")
                 
                 for match in matches:
+                    match_seq = match.group()
+                    if isinstance(match_seq, bytes):
+                        match_seq = match_seq.decode()
                     site = AttSite(
                         pattern_name=pattern_name,
                         contig=contig,
-                        start=match.start() + 1,  # Convert to 1-based
-                        end=match.end(),
-                        match_seq=match.group()
+                        start=match.start() - pos + 1,  # Convert to 1-based
+                        end=match.end() - pos,
+                        match_seq=match_seq
                     )
                     
                     # Check if site is within rlmH gene
@@ -351,7 +394,7 @@ class AttSiteFinder:
     
     def write_results(self, sites: List[AttSite], output_file: str):
         """Write results to TSV file."""
-        input_file_name = Path(self.fasta_file).stem
+        input_file_name = self.input_name
 
         output_path = Path(output_file)
         write_header = not output_path.exists() or output_path.stat().st_size == 0
@@ -379,6 +422,12 @@ def main():
         "--rlmh-ref",
         help="Custom rlmH reference FASTA for BLAST detection (optional)",
     )
+    parser.add_argument(
+        "--index",
+        action="store_true",
+        help="Update a sidecar index (<outfile>.idx.sqlite) of the output so "
+             "sccmec-extract loads each genome's sites without rescanning it",
+    )
     args = parser.parse_args()
 
     # Validate inputs
@@ -417,6 +466,10 @@ def main():
     # Write results
     finder.write_results(filtered_sites, args.outfile)
 
+    if args.index:
+        from sccmecextractor.att_index import AttSiteIndex
+        AttSiteIndex(args.outfile).close()
+
     print(f"\nFound {len(filtered_sites)} att sites total")
     print(f"Results written to {args.outfile}")
 
@@ -0,0 +1,142 @@
+#!/usr/bin/env python
+
+"""Memory-aware admission of genomes into a pipeline run.
+
+How much memory a genome needs varies with its assembly size: the sequence
+buffer, its shared-memory copy in process mode, BLAST's database and the
+Python objects built while scanning and extracting. With ``--max-memory``
+the pipeline checks a MemoryGate before starting each genome and holds it
+back while the run's resident memory plus the genome's estimated footprint
+would exceed the limit, resuming as genomes finish and memory is freed.
+
+Resident memory is summed over this process and all of its descendants
+(worker processes and BLAST subprocesses) from ``/proc``. Where ``/proc``
+is unavailable only the footprint estimates are counted.
+"""
+
+import os
+import re
+import threading
+
+from typing import Callable, Dict, Optional
+
+# Estimated footprint of one genome: a multiple of its sequence size plus a
+# fixed allowance for a blastn process and per-genome Python objects
+GENOME_MEMORY_FACTOR = 3.0
+GENOME_MEMORY_OVERHEAD = 64 << 20
+
+# Compressed inputs are costed at this multiple of their file size
+GZIP_EXPANSION = 3.5
+
+_SIZE_UNITS = {"": 1, "K": 1 << 10, "M": 1 << 20, "G": 1 << 30, "T": 1 << 40}
+
+
+def parse_size(value: str) -> int:
+    """Parse a byte size such as ``512M``, ``64G`` or ``1.5T`` (binary units;
+    a trailing ``B``/``iB`` is accepted)."""
+    match = re.fullmatch(r"\s*([0-9]*\.?[0-9]+)\s*([KMGT]?)(I?B)?\s*", str(value).upper())
+    if match is None:
+        raise ValueError(f"Invalid size {value!r} (expected e.g. 512M or 64G)")
+    size = int(float(match.group(1)) * _SIZE_UNITS[match.group(2)])
+    if size <= 0:
+        raise ValueError(f"Size must be positive (got {value!r})")
+    return size
+
+
+def _proc_children() -> Dict[int, list]:
+    """Map of pid -> child pids from ``/proc/<pid>/stat``."""
+    children: Dict[int, list] = {}
+    for entry in os.listdir("/proc"):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/stat") as f:
+                stat = f.read()
+        except OSError:
+            continue  # exited while scanning
+        # The command name may contain spaces; fields resume after its ")"
+        ppid = int(stat[stat.rindex(")") + 2:].split()[1])
+        children.setdefault(ppid, []).append(int(entry))
+    return children
+
+
+def _rss(pid: int) -> int:
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    return 0
+
+
+def process_tree_rss(pid: Optional[int] = None) -> Optional[int]:
+    """Resident memory of *pid* (default: this process) and every descendant,
+    in bytes; None where ``/proc`` is unavailable."""
+    if not os.path.isdir("/proc/self"):
+        return None
+    pid = os.getpid() if pid is None else pid
+    children = _proc_children()
+    total = 0
+    stack = [pid]
+    while stack:
+        current = stack.pop()
+        total += _rss(current)
+        stack.extend(children.get(current, ()))
+    return total
+
+
+def estimate_genome_footprint(fasta_path: str, sequence_bytes: Optional[int] = None) -> int:
+    """Estimated peak memory of processing one genome, in bytes.
+
+    *sequence_bytes* is used when known (genomes already in memory);
+    otherwise the file size stands in for it.
+    """
+    if sequence_bytes is None:
+        sequence_bytes = os.path.getsize(fasta_path)
+        if str(fasta_path).endswith(".gz"):
+            sequence_bytes = int(sequence_bytes * GZIP_EXPANSION)
+    return int(sequence_bytes * GENOME_MEMORY_FACTOR) + GENOME_MEMORY_OVERHEAD
+
+
+class MemoryGate:
+    """Admits genomes while the run stays under *limit* bytes.
+
+    Each admitted genome reserves its estimated footprint until released.
+    A genome is admitted if the larger of the measured resident memory and
+    the baseline (measured when the gate was created) plus all reservations
+    leaves room for its estimate. With nothing in flight a genome is always
+    admitted, so an oversized genome still runs (on its own).
+    """
+
+    def __init__(self, limit: int,
+                 measure: Callable[[], Optional[int]] = process_tree_rss,
+                 poll_interval: float = 1.0):
+        self.limit = limit
+        self.measure = measure
+        self.poll_interval = poll_interval
+        self.baseline = measure() or 0
+        self.reserved = 0
+        self.in_flight = 0
+        self._lock = threading.Lock()
+
+    def used(self) -> int:
+        """Current memory use as the gate sees it."""
+        return max(self.measure() or 0, self.baseline + self.reserved)
+
+    def admits(self, estimate: int) -> bool:
+        with self._lock:
+            if self.in_flight == 0:
+                return True
+        return self.used() + estimate <= self.limit
+
+    def acquire(self, estimate: int):
+        with self._lock:
+            self.reserved += estimate
+            self.in_flight += 1
+
+    def release(self, estimate: int):
+        with self._lock:
+            self.reserved -= estimate
+            self.in_flight -= 1
@@ -0,0 +1,252 @@
+#!/usr/bin/env python
+
+"""Static sharding of pipeline runs and merging of the shard outputs.
+
+``sccmec-pipeline --shard i/N`` processes the genomes whose name hashes to
+shard *i* of *N* (a stable hash, so every node given the same inputs picks
+a disjoint subset without coordination) and writes shard-local reports to
+its own output directory, with a ``shard.json`` listing the genomes it was
+assigned. ``sccmec-merge`` then checks that every shard is present and
+finished and combines their extraction, ambiguous, coordinates and typing
+reports, writing each header once, before building the unified report.
+
+Per-genome outputs (att-site TSVs, element FASTAs, bundled shards, typing
+hits) stay in the shard directories.
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import sys
+
+from typing import Dict, List, Optional, Tuple
+
+from sccmecextractor.extract_SCCmec import COORDINATES_FILENAME
+from sccmecextractor.report_sccmec import (
+    merge_reports,
+    normalise_typing_keys,
+    read_tsv,
+    write_unified_report,
+)
+from sccmecextractor.run_manifest import RunManifest, manifest_path
+
+SHARD_FILENAME = "shard.json"
+
+# Reports combined by sccmec-merge, relative to an output directory
+MERGED_REPORTS = [
+    "extraction_report.tsv",
+    "ambiguous_att_sites.tsv",
+    "typing_results.tsv",
+    os.path.join("sccmec", COORDINATES_FILENAME),
+]
+
+
+class ShardMergeError(ValueError):
+    """Raised when shard output directories cannot be merged."""
+
+    pass
+
+
+def parse_shard(value: str) -> Tuple[int, int]:
+    """Parse ``"i/N"`` (1 <= i <= N) into ``(i, N)``."""
+    try:
+        index, count = (int(part) for part in value.split("/"))
+    except ValueError:
+        raise ValueError(f"Invalid shard {value!r} (expected i/N, e.g. 2/8)")
+    if count < 1 or not 1 <= index <= count:
+        raise ValueError(f"Invalid shard {value!r} (need 1 <= i <= N)")
+    return index, count
+
+
+def shard_of(name: str, count: int) -> int:
+    """Shard (1-based) of *count* that genome *name* belongs to.
+
+    Uses a hash of the name that, unlike ``hash()``, is the same in every
+    process and on every node.
+    """
+    digest = hashlib.blake2b(name.encode(), digest_size=8).digest()
+    return int.from_bytes(digest, "big") % count + 1
+
+
+def write_shard_file(outdir: str, shard: Tuple[int, int], genomes: List[str]):
+    """Record the shard a run processed and the genomes assigned to it."""
+    index, count = shard
+    with open(os.path.join(outdir, SHARD_FILENAME), "w") as fh:
+        json.dump({"shard": index, "shards": count, "genomes": sorted(genomes)}, fh)
+
+
+def _read_shard(shard_dir: str) -> Tuple[Optional[dict], set, Dict[str, object]]:
+    """``(shard.json contents, recorded genomes, run parameters)`` of a
+    shard directory (None / empty when missing)."""
+    info = None
+    shard_file = os.path.join(shard_dir, SHARD_FILENAME)
+    if os.path.isfile(shard_file):
+        with open(shard_file) as fh:
+            info = json.load(fh)
+    recorded, params = set(), {}
+    if os.path.isfile(manifest_path(shard_dir)):
+        with RunManifest(shard_dir) as manifest:
+            recorded = manifest.names()
+            params = manifest.params()
+    params.pop("shard", None)
+    return info, recorded, params
+
+
+def check_shards(shard_dirs: List[str]) -> List[str]:
+    """Problems that make *shard_dirs* an incomplete set of shards.
+
+    Every directory must hold a finished shard run (``shard.json``) whose
+    assigned genomes are all recorded in its run manifest; together they
+    must cover shards 1..N of a single N exactly once, run with the same
+    parameters.
+    """
+    problems = []
+    seen: Dict[int, str] = {}
+    counts = set()
+    reference = None
+    for shard_dir in shard_dirs:
+        info, recorded, params = _read_shard(shard_dir)
+        if info is None:
+            problems.append(f"{shard_dir}: no {SHARD_FILENAME} (shard run not finished)")
+            continue
+        index, count = info["shard"], info["shards"]
+        counts.add(count)
+        if index in seen:
+            problems.append(f"{shard_dir}: shard {index}/{count} also in {seen[index]}")
+        seen[index] = shard_dir
+        missing = sorted(set(info["genomes"]) - recorded)
+        if missing:
+            shown = ", ".join(missing[:5]) + (", ..." if len(missing) > 5 else "")
+            problems.append(
+                f"{shard_dir}: {len(missing)} genome(s) not finished ({shown}); "
+                f"rerun the shard with --resume"
+            )
+        if reference is None:
+            reference = (shard_dir, params)
+        elif params != reference[1]:
+            changed = sorted(
+                key for key in set(params) | set(reference[1])
+                if params.get(key) != reference[1].get(key)
+            )
+            problems.append(
+                f"{shard_dir}: run with different parameters from {reference[0]} "
+                f"({', '.join(changed)})"
+            )
+
+    if len(counts) > 1:
+        problems.append(f"Shards from different splits: N = {sorted(counts)}")
+    elif counts:
+        count = counts.pop()
+        absent = [str(i) for i in range(1, count + 1) if i not in seen]
+        if absent:
+            problems.append(f"Missing shard(s) {', '.join(absent)} of {count}")
+    return problems
+
+
+def _concatenate_reports(paths: List[str], outfile: str) -> int:
+    """Concatenate TSV reports, keeping the first header line only.
+
+    Lines equal to that header (from batch concatenation) are dropped too.
+    Returns the number of data rows; nothing is written if no report exists.
+    """
+    header = None
+    rows = 0
+    out = None
+    try:
+        for path in paths:
+            if not os.path.isfile(path):
+                continue
+            with open(path) as fh:
+                for line in fh:
+                    if header is None:
+                        header = line
+                        os.makedirs(os.path.dirname(outfile) or ".", exist_ok=True)
+                        out = open(outfile, "w")
+                        out.write(header)
+                    elif line != header and line.strip():
+                        out.write(line)
+                        rows += 1
+    finally:
+        if out is not None:
+            out.close()
+    return rows
+
+
+def merge_shards(shard_dirs: List[str], outdir: str,
+                 allow_incomplete: bool = False) -> dict:
+    """Combine the reports of shard output directories into *outdir*.
+
+    Reports are concatenated in shard order and the unified report is
+    rebuilt from the merged extraction and typing reports. Raises
+    ShardMergeError if ``check_shards`` finds problems, unless
+    *allow_incomplete*, when they are printed as warnings.
+
+    Returns ``{report filename: data rows}`` for the reports written.
+    """
+    problems = check_shards(shard_dirs)
+    if problems and not allow_incomplete:
+        raise ShardMergeError(
+            "Cannot merge incomplete shards:\n  " + "\n  ".join(problems)
+        )
+    for problem in problems:
+        print(f"WARNING: {problem}", file=sys.stderr)
+
+    def shard_key(shard_dir):
+        info, _, _ = _read_shard(shard_dir)
+        return info["shard"] if info else sys.maxsize
+
+    ordered = sorted(shard_dirs, key=shard_key)
+    os.makedirs(outdir, exist_ok=True)
+    counts = {}
+    for report in MERGED_REPORTS:
+        outfile = os.path.join(outdir, report)
+        rows = _concatenate_reports([os.path.join(d, report) for d in ordered], outfile)
+        if os.path.isfile(outfile):
+            counts[report] = rows
+
+    extraction_report_file = os.path.join(outdir, "extraction_report.tsv")
+    typing_results_file = os.path.join(outdir, "typing_results.tsv")
+    if os.path.isfile(extraction_report_file):
+        extraction_rows = read_tsv(extraction_report_file)
+        typing_rows = {}
+        if os.path.isfile(typing_results_file):
+            typing_rows = normalise_typing_keys(read_tsv(typing_results_file))
+        merged = merge_reports(extraction_rows, typing_rows)
+        write_unified_report(merged, os.path.join(outdir, "sccmec_unified_report.tsv"))
+        counts["sccmec_unified_report.tsv"] = len(merged)
+    return counts
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Merge the output directories of sccmec-pipeline --shard "
+                    "runs into one set of reports"
+    )
+    parser.add_argument(
+        "shard_dirs", nargs="+",
+        help="Output directories of the shard runs (one per shard)",
+    )
+    parser.add_argument(
+        "-o", "--outdir", required=True,
+        help="Output directory for the merged reports",
+    )
+    parser.add_argument(
+        "--allow-incomplete", action="store_true",
+        help="Merge even if shards are missing or unfinished (with warnings)",
+    )
+    args = parser.parse_args()
+
+    try:
+        counts = merge_shards(args.shard_dirs, args.outdir, args.allow_incomplete)
+    except ShardMergeError as e:
+        print(f"ERROR: {e}", file=sys.stderr)
+        sys.exit(1)
+
+    print(f"Merged {len(args.shard_dirs)} shard(s) into {args.outdir}")
+    for report, rows in counts.items():
+        print(f"  {report}: {rows} rows")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+#!/usr/bin/env python
+
+"""Multi-sample FASTA input: many genomes in one file.
+
+Assembly databases often export one large multi-FASTA in which each
+contig's ID starts with its genome's ID (``SAMPLE|contig_1``). Rather than
+splitting such a file into one FASTA per genome, it is streamed once and
+consecutive contigs of the same sample are grouped into an in-memory
+GenomeBuffer, which every pipeline stage then processes as one genome
+named after the sample.
+
+Contig names keep the full record ID (``SAMPLE|contig_1``), so att sites,
+record IDs and BED intervals still identify their source contig.
+"""
+
+import gzip
+import os
+import re
+
+from typing import Iterator, Optional, Tuple
+
+from sccmecextractor.genome_buffer import GenomeBuffer
+
+DEFAULT_SAMPLE_SEPARATOR = "|"
+
+
+class SampleIdParser:
+    """Derive a sample ID from a contig's record ID.
+
+    By default the sample is everything before the first *separator*
+    (``SAMPLE|contig_1`` -> ``SAMPLE``). With *pattern*, the regex is
+    searched in the record ID and its ``sample`` named group (or first
+    group, or whole match) is the sample ID.
+    """
+
+    def __init__(self, separator: str = DEFAULT_SAMPLE_SEPARATOR,
+                 pattern: Optional[str] = None):
+        self.separator = separator
+        self.pattern = re.compile(pattern) if pattern else None
+
+    def __call__(self, record_id: str) -> str:
+        if self.pattern is not None:
+            match = self.pattern.search(record_id)
+            if match is None:
+                raise ValueError(
+                    f"Contig {record_id} does not match sample pattern "
+                    f"{self.pattern.pattern!r}"
+                )
+            if "sample" in self.pattern.groupindex:
+                sample = match.group("sample")
+            elif self.pattern.groups:
+                sample = match.group(1)
+            else:
+                sample = match.group(0)
+        else:
+            sample, sep, _ = record_id.partition(self.separator)
+            if not sep:
+                raise ValueError(
+                    f"Contig {record_id} has no sample prefix (separator "
+                    f"{self.separator!r})"
+                )
+
+        # Sample IDs name output files
+        if not sample or os.sep in sample or sample in (".", ".."):
+            raise ValueError(f"Invalid sample ID {sample!r} from contig {record_id}")
+        return sample
+
+
+def iter_sample_genomes(fasta_file: str, sample_id: SampleIdParser
+                        ) -> Iterator[Tuple[str, GenomeBuffer]]:
+    """Stream a multi-sample FASTA, yielding ``(sample, genome)`` per sample.
+
+    Each sample's contigs must be consecutive; only one sample is held in
+    memory at a time. Raises ValueError if a sample reappears after another
+    one or a contig ID is repeated. Gzipped files are read directly.
+    """
+    opener = gzip.open if str(fasta_file).endswith(".gz") else open
+    seen = set()
+    sample = None
+    data, spans, headers = bytearray(), {}, {}
+    name = None
+    start = 0
+
+    def finish():
+        if name is not None:
+            spans[name] = (start, len(data) - start)
+        return sample, GenomeBuffer(data, spans, fasta_file, headers)
+
+    with opener(fasta_file, "rb") as fasta:
+        for line in fasta:
+            if line.startswith(b">"):
+                fields = line[1:].split(None, 1)
+                contig = fields[0].decode() if fields else ""
+                contig_sample = sample_id(contig)
+
+                if contig_sample != sample:
+                    if sample is not None:
+                        yield finish()
+                    if contig_sample in seen:
+                        raise ValueError(
+                            f"{fasta_file}: contigs of sample {contig_sample} are "
+                            f"not consecutive (sort the file by sample)"
+                        )
+                    seen.add(contig_sample)
+                    sample = contig_sample
+                    data, spans, headers = bytearray(), {}, {}
+                elif name is not None:
+                    spans[name] = (start, len(data) - start)
+
+                if contig in headers:
+                    raise ValueError(f"{fasta_file}: duplicate contig ID {contig!r}")
+                name = contig
+                headers[name] = line[1:].rstrip().decode()
+                start = len(data)
+            elif name is not None:
+                data += line.strip()
+
+    if sample is not None:
+        yield finish()
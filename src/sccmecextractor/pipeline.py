@@ -8,22 +8,76 @@ Runs locate-att → extract → type → report in a single command.
 import argparse
 import csv
 import glob
+import itertools
+import multiprocessing
 import os
+import signal
 import sys
 import tempfile
 import threading
+import time
 
+from contextlib import contextmanager
+from dataclasses import dataclass
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
 
-from sccmecextractor.locate_att_sites import AttSiteFinder
-from sccmecextractor.extract_SCCmec import SCCmecExtractor, ExtractionReport, AmbiguousHitReport, GenomeSequences
+from sccmecextractor.blast_utils import (
+    BlastRunner,
+    BlastTimeoutError,
+    blast_deadline,
+    blast_settings,
+    configure_blast,
+)
+from sccmecextractor.cpu_budget import (
+    CALIBRATION_GENOMES,
+    available_cpus,
+    plan_cpu_budget,
+)
+from sccmecextractor.memory_budget import (
+    MemoryGate,
+    estimate_genome_footprint,
+    parse_size,
+)
+from sccmecextractor.hit_store import HitStore
+from sccmecextractor.locate_att_sites import AttSiteFinder, RlmHBlastDetector
+from sccmecextractor.extract_SCCmec import (
+    COORDINATES_FILENAME,
+    AmbiguousHitReport,
+    ElementCoordinates,
+    ExtractionReport,
+    SCCmecExtractor,
+    append_report_rows,
+)
+from sccmecextractor.fasta_shards import RecordCollector, ShardWriter
+from sccmecextractor.genome_buffer import GenomeBuffer, SharedGenome, as_genome_buffer
+from sccmecextractor.merge_sccmec import (
+    SHARD_FILENAME,
+    parse_shard,
+    shard_of,
+    write_shard_file,
+)
+from sccmecextractor.run_manifest import (
+    REPORT_KINDS,
+    GenomeRecord,
+    ManifestMismatchError,
+    RunManifest,
+    file_fingerprint,
+)
+from sccmecextractor.multi_sample import (
+    DEFAULT_SAMPLE_SEPARATOR,
+    SampleIdParser,
+    iter_sample_genomes,
+)
 from sccmecextractor.type_sccmec import SCCmecTyper, TYPING_HEADER
+from sccmecextractor.work_queue import QueueMismatchError, WorkQueue
 from sccmecextractor.report_sccmec import (
     read_tsv,
     normalise_typing_keys,
     merge_reports,
+    update_unified_report,
     write_unified_report,
+    EXTRACTION_HEADER,
 )
 
 
@@ -56,17 +110,379 @@ def resolve_gff(fasta_stem: str, gff_files: Optional[Dict[str, str]] = None,
     return None
 
 
-def _write_typing_row(result: dict, output_file: str, write_header: bool):
+def _write_typing_row(result: dict, output_file: str, write_header: bool,
+                      header: List[str] = TYPING_HEADER):
     """Append one typing result dict as a TSV row."""
     with open(output_file, "a", newline="") as fh:
         writer = csv.DictWriter(
-            fh, fieldnames=TYPING_HEADER, delimiter="\t", extrasaction="ignore",
+            fh, fieldnames=header, delimiter="\t", extrasaction="ignore",
         )
         if write_header:
             writer.writeheader()
         writer.writerow(result)
 
 
+@dataclass
+class GenomeSearch:
+    """One genome after the BLAST-bound stage, ready for analysis.
+
+    Holds the genome (a GenomeBuffer, or a GenomeDescriptor when analysis
+    runs in another process), its temporary BLAST database, the rlmH
+    positions found by BLAST and the raw mec/ccr hits. *error* is set when
+    rlmH detection failed, and *timeout* (the failure reason, with the
+    message in *error*) when the genome ran out of time while searching.
+    """
+
+    fasta_path: str
+    index: int
+    stem: str
+    sample_name: Optional[str]
+    gff_path: Optional[str]
+    use_blast: bool
+    genome: object = None
+    db_prefix: Optional[str] = None
+    rlmh_positions: Optional[dict] = None
+    genome_hits: Optional[dict] = None
+    error: str = ""
+    # Wall time spent in the search stage
+    seconds: float = 0.0
+    # GenomeBuffer.digest of the genome, for run manifests
+    input_hash: str = ""
+    # time.monotonic() by which the genome must be done
+    deadline: Optional[float] = None
+    timeout: str = ""
+
+
+class GenomeTimeoutError(BaseException):
+    """Raised when a genome runs past its time limit.
+
+    A BaseException, like BlastTimeoutError, so that per-stage error
+    handlers do not catch it: the genome is abandoned as a whole.
+    """
+
+    pass
+
+
+# Exceptions that abandon a genome for running out of time
+_TIMEOUTS = (GenomeTimeoutError, BlastTimeoutError)
+
+
+def _check_deadline(deadline: Optional[float]):
+    """Raise GenomeTimeoutError once *deadline* has passed (between stages,
+    where a worker thread cannot be interrupted)."""
+    if deadline is not None and time.monotonic() >= deadline:
+        raise GenomeTimeoutError("genome time limit reached")
+
+
+@contextmanager
+def _genome_alarm(deadline: Optional[float]):
+    """Interrupt Python code with GenomeTimeoutError at *deadline*.
+
+    Only possible on the main thread (sequential runs and worker
+    processes) and where SIGALRM exists; elsewhere the limit is enforced
+    by ``_check_deadline`` and BLAST command timeouts.
+    """
+    if (deadline is None or not hasattr(signal, "setitimer")
+            or threading.current_thread() is not threading.main_thread()):
+        yield
+        return
+
+    def expire(signum, frame):
+        raise GenomeTimeoutError("genome time limit reached")
+
+    previous = signal.signal(signal.SIGALRM, expire)
+    signal.setitimer(signal.ITIMER_REAL, max(deadline - time.monotonic(), 0.001))
+    try:
+        yield
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        signal.signal(signal.SIGALRM, previous)
+
+
+def _cleanup_search_db(db_prefix: Optional[str]):
+    """Remove a GenomeSearch's BLAST database and its temporary directory."""
+    if db_prefix is None:
+        return
+    BlastRunner.cleanup_db(db_prefix)
+    try:
+        os.rmdir(os.path.dirname(db_prefix))
+    except OSError:
+        pass
+
+
+def _progress(index: int, total: Optional[int], stem: str) -> str:
+    return f"[{index}/{total}] {stem}:" if total else f"[{index}] {stem}:"
+
+
+def _locked_print(print_lock: Optional[threading.Lock]):
+    def _print(*args, **kwargs):
+        if print_lock is not None:
+            with print_lock:
+                print(*args, **kwargs)
+        else:
+            print(*args, **kwargs)
+    return _print
+
+
+def _search_genome(
+    fasta_path: str,
+    index: int,
+    typer: SCCmecTyper,
+    gff_files: Optional[Dict[str, str]],
+    gff_dir: Optional[str],
+    blast_rlmh: bool,
+    rlmh_ref: Optional[str],
+    total: Optional[int] = None,
+    print_lock: Optional[threading.Lock] = None,
+    genome: Optional[GenomeBuffer] = None,
+    sample_name: Optional[str] = None,
+    genome_timeout: Optional[float] = None,
+) -> GenomeSearch:
+    """BLAST-bound stage: build the genome database and run every search.
+
+    One database (streamed from the genome buffer, parsed here unless
+    given) serves rlmH detection, typing and the analysis stage's ccr
+    checks; it is removed by ``_analyse_genome``. With *genome_timeout*,
+    the genome's deadline starts now; a search cut short by it (or by a
+    BLAST command timeout) leaves ``timeout`` set and no database.
+    """
+    started = time.perf_counter()
+    stem = sample_name or Path(fasta_path).stem
+    _print = _locked_print(print_lock)
+    gff_path = resolve_gff(stem, gff_files=gff_files, gff_dir=gff_dir)
+    use_blast = blast_rlmh or (gff_path is None)
+    search = GenomeSearch(fasta_path, index, stem, sample_name, gff_path, use_blast)
+    if genome_timeout:
+        search.deadline = time.monotonic() + genome_timeout
+
+    try:
+        with blast_deadline(search.deadline):
+            _run_searches(search, genome, typer, rlmh_ref, total, _print)
+    except _TIMEOUTS as e:
+        _print(f"{_progress(index, total, stem)} TIMEOUT: {e}", file=sys.stderr)
+        _cleanup_search_db(search.db_prefix)
+        search.db_prefix = None
+        search.timeout = _timeout_reason(e)
+        search.error = str(e)
+    search.seconds = time.perf_counter() - started
+    return search
+
+
+def _run_searches(search: GenomeSearch, genome: Optional[GenomeBuffer],
+                  typer: SCCmecTyper, rlmh_ref: Optional[str],
+                  total: Optional[int], _print):
+    """The searches of ``_search_genome``, filling in *search*."""
+    fasta_path, stem = search.fasta_path, search.stem
+    if genome is None:
+        genome = GenomeBuffer.from_fasta(fasta_path)
+    search.genome = genome
+    search.input_hash = genome.digest()
+
+    tmp_db_dir = tempfile.mkdtemp(prefix="sccmec_pipeline_")
+    search.db_prefix = os.path.join(tmp_db_dir, "genome_db")
+    _print(f"{_progress(search.index, total, stem)} searching...", file=sys.stderr, flush=True)
+
+    try:
+        BlastRunner().create_db_from_stream(genome.write_fasta, search.db_prefix, title=stem)
+    except BaseException:
+        _cleanup_search_db(search.db_prefix)
+        raise
+
+    if search.use_blast:
+        try:
+            search.rlmh_positions = RlmHBlastDetector(
+                fasta_path, rlmh_ref, genome_db_prefix=search.db_prefix,
+            ).rlmH_genes
+        except Exception as e:
+            search.error = str(e)
+            return
+
+    # --- Search mec/ccr once against the genome; typing of both the
+    # extracted element and the WGS fallback is derived from these hits ---
+    try:
+        search.genome_hits = typer.search_db(search.db_prefix)
+    except Exception as e:
+        _print(f"{_progress(search.index, total, stem)} typing ERROR: {e}", file=sys.stderr)
+
+
+def _analyse_genome(
+    search: GenomeSearch,
+    att_dir: str,
+    sccmec_dir: str,
+    extraction_report_file: str,
+    ambiguous_report_file: str,
+    typer: SCCmecTyper,
+    rlmh_ref: Optional[str],
+    composite: bool,
+    total: Optional[int] = None,
+    print_lock: Optional[threading.Lock] = None,
+    circular: bool = False,
+    coordinates_only: bool = False,
+    bundle: Optional[ShardWriter] = None,
+    collect_reports: bool = False,
+) -> dict:
+    """CPU-bound stage: locate att sites, extract and type one genome.
+
+    Uses the database, rlmH positions and hits of *search* (its genome is
+    attached from shared memory if given as a descriptor) and removes the
+    database when done. Returns the result dict described in
+    ``_process_genome``. BLAST commands stop at the genome's deadline,
+    which is also checked between stages; a genome out of time is reported
+    with status "timeout".
+    """
+    started = time.perf_counter()
+    stem = search.stem
+    fasta_path = search.fasta_path
+    sample_name = search.sample_name
+    progress = _progress(search.index, total, stem)
+    _print = _locked_print(print_lock)
+    if search.timeout:
+        # Ran out of time while searching
+        result = _abandoned_result(
+            stem, "timeout", search.timeout, search.error, seconds=search.seconds,
+        )
+        if not collect_reports:
+            append_report_rows(result.pop("reports"), extraction_report_file)
+        return result
+    # Hit-store source for later reference updates; a multi-sample FASTA
+    # holds other genomes too, so its samples have none
+    source = fasta_path if sample_name is None else None
+    result = {
+        "stem": stem,
+        "status": "failed",
+        "typing_result": None,
+        "success": False,
+        "extracted": False,
+        "typed_sccmec": False,
+        "typed_wgs": False,
+        "seconds": search.seconds,
+        "blast_seconds": search.seconds,
+        "input_file": fasta_path,
+        "fingerprint": file_fingerprint(fasta_path) if sample_name is None else None,
+        "input_hash": search.input_hash,
+        "stages": [],
+    }
+
+    attached = not isinstance(search.genome, GenomeBuffer)
+    genome = as_genome_buffer(search.genome)
+    genome_hits = search.genome_hits
+
+    try:
+        with blast_deadline(search.deadline):
+            # --- Stage 1: Locate att sites ---
+            _print(f"{progress} locating att sites...", end="", file=sys.stderr, flush=True)
+            att_output = os.path.join(att_dir, f"{stem}_att_sites.tsv")
+
+            try:
+                if search.error:
+                    raise RuntimeError(search.error)
+                result["stages"].append("search")
+                finder = AttSiteFinder(
+                    fasta_path, gff3_file=search.gff_path,
+                    rlmh_positions=search.rlmh_positions,
+                    genome_buffer=genome,
+                    sample_name=sample_name,
+                )
+                all_sites = finder.find_all_sites()
+                filtered_sites = finder.filter_sites(all_sites)
+                finder.write_results(filtered_sites, att_output)
+                result["stages"].append("locate")
+            except Exception as e:
+                _print(f" ERROR (locate): {e}", file=sys.stderr)
+                result["status"] = "error_locate"
+                return result
+            _check_deadline(search.deadline)
+
+            # --- Stage 2: Extract SCCmec ---
+            _print(" extracting...", end="", file=sys.stderr, flush=True)
+
+            # Pass pre-computed rlmH positions to avoid redundant BLAST
+            rlmh_positions = getattr(finder.gene_parser, 'rlmH_genes', None)
+
+            # Extraction's ccr checks use the bundled ccr reference
+            ccr_hits = None
+            ccr_family = typer.manifest.get("ccr")
+            if (genome_hits is not None and ccr_family is not None
+                    and ccr_family.is_bundled("ccr_genes.fasta")):
+                ccr_hits = genome_hits["ccr"]
+
+            try:
+                extractor = SCCmecExtractor(
+                    fasta_path, gff3_file=search.gff_path, tsv_file=att_output,
+                    composite=composite, blast_rlmh=search.use_blast, rlmh_ref=rlmh_ref,
+                    rlmh_positions=rlmh_positions,
+                    genome_sequences=genome,
+                    genome_db_prefix=search.db_prefix,
+                    ccr_hits=ccr_hits,
+                    circular=circular,
+                    coordinates_only=coordinates_only,
+                    bundle=bundle,
+                    sample_name=sample_name,
+                    collect_reports=collect_reports,
+                )
+                success = extractor.extract_sccmec(
+                    sccmec_dir, report_file=extraction_report_file,
+                    ambiguous_report_file=ambiguous_report_file,
+                    coordinates_file=os.path.join(sccmec_dir, COORDINATES_FILENAME),
+                )
+                if collect_reports:
+                    result["reports"] = extractor.reports
+                    result["ambiguous_reports"] = extractor.ambiguous_reports
+                    result["coordinates"] = extractor.coordinates
+                result["stages"].append("extract")
+            except Exception as e:
+                _print(f" ERROR (extract): {e}", file=sys.stderr)
+                result["status"] = "error_extract"
+                return result
+            _check_deadline(search.deadline)
+
+            # --- Stage 3: Type ---
+            region = extractor.extracted_region
+            if success and region is not None:
+                _print(" typing (sccmec)...", end="", file=sys.stderr, flush=True)
+                if genome_hits is not None:
+                    try:
+                        result["typing_result"] = typer.type_region(
+                            f"{stem}_SCCmec", genome_hits, region.contig,
+                            region.start, region.end, region.reverse_complement,
+                            region.record_id, source=source,
+                            contig_length=region.contig_length,
+                        )
+                        result["typed_sccmec"] = True
+                        result["stages"].append("type")
+                    except Exception as e:
+                        _print(f" typing ERROR: {e}", end="", file=sys.stderr)
+                result["extracted"] = True
+                result["success"] = True
+            else:
+                _print(" FAILED, typing (wgs)...", end="", file=sys.stderr, flush=True)
+                if genome_hits is not None:
+                    try:
+                        result["typing_result"] = typer.type_hits(
+                            stem, genome_hits, source=source,
+                        )
+                        result["typed_wgs"] = True
+                        result["stages"].append("type")
+                    except Exception as e:
+                        _print(f" typing ERROR: {e}", end="", file=sys.stderr)
+    except _TIMEOUTS as e:
+        _print(f" TIMEOUT: {e}", file=sys.stderr)
+        result = _abandoned_result(
+            stem, "timeout", _timeout_reason(e), str(e), seconds=search.seconds,
+        )
+        if not collect_reports:
+            append_report_rows(result.pop("reports"), extraction_report_file)
+    finally:
+        # Clean up shared BLAST DB
+        _cleanup_search_db(search.db_prefix)
+        if attached:
+            genome.close()
+        result["seconds"] += time.perf_counter() - started
+
+    _print(" done", file=sys.stderr)
+    return result
+
+
 def _process_genome(
     fasta_path: str,
     att_dir: str,
@@ -80,20 +496,168 @@ def _process_genome(
     rlmh_ref: Optional[str],
     composite: bool,
     index: int,
-    total: int,
+    total: Optional[int],
     print_lock: Optional[threading.Lock] = None,
+    genome=None,
+    circular: bool = False,
+    coordinates_only: bool = False,
+    bundle: Optional[ShardWriter] = None,
+    sample_name: Optional[str] = None,
+    collect_reports: bool = False,
+    genome_timeout: Optional[float] = None,
 ) -> dict:
     """Process a single genome through stages 1-3.
 
+    Runs the BLAST-bound (``_search_genome``) and CPU-bound
+    (``_analyse_genome``) stages back to back.
+
+    *genome* may be a pre-loaded GenomeBuffer or a GenomeDescriptor for a
+    genome in shared memory (read in place by every stage); by default the
+    FASTA is parsed here. *sample_name* names a genome grouped from a
+    multi-sample FASTA (*fasta_path*) in place of the file's stem.
+
     Returns a result dict with keys:
         stem, status, typing_result, success
-    where status is one of "extracted", "failed", "error_locate", "error_extract".
+    where status is one of "extracted", "failed", "error_locate", "error_extract",
+    "timeout" (over *genome_timeout* seconds, or a BLAST command over its
+    time limit; see ``configure_blast``), plus the genome's processing time in seconds (blast_seconds of it in
+    the search stage), the input's identity for run manifests (input_file,
+    fingerprint, input_hash) and the stages completed (search, locate,
+    extract, type).
+    With *collect_reports*, extraction report rows are returned under
+    reports, ambiguous_reports and coordinates instead of being written.
     """
-    stem = Path(fasta_path).stem
-    progress = f"[{index}/{total}] {stem}:"
-    result = {
+    attached = genome is not None and not isinstance(genome, GenomeBuffer)
+    if genome is not None:
+        genome = as_genome_buffer(genome)
+
+    deadline = time.monotonic() + genome_timeout if genome_timeout else None
+    try:
+        with _genome_alarm(deadline):
+            search = _search_genome(
+                fasta_path, index, typer, gff_files, gff_dir, blast_rlmh, rlmh_ref,
+                total=total, print_lock=print_lock, genome=genome,
+                sample_name=sample_name, genome_timeout=genome_timeout,
+            )
+            return _analyse_genome(
+                search, att_dir, sccmec_dir, extraction_report_file,
+                ambiguous_report_file, typer, rlmh_ref, composite, total=total,
+                print_lock=print_lock, circular=circular,
+                coordinates_only=coordinates_only, bundle=bundle,
+                collect_reports=collect_reports,
+            )
+    except _TIMEOUTS as e:
+        # The alarm went off outside the stages' own timeout handling
+        result = _abandoned_result(
+            sample_name or Path(fasta_path).stem, "timeout", _timeout_reason(e), str(e),
+        )
+        if not collect_reports:
+            append_report_rows(result.pop("reports"), extraction_report_file)
+        return result
+    finally:
+        if attached:
+            genome.close()
+
+
+# Per-process state for pipeline workers, set by _init_pipeline_worker
+_WORKER_STATE: Dict = {}
+
+
+def _init_pipeline_worker(hit_store_path: Optional[str], bundled: Optional[set],
+                          kwargs: dict, blast_config: tuple = (1, None),
+                          started=None):
+    """Build the typer and its reference data once per worker process and
+    apply the parent's BLAST limits (see ``configure_blast``). Workers
+    report each genome they start on the *started* queue, if given."""
+    configure_blast(*blast_config)
+    hit_store = HitStore(hit_store_path) if hit_store_path else None
+    _WORKER_STATE["bundled"] = bundled
+    _WORKER_STATE["started"] = started
+    _WORKER_STATE["kwargs"] = dict(kwargs, typer=SCCmecTyper(hit_store=hit_store))
+
+
+def _report_start(index: int, deadline: Optional[float]):
+    """Tell the parent (``_WorkerPool``) this worker started genome *index*,
+    to be done by *deadline* (a ``time.monotonic()`` value or None)."""
+    started = _WORKER_STATE.get("started")
+    if started is not None:
+        started.put((index, os.getpid(), deadline))
+
+
+def _process_genome_in_worker(fasta_path: str, index: int, genome=None,
+                              sample_name: Optional[str] = None) -> dict:
+    """Run ``_process_genome`` in a pipeline worker process.
+
+    Report rows and bundled records are returned in the result dict for
+    the parent to write, so only plain picklable data crosses back.
+    """
+    state = _WORKER_STATE
+    genome_timeout = state["kwargs"].get("genome_timeout")
+    _report_start(index, time.monotonic() + genome_timeout if genome_timeout else None)
+    bundle = RecordCollector(state["bundled"]) if state["bundled"] is not None else None
+    result = _process_genome(
+        fasta_path, index=index, genome=genome, sample_name=sample_name,
+        bundle=bundle, collect_reports=True, **state["kwargs"],
+    )
+    result["records"] = bundle.records if bundle is not None else []
+    return result
+
+
+def estimate_genome_cost(fasta_path: str, has_gff: bool = False) -> float:
+    """Relative processing cost of one genome, for longest-first ordering.
+
+    Scales with sequence size (scanning and BLAST) plus a fixed overhead
+    per contig (fragmented assemblies mean more att-site and extraction
+    bookkeeping); genomes without a GFF also need an rlmH BLAST search.
+    Contigs are counted from a ``.fai`` if present, otherwise by scanning
+    for headers; gzipped files are costed by their compressed size.
+    """
+    size = os.path.getsize(fasta_path)
+    if str(fasta_path).endswith(".gz"):
+        return size * GZIP_SIZE_FACTOR * (1.0 if has_gff else 1.0 + RLMH_BLAST_COST)
+
+    fai = str(fasta_path) + ".fai"
+    if os.path.exists(fai):
+        with open(fai) as f:
+            contigs = sum(1 for _ in f)
+    else:
+        contigs = 0
+        with open(fasta_path, "rb") as f:
+            first = f.read(1)
+            contigs += first == b">"
+            for chunk in iter(lambda: f.read(1 << 20), b""):
+                contigs += chunk.count(b"\n>")
+    return size * (1.0 if has_gff else 1.0 + RLMH_BLAST_COST) + CONTIG_COST * contigs
+
+
+def _genome_jobs(fasta_files: List[str], sample_parser: Optional[SampleIdParser],
+                 costs: Optional[Dict[str, float]] = None
+                 ) -> Iterator[Tuple[int, str, Optional[str], Optional[GenomeBuffer]]]:
+    """Yield ``(input index, fasta_path, sample_name, genome)`` per genome.
+
+    Without *sample_parser* each file is one genome, parsed when processed,
+    yielded most expensive first when *costs* are given; with it, each file
+    is streamed into per-sample genomes in file order.
+    """
+    if sample_parser is None:
+        order = list(enumerate(fasta_files))
+        if costs is not None:
+            order.sort(key=lambda job: costs[job[1]], reverse=True)
+        for idx, fasta_path in order:
+            yield idx, fasta_path, None, None
+        return
+
+    idx = 0
+    for fasta_path in fasta_files:
+        for sample, genome in iter_sample_genomes(fasta_path, sample_parser):
+            yield idx, fasta_path, sample, genome
+            idx += 1
+
+
+def _error_result(stem: str) -> dict:
+    return {
         "stem": stem,
-        "status": "failed",
+        "status": "error",
         "typing_result": None,
         "success": False,
         "extracted": False,
@@ -101,105 +665,733 @@ def _process_genome(
         "typed_wgs": False,
     }
 
-    def _print(*args, **kwargs):
-        if print_lock is not None:
-            with print_lock:
-                print(*args, **kwargs)
-        else:
-            print(*args, **kwargs)
 
-    # --- Resolve GFF for this genome ---
-    gff_path = resolve_gff(stem, gff_files=gff_files, gff_dir=gff_dir)
-    use_blast = blast_rlmh or (gff_path is None)
+def _timeout_reason(e: BaseException) -> str:
+    """Extraction report failure reason for a timeout exception."""
+    if isinstance(e, BlastTimeoutError) and not e.deadline:
+        return "blast_timeout"
+    return "genome_timeout"
+
 
-    # --- Parse genome once, share between stages ---
-    genome = GenomeSequences(fasta_path)
-    string_sequences = {cid: str(rec.seq) for cid, rec in genome.sequences.items()}
+def _abandoned_result(stem: str, status: str, failure_reason: str, notes: str,
+                      seconds: float = 0.0) -> dict:
+    """Result of a genome abandoned for running out of time ("timeout") or
+    taking its worker process down ("crashed"), with the reason in its
+    extraction report row. It has no input_hash, so it is recorded as a
+    failure (``record_failure``) and a resumed run tries the genome again."""
+    result = dict(_error_result(stem), status=status, seconds=seconds)
+    result["reports"] = [ExtractionReport(
+        stem, status=status, failure_reason=failure_reason, notes=notes,
+    )]
+    return result
+
+
+EXECUTORS = ("thread", "process")
+SCHEDULERS = ("genome", "staged")
+ORDERS = ("input", "lpt")
+
+# Cost model for estimate_genome_cost, in bytes of sequence: fixed cost
+# per contig, extra share for the rlmH search and gzip expansion
+CONTIG_COST = 2_000
+RLMH_BLAST_COST = 0.25
+GZIP_SIZE_FACTOR = 3.5
+
+# _process_genome arguments used by the analysis stage
+_ANALYSE_ARGS = (
+    "att_dir", "sccmec_dir", "extraction_report_file", "ambiguous_report_file",
+    "rlmh_ref", "composite", "total", "circular", "coordinates_only",
+)
 
-    # --- Create shared BLAST DB when using BLAST mode ---
-    genome_db_prefix = None
-    tmp_db_dir = None
-    if use_blast:
-        from sccmecextractor.blast_utils import BlastRunner
-        tmp_db_dir = tempfile.mkdtemp(prefix="sccmec_pipeline_")
-        genome_db_prefix = os.path.join(tmp_db_dir, "genome_db")
-        BlastRunner().create_db(fasta_path, genome_db_prefix)
 
+def _analyse_in_worker(search: GenomeSearch) -> dict:
+    """Run ``_analyse_genome`` in a pipeline worker process (staged mode)."""
+    state = _WORKER_STATE
+    _report_start(search.index, search.deadline)
+    bundle = RecordCollector(state["bundled"]) if state["bundled"] is not None else None
+    kwargs = {k: state["kwargs"][k] for k in _ANALYSE_ARGS}
     try:
-        # --- Stage 1: Locate att sites ---
-        _print(f"{progress} locating att sites...", end="", file=sys.stderr, flush=True)
-        att_output = os.path.join(att_dir, f"{stem}_att_sites.tsv")
+        with _genome_alarm(search.deadline):
+            result = _analyse_genome(
+                search, typer=state["kwargs"]["typer"], bundle=bundle,
+                collect_reports=True, **kwargs,
+            )
+    except _TIMEOUTS as e:
+        result = _abandoned_result(
+            search.stem, "timeout", _timeout_reason(e), str(e), seconds=search.seconds,
+        )
+    result["records"] = bundle.records if bundle is not None else []
+    return result
 
-        try:
-            finder = AttSiteFinder(
-                fasta_path, gff3_file=gff_path,
-                blast_rlmh=use_blast, rlmh_ref=rlmh_ref,
-                sequences=string_sequences,
-                genome_db_prefix=genome_db_prefix,
+
+def _manifest_result(result: dict) -> dict:
+    """The part of a result dict kept in a run manifest: counts, typing
+    result and report rows (as TSV lines)."""
+    stored = {
+        key: result.get(key)
+        for key in ("stem", "status", "success", "extracted", "typed_sccmec",
+                    "typed_wgs", "typing_result", "seconds", "blast_seconds")
+    }
+    stored["rows"] = {
+        kind: [row.to_tsv_row() for row in result.get(key, [])]
+        for key, kind in REPORT_KINDS.items()
+    }
+    return stored
+
+
+class _ResultWriter:
+    """Writes results in input order: collected report rows, bundled
+    records and typing rows, then the genome's checkpoint in *manifest*.
+
+    Results may arrive in any order; each is written once every earlier
+    genome's has been, then dropped, so only counts and timings are kept
+    for the summary. Results marked ``resumed`` (recorded by an earlier
+    run) are only counted. Genomes are recorded in *manifest* (a RunManifest
+    or WorkQueue) from *first_position* on. Without report files (None),
+    results only go to *manifest*.
+    """
+
+    def __init__(self, extraction_report_file: Optional[str],
+                 ambiguous_report_file: Optional[str], coordinates_file: Optional[str],
+                 shard_writer: Optional[ShardWriter], typing_results_file: Optional[str],
+                 typing_header: List[str] = TYPING_HEADER,
+                 manifest=None, first_position: int = 0):
+        self.extraction_report_file = extraction_report_file
+        self.ambiguous_report_file = ambiguous_report_file
+        self.coordinates_file = coordinates_file
+        self.shard_writer = shard_writer
+        self.typing_results_file = typing_results_file
+        self.typing_header = typing_header
+        self.manifest = manifest
+        self.first_position = first_position
+        self._pending: Dict[int, dict] = {}
+        self._next = 0
+        # As for append_report_rows, the header goes only into a new file
+        self._typing_header_written = bool(typing_results_file) and (
+            os.path.isfile(typing_results_file) and os.path.getsize(typing_results_file) > 0
+        )
+
+        self.total = 0
+        self.resumed = 0
+        self.extracted = 0
+        self.typed_sccmec = 0
+        self.typed_wgs = 0
+        self.timed_out = 0
+        self.crashed = 0
+        self.genome_seconds = 0.0
+        self.blast_seconds = 0.0
+        self.longest = 0.0
+
+    def add(self, idx: int, result: dict):
+        self.total += 1
+        if result:
+            self.extracted += bool(result.get("extracted"))
+            self.typed_sccmec += bool(result.get("typed_sccmec"))
+            self.typed_wgs += bool(result.get("typed_wgs"))
+            self.timed_out += result.get("status") == "timeout"
+            self.crashed += result.get("status") == "crashed"
+        if result and result.get("resumed"):
+            # Already written and recorded by an earlier run
+            self.resumed += 1
+            result = None
+        elif result:
+            seconds = result.get("seconds", 0.0)
+            self.genome_seconds += seconds
+            self.blast_seconds += result.get("blast_seconds", 0.0)
+            self.longest = max(self.longest, seconds)
+
+        self._pending[idx] = result
+        while self._next in self._pending:
+            ready = self._pending.pop(self._next) or {}
+            if self.extraction_report_file is not None:
+                self._write(ready)
+            if self.manifest is not None and ready.get("input_hash"):
+                self.manifest.record(
+                    self.first_position + self._next, ready["stem"], ready["input_file"],
+                    ready.get("fingerprint"), ready["input_hash"],
+                    ready.get("stages", []), _manifest_result(ready),
+                )
+            elif self.manifest is not None and ready:
+                self.manifest.record_failure(
+                    self.first_position + self._next, ready["stem"], _manifest_result(ready),
+                )
+            self._next += 1
+
+    def _write(self, ready: dict):
+        append_report_rows(ready.get("reports", []), self.extraction_report_file)
+        append_report_rows(ready.get("ambiguous_reports", []), self.ambiguous_report_file)
+        append_report_rows(ready.get("coordinates", []), self.coordinates_file)
+        for input_name, record in ready.get("records", []):
+            try:
+                self.shard_writer.add(input_name, record)
+            except ValueError as e:
+                print(f"WARNING: {e}", file=sys.stderr)
+        if ready.get("typing_result"):
+            _write_typing_row(
+                ready["typing_result"], self.typing_results_file,
+                not self._typing_header_written, header=self.typing_header,
             )
-            all_sites = finder.find_all_sites()
-            filtered_sites = finder.filter_sites(all_sites)
-            finder.write_results(filtered_sites, att_output)
-        except Exception as e:
-            _print(f" ERROR (locate): {e}", file=sys.stderr)
-            result["status"] = "error_locate"
-            return result
+            self._typing_header_written = True
+
+    @property
+    def blast_share(self) -> Optional[float]:
+        """Share of genome time spent in the search stage so far."""
+        if self.genome_seconds <= 0:
+            return None
+        return self.blast_seconds / self.genome_seconds
+
 
-        # --- Stage 2: Extract SCCmec ---
-        _print(" extracting...", end="", file=sys.stderr, flush=True)
+# Genomes submitted per worker before waiting for one to finish
+IN_FLIGHT_PER_WORKER = 2
 
-        # Pass pre-computed rlmH positions to avoid redundant BLAST
-        rlmh_positions = getattr(finder.gene_parser, 'rlmH_genes', None)
+# Seconds between checks for worker processes over the genome time limit,
+# and the time past the limit they are given before they are killed
+WATCHDOG_INTERVAL = 1.0
+KILL_GRACE = 30.0
+
+# Worker crashes a genome may be involved in before it is given up
+MAX_WORKER_CRASHES = 2
+
+
+def _job_footprint(job) -> int:
+    """Estimated memory of a ``_genome_jobs`` job."""
+    _, fasta_path, _, genome = job
+    try:
+        return estimate_genome_footprint(
+            fasta_path, len(genome.data) if genome is not None else None,
+        )
+    except OSError:
+        # Unreadable inputs fail when processed; count only the overhead
+        return estimate_genome_footprint(fasta_path, 0)
+
+
+def _submit_bounded(jobs, submit, finish, window: int,
+                    gate: Optional[MemoryGate] = None,
+                    watchdog: Optional[Callable[[], None]] = None):
+    """Submit *jobs* with at most *window* in flight, and with *gate* only
+    while its memory limit allows.
+
+    ``submit(job)`` returns a future; ``finish(job, future)`` handles it once
+    done, or returns a new future for a job that has to run again. Held-back
+    jobs wait for running ones to finish (memory is re-measured every
+    ``gate.poll_interval`` seconds meanwhile). *watchdog* is called at least
+    every WATCHDOG_INTERVAL seconds while jobs run.
+    """
+    from concurrent.futures import FIRST_COMPLETED, wait
+
+    pending = {}
+
+    def drain(timeout=None):
+        if watchdog is not None:
+            timeout = min(timeout or WATCHDOG_INTERVAL, WATCHDOG_INTERVAL)
+        done, _ = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+        for future in done:
+            job, estimate = pending.pop(future)
+            rerun = finish(job, future)
+            if rerun is not None:
+                pending[rerun] = (job, estimate)
+            elif gate is not None:
+                gate.release(estimate)
+        if watchdog is not None:
+            watchdog()
+
+    for job in jobs:
+        while len(pending) >= window:
+            drain()
+        estimate = 0
+        if gate is not None:
+            estimate = _job_footprint(job)
+            while not gate.admits(estimate):
+                drain(gate.poll_interval)
+            gate.acquire(estimate)
+        pending[submit(job)] = (job, estimate)
+    while pending:
+        drain()
+
+
+class _WorkerPool:
+    """Pipeline worker process pool that outlives its workers.
+
+    Workers report each genome they start, with its deadline
+    (``_report_start``). ``watchdog`` kills a worker still on a genome
+    KILL_GRACE seconds past its deadline, and the genome is recorded as
+    "timeout". A dead worker breaks the pool: a new pool is started and
+    the genomes it held are run again (``result`` returns None for them),
+    except one that has been running in MAX_WORKER_CRASHES broken pools,
+    which is recorded as "crashed".
+
+    Jobs are identified by their 0-based input index; the functions
+    submitted are handed the 1-based one.
+    """
+
+    def __init__(self, workers: int, hit_store_path: Optional[str],
+                 bundled: Optional[set], kwargs: dict, blast_config: tuple):
+        self.workers = workers
+        self.genome_timeout = kwargs.get("genome_timeout")
+        self._initargs = (hit_store_path, bundled, kwargs, blast_config)
+        # Written synchronously, so a start is seen even if the worker dies next
+        self._started = multiprocessing.SimpleQueue()
+        # Genomes being processed: job index -> (worker pid, deadline)
+        self._running: Dict[int, Tuple[int, Optional[float]]] = {}
+        self._finished = set()
+        self._killed = set()
+        self._crashes: Dict[int, int] = {}
+        # Genomes that may have broken each pool generation (None: any it held)
+        self._suspects: Dict[int, Optional[set]] = {}
+        self._generations = {}
+        self._pool = None
+        self._generation = -1
+        self._new_pool()
+
+    def _new_pool(self):
+        from concurrent.futures import ProcessPoolExecutor
+
+        if self._pool is not None:
+            self._poll_started()
+            if self._killed - self._finished:
+                self._suspects[self._generation] = set()  # broken by the watchdog
+            else:
+                self._suspects[self._generation] = set(self._running) or None
+            self._running.clear()
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            print("Worker process died; restarting the worker pool", file=sys.stderr)
+        self._generation += 1
+        self._pool = ProcessPoolExecutor(
+            max_workers=self.workers, initializer=_init_pipeline_worker,
+            initargs=self._initargs + (self._started,),
+        )
+
+    def _poll_started(self):
+        while not self._started.empty():
+            index, pid, deadline = self._started.get()
+            if index - 1 not in self._finished:
+                self._running[index - 1] = (pid, deadline)
+
+    def watchdog(self):
+        """Kill workers KILL_GRACE seconds past their genome's deadline."""
+        self._poll_started()
+        now = time.monotonic()
+        for i, (pid, deadline) in list(self._running.items()):
+            if deadline is not None and now > deadline + KILL_GRACE:
+                del self._running[i]
+                try:
+                    os.kill(pid, getattr(signal, "SIGKILL", signal.SIGTERM))
+                except ProcessLookupError:
+                    continue
+                self._killed.add(i)
+
+    def submit(self, i: int, fn, *args):
+        """Submit job *i* (``fn(*args)``), restarting a broken pool."""
+        from concurrent.futures.process import BrokenProcessPool
 
         try:
-            extractor = SCCmecExtractor(
-                fasta_path, gff3_file=gff_path, tsv_file=att_output,
-                composite=composite, blast_rlmh=use_blast, rlmh_ref=rlmh_ref,
-                rlmh_positions=rlmh_positions,
-                genome_sequences=genome,
-                genome_db_prefix=genome_db_prefix,
-            )
-            success = extractor.extract_sccmec(
-                sccmec_dir, report_file=extraction_report_file,
-                ambiguous_report_file=ambiguous_report_file,
+            future = self._pool.submit(fn, *args)
+        except BrokenProcessPool:
+            self._new_pool()
+            future = self._pool.submit(fn, *args)
+        self._generations[future] = self._generation
+        return future
+
+    def result(self, i: int, future, name: str) -> Optional[dict]:
+        """Return job *i*'s result, or None if it must be submitted again.
+
+        Exceptions raised by the job are re-raised.
+        """
+        from concurrent.futures.process import BrokenProcessPool
+
+        broken_in = self._generations.pop(future)
+        rerun = False
+        try:
+            return future.result()
+        except BrokenProcessPool:
+            if broken_in == self._generation:
+                self._new_pool()
+            if i in self._killed:
+                print(f"TIMEOUT: {name}: worker killed", file=sys.stderr)
+                return _abandoned_result(
+                    name, "timeout", "genome_timeout",
+                    f"worker killed after {self.genome_timeout + KILL_GRACE:g}s",
+                )
+            culprits = self._suspects.get(broken_in)
+            if culprits is None or i in culprits:
+                self._crashes[i] = self._crashes.get(i, 0) + 1
+            if self._crashes.get(i, 0) < MAX_WORKER_CRASHES:
+                rerun = True
+                return None
+            print(f"ERROR: {name}: worker process crashed", file=sys.stderr)
+            return _abandoned_result(
+                name, "crashed", "worker_crashed",
+                f"worker process died {self._crashes[i]} times on this genome",
             )
-        except Exception as e:
-            _print(f" ERROR (extract): {e}", file=sys.stderr)
-            result["status"] = "error_extract"
-            return result
-    finally:
-        # Clean up shared BLAST DB
-        if genome_db_prefix is not None:
-            from sccmecextractor.blast_utils import BlastRunner as _BR
-            _BR.cleanup_db(genome_db_prefix)
-            try:
-                os.rmdir(tmp_db_dir)
-            except OSError:
-                pass
-
-    # --- Stage 3: Type ---
-    sccmec_fasta = os.path.join(sccmec_dir, f"{stem}_SCCmec.fasta")
-    if success and os.path.isfile(sccmec_fasta):
-        _print(" typing (sccmec)...", end="", file=sys.stderr, flush=True)
+        finally:
+            if not rerun:
+                self._finished.add(i)
+                self._running.pop(i, None)
+
+    def shutdown(self):
+        self._pool.shutdown()
+        self._started.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.shutdown()
+
+
+def _run_in_processes(jobs, workers: int, hit_store_path: Optional[str],
+                      shard_writer: Optional[ShardWriter], common_kwargs: dict,
+                      writer: _ResultWriter, blast_config: tuple = (1, None),
+                      gate: Optional[MemoryGate] = None, resume: bool = False):
+    """Process genomes in a worker process pool.
+
+    Genomes grouped from multi-sample FASTAs are handed over in shared
+    memory. Report rows and bundled records come back with each result and
+    are written by *writer* in input order. Workers apply *blast_config*
+    (``configure_blast`` arguments); *gate* holds genomes back to stay under
+    a memory limit. With *resume*, every genome submitted is being redone,
+    so workers do not skip those with an element already stored.
+
+    Workers stuck past the genome time limit (``genome_timeout`` in
+    *common_kwargs*) are killed and dead workers replaced (see
+    ``_WorkerPool``).
+    """
+    kwargs = {k: v for k, v in common_kwargs.items() if k not in ("typer", "bundle")}
+    bundled = None
+    if shard_writer is not None:
+        bundled = set() if resume else shard_writer.stored_inputs()
+    shared = {}
+    pool = _WorkerPool(workers, hit_store_path, bundled, kwargs, blast_config)
+
+    def submit(job):
+        i, fasta_path, sample, genome = job
+        descriptor = None
+        if genome is not None:
+            if i not in shared:
+                shared[i] = SharedGenome(genome)
+            descriptor = shared[i].descriptor
+        return pool.submit(
+            i, _process_genome_in_worker, fasta_path, i + 1, descriptor, sample,
+        )
+
+    def finish(job, future):
+        i, fasta_path, sample, _ = job
+        name = sample or Path(fasta_path).stem
         try:
-            typing_result = typer.type_file(sccmec_fasta)
-            result["typing_result"] = typing_result
-            result["typed_sccmec"] = True
+            result = pool.result(i, future, name)
         except Exception as e:
-            _print(f" typing ERROR: {e}", end="", file=sys.stderr)
-        result["extracted"] = True
-        result["success"] = True
+            print(f"ERROR: {name}: {e}", file=sys.stderr)
+            result = _error_result(name)
+        if result is None:
+            return submit(job)
+        if i in shared:
+            shared.pop(i).close()
+        writer.add(i, result)
+        return None
+
+    with pool:
+        _submit_bounded(
+            jobs, submit, finish, IN_FLIGHT_PER_WORKER * workers, gate, pool.watchdog,
+        )
+
+
+def _run_staged(jobs, blast_workers: int, cpu_workers: int, use_processes: bool,
+                hit_store_path: Optional[str], shard_writer: Optional[ShardWriter],
+                common_kwargs: dict, writer: _ResultWriter,
+                blast_config: tuple = (1, None), gate: Optional[MemoryGate] = None,
+                resume: bool = False):
+    """Process genomes with the BLAST-bound and CPU-bound stages overlapped.
+
+    Searches (makeblastdb, rlmH and mec/ccr blastn) run in a thread pool of
+    *blast_workers*, since the work happens in BLAST subprocesses. Analysis
+    (att scanning, pairing, extraction, typing and report rows) runs in
+    *cpu_workers* threads or, with *use_processes*, worker processes. While
+    genome N is analysed, genome N+1 is already being searched.
+
+    Stages are joined by a bounded queue: no new search starts while
+    *cpu_workers* searched genomes already wait for analysis, so at most
+    ``blast_workers + 2 x cpu_workers`` genomes are held at once. Report
+    rows are written by *writer* in input order; analysis worker processes
+    apply *blast_config*. With *gate*, a genome's search only starts while
+    the memory limit allows; its reservation lasts until its analysis ends.
+    *resume* is as for ``_run_in_processes``, and analysis worker processes
+    are watched and replaced as there (see ``_WorkerPool``).
+    """
+    from collections import deque
+    from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+    search_kwargs = {
+        k: common_kwargs[k]
+        for k in ("typer", "gff_files", "gff_dir", "blast_rlmh", "rlmh_ref", "total",
+                  "genome_timeout")
+    }
+    analyse_kwargs = {k: common_kwargs[k] for k in _ANALYSE_ARGS}
+    queue_size = cpu_workers
+
+    print_lock = threading.Lock()
+    jobs = iter(jobs)
+    exhausted = False
+    held = None
+    estimates = {}
+    names = {}
+    db_prefixes = {}
+    shared = {}
+    searches = {}
+    analyses = {}
+    # Searched genomes being analysed in worker processes, to run again
+    # if their worker dies
+    analysing = {}
+    ready = deque()
+
+    blast_pool = ThreadPoolExecutor(max_workers=blast_workers)
+    if use_processes:
+        worker_kwargs = {
+            k: v for k, v in common_kwargs.items() if k not in ("typer", "bundle")
+        }
+        bundled = None
+        if shard_writer is not None:
+            bundled = set() if resume else shard_writer.stored_inputs()
+        cpu_pool = _WorkerPool(
+            cpu_workers, hit_store_path, bundled, worker_kwargs, blast_config,
+        )
     else:
-        _print(" FAILED, typing (wgs)...", end="", file=sys.stderr, flush=True)
-        try:
-            typing_result = typer.type_file(fasta_path)
-            result["typing_result"] = typing_result
-            result["typed_wgs"] = True
-        except Exception as e:
-            _print(f" typing ERROR: {e}", end="", file=sys.stderr)
+        cpu_pool = ThreadPoolExecutor(max_workers=cpu_workers)
 
-    _print(" done", file=sys.stderr)
-    return result
+    def fail(idx, e):
+        print(f"ERROR: {names[idx]}: {e}", file=sys.stderr)
+        writer.add(idx, _error_result(names[idx]))
+
+    def release(idx):
+        if gate is not None:
+            gate.release(estimates.pop(idx))
+
+    with blast_pool, cpu_pool:
+        while True:
+            while not exhausted and len(searches) < blast_workers and len(ready) < queue_size:
+                if held is None:
+                    try:
+                        held = next(jobs)
+                    except StopIteration:
+                        exhausted = True
+                        break
+                if gate is not None:
+                    estimate = _job_footprint(held)
+                    if not gate.admits(estimate):
+                        break
+                    gate.acquire(estimate)
+                    estimates[held[0]] = estimate
+                i, fasta_path, sample, genome = held
+                held = None
+                names[i] = sample or Path(fasta_path).stem
+                future = blast_pool.submit(
+                    _search_genome, fasta_path, i + 1, print_lock=print_lock,
+                    genome=genome, sample_name=sample, **search_kwargs,
+                )
+                searches[future] = i
+
+            while ready and len(analyses) < cpu_workers:
+                search = ready.popleft()
+                idx = search.index - 1
+                db_prefixes[idx] = search.db_prefix
+                if use_processes:
+                    shared[idx] = SharedGenome(search.genome)
+                    search.genome = shared[idx].descriptor
+                    analysing[idx] = search
+                    future = cpu_pool.submit(idx, _analyse_in_worker, search)
+                else:
+                    future = cpu_pool.submit(
+                        _analyse_genome, search, typer=common_kwargs["typer"],
+                        print_lock=print_lock, bundle=shard_writer,
+                        collect_reports=True, **analyse_kwargs,
+                    )
+                analyses[future] = idx
+
+            if not (searches or analyses):
+                break
+
+            # A held-back genome waits for memory to be freed, re-measured
+            # every poll interval
+            timeout = gate.poll_interval if held is not None else None
+            if use_processes:
+                timeout = min(timeout or WATCHDOG_INTERVAL, WATCHDOG_INTERVAL)
+            done, _ = wait(set(searches) | set(analyses), timeout=timeout,
+                           return_when=FIRST_COMPLETED)
+            for future in done:
+                if future in searches:
+                    idx = searches.pop(future)
+                    try:
+                        search = future.result()
+                    except Exception as e:
+                        release(idx)
+                        fail(idx, e)
+                        continue
+                    if search.timeout:
+                        # Out of time already; nothing to analyse
+                        release(idx)
+                        writer.add(idx, _abandoned_result(
+                            search.stem, "timeout", search.timeout, search.error,
+                            seconds=search.seconds,
+                        ))
+                    else:
+                        ready.append(search)
+                    continue
+
+                idx = analyses.pop(future)
+                try:
+                    if use_processes:
+                        result = cpu_pool.result(idx, future, names[idx])
+                        if result is None:
+                            # Its worker died: analyse it again
+                            analyses[cpu_pool.submit(
+                                idx, _analyse_in_worker, analysing[idx],
+                            )] = idx
+                            continue
+                    else:
+                        result = future.result()
+                    writer.add(idx, result)
+                except Exception as e:
+                    fail(idx, e)
+                # A failed or killed analysis leaves the database behind
+                _cleanup_search_db(db_prefixes.pop(idx))
+                release(idx)
+                analysing.pop(idx, None)
+                if idx in shared:
+                    shared.pop(idx).close()
+            if use_processes:
+                cpu_pool.watchdog()
+
+
+def _input_unchanged(record: GenomeRecord, fasta_path: str,
+                     genome: Optional[GenomeBuffer]) -> bool:
+    """Whether a genome's input matches the one recorded in a manifest."""
+    if genome is not None:
+        return genome.digest() == record.input_hash
+    try:
+        if record.size is not None and \
+                file_fingerprint(fasta_path) == (record.size, record.mtime_ns):
+            return True
+        # Touched or copied: compare the sequences themselves
+        return GenomeBuffer.from_fasta(fasta_path).digest() == record.input_hash
+    except OSError:
+        return False
+
+
+def _resume_jobs(jobs, manifest: RunManifest, writer: _ResultWriter,
+                 shard_writer: Optional[ShardWriter], att_dir: str, sccmec_dir: str):
+    """Skip genomes whose result is recorded in *manifest* for the same input.
+
+    Their recorded results go straight to *writer*. Every other genome has
+    the partial outputs of the interrupted run (att-site TSV, element FASTA
+    or stored shard record) removed before it is yielded for processing.
+    """
+    for job in jobs:
+        i, fasta_path, sample, genome = job
+        name = sample or Path(fasta_path).stem
+        record = manifest.get(name)
+        # Failed genomes (no input hash) are retried
+        if record is not None and record.input_hash and \
+                _input_unchanged(record, fasta_path, genome):
+            # Bundled elements are lost if their shard was never finished
+            stored = (shard_writer is None or not record.result.get("extracted")
+                      or name in shard_writer)
+            if stored:
+                manifest.set_position(name, i)
+                writer.add(i, dict(record.result, resumed=True))
+                continue
+
+        for partial in (os.path.join(att_dir, f"{name}_att_sites.tsv"),
+                        os.path.join(sccmec_dir, f"{name}_SCCmec.fasta")):
+            if os.path.exists(partial):
+                os.remove(partial)
+        if shard_writer is not None:
+            shard_writer.discard(name)
+        yield job
+
+
+def _rebuild_reports(records: Iterator[GenomeRecord], files: Dict[str, str],
+                     typing_results_file: str, typing_header: List[str]):
+    """Rewrite the report files from recorded results (a run manifest's or
+    work queue's ``records()``), in input order.
+
+    *files* maps each ``REPORT_KINDS`` kind to its report path; a report
+    without any rows is removed.
+    """
+    headers = {
+        "extraction": ExtractionReport.HEADER,
+        "ambiguous": AmbiguousHitReport.HEADER,
+        "coordinates": ElementCoordinates.HEADER,
+    }
+    written = {kind: False for kind in files}
+    handles = {kind: open(path, "w") for kind, path in files.items()}
+    typing_fh = open(typing_results_file, "w", newline="")
+    try:
+        typing_writer = csv.DictWriter(
+            typing_fh, fieldnames=typing_header, delimiter="\t", extrasaction="ignore",
+        )
+        typed = False
+        for record in records:
+            for kind, handle in handles.items():
+                rows = record.rows(kind)
+                if rows and not written[kind]:
+                    handle.write(headers[kind] + "\n")
+                    written[kind] = True
+                for row in rows:
+                    handle.write(row + "\n")
+            if record.result.get("typing_result"):
+                if not typed:
+                    typing_writer.writeheader()
+                    typed = True
+                typing_writer.writerow(record.result["typing_result"])
+    finally:
+        for handle in handles.values():
+            handle.close()
+        typing_fh.close()
+
+    for kind, path in files.items():
+        if not written[kind]:
+            os.remove(path)
+    if not typed:
+        os.remove(typing_results_file)
+
+
+def _select_samples(jobs, keep: Callable[[str], bool]):
+    """Keep the genomes of *jobs* whose name passes *keep*, renumbering them
+    from 0 (multi-sample input, whose genomes are named as they are read)."""
+    idx = 0
+    for _, fasta_path, sample, genome in jobs:
+        if not keep(sample):
+            continue
+        yield idx, fasta_path, sample, genome
+        idx += 1
+
+
+def _merge_new_genomes(manifest: RunManifest, unified_report_file: str) -> int:
+    """Merge the genomes recorded in *manifest* but not yet in the unified
+    report into it (see ``update_unified_report``); returns how many."""
+    extraction_rows, typing_rows, names = {}, {}, []
+    for record in manifest.records(unreported=True):
+        names.append(record.name)
+        for row in record.rows("extraction"):
+            fields = dict(zip(EXTRACTION_HEADER, row.split("\t")))
+            extraction_rows[fields["Input_File"]] = fields
+        typing_result = record.result.get("typing_result")
+        if typing_result:
+            typing_rows[typing_result["Input_File"]] = typing_result
+    if names:
+        merged = merge_reports(extraction_rows, normalise_typing_keys(typing_rows))
+        update_unified_report(merged, unified_report_file)
+        manifest.mark_reported(names)
+    return len(names)
+
+
+def _timing_summary(busy: float, longest: float, wall_seconds: float, order: str,
+                    workers: int) -> str:
+    """Wall time against the best makespan the genome times allow."""
+    bound = max(busy / workers, longest)
+    return (
+        f"  Timing ({order} order, {workers} worker(s)): {wall_seconds:.1f}s wall, "
+        f"{busy:.1f}s genome time, longest genome {longest:.1f}s, "
+        f"lower bound {bound:.1f}s"
+    )
 
 
 def run_pipeline(
@@ -211,6 +1403,23 @@ def run_pipeline(
     rlmh_ref: Optional[str] = None,
     composite: bool = False,
     threads: int = 1,
+    save_hits: bool = False,
+    circular: bool = False,
+    coordinates_only: bool = False,
+    bundle: bool = False,
+    sample_parser: Optional[SampleIdParser] = None,
+    executor: str = "thread",
+    scheduler: str = "genome",
+    blast_workers: Optional[int] = None,
+    order: str = "input",
+    cpus=None,
+    max_memory: Optional[int] = None,
+    resume: bool = False,
+    incremental: bool = False,
+    shard: Optional[Tuple[int, int]] = None,
+    queue: Optional[str] = None,
+    genome_timeout: Optional[float] = None,
+    blast_timeout: Optional[float] = None,
 ) -> dict:
     """Run the full SCCmecExtractor pipeline on one or more genomes.
 
@@ -232,12 +1441,180 @@ def run_pipeline(
         Extract to outermost boundary for composite elements.
     threads : int
         Number of parallel threads (default 1 = sequential).
+    save_hits : bool
+        Save raw typing hits to ``typing/typing_hits.sqlite`` so typing can
+        be re-derived later with ``sccmec-type --from-hits``.
+    circular : bool
+        Treat every contig as circular so origin-spanning elements are
+        extracted (contigs with a circular header always are).
+    coordinates_only : bool
+        Write element intervals to ``sccmec/sccmec_coordinates.bed`` instead
+        of one FASTA per element (typing is unaffected).
+    bundle : bool
+        Append elements to indexed bgzip shards in ``sccmec/`` (mapped by
+        ``sccmec_records.tsv``) instead of writing one FASTA per genome.
+    sample_parser : SampleIdParser, optional
+        Treat each input as a multi-sample FASTA: contigs are grouped into
+        genomes by the sample ID this derives from their record IDs, and
+        each group is processed (and reported) as one genome.
+    executor : str
+        ``"thread"`` runs genomes in a thread pool; ``"process"`` runs them
+        in *threads* worker processes, each building its own typer once, so
+        GIL-bound stages (att scanning, parsing, report building) also
+        scale. Report rows are written by this process in input order.
+    scheduler : str
+        ``"genome"`` runs each genome through every stage in one task;
+        ``"staged"`` splits BLAST searches from analysis so the two overlap
+        across genomes (see ``_run_staged``), with *threads* analysis
+        workers of the *executor* kind.
+    blast_workers : int, optional
+        Concurrent genome searches in staged mode (default: *threads*).
+    order : str
+        ``"input"`` submits genomes in the given order; ``"lpt"`` submits
+        the most expensive first (longest processing time, estimated by
+        ``estimate_genome_cost``) so large genomes do not leave the pool
+        idle at the end. Outputs are in input order either way.
+    cpus : int or "auto", optional
+        CPU budget split by ``plan_cpu_budget`` between workers, blastn
+        ``-num_threads`` and concurrent makeblastdb runs; replaces *threads*
+        and *blast_workers*. ``"auto"`` uses every available core and
+        re-plans after measuring the BLAST share of the first
+        ``CALIBRATION_GENOMES`` genomes.
+    max_memory : int, optional
+        Memory limit in bytes: new genomes are held back while the run's
+        resident memory (this process and its children) plus their
+        estimated footprint would exceed it (see ``MemoryGate``).
+    resume : bool
+        Continue the run recorded in ``outdir``'s run manifest: genomes
+        already finished with the same input are skipped, the rest are
+        processed from their first stage (checkpoints are per genome, not
+        per stage) and the reports are rebuilt from the recorded results.
+        Raises ManifestMismatchError if output-affecting parameters changed.
+        Without it (or *incremental*), the manifest's records are discarded,
+        with a warning.
+    incremental : bool
+        Add genomes to the run recorded in ``outdir``'s run manifest: only
+        genomes not recorded yet are processed, their rows are appended to
+        the reports and merged into the existing unified report instead of
+        rebuilding it. Recorded genomes are skipped by name, even if their
+        input changed. Parameters are checked as for *resume*.
+    shard : (int, int), optional
+        ``(i, N)``: process only the genomes whose name hashes to shard *i*
+        of *N* (``shard_of``) and record them in ``outdir/shard.json`` for
+        ``sccmec-merge``.
+    queue : str, optional
+        Work-queue directory on a filesystem shared by any number of
+        workers (see ``WorkQueue``): the first worker queues the genomes,
+        every worker claims them until none are left and publishes each
+        result to the queue, and the worker that sees the last result
+        published builds the reports in its *outdir*. Per-genome outputs go
+        to each worker's *outdir*. Not combined with *resume*,
+        *incremental*, *shard*, *bundle*, *save_hits* or multi-sample input.
+    genome_timeout : float, optional
+        Seconds a genome may take before it is abandoned with status
+        ``"timeout"`` and the batch moves on. BLAST commands stop at the
+        limit and it is checked between stages; sequential runs and worker
+        processes are also interrupted by SIGALRM, and process-mode workers
+        still running ``KILL_GRACE`` seconds later are killed and replaced.
+        Timed-out genomes are recorded as failures, which ``--resume``
+        retries.
+    blast_timeout : float, optional
+        Seconds any one BLAST command may run before it is killed (its
+        genome is then recorded as ``"timeout"``).
 
     Returns
     -------
     dict
-        Summary with keys: total, extracted, failed, typed_sccmec, typed_wgs.
+        Summary with keys: total, extracted, failed, typed_sccmec, typed_wgs,
+        plus order, wall_seconds and genome_seconds (summed per-genome time),
+        resumed and, for incremental runs, recorded (genomes skipped).
     """
+    if executor not in EXECUTORS:
+        raise ValueError(f"Unknown executor {executor!r} (expected one of {EXECUTORS})")
+    if scheduler not in SCHEDULERS:
+        raise ValueError(f"Unknown scheduler {scheduler!r} (expected one of {SCHEDULERS})")
+    if order not in ORDERS:
+        raise ValueError(f"Unknown order {order!r} (expected one of {ORDERS})")
+    if resume and incremental:
+        raise ValueError("resume and incremental runs are exclusive")
+    if shard is not None and not 1 <= shard[0] <= shard[1]:
+        raise ValueError(f"Invalid shard {shard[0]}/{shard[1]}")
+    if queue is not None and (resume or incremental or shard is not None):
+        raise ValueError("A queue run cannot be resumed, incremental or sharded")
+    if queue is not None and (bundle or save_hits or sample_parser is not None):
+        raise ValueError("A queue run cannot bundle elements, save hits or read "
+                         "multi-sample input")
+    use_processes = executor == "process"
+    staged = scheduler == "staged"
+
+    # Checkpoint every genome so an interrupted run can be resumed (queue
+    # workers publish results to the queue instead)
+    os.makedirs(outdir, exist_ok=True)
+    run_params = dict(
+        gff_files=gff_files,
+        gff_dir=gff_dir,
+        blast_rlmh=blast_rlmh,
+        rlmh_ref=rlmh_ref,
+        composite=composite,
+        circular=circular,
+        coordinates_only=coordinates_only,
+        bundle=bundle,
+        sample_separator=sample_parser.separator if sample_parser else None,
+        sample_pattern=(
+            sample_parser.pattern.pattern
+            if sample_parser and sample_parser.pattern else None
+        ),
+        shard=list(shard) if shard else None,
+    )
+    manifest = None
+    if queue is None:
+        manifest = RunManifest(outdir)
+        try:
+            if resume or incremental:
+                manifest.resume(run_params)
+            else:
+                forgotten = manifest.start(run_params)
+                if forgotten:
+                    print(f"WARNING: Discarding {forgotten} genome checkpoint(s) "
+                          f"recorded in {manifest.path}; use --resume to continue "
+                          "that run instead", file=sys.stderr)
+        except ManifestMismatchError:
+            manifest.close()
+            raise
+
+    recorded = set()
+    first_position = 0
+    if incremental:
+        recorded = manifest.names()
+        first_position = manifest.next_position()
+
+    # Genomes this shard is assigned (every genome when not sharded);
+    # shard.json is only present once the shard run has finished
+    assigned: List[str] = []
+    shard_file = os.path.join(outdir, SHARD_FILENAME)
+    if os.path.exists(shard_file):
+        os.remove(shard_file)
+
+    def keep(name: str) -> bool:
+        if shard is not None:
+            if shard_of(name, shard[1]) != shard[0]:
+                return False
+            assigned.append(name)
+        return name not in recorded
+
+    if sample_parser is None and (shard is not None or incremental):
+        fasta_files = [f for f in fasta_files if keep(Path(f).stem)]
+
+    # Genomes in multi-sample FASTAs are only counted as they are read
+    total = len(fasta_files) if sample_parser is None else None
+
+    plan = None
+    calibrate = cpus == "auto"
+    if cpus is not None:
+        budget = available_cpus() if calibrate else int(cpus)
+        plan = plan_cpu_budget(budget, staged, genomes=None if calibrate else total)
+        threads, blast_workers = plan.workers, plan.blast_workers
+
     # Create output subdirectories
     att_dir = os.path.join(outdir, "att_sites")
     sccmec_dir = os.path.join(outdir, "sccmec")
@@ -250,17 +1627,17 @@ def run_pipeline(
     typing_results_file = os.path.join(outdir, "typing_results.tsv")
 
     # Instantiate one typer (reuses BLAST runner across all genomes)
-    typer = SCCmecTyper()
+    hit_store = None
+    hit_store_path = os.path.join(typing_dir, "typing_hits.sqlite") if save_hits else None
+    if save_hits:
+        hit_store = HitStore(hit_store_path)
+    typer = SCCmecTyper(hit_store=hit_store)
 
-    total = len(fasta_files)
+    # Report rows are collected from every genome and written from this
+    # thread, in input order, by _ResultWriter
+    coordinates_file = os.path.join(sccmec_dir, COORDINATES_FILENAME)
 
-    # Pre-write report headers to avoid race condition in parallel mode
-    if threads > 1 and not os.path.isfile(extraction_report_file):
-        with open(extraction_report_file, 'w') as f:
-            f.write(ExtractionReport.HEADER + "\n")
-    if threads > 1 and not os.path.isfile(ambiguous_report_file):
-        with open(ambiguous_report_file, 'w') as f:
-            f.write(AmbiguousHitReport.HEADER + "\n")
+    shard_writer = ShardWriter(sccmec_dir) if bundle and not coordinates_only else None
 
     # Common kwargs for _process_genome
     common_kwargs = dict(
@@ -275,72 +1652,207 @@ def run_pipeline(
         rlmh_ref=rlmh_ref,
         composite=composite,
         total=total,
+        circular=circular,
+        coordinates_only=coordinates_only,
+        bundle=shard_writer,
+        genome_timeout=genome_timeout,
     )
 
-    if threads <= 1:
-        # Sequential processing
-        results = []
-        for i, fasta_path in enumerate(fasta_files, 1):
-            result = _process_genome(
-                fasta_path, index=i, **common_kwargs,
-            )
-            results.append(result)
+    costs = None
+    if order == "lpt":
+        if sample_parser is None:
+            costs = {
+                path: estimate_genome_cost(
+                    path,
+                    resolve_gff(Path(path).stem, gff_files=gff_files, gff_dir=gff_dir)
+                    is not None,
+                )
+                for path in fasta_files
+            }
+        else:
+            print("Multi-sample input is processed in file order (--order lpt "
+                  "needs every genome's size up front)", file=sys.stderr)
+            order = "input"
+    jobs = _genome_jobs(fasta_files, sample_parser, costs)
+    if sample_parser is not None and (shard is not None or incremental):
+        jobs = _select_samples(jobs, keep)
+
+    work_queue = None
+    if queue is not None:
+        work_queue = WorkQueue(queue)
+        tasks = [
+            {"name": Path(fasta_path).stem, "fasta_path": fasta_path, "position": i}
+            for i, fasta_path, _, _ in jobs
+        ]
+        try:
+            if work_queue.open(tasks, run_params):
+                print(f"Queued {len(tasks)} genomes in {queue}", file=sys.stderr)
+        except (QueueMismatchError, TimeoutError):
+            work_queue.close()
+            raise
+        claimed = itertools.count()
+
+        def queue_jobs():
+            # Numbered in claim order, as _ResultWriter expects
+            for task in work_queue.tasks():
+                yield next(claimed), task["fasta_path"], None, None
+
+        jobs = queue_jobs()
+    started = time.perf_counter()
+
+    if work_queue is None:
+        writer = _ResultWriter(
+            extraction_report_file, ambiguous_report_file, coordinates_file, shard_writer,
+            typing_results_file, typer.header, manifest, first_position,
+        )
     else:
-        from concurrent.futures import ThreadPoolExecutor, as_completed
+        # Results are published to the queue, and the reports built from it
+        writer = _ResultWriter(None, None, None, None, None, typer.header, work_queue)
+    if resume:
+        jobs = _resume_jobs(jobs, manifest, writer, shard_writer, att_dir, sccmec_dir)
+    gate = MemoryGate(max_memory) if max_memory else None
 
-        print_lock = threading.Lock()
-        results = [None] * total
+    def run_jobs(jobs, threads, blast_workers, blast_config):
+        """Run *jobs* with one of the dispatchers; results go to *writer*."""
+        if staged:
+            # Databases are built by this process's search threads
+            _run_staged(
+                jobs, blast_workers or threads, max(threads, 1), use_processes,
+                hit_store_path, shard_writer, common_kwargs, writer,
+                blast_config=(blast_config[0], None) + tuple(blast_config[2:]),
+                gate=gate, resume=resume,
+            )
+        elif use_processes:
+            _run_in_processes(
+                jobs, threads, hit_store_path, shard_writer, common_kwargs, writer,
+                blast_config=blast_config, gate=gate, resume=resume,
+            )
+        elif threads <= 1:
+            # Sequential processing
+            for i, fasta_path, sample, genome in jobs:
+                try:
+                    result = _process_genome(
+                        fasta_path, index=i + 1, genome=genome, sample_name=sample,
+                        collect_reports=True, **common_kwargs,
+                    )
+                except Exception as e:
+                    # As in the pools: a bad input fails only its genome
+                    name = sample or Path(fasta_path).stem
+                    print(f"ERROR: {name}: {e}", file=sys.stderr)
+                    result = _error_result(name)
+                writer.add(i, result)
+        else:
+            from concurrent.futures import ThreadPoolExecutor
+
+            print_lock = threading.Lock()
 
-        with ThreadPoolExecutor(max_workers=threads) as pool:
-            futures = {}
-            for i, fasta_path in enumerate(fasta_files):
-                future = pool.submit(
+            def submit(job):
+                i, fasta_path, sample, genome = job
+                return pool.submit(
                     _process_genome,
                     fasta_path,
                     index=i + 1,
                     print_lock=print_lock,
+                    genome=genome,
+                    sample_name=sample,
+                    collect_reports=True,
                     **common_kwargs,
                 )
-                futures[future] = i
 
-            for future in as_completed(futures):
-                idx = futures[future]
+            def finish(job, future):
+                i, fasta_path, sample, _ = job
                 try:
-                    results[idx] = future.result()
+                    result = future.result()
                 except Exception as e:
-                    stem = Path(fasta_files[idx]).stem
-                    print(f"ERROR: {stem}: {e}", file=sys.stderr)
-                    results[idx] = {
-                        "stem": stem,
-                        "status": "error",
-                        "typing_result": None,
-                        "success": False,
-                        "extracted": False,
-                        "typed_sccmec": False,
-                        "typed_wgs": False,
-                    }
-
-    # Write typing results in input order (deterministic output)
-    typing_header_written = False
-    for result in results:
-        if result and result.get("typing_result"):
-            _write_typing_row(
-                result["typing_result"],
-                typing_results_file,
-                not typing_header_written,
-            )
-            typing_header_written = True
+                    name = sample or Path(fasta_path).stem
+                    print(f"ERROR: {name}: {e}", file=sys.stderr)
+                    result = _error_result(name)
+                writer.add(i, result)
+
+            # At most IN_FLIGHT_PER_WORKER x threads genomes are submitted
+            # (and, for multi-sample input, held in memory) at once
+            with ThreadPoolExecutor(max_workers=threads) as pool:
+                _submit_bounded(
+                    jobs, submit, finish, IN_FLIGHT_PER_WORKER * threads, gate,
+                )
+
+    def apply_plan(plan) -> tuple:
+        """Set this process's BLAST limits from *plan*; returns them as
+        worker ``blast_config``."""
+        limit = plan.makeblastdb_slots
+        if use_processes and not staged:
+            # Genome workers build their own databases
+            limit = multiprocessing.BoundedSemaphore(limit)
+        timeout = blast_settings()[2]
+        configure_blast(plan.blast_threads, limit, timeout)
+        print(f"CPU budget: {plan.describe()}", file=sys.stderr)
+        return plan.blast_threads, limit, timeout
+
+    saved_blast_settings = blast_settings()
+    try:
+        if blast_timeout:
+            configure_blast(*saved_blast_settings[:2], blast_timeout)
+        blast_config = blast_settings()
+        if plan is not None:
+            blast_config = apply_plan(plan)
+            if calibrate:
+                first = list(itertools.islice(jobs, CALIBRATION_GENOMES))
+                run_jobs(first, plan.workers, plan.blast_workers, blast_config)
+                if writer.blast_share is not None:
+                    remaining = total - len(first) if total is not None else None
+                    plan = plan_cpu_budget(
+                        plan.cpus, staged, writer.blast_share, genomes=remaining,
+                    )
+                    blast_config = apply_plan(plan)
+            threads, blast_workers = plan.workers, plan.blast_workers
+        run_jobs(jobs, threads, blast_workers, blast_config)
+        # Queue workers stay until every genome is published, to take back
+        # the genomes of workers that die meanwhile
+        while work_queue is not None and work_queue.wait_for_work():
+            run_jobs(queue_jobs(), threads, blast_workers, blast_config)
+    finally:
+        configure_blast(*saved_blast_settings)
+        if work_queue is not None:
+            work_queue.close()
+
+    wall_seconds = time.perf_counter() - started
+    total = writer.total
+
+    if hit_store is not None:
+        hit_store.close()
+    if shard_writer is not None:
+        shard_writer.close()
 
     # Tally results
-    extracted_count = sum(1 for r in results if r and r.get("extracted"))
+    extracted_count = writer.extracted
     failed_count = total - extracted_count
-    typed_sccmec = sum(1 for r in results if r and r.get("typed_sccmec"))
-    typed_wgs = sum(1 for r in results if r and r.get("typed_wgs"))
+    typed_sccmec = writer.typed_sccmec
+    typed_wgs = writer.typed_wgs
 
+    report_files = {
+        "extraction": extraction_report_file, "ambiguous": ambiguous_report_file,
+        "coordinates": coordinates_file,
+    }
+    if resume:
+        _rebuild_reports(manifest.records(), report_files, typing_results_file, typer.header)
+    build_reports = True
+    if work_queue is not None:
+        # One worker builds the reports, once every result is published
+        build_reports = work_queue.complete() and work_queue.lock_reports(outdir)
+        if build_reports:
+            _rebuild_reports(
+                work_queue.records(), report_files, typing_results_file, typer.header,
+            )
     # --- Stage 4: Unified report ---
     unified_report_file = os.path.join(outdir, "sccmec_unified_report.tsv")
 
-    if os.path.isfile(extraction_report_file) and os.path.isfile(typing_results_file):
+    if incremental:
+        # Only the new genomes' rows are joined and merged into the report
+        _merge_new_genomes(manifest, unified_report_file)
+    elif not build_reports:
+        # Another queue worker builds the reports
+        pass
+    elif os.path.isfile(extraction_report_file) and os.path.isfile(typing_results_file):
         extraction_rows = read_tsv(extraction_report_file)
         typing_rows = read_tsv(typing_results_file)
         typing_rows = normalise_typing_keys(typing_rows)
@@ -351,6 +1863,12 @@ def run_pipeline(
         extraction_rows = read_tsv(extraction_report_file)
         merged = merge_reports(extraction_rows, {})
         write_unified_report(merged, unified_report_file)
+    if manifest is not None:
+        if not incremental:
+            manifest.mark_reported()
+        manifest.close()
+    if shard is not None:
+        write_shard_file(outdir, shard, assigned)
 
     # Summary
     summary = {
@@ -359,13 +1877,45 @@ def run_pipeline(
         "failed": failed_count,
         "typed_sccmec": typed_sccmec,
         "typed_wgs": typed_wgs,
+        "order": order,
+        "wall_seconds": wall_seconds,
+        "genome_seconds": writer.genome_seconds,
+        "resumed": writer.resumed,
+        "timed_out": writer.timed_out,
+        "crashed": writer.crashed,
     }
+    if incremental:
+        summary["recorded"] = len(recorded)
+    if shard is not None:
+        summary["shard"] = f"{shard[0]}/{shard[1]}"
+    if work_queue is not None:
+        summary["reports_built"] = build_reports
+        if not build_reports:
+            unified_report_file = "built by the worker that finishes the queue"
+
+    if not total:
+        print(
+            "\nPipeline complete: no genomes processed"
+            f"{f' ({len(recorded)} already recorded)' if incremental else ''}",
+            file=sys.stderr,
+        )
+        return summary
 
+    timing = _timing_summary(
+        writer.genome_seconds, writer.longest, wall_seconds, order, max(threads, 1),
+    )
+    abandoned = ""
+    if writer.timed_out or writer.crashed:
+        abandoned = f"  Timed out: {writer.timed_out}, Crashed: {writer.crashed}\n"
     print(
-        f"\nPipeline complete: {total} genomes processed\n"
+        f"\nPipeline complete: {total} genomes processed"
+        f"{f' ({writer.resumed} resumed)' if writer.resumed else ''}"
+        f"{f' ({len(recorded)} already recorded)' if incremental else ''}\n"
         f"  Extracted: {extracted_count} ({extracted_count/total*100:.1f}%)\n"
         f"  Failed: {failed_count} ({failed_count/total*100:.1f}%)\n"
         f"  Typed (SCCmec): {typed_sccmec}, Typed (WGS): {typed_wgs}\n"
+        f"{abandoned}"
+        f"{timing}\n"
         f"Report: {unified_report_file}",
         file=sys.stderr,
     )
@@ -373,6 +1923,46 @@ def run_pipeline(
     return summary
 
 
+def _cpu_budget_arg(value: str):
+    """argparse type for ``--cpus``: a positive core count or ``auto``."""
+    if value == "auto":
+        return value
+    try:
+        cpus = int(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected a number or 'auto', got {value!r}")
+    if cpus < 1:
+        raise argparse.ArgumentTypeError("must be at least 1")
+    return cpus
+
+
+def _shard_arg(value: str) -> Tuple[int, int]:
+    """argparse type for ``--shard i/N``."""
+    try:
+        return parse_shard(value)
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(str(e))
+
+
+def _seconds_arg(value: str) -> float:
+    """argparse type for ``--genome-timeout`` and ``--blast-timeout``."""
+    try:
+        seconds = float(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected a number of seconds, got {value!r}")
+    if not seconds > 0:
+        raise argparse.ArgumentTypeError("must be more than 0")
+    return seconds
+
+
+def _memory_limit_arg(value: str) -> int:
+    """argparse type for ``--max-memory``."""
+    try:
+        return parse_size(value)
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(str(e))
+
+
 def main():
     parser = argparse.ArgumentParser(
         description=(
@@ -389,6 +1979,22 @@ def main():
         "--fna-dir",
         help="Directory of FASTA/FNA genome files (all .fna files will be used)",
     )
+    fna_group.add_argument(
+        "--multi-sample", nargs="+", metavar="FASTA",
+        help="Multi-sample FASTA file(s) whose contig IDs start with the "
+             "genome's sample ID (e.g. SAMPLE|contig_1); each sample is "
+             "processed as one genome",
+    )
+    parser.add_argument(
+        "--sample-sep", default=DEFAULT_SAMPLE_SEPARATOR,
+        help="With --multi-sample: separator ending the sample ID in contig "
+             f"IDs (default: {DEFAULT_SAMPLE_SEPARATOR!r})",
+    )
+    parser.add_argument(
+        "--sample-regex",
+        help="With --multi-sample: regex whose 'sample' group (or first "
+             "group) is the sample ID; overrides --sample-sep",
+    )
     gff_group = parser.add_mutually_exclusive_group()
     gff_group.add_argument(
         "-g", "--gff", nargs="+",
@@ -410,6 +2016,22 @@ def main():
         "--composite", action="store_true",
         help="Extract to outermost boundary for composite elements",
     )
+    parser.add_argument(
+        "--circular", action="store_true",
+        help="Treat every contig as circular so elements spanning the origin "
+             "are extracted (contigs with circular=true or topology=circular "
+             "in their header always are)",
+    )
+    parser.add_argument(
+        "--coordinates-only", action="store_true",
+        help=f"Write element intervals to sccmec/{COORDINATES_FILENAME} (BED) "
+             f"instead of one FASTA per element",
+    )
+    parser.add_argument(
+        "--bundle", action="store_true",
+        help="Append elements to indexed bgzip multi-FASTA shards in sccmec/ "
+             "instead of writing one FASTA per genome",
+    )
     parser.add_argument(
         "-o", "--outdir", required=True,
         help="Output directory for all results",
@@ -418,11 +2040,96 @@ def main():
         "-t", "--threads", type=int, default=1,
         help="Number of parallel threads (default: 1 = sequential)",
     )
+    parser.add_argument(
+        "--executor", choices=EXECUTORS, default="thread",
+        help="Run genomes in a thread pool or in -t worker processes "
+             "(scales CPU-bound stages; default: thread)",
+    )
+    parser.add_argument(
+        "--scheduler", choices=SCHEDULERS, default="genome",
+        help="genome: each genome runs every stage in one task; staged: BLAST "
+             "searches and CPU-bound analysis run in separate pools so they "
+             "overlap across genomes (default: genome)",
+    )
+    parser.add_argument(
+        "--blast-workers", type=int, default=None,
+        help="With --scheduler staged: concurrent genome BLAST searches "
+             "(default: -t)",
+    )
+    parser.add_argument(
+        "--cpus", type=_cpu_budget_arg, default=None, metavar="N|auto",
+        help="CPU budget split between workers, blastn threads and concurrent "
+             "makeblastdb runs (overrides -t and --blast-workers); auto uses "
+             "every available core and calibrates the split on the first "
+             f"{CALIBRATION_GENOMES} genomes",
+    )
+    parser.add_argument(
+        "--max-memory", type=_memory_limit_arg, default=None, metavar="SIZE",
+        help="Hold back new genomes while resident memory plus their "
+             "estimated footprint would exceed SIZE (e.g. 64G)",
+    )
+    parser.add_argument(
+        "--order", choices=ORDERS, default="input",
+        help="Submission order: input, or lpt to start the most expensive "
+             "genomes (by size, contig count and GFF availability) first; "
+             "outputs stay in input order (default: input)",
+    )
+    parser.add_argument(
+        "--genome-timeout", type=_seconds_arg, metavar="SECONDS",
+        help="Abandon a genome still running after SECONDS, recording it with "
+             "status timeout, and move on (process-mode workers stuck past "
+             "the limit are killed and replaced)",
+    )
+    parser.add_argument(
+        "--blast-timeout", type=_seconds_arg, metavar="SECONDS",
+        help="Kill any BLAST command running longer than SECONDS; its genome "
+             "is recorded with status timeout",
+    )
+    parser.add_argument(
+        "--shard", type=_shard_arg, metavar="i/N",
+        help="Process only shard i of N of the genomes (by a stable hash of "
+             "their names), for splitting a run across nodes; combine the "
+             "shard output directories with sccmec-merge",
+    )
+    checkpoint = parser.add_mutually_exclusive_group()
+    checkpoint.add_argument(
+        "--resume", action="store_true",
+        help="Continue an interrupted run in --outdir: genomes already "
+             "finished (per its run_manifest.sqlite) are skipped, unfinished "
+             "ones are redone from the start (checkpoints are per genome) and "
+             "the reports rebuilt. Without it, the manifest's checkpoints are "
+             "discarded",
+    )
+    checkpoint.add_argument(
+        "--incremental", action="store_true",
+        help="Add genomes to an existing --outdir: only genomes not in its "
+             "run_manifest.sqlite are processed, and their rows are appended "
+             "to the reports and merged into the unified report",
+    )
+    checkpoint.add_argument(
+        "--queue", metavar="DIR",
+        help="Take genomes from a work queue in DIR on a shared filesystem, "
+             "with any number of workers on any hosts (the first creates the "
+             "queue from the inputs); the last worker to finish builds the "
+             "reports in its --outdir",
+    )
+    parser.add_argument(
+        "--save-hits", action="store_true",
+        help="Save raw typing BLAST hits to typing/typing_hits.sqlite for "
+             "re-classification with sccmec-type --from-hits",
+    )
     args = parser.parse_args()
+    if args.queue and (args.shard or args.bundle or args.save_hits or args.multi_sample):
+        parser.error("--queue cannot be combined with --shard, --bundle, "
+                     "--save-hits or --multi-sample")
 
-    # Resolve FASTA files from --fna or --fna-dir
+    # Resolve FASTA files from --fna, --multi-sample or --fna-dir
+    sample_parser = None
     if args.fna:
         fasta_files = args.fna
+    elif args.multi_sample:
+        fasta_files = args.multi_sample
+        sample_parser = SampleIdParser(args.sample_sep, args.sample_regex)
     else:
         if not os.path.isdir(args.fna_dir):
             print(f"ERROR: FNA directory not found: {args.fna_dir}", file=sys.stderr)
@@ -454,7 +2161,6 @@ def main():
     blast_rlmh = args.blast_rlmh
     if not args.gff and not args.gff_dir and not blast_rlmh:
         try:
-            from sccmecextractor.blast_utils import BlastRunner
             BlastRunner._check_blast_installed()
             blast_rlmh = True
             print(
@@ -471,16 +2177,37 @@ def main():
 
     os.makedirs(args.outdir, exist_ok=True)
 
-    run_pipeline(
-        fasta_files=fasta_files,
-        outdir=args.outdir,
-        gff_files=gff_files,
-        gff_dir=gff_dir,
-        blast_rlmh=blast_rlmh,
-        rlmh_ref=args.rlmh_ref,
-        composite=args.composite,
-        threads=args.threads,
-    )
+    try:
+        run_pipeline(
+            fasta_files=fasta_files,
+            outdir=args.outdir,
+            gff_files=gff_files,
+            gff_dir=gff_dir,
+            blast_rlmh=blast_rlmh,
+            rlmh_ref=args.rlmh_ref,
+            composite=args.composite,
+            threads=args.threads,
+            save_hits=args.save_hits,
+            circular=args.circular,
+            coordinates_only=args.coordinates_only,
+            bundle=args.bundle,
+            sample_parser=sample_parser,
+            executor=args.executor,
+            scheduler=args.scheduler,
+            blast_workers=args.blast_workers,
+            order=args.order,
+            cpus=args.cpus,
+            max_memory=args.max_memory,
+            resume=args.resume,
+            incremental=args.incremental,
+            shard=args.shard,
+            queue=args.queue,
+            genome_timeout=args.genome_timeout,
+            blast_timeout=args.blast_timeout,
+        )
+    except (ManifestMismatchError, QueueMismatchError, TimeoutError) as e:
+        print(f"ERROR: {e}", file=sys.stderr)
+        sys.exit(1)
 
 
 if __name__ == "__main__":
@@ -13,6 +13,7 @@ came from a whole-genome sequence), or ``"-"`` when no typing data exists.
 
 import argparse
 import csv
+import os
 import sys
 
 from sccmecextractor.extract_SCCmec import ExtractionReport
@@ -138,6 +139,46 @@ def write_unified_report(merged, outfile):
         writer.writerows(merged)
 
 
+def update_unified_report(merged, outfile):
+    """Merge new rows into an existing unified report.
+
+    *merged* (sorted by Input_File, as returned by ``merge_reports``) is
+    merged with the rows already in *outfile*, replacing rows with the same
+    Input_File, without re-joining the extraction and typing reports. The
+    existing report is streamed, so only the new rows are held in memory.
+    Writes a new report if *outfile* does not exist.
+    """
+    if not os.path.isfile(outfile):
+        write_unified_report(merged, outfile)
+        return
+
+    new_rows = iter(merged)
+    pending = next(new_rows, None)
+    tmp_file = outfile + ".tmp"
+    with open(outfile, "r", newline="") as src, open(tmp_file, "w", newline="") as fh:
+        writer = csv.DictWriter(
+            fh, fieldnames=UNIFIED_HEADER, delimiter="\t", extrasaction="ignore"
+        )
+        writer.writeheader()
+        for row in csv.DictReader(src, delimiter="\t"):
+            key = row.get("Input_File", "")
+            if key == "Input_File":
+                continue
+            while pending is not None and pending["Input_File"] < key:
+                writer.writerow(pending)
+                pending = next(new_rows, None)
+            if pending is not None and pending["Input_File"] == key:
+                # Reprocessed genome: the new row replaces the old one
+                writer.writerow(pending)
+                pending = next(new_rows, None)
+                continue
+            writer.writerow(row)
+        while pending is not None:
+            writer.writerow(pending)
+            pending = next(new_rows, None)
+    os.replace(tmp_file, outfile)
+
+
 def main():
     parser = argparse.ArgumentParser(
         description="Merge SCCmec extraction report with typing results"
@@ -0,0 +1,246 @@
+#!/usr/bin/env python
+
+"""Checkpoints for resumable pipeline runs.
+
+``run_manifest.sqlite`` in the output directory records the run's
+parameters and, for every genome finished, its input fingerprint, the
+stages it completed and its result: report rows, typing result and counts.
+Genomes that failed without a result (e.g. timed out) are recorded with
+their status and report rows only. A run interrupted part-way is continued
+with ``sccmec-pipeline --resume``: genomes whose result is recorded and
+whose input is unchanged are skipped, the rest (failed ones included) are
+processed again, and the reports are rebuilt from the recorded
+results so they match those of an uninterrupted run. Checkpoints are per
+genome: the recorded stages are informational, and a genome interrupted
+part-way is redone from its first stage. A run started without
+``--resume`` forgets the recorded genomes (``RunManifest.start``).
+
+Inputs are compared by size and modification time, falling back to a hash
+of the genome's contig names and sequences (``GenomeBuffer.digest``) when
+those differ, e.g. for copied files.
+
+Each record also notes whether the genome is in the unified report yet, so
+``sccmec-pipeline --incremental`` can add new genomes to an existing output
+directory by merging only their rows into it.
+"""
+
+import json
+import os
+import sqlite3
+import threading
+
+from dataclasses import dataclass
+from typing import Dict, Iterator, List, Optional, Tuple
+
+MANIFEST_FILENAME = "run_manifest.sqlite"
+
+# Report kinds stored per genome: result dict key -> manifest key
+REPORT_KINDS = {
+    "reports": "extraction",
+    "ambiguous_reports": "ambiguous",
+    "coordinates": "coordinates",
+}
+
+
+class ManifestMismatchError(ValueError):
+    """Raised when resuming with parameters that differ from the recorded run."""
+
+    pass
+
+
+@dataclass
+class GenomeRecord:
+    """One finished genome as recorded in the manifest (*input_hash* is
+    empty for genomes that failed)."""
+
+    name: str
+    position: int
+    input_file: str
+    size: Optional[int]
+    mtime_ns: Optional[int]
+    input_hash: str
+    stages: List[str]
+    result: dict
+
+    def rows(self, kind: str) -> List[str]:
+        """Stored TSV rows of one report kind (``REPORT_KINDS`` values)."""
+        return self.result.get("rows", {}).get(kind, [])
+
+
+_RECORD_COLUMNS = "name, position, input_file, size, mtime_ns, input_hash, stages, result"
+
+
+def file_fingerprint(path: str) -> Tuple[int, int]:
+    """``(size, mtime_ns)`` of an input file."""
+    stat = os.stat(path)
+    return stat.st_size, stat.st_mtime_ns
+
+
+def manifest_path(outdir: str) -> str:
+    return os.path.join(outdir, MANIFEST_FILENAME)
+
+
+class RunManifest:
+    """Per-genome checkpoints of a pipeline run.
+
+    Written by the coordinating process only; a single connection is shared
+    between threads behind a lock. The default rollback journal is used,
+    since WAL needs shared memory that network and parallel filesystems
+    (NFS, Lustre), where output directories often live, do not provide.
+    """
+
+    def __init__(self, outdir: str):
+        self.path = manifest_path(outdir)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, timeout=600, check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.executescript(
+                """
+                PRAGMA journal_mode = DELETE;
+                CREATE TABLE IF NOT EXISTS params (
+                    key TEXT PRIMARY KEY,
+                    value TEXT
+                );
+                CREATE TABLE IF NOT EXISTS genomes (
+                    name TEXT PRIMARY KEY,
+                    position INTEGER,
+                    input_file TEXT,
+                    size INTEGER,
+                    mtime_ns INTEGER,
+                    input_hash TEXT,
+                    stages TEXT,
+                    result TEXT,
+                    reported INTEGER DEFAULT 0
+                );
+                """
+            )
+
+    def params(self) -> Dict[str, object]:
+        with self._lock:
+            rows = self._conn.execute("SELECT key, value FROM params").fetchall()
+        return {key: json.loads(value) for key, value in rows}
+
+    def start(self, params: Dict[str, object]) -> int:
+        """Begin a new run: forget recorded genomes and store *params*.
+
+        Returns the number of genome records forgotten, so callers can warn
+        that an earlier run's checkpoints were discarded.
+        """
+        with self._lock, self._conn:
+            forgotten = self._conn.execute("DELETE FROM genomes").rowcount
+            self._conn.execute("DELETE FROM params")
+            self._store_params(params)
+        return forgotten
+
+    def resume(self, params: Dict[str, object]):
+        """Continue the recorded run; raises ManifestMismatchError if
+        *params* differ from the recorded ones (a manifest without
+        parameters is started afresh)."""
+        recorded = self.params()
+        if not recorded:
+            self.start(params)
+            return
+        normalised = json.loads(json.dumps(params))
+        changed = sorted(
+            key for key in set(recorded) | set(normalised)
+            if recorded.get(key) != normalised.get(key)
+        )
+        if changed:
+            raise ManifestMismatchError(
+                f"Cannot resume {self.path}: parameters changed ({', '.join(changed)}); "
+                f"rerun without --resume or use a new output directory"
+            )
+
+    def _store_params(self, params: Dict[str, object]):
+        self._conn.executemany(
+            "INSERT OR REPLACE INTO params VALUES (?, ?)",
+            [(key, json.dumps(value)) for key, value in params.items()],
+        )
+
+    def get(self, name: str) -> Optional[GenomeRecord]:
+        with self._lock:
+            row = self._conn.execute(
+                f"SELECT {_RECORD_COLUMNS} FROM genomes WHERE name = ?", (name,)
+            ).fetchone()
+        return self._record(row) if row is not None else None
+
+    def names(self) -> set:
+        with self._lock:
+            return {row[0] for row in self._conn.execute("SELECT name FROM genomes")}
+
+    def next_position(self) -> int:
+        """Position after the last recorded genome."""
+        with self._lock:
+            last = self._conn.execute("SELECT MAX(position) FROM genomes").fetchone()[0]
+        return 0 if last is None else last + 1
+
+    def record(self, position: int, name: str, input_file: str,
+               fingerprint: Optional[Tuple[int, int]], input_hash: str,
+               stages: List[str], result: dict):
+        """Record a finished genome (replacing any earlier record), not yet
+        in the unified report."""
+        size, mtime_ns = fingerprint if fingerprint is not None else (None, None)
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO genomes VALUES (?, ?, ?, ?, ?, ?, ?, ?, 0)",
+                (name, position, input_file, size, mtime_ns, input_hash,
+                 json.dumps(stages), json.dumps(result)),
+            )
+
+    def record_failure(self, position: int, name: str, result: dict):
+        """Record a genome that failed (e.g. timed out) with its status and
+        report rows but no input hash, so it counts as done for the run
+        while a resumed run still retries it."""
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO genomes VALUES (?, ?, ?, ?, ?, ?, ?, ?, 0)",
+                (name, position, "", None, None, "", json.dumps([]), json.dumps(result)),
+            )
+
+    def set_position(self, name: str, position: int):
+        """Move a recorded genome to *position* in the current input order."""
+        with self._lock, self._conn:
+            self._conn.execute(
+                "UPDATE genomes SET position = ? WHERE name = ?", (position, name)
+            )
+
+    def records(self, unreported: bool = False) -> Iterator[GenomeRecord]:
+        """Every recorded genome in input order (only those not yet in the
+        unified report if *unreported*)."""
+        where = "WHERE reported = 0 " if unreported else ""
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT {_RECORD_COLUMNS} FROM genomes {where}ORDER BY position"
+            ).fetchall()
+        for row in rows:
+            yield self._record(row)
+
+    def mark_reported(self, names: Optional[List[str]] = None):
+        """Note that *names* (default: every recorded genome) are in the
+        unified report."""
+        with self._lock, self._conn:
+            if names is None:
+                self._conn.execute("UPDATE genomes SET reported = 1")
+            else:
+                self._conn.executemany(
+                    "UPDATE genomes SET reported = 1 WHERE name = ?",
+                    [(name,) for name in names],
+                )
+
+    @staticmethod
+    def _record(row) -> GenomeRecord:
+        name, position, input_file, size, mtime_ns, input_hash, stages, result = row
+        return GenomeRecord(
+            name, position, input_file, size, mtime_ns, input_hash,
+            json.loads(stages), json.loads(result),
+        )
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -3,26 +3,41 @@
 """SCCmec typing by mec and ccr gene content using BLAST.
 
 Classifies extracted SCCmec sequences by identifying mec and ccr genes
-via BLAST against bundled reference databases.
+via BLAST against bundled reference databases. Gene families and their
+thresholds are defined by a typing manifest (``data/typing_manifest.json``
+by default), so further families can be typed from the same search.
 """
 
 import argparse
+import gzip
+import hashlib
+import json
 import os
+import shutil
 import tempfile
+import weakref
 
-from dataclasses import dataclass
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from importlib.resources import files
 from pathlib import Path
 from typing import Dict, List, Optional
 
 from Bio import SeqIO
 
 from sccmecextractor.blast_utils import (
+    BlastResult,
     BlastRunner,
     filter_hits,
     get_best_non_overlapping_hits,
     get_default_ref,
+    get_ref_lengths,
     parse_blast_output,
+    project_hits,
 )
+from sccmecextractor.fasta_shards import ShardReader, shard_source, split_source
+from sccmecextractor.genome_buffer import as_genome_buffer
+from sccmecextractor.hit_store import HitStore, StoredRegion
 
 
 @dataclass
@@ -45,58 +60,166 @@ class GeneHit:
     end: int = 0
 
 
-class MecClassifier:
-    """Classify mec gene hits from BLAST results.
+# Output column kinds a manifest family may request, in display order
+FAMILY_COLUMNS = (
+    "genes", "allotypes", "identity", "coverage", "locations", "complex_type",
+)
 
-    Thresholds:
-        - Confirmed full: >=95% identity AND >=90% coverage
-        - Confirmed partial: >=95% identity AND >=75% coverage
-        - Novel full: 75-94.9% identity AND >=90% coverage
-        - Novel partial: 75-94.9% identity AND >=75% coverage
+BUNDLED_PREFIX = "bundled:"
+
+
+@dataclass
+class GeneFamily:
+    """One gene family entry from a typing manifest.
+
+    ``reference`` is either a FASTA path or ``"bundled:<filename>"`` for a
+    reference shipped in ``sccmecextractor/data``. ``columns`` lists the
+    output columns (see ``FAMILY_COLUMNS``), each written as
+    ``{name}_{column}``. With ``sort_by_gene`` every column except
+    ``genes`` is ordered by gene name so the columns align.
     """
 
-    CONFIRMED_PIDENT = 95.0
-    NOVEL_PIDENT = 75.0
-    FULL_COVERAGE = 0.90
-    MIN_COVERAGE = 0.75
+    name: str
+    reference: str
+    confirmed_pident: float
+    novel_pident: float
+    full_coverage: float = 0.90
+    min_coverage: float = 0.75
+    overlap_threshold: int = 500
+    columns: List[str] = field(
+        default_factory=lambda: ["genes", "identity", "coverage", "locations"]
+    )
+    sort_by_gene: bool = False
+
+    @property
+    def header(self) -> List[str]:
+        return [f"{self.name}_{column}" for column in self.columns]
+
+    def is_bundled(self, filename: str) -> bool:
+        """Return True if this family uses the named bundled reference."""
+        return self.reference == f"{BUNDLED_PREFIX}{filename}"
+
+    @contextmanager
+    def reference_path(self):
+        """Yield a filesystem path to the family's reference FASTA."""
+        if self.reference.startswith(BUNDLED_PREFIX):
+            with get_default_ref(self.reference[len(BUNDLED_PREFIX):]) as ref:
+                yield str(ref)
+        else:
+            yield self.reference
 
-    def __init__(self, ref_fasta: str):
-        self.ref_lengths = self._get_ref_lengths(ref_fasta)
 
-    @staticmethod
-    def _get_ref_lengths(fasta_path: str) -> Dict[str, int]:
-        lengths = {}
-        for record in SeqIO.parse(fasta_path, "fasta"):
-            lengths[record.id] = len(record.seq)
-        return lengths
+class TypingManifest:
+    """Ordered collection of gene families typed from one combined search.
+
+    Manifests are JSON files of the form::
+
+        {"families": [{"name": "mec", "reference": "bundled:mec_genes_allotypes.fasta",
+                       "confirmed_pident": 95.0, "novel_pident": 75.0, ...}, ...]}
+
+    Relative reference paths are resolved against the manifest's directory.
+    """
+
+    DEFAULT = "typing_manifest.json"
+
+    def __init__(self, families: List[GeneFamily]):
+        names = [f.name for f in families]
+        if len(set(names)) != len(names):
+            raise ValueError(f"Duplicate gene family names in manifest: {names}")
+        for family in families:
+            unknown = set(family.columns) - set(FAMILY_COLUMNS)
+            if unknown:
+                raise ValueError(
+                    f"Unknown output column(s) for family '{family.name}': "
+                    f"{', '.join(sorted(unknown))}"
+                )
+        self.families = families
+
+    @classmethod
+    def load(cls, manifest_path: Optional[str] = None) -> "TypingManifest":
+        """Load a manifest file, or the bundled default when *manifest_path* is None."""
+        if manifest_path is None:
+            text = files("sccmecextractor").joinpath("data", cls.DEFAULT).read_text()
+            base_dir = None
+        else:
+            text = Path(manifest_path).read_text()
+            base_dir = Path(manifest_path).parent
+
+        families = []
+        for entry in json.loads(text)["families"]:
+            family = GeneFamily(**entry)
+            if base_dir is not None and not family.reference.startswith(BUNDLED_PREFIX):
+                ref = Path(family.reference)
+                if not ref.is_absolute():
+                    family.reference = str(base_dir / ref)
+            families.append(family)
+
+        return cls(families)
+
+    def get(self, name: str) -> Optional[GeneFamily]:
+        for family in self.families:
+            if family.name == name:
+                return family
+        return None
+
+    @property
+    def header(self) -> List[str]:
+        """Typing output header: Input_File then each family's columns."""
+        header = ["Input_File"]
+        for family in self.families:
+            header.extend(family.header)
+        return header
+
+
+class GeneClassifier:
+    """Classify BLAST hits for one gene family using its manifest thresholds.
+
+    Thresholds (from the family entry):
+        - Confirmed full: >=confirmed_pident AND >=full_coverage
+        - Confirmed partial: >=confirmed_pident AND >=min_coverage
+        - Novel full: novel_pident up to confirmed_pident AND >=full_coverage
+        - Novel partial: novel_pident up to confirmed_pident AND >=min_coverage
+    """
+
+    def __init__(self, family: GeneFamily, ref_fasta: Optional[str] = None):
+        self.family = family
+        if ref_fasta is None:
+            with family.reference_path() as ref:
+                self.ref_lengths = get_ref_lengths(str(ref))
+        else:
+            self.ref_lengths = get_ref_lengths(str(ref_fasta))
 
     def classify(self, hits) -> List[GeneHit]:
-        """Classify BLAST hits as confirmed/novel mec gene detections."""
+        """Classify BLAST hits as confirmed/novel gene detections."""
+        family = self.family
+
         # Filter to minimum thresholds
         passing = filter_hits(
             hits,
-            min_pident=self.NOVEL_PIDENT,
-            min_coverage=self.MIN_COVERAGE,
+            min_pident=family.novel_pident,
+            min_coverage=family.min_coverage,
             ref_lengths=self.ref_lengths,
         )
 
         # Resolve overlapping hits — keeps best hit per genomic location
         # This prevents cross-reactive allotype matches (e.g. mecA1/mecA2
         # appearing alongside mecA when only mecA is truly present)
-        best_hits = get_best_non_overlapping_hits(passing, overlap_threshold=500)
+        best_hits = get_best_non_overlapping_hits(
+            passing, overlap_threshold=family.overlap_threshold
+        )
 
         results = []
         for hit in best_hits:
             ref_len = self.ref_lengths.get(hit.qseqid, 1)
             coverage = hit.length / ref_len
 
-            if hit.pident >= self.CONFIRMED_PIDENT:
-                if coverage >= self.FULL_COVERAGE:
+            if hit.pident >= family.confirmed_pident:
+                if coverage >= family.full_coverage:
                     classification = "full"
                 else:
                     classification = "partial"
             else:
-                if coverage >= self.FULL_COVERAGE:
+                if coverage >= family.full_coverage:
                     classification = "novel_full"
                 else:
                     classification = "novel_partial"
@@ -116,73 +239,32 @@ class MecClassifier:
         return results
 
 
-class CcrClassifier:
-    """Classify ccr gene hits from BLAST results.
+class MecClassifier(GeneClassifier):
+    """Classify mec gene hits using the bundled manifest's mec thresholds.
 
     Thresholds:
-        - Confirmed full: >=85% identity AND >=90% coverage
-        - Confirmed partial: >=85% identity AND >=75% coverage
-        - Novel full: 70-84.4% identity AND >=90% coverage
-        - Novel partial: 70-84.4% identity AND >=75% coverage
+        - Confirmed full: >=95% identity AND >=90% coverage
+        - Confirmed partial: >=95% identity AND >=75% coverage
+        - Novel full: 75-94.9% identity AND >=90% coverage
+        - Novel partial: 75-94.9% identity AND >=75% coverage
     """
 
-    CONFIRMED_PIDENT = 84.5
-    NOVEL_PIDENT = 70.0
-    FULL_COVERAGE = 0.90
-    MIN_COVERAGE = 0.75
-
     def __init__(self, ref_fasta: str):
-        self.ref_lengths = self._get_ref_lengths(ref_fasta)
-
-    @staticmethod
-    def _get_ref_lengths(fasta_path: str) -> Dict[str, int]:
-        lengths = {}
-        for record in SeqIO.parse(fasta_path, "fasta"):
-            lengths[record.id] = len(record.seq)
-        return lengths
-
-    def classify(self, hits) -> List[GeneHit]:
-        """Classify BLAST hits as confirmed/novel ccr gene detections."""
-        # Filter to minimum thresholds
-        passing = filter_hits(
-            hits,
-            min_pident=self.NOVEL_PIDENT,
-            min_coverage=self.MIN_COVERAGE,
-            ref_lengths=self.ref_lengths,
-        )
-
-        # Resolve overlapping hits
-        best_hits = get_best_non_overlapping_hits(passing, overlap_threshold=500)
+        super().__init__(TypingManifest.load().get("mec"), ref_fasta)
 
-        results = []
-        for hit in best_hits:
-            ref_len = self.ref_lengths.get(hit.qseqid, 1)
-            coverage = hit.length / ref_len
 
-            if hit.pident >= self.CONFIRMED_PIDENT:
-                if coverage >= self.FULL_COVERAGE:
-                    classification = "full"
-                else:
-                    classification = "partial"
-            else:
-                if coverage >= self.FULL_COVERAGE:
-                    classification = "novel_full"
-                else:
-                    classification = "novel_partial"
+class CcrClassifier(GeneClassifier):
+    """Classify ccr gene hits using the bundled manifest's ccr thresholds.
 
-            results.append(
-                GeneHit(
-                    gene_name=hit.qseqid,
-                    pident=round(hit.pident, 1),
-                    coverage=round(coverage * 100, 1),
-                    classification=classification,
-                    contig=hit.sseqid,
-                    start=min(hit.sstart, hit.send),
-                    end=max(hit.sstart, hit.send),
-                )
-            )
+    Thresholds:
+        - Confirmed full: >=85% identity AND >=90% coverage
+        - Confirmed partial: >=85% identity AND >=75% coverage
+        - Novel full: 70-84.4% identity AND >=90% coverage
+        - Novel partial: 70-84.4% identity AND >=75% coverage
+    """
 
-        return results
+    def __init__(self, ref_fasta: str):
+        super().__init__(TypingManifest.load().get("ccr"), ref_fasta)
 
 
 class CcrComplexLookup:
@@ -294,70 +376,229 @@ class CcrComplexLookup:
         return label
 
 
+def format_typing_row(
+    input_name: str,
+    families: List[GeneFamily],
+    results: Dict[str, List[GeneHit]],
+) -> dict:
+    """Format classified hits for each family into a dict for TSV output."""
+    row = {"Input_File": input_name}
+
+    for family in families:
+        family_results = results.get(family.name, [])
+        # Sort by gene name so allotypes and identity columns align
+        ordered = (
+            sorted(family_results, key=lambda r: r.gene_name)
+            if family.sort_by_gene else family_results
+        )
+
+        for column in family.columns:
+            key = f"{family.name}_{column}"
+            if column == "complex_type":
+                row[key] = CcrComplexLookup.lookup(family_results)
+            elif not family_results:
+                row[key] = "-"
+            elif column == "genes":
+                row[key] = ";".join(
+                    f"{r.gene_name}({r.classification})" for r in family_results
+                )
+            elif column == "allotypes":
+                row[key] = ";".join(r.gene_name for r in ordered)
+            elif column == "identity":
+                row[key] = ";".join(str(r.pident) for r in ordered)
+            elif column == "coverage":
+                row[key] = ";".join(str(r.coverage) for r in ordered)
+            elif column == "locations":
+                row[key] = ";".join(f"{r.contig}:{r.start}-{r.end}" for r in ordered)
+
+    return row
+
+
+# Bundled manifest: mec and ccr families typed by default
+DEFAULT_MANIFEST = TypingManifest.load()
+
 # Column header for typing output — shared with report_sccmec
-TYPING_HEADER = [
-    "Input_File",
-    "mec_genes",
-    "mec_identity",
-    "mec_coverage",
-    "mec_locations",
-    "ccr_genes",
-    "ccr_allotypes",
-    "ccr_identity",
-    "ccr_locations",
-    "ccr_complex_type",
-]
+TYPING_HEADER = DEFAULT_MANIFEST.header
+
+# Inputs up to this size (FASTA bytes, ~bp) are searched with blastn -subject
+# instead of building a database; see benchmarks/bench_subject_mode.py
+DEFAULT_SUBJECT_MAX_SIZE = 1_000_000
 
 
 class SCCmecTyper:
-    """Orchestrate BLAST-based SCCmec typing for mec and ccr gene content."""
+    """Orchestrate BLAST-based SCCmec typing for every family in a manifest.
+
+    All family references are concatenated into one query FASTA so each
+    input needs a single blastn search regardless of how many families are
+    typed; hits are partitioned back to families by query ID.
+    """
 
     def __init__(
         self,
         mec_ref: Optional[str] = None,
         ccr_ref: Optional[str] = None,
+        manifest: Optional[str] = None,
+        hit_store: Optional[HitStore] = None,
+        offline: bool = False,
+        subject_max_size: int = DEFAULT_SUBJECT_MAX_SIZE,
     ):
+        """
+        Args:
+            mec_ref: Override the manifest's mec reference FASTA.
+            ccr_ref: Override the manifest's ccr reference FASTA.
+            manifest: Typing manifest JSON (default: bundled).
+            hit_store: When given, the raw hits of every typed input are
+                saved to it for later re-classification.
+            offline: Do not require BLAST+; only stored hits can be typed.
+            subject_max_size: Inputs whose FASTA is at most this many bytes
+                are searched directly as a blastn subject, skipping
+                makeblastdb. 0 always builds a database.
+        """
         self.mec_ref = mec_ref
         self.ccr_ref = ccr_ref
-        self.runner = BlastRunner()
+        self.manifest = TypingManifest.load(manifest)
+        self.hit_store = hit_store
+        self.subject_max_size = subject_max_size
+        self.runner = None if offline else BlastRunner()
+
+        # --mec-ref / --ccr-ref override the matching manifest entries
+        for name, ref in (("mec", mec_ref), ("ccr", ccr_ref)):
+            if ref:
+                family = self.manifest.get(name)
+                if family is None:
+                    raise ValueError(f"Manifest has no '{name}' family to override")
+                family.reference = ref
 
         # Cache classifiers — ref FASTAs parsed once, reused for all genomes
-        self._mec_classifier = self._create_mec_classifier()
-        self._ccr_classifier = self._create_ccr_classifier()
-
-    def _create_mec_classifier(self) -> MecClassifier:
-        """Create a MecClassifier, handling default ref resolution."""
-        if self.mec_ref:
-            return MecClassifier(self.mec_ref)
-        with get_default_ref("mec_genes_allotypes.fasta") as ref:
-            return MecClassifier(str(ref))
-
-    def _create_ccr_classifier(self) -> CcrClassifier:
-        """Create a CcrClassifier, handling default ref resolution."""
-        if self.ccr_ref:
-            return CcrClassifier(self.ccr_ref)
-        with get_default_ref("ccr_genes.fasta") as ref:
-            return CcrClassifier(str(ref))
+        self._classifiers = {
+            family.name: GeneClassifier(family) for family in self.manifest.families
+        }
+
+        self._family_of = {}
+        self._ref_hashes = {}
+        self._query_dir = tempfile.mkdtemp(prefix="sccmec_query_")
+        self._query_fasta = os.path.join(self._query_dir, "typing_refs.fasta")
+        self._write_combined_query()
+        self._finalizer = weakref.finalize(
+            self, shutil.rmtree, self._query_dir, ignore_errors=True
+        )
+
+    @property
+    def header(self) -> List[str]:
+        return self.manifest.header
+
+    def _write_combined_query(self):
+        """Concatenate every family reference into one query FASTA."""
+        with open(self._query_fasta, "w") as out:
+            for family in self.manifest.families:
+                with family.reference_path() as ref:
+                    for record in SeqIO.parse(ref, "fasta"):
+                        owner = self._family_of.get(record.id)
+                        if owner is not None:
+                            raise ValueError(
+                                f"Reference ID '{record.id}' appears in both "
+                                f"'{owner}' and '{family.name}' families"
+                            )
+                        self._family_of[record.id] = family.name
+                        self._ref_hashes[record.id] = _sequence_hash(record.seq)
+                        SeqIO.write(record, out, "fasta")
+
+        if self.hit_store is not None and not self.hit_store.references():
+            self.hit_store.set_references(self._ref_hashes)
 
     def type_file(self, input_fasta: str) -> dict:
         """Type a single SCCmec FASTA file.
 
-        Returns a dict with keys:
-            Input_File, mec_genes, mec_identity, mec_coverage,
-            ccr_genes, ccr_allotypes, ccr_identity
+        Returns a dict keyed by ``self.header`` (Input_File plus each
+        family's output columns).
         """
         input_name = Path(input_fasta).stem
+        hits = self.partition_hits(self.search_file(input_fasta))
+        return self.type_hits(input_name, hits, source=input_fasta)
+
+    def search_file(
+        self, fasta_path: str, query: Optional[str] = None
+    ) -> List[BlastResult]:
+        """BLAST *query* (default: all family references) against a FASTA file.
+
+        Small files (see ``subject_max_size``) are searched directly as a
+        subject; larger ones get a temporary database. Gzipped (including
+        bgzip) files are decompressed to a temporary copy first. Returns the
+        raw hits.
+        """
+        query = query or self._query_fasta
+
+        if fasta_path.endswith(".gz"):
+            tmp_dir = tempfile.mkdtemp(prefix="sccmec_type_")
+            plain = os.path.join(tmp_dir, "input.fasta")
+            try:
+                with gzip.open(fasta_path, "rb") as src, open(plain, "wb") as dst:
+                    shutil.copyfileobj(src, dst)
+                return self.search_file(plain, query=query)
+            finally:
+                shutil.rmtree(tmp_dir, ignore_errors=True)
+
+        if os.path.getsize(fasta_path) <= self.subject_max_size:
+            results_file = self.runner.run_blastn(query, None, subject=fasta_path)
+            hits = parse_blast_output(results_file)
+            self.runner.cleanup_file(results_file)
+            return hits
+
         tmp_dir = tempfile.mkdtemp(prefix="sccmec_type_")
         db_prefix = os.path.join(tmp_dir, "sccmec_db")
 
         try:
-            # Create BLAST DB from the input SCCmec sequence
-            self.runner.create_db(input_fasta, db_prefix)
+            self.runner.create_db(fasta_path, db_prefix)
+            results_file = self.runner.run_blastn(query, db_prefix)
+            hits = parse_blast_output(results_file)
+            self.runner.cleanup_file(results_file)
+
+        finally:
+            self.runner.cleanup_db(db_prefix)
+            try:
+                os.rmdir(tmp_dir)
+            except OSError:
+                pass
+
+        return hits
 
-            # Type mec genes
-            mec_hits = self._blast_ref("mec", db_prefix, tmp_dir)
-            # Type ccr genes
-            ccr_hits = self._blast_ref("ccr", db_prefix, tmp_dir)
+    def type_shard(self, reader: ShardReader, shard: str) -> List[dict]:
+        """Type every element stored in one bundled-output shard.
+
+        The whole shard is searched once and hits are split by record, so
+        each element is typed exactly as its own FASTA would be. Rows are
+        named ``{input}_SCCmec`` like per-genome element files.
+        """
+        shard_path = os.path.join(reader.directory, shard)
+        by_record = {}
+        for hit in self.search_file(shard_path):
+            by_record.setdefault(hit.sseqid, []).append(hit)
+
+        return [
+            self.type_hits(
+                f"{location.input_file}_SCCmec",
+                self.partition_hits(by_record.get(location.record_id, [])),
+                source=shard_source(shard_path, location.record_id),
+            )
+            for location in reader.records_in_shard(shard)
+        ]
+
+    def search_genome(self, genome) -> Dict[str, List[BlastResult]]:
+        """BLAST all family references against an in-memory genome.
+
+        *genome* is a GenomeBuffer or a shared-memory GenomeDescriptor; the
+        temporary database is built by streaming the buffer to makeblastdb.
+        Returns raw hits keyed by family name, as ``search_db``.
+        """
+        genome = as_genome_buffer(genome)
+        tmp_dir = tempfile.mkdtemp(prefix="sccmec_type_")
+        db_prefix = os.path.join(tmp_dir, "genome_db")
+
+        try:
+            self.runner.create_db_from_stream(
+                genome.write_fasta, db_prefix, title=Path(genome.fasta_file or "genome").stem,
+            )
+            return self.search_db(db_prefix)
 
         finally:
             self.runner.cleanup_db(db_prefix)
@@ -366,41 +607,180 @@ class SCCmecTyper:
             except OSError:
                 pass
 
-        # Classify using cached classifiers (ref FASTAs parsed once in __init__)
-        mec_results = self._mec_classifier.classify(mec_hits)
-        ccr_results = self._ccr_classifier.classify(ccr_hits)
-
-        # Format output
-        return self._format_result(input_name, mec_results, ccr_results)
-
-    def _blast_ref(self, ref_type: str, db_prefix: str, tmp_dir: str):
-        """BLAST a reference set against the SCCmec database."""
-        if ref_type == "mec":
-            if self.mec_ref:
-                ref_path = self.mec_ref
-                results_file = self.runner.run_blastn(ref_path, db_prefix)
-                hits = parse_blast_output(results_file)
-                self.runner.cleanup_file(results_file)
-                return hits
-            else:
-                with get_default_ref("mec_genes_allotypes.fasta") as ref:
-                    results_file = self.runner.run_blastn(str(ref), db_prefix)
-                    hits = parse_blast_output(results_file)
-                    self.runner.cleanup_file(results_file)
-                    return hits
-        else:
-            if self.ccr_ref:
-                ref_path = self.ccr_ref
-                results_file = self.runner.run_blastn(ref_path, db_prefix)
-                hits = parse_blast_output(results_file)
-                self.runner.cleanup_file(results_file)
-                return hits
-            else:
-                with get_default_ref("ccr_genes.fasta") as ref:
-                    results_file = self.runner.run_blastn(str(ref), db_prefix)
-                    hits = parse_blast_output(results_file)
-                    self.runner.cleanup_file(results_file)
-                    return hits
+    def search_db(self, db_prefix: str) -> Dict[str, List[BlastResult]]:
+        """BLAST all family references against an existing database at once.
+
+        Returns the raw (unfiltered) hits keyed by family name, so a single
+        search of a genome can be reused for both whole-genome and
+        extracted-element typing.
+        """
+        results_file = self.runner.run_blastn(self._query_fasta, db_prefix)
+        hits = parse_blast_output(results_file)
+        self.runner.cleanup_file(results_file)
+        return self.partition_hits(hits)
+
+    def partition_hits(self, hits: List[BlastResult]) -> Dict[str, List[BlastResult]]:
+        """Split combined-search hits into per-family lists by query ID."""
+        by_family = {family.name: [] for family in self.manifest.families}
+        for hit in hits:
+            name = self._family_of.get(hit.qseqid)
+            if name is not None:
+                by_family[name].append(hit)
+        return by_family
+
+    def type_hits(
+        self,
+        input_name: str,
+        hits: Dict[str, List[BlastResult]],
+        source: Optional[str] = None,
+    ) -> dict:
+        """Classify raw hits for every family and format a typing result row."""
+        self._store_hits(input_name, hits, source, None)
+        return self._classify(input_name, hits)
+
+    def type_region(
+        self,
+        input_name: str,
+        hits: Dict[str, List[BlastResult]],
+        contig: str,
+        start: int,
+        end: int,
+        reverse_complement: bool,
+        record_id: str,
+        source: Optional[str] = None,
+        contig_length: Optional[int] = None,
+    ) -> dict:
+        """Type an extracted region from hits found in the whole genome.
+
+        Hits are intersected with the extraction interval and mapped onto the
+        element's own coordinates (see ``project_hits``), giving the same
+        result as typing the extracted FASTA without another BLAST search.
+        *contig_length* is given for regions spanning the origin of a
+        circular contig.
+        """
+        region = StoredRegion(contig, start, end, reverse_complement, record_id,
+                              contig_length)
+        self._store_hits(input_name, hits, source, region)
+        return self._classify(input_name, self._project(hits, region))
+
+    def type_stored(self, input_name: str) -> dict:
+        """Re-type one input from its stored raw hits (no BLAST)."""
+        raw, _, region = self.hit_store.load(input_name)
+        hits = self.partition_hits(self._rename_stored(raw))
+        if region is not None:
+            hits = self._project(hits, region)
+        return self._classify(input_name, hits)
+
+    def new_references(self) -> List[str]:
+        """IDs of current reference sequences absent from the hit store.
+
+        References are compared by sequence hash, so renamed sequences are
+        not treated as new.
+        """
+        stored = self.hit_store.references()
+        return [
+            ref_id for ref_id, seq_hash in self._ref_hashes.items()
+            if seq_hash not in stored
+        ]
+
+    def update_references(self) -> List[str]:
+        """Bring the hit store up to date with the current reference sets.
+
+        Only references whose sequences are new to the store are searched,
+        against each stored input's source FASTA (one search per source;
+        inputs stored from a bundled-output shard keep only their record's
+        hits).
+        The store's reference set is first brought up to date without them
+        (``HitStore.set_references`` moves hits of renamed references to
+        their current IDs and drops hits of removed or changed sequences),
+        then their hits are merged and they are recorded as searched.
+
+        Returns:
+            Names of stored inputs that gained hits and so need re-typing.
+        """
+        new_refs = set(self.new_references())
+        new_hits = {}
+
+        if new_refs:
+            query_fasta = os.path.join(self._query_dir, "new_refs.fasta")
+            with open(query_fasta, "w") as out:
+                for record in SeqIO.parse(self._query_fasta, "fasta"):
+                    if record.id in new_refs:
+                        SeqIO.write(record, out, "fasta")
+
+            hits_by_source = {}
+            for input_name in self.hit_store.input_names():
+                _, source, _ = self.hit_store.load(input_name)
+                path, record_id = split_source(source) if source else (None, None)
+                if not path or not os.path.isfile(path):
+                    print(f"    WARNING: Source of {input_name} not found ({source}); "
+                          "not searched for new references")
+                    continue
+                if path not in hits_by_source:
+                    hits_by_source[path] = self.search_file(path, query=query_fasta)
+                hits = hits_by_source[path]
+                if record_id is not None:
+                    hits = [hit for hit in hits if hit.sseqid == record_id]
+                if hits:
+                    new_hits[input_name] = hits
+
+        # Purge stale hits before merging, so a reference whose sequence
+        # changed under the same ID keeps its new hits
+        self.hit_store.set_references({
+            ref_id: seq_hash for ref_id, seq_hash in self._ref_hashes.items()
+            if ref_id not in new_refs
+        })
+        for input_name, hits in new_hits.items():
+            self.hit_store.add_hits(input_name, hits)
+        self.hit_store.set_references(self._ref_hashes)
+        return list(new_hits)
+
+    def _rename_stored(self, hits: List[BlastResult]) -> List[BlastResult]:
+        """Map stored query IDs to the current IDs of the same sequences.
+
+        Hits from reference sequences that are no longer present are
+        dropped; stores without a recorded reference set are used as-is.
+        """
+        stored_hash = {
+            ref_id: seq_hash
+            for seq_hash, ref_id in self.hit_store.references().items()
+        }
+        if not stored_hash:
+            return hits
+
+        current_id = {seq_hash: ref_id for ref_id, seq_hash in self._ref_hashes.items()}
+        renamed = []
+        for hit in hits:
+            ref_id = current_id.get(stored_hash.get(hit.qseqid))
+            if ref_id is not None:
+                hit.qseqid = ref_id
+                renamed.append(hit)
+        return renamed
+
+    @staticmethod
+    def _project(
+        hits: Dict[str, List[BlastResult]], region: StoredRegion
+    ) -> Dict[str, List[BlastResult]]:
+        return {
+            family: project_hits(
+                family_hits, region.contig, region.start, region.end,
+                region.reverse_complement, region.record_id,
+                contig_length=region.contig_length,
+            )
+            for family, family_hits in hits.items()
+        }
+
+    def _store_hits(self, input_name, hits, source, region):
+        if self.hit_store is not None:
+            flat = [hit for family_hits in hits.values() for hit in family_hits]
+            self.hit_store.save(input_name, flat, source=source, region=region)
+
+    def _classify(self, input_name: str, hits: Dict[str, List[BlastResult]]) -> dict:
+        results = {
+            name: classifier.classify(hits.get(name, []))
+            for name, classifier in self._classifiers.items()
+        }
+        return format_typing_row(input_name, self.manifest.families, results)
 
     @staticmethod
     def _format_result(
@@ -408,53 +788,31 @@ class SCCmecTyper:
         mec_results: List[GeneHit],
         ccr_results: List[GeneHit],
     ) -> dict:
-        """Format typing results into a dict for TSV output."""
-        if mec_results:
-            mec_genes = ";".join(
-                f"{r.gene_name}({r.classification})" for r in mec_results
-            )
-            mec_identity = ";".join(str(r.pident) for r in mec_results)
-            mec_coverage = ";".join(str(r.coverage) for r in mec_results)
-            mec_locations = ";".join(
-                f"{r.contig}:{r.start}-{r.end}" for r in mec_results
-            )
-        else:
-            mec_genes = "-"
-            mec_identity = "-"
-            mec_coverage = "-"
-            mec_locations = "-"
-
-        if ccr_results:
-            ccr_genes = ";".join(
-                f"{r.gene_name}({r.classification})" for r in ccr_results
-            )
-            # Sort by gene name so allotypes and identity columns align
-            sorted_ccr = sorted(ccr_results, key=lambda r: r.gene_name)
-            ccr_allotypes = ";".join(r.gene_name for r in sorted_ccr)
-            ccr_identity = ";".join(str(r.pident) for r in sorted_ccr)
-            ccr_locations = ";".join(
-                f"{r.contig}:{r.start}-{r.end}" for r in sorted_ccr
-            )
-        else:
-            ccr_genes = "-"
-            ccr_allotypes = "-"
-            ccr_identity = "-"
-            ccr_locations = "-"
+        """Format mec/ccr typing results with the bundled manifest's columns."""
+        return format_typing_row(
+            input_name,
+            DEFAULT_MANIFEST.families,
+            {"mec": mec_results, "ccr": ccr_results},
+        )
 
-        ccr_complex_type = CcrComplexLookup.lookup(ccr_results)
 
-        return {
-            "Input_File": input_name,
-            "mec_genes": mec_genes,
-            "mec_identity": mec_identity,
-            "mec_coverage": mec_coverage,
-            "mec_locations": mec_locations,
-            "ccr_genes": ccr_genes,
-            "ccr_allotypes": ccr_allotypes,
-            "ccr_identity": ccr_identity,
-            "ccr_locations": ccr_locations,
-            "ccr_complex_type": ccr_complex_type,
-        }
+def _sequence_hash(seq) -> str:
+    return hashlib.sha256(str(seq).upper().encode()).hexdigest()
+
+
+def read_typing_rows(path: str, header: List[str]) -> Dict[str, dict]:
+    """Read an existing typing TSV keyed by Input_File.
+
+    Returns an empty dict when the file is missing or its columns differ
+    from *header* (every row then needs re-typing).
+    """
+    if not os.path.isfile(path):
+        return {}
+    with open(path) as f:
+        lines = [line.rstrip("\n").split("\t") for line in f if line.strip()]
+    if not lines or lines[0] != header:
+        return {}
+    return {fields[0]: dict(zip(header, fields)) for fields in lines[1:]}
 
 
 def collect_input_files(paths: List[str]) -> List[str]:
@@ -482,17 +840,93 @@ def collect_input_files(paths: List[str]) -> List[str]:
     return sorted(files)
 
 
+def _retype_incremental(typer: SCCmecTyper, outfile: str):
+    """Follow reference-set updates for every input in the typer's hit store.
+
+    Inputs that gained hits from new references (or have no usable row in
+    *outfile*) are re-classified; all other rows are kept as they were.
+    """
+    new_refs = typer.new_references()
+    print(f"{len(new_refs)} reference sequence(s) new to the hit store")
+    changed_inputs = set(typer.update_references())
+
+    header = typer.header
+    existing = read_typing_rows(outfile, header)
+    rows = []
+    n_changed = 0
+
+    for name in typer.hit_store.input_names():
+        row = existing.get(name)
+        if row is None or name in changed_inputs:
+            try:
+                result = typer.type_stored(name)
+                new_row = {col: str(result[col]) for col in header}
+            except Exception as e:
+                print(f"    ERROR: {name}: {e}")
+                new_row = dict(zip(header, [name] + ["ERROR"] * (len(header) - 1)))
+            if new_row != row:
+                print(f"  Updated {name}")
+                n_changed += 1
+            row = new_row
+        rows.append(row)
+
+    tmp_path = outfile + ".tmp"
+    with open(tmp_path, "w") as f:
+        f.write("\t".join(header) + "\n")
+        for row in rows:
+            f.write("\t".join(row[col] for col in header) + "\n")
+    os.replace(tmp_path, outfile)
+
+    print(f"\n{n_changed} of {len(rows)} row(s) changed; results written to {outfile}")
+
+
+def _type_shards(typer: SCCmecTyper, reader: ShardReader, outfile: str):
+    """Type every bundled element, one BLAST search per shard."""
+    header = typer.header
+    shards = reader.shards()
+
+    with open(outfile, "w") as f:
+        f.write("\t".join(header) + "\n")
+
+        for i, shard in enumerate(shards, 1):
+            print(f"  [{i}/{len(shards)}] Typing {shard}...")
+            try:
+                rows = [
+                    "\t".join(str(result[col]) for col in header)
+                    for result in typer.type_shard(reader, shard)
+                ]
+            except Exception as e:
+                print(f"    ERROR: {e}")
+                rows = [
+                    "\t".join([f"{location.input_file}_SCCmec"]
+                              + ["ERROR"] * (len(header) - 1))
+                    for location in reader.records_in_shard(shard)
+                ]
+            for line in rows:
+                f.write(line + "\n")
+
+
 def main():
     parser = argparse.ArgumentParser(
         description="Type extracted SCCmec sequences by mec and ccr gene content"
     )
-    parser.add_argument(
+    input_group = parser.add_mutually_exclusive_group(required=True)
+    input_group.add_argument(
         "-f",
         "--fasta",
         nargs="+",
-        required=True,
         help="Input SCCmec FASTA file(s) or directory",
     )
+    input_group.add_argument(
+        "--shards",
+        help="Directory of bundled-output shards (sccmec-extract/sccmec-pipeline "
+             "--bundle); each shard is searched once",
+    )
+    input_group.add_argument(
+        "--from-hits",
+        help="Re-classify every input in a hit store (from --save-hits) "
+             "without running BLAST",
+    )
     parser.add_argument(
         "-o",
         "--outfile",
@@ -507,37 +941,110 @@ def main():
         "--ccr-ref",
         help="Custom ccr gene reference FASTA (default: bundled)",
     )
+    parser.add_argument(
+        "--manifest",
+        help="Gene-family typing manifest JSON (default: bundled mec + ccr)",
+    )
+    parser.add_argument(
+        "--save-hits",
+        help="Save raw BLAST hits per input to this SQLite store for later "
+             "re-classification with --from-hits",
+    )
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="With --from-hits: BLAST only references new to the store "
+             "against the stored inputs' sources, then re-type only inputs "
+             "that gained hits, updating an existing --outfile in place",
+    )
+    parser.add_argument(
+        "--subject-max-size",
+        type=int,
+        default=DEFAULT_SUBJECT_MAX_SIZE,
+        help="Search inputs up to this FASTA size (bytes) directly with "
+             "blastn -subject instead of building a BLAST database; "
+             f"0 always builds one (default: {DEFAULT_SUBJECT_MAX_SIZE})",
+    )
     args = parser.parse_args()
 
-    # Collect input files
-    input_files = collect_input_files(args.fasta)
+    if args.incremental and not args.from_hits:
+        parser.error("--incremental requires --from-hits")
+
+    if args.from_hits:
+        if not os.path.isfile(args.from_hits):
+            print(f"ERROR: Hit store not found: {args.from_hits}")
+            return
+        hit_store = HitStore(args.from_hits)
+        input_names = hit_store.input_names()
+        print(f"Found {len(input_names)} stored input(s)")
+    elif args.shards:
+        shard_reader = ShardReader(args.shards)
+        if not shard_reader.locations:
+            print(f"ERROR: No bundled elements found in {args.shards}")
+            return
+        print(f"Found {len(shard_reader.locations)} element(s) in "
+              f"{len(shard_reader.shards())} shard(s)")
+        hit_store = HitStore(args.save_hits) if args.save_hits else None
+    else:
+        # Collect input files
+        input_files = collect_input_files(args.fasta)
+
+        if not input_files:
+            print("ERROR: No FASTA files found in the provided paths")
+            return
+
+        print(f"Found {len(input_files)} input file(s)")
+        hit_store = HitStore(args.save_hits) if args.save_hits else None
 
-    if not input_files:
-        print("ERROR: No FASTA files found in the provided paths")
+    # Create typer
+    typer = SCCmecTyper(
+        mec_ref=args.mec_ref, ccr_ref=args.ccr_ref, manifest=args.manifest,
+        hit_store=hit_store, offline=bool(args.from_hits) and not args.incremental,
+        subject_max_size=args.subject_max_size,
+    )
+    header = typer.header
+
+    if args.incremental:
+        _retype_incremental(typer, args.outfile)
+        hit_store.close()
         return
 
-    print(f"Found {len(input_files)} input file(s)")
+    if args.shards:
+        _type_shards(typer, shard_reader, args.outfile)
+        if hit_store is not None:
+            hit_store.close()
+        print(f"\nResults written to {args.outfile}")
+        return
 
-    # Create typer
-    typer = SCCmecTyper(mec_ref=args.mec_ref, ccr_ref=args.ccr_ref)
+    # (label, Input_File name, typing call, argument) per input
+    if args.from_hits:
+        tasks = [(name, name, typer.type_stored, name) for name in input_names]
+    else:
+        tasks = [
+            (Path(path).name, Path(path).stem, typer.type_file, path)
+            for path in input_files
+        ]
 
-    # Type each file
+    # Type each input
     with open(args.outfile, "w") as f:
-        f.write("\t".join(TYPING_HEADER) + "\n")
+        f.write("\t".join(header) + "\n")
 
-        for i, input_file in enumerate(input_files, 1):
-            print(f"  [{i}/{len(input_files)}] Typing {Path(input_file).name}...")
+        for i, (label, name, type_func, target) in enumerate(tasks, 1):
+            print(f"  [{i}/{len(tasks)}] Typing {label}...")
             try:
-                result = typer.type_file(input_file)
-                line = "\t".join(str(result[col]) for col in TYPING_HEADER)
+                result = type_func(target)
+                line = "\t".join(str(result[col]) for col in header)
                 f.write(line + "\n")
             except Exception as e:
                 print(f"    ERROR: {e}")
                 line = "\t".join(
-                    [Path(input_file).stem] + ["ERROR"] * (len(TYPING_HEADER) - 1)
+                    [name] + ["ERROR"] * (len(header) - 1)
                 )
                 f.write(line + "\n")
 
+    if hit_store is not None:
+        hit_store.close()
+
     print(f"\nResults written to {args.outfile}")
 
 
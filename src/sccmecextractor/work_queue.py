@@ -0,0 +1,341 @@
+#!/usr/bin/env python
+
+"""A genome work queue on a shared filesystem, for multi-node runs.
+
+Any number of ``sccmec-pipeline --queue DIR`` workers, on any host that
+mounts *DIR*, take genomes from the queue until it is empty, so fast nodes
+are not left idle behind slow shards. Only POSIX filesystem operations are
+used (no broker, no SQLite, whose locking is unreliable over NFS)::
+
+    DIR/queue.json              parameters and size of the queue
+    DIR/todo/<rank>             unclaimed genomes (JSON)
+    DIR/claimed/<worker>/<rank> genomes being processed by a worker
+    DIR/workers/<worker>        heartbeat, touched while the worker runs
+    DIR/results/<rank>.json     published result of each finished genome
+    DIR/reports.lock            held by the worker building the reports
+
+The first worker creates ``queue.json`` with ``os.link`` (which fails if
+it exists) and then moves a staged ``todo`` directory into place, so the
+queue appears complete or not at all. Genomes are claimed by renaming
+them from ``todo/`` into the worker's ``claimed/`` directory; a rename
+succeeds for exactly one worker. Results are written to a temporary file
+and renamed into ``results/`` before the claim is removed.
+
+A worker whose heartbeat is older than *stale_after* is taken to be dead
+and its claims are renamed back into ``todo/`` by whichever worker notices
+first. Heartbeat ages are measured against the mtime of the checking
+worker's own heartbeat, so hosts need not agree on the time. A worker that
+was only slow may publish a genome that has also been redone elsewhere;
+both results are the same, and the later one replaces the earlier.
+"""
+
+import json
+import os
+import socket
+import threading
+import time
+import uuid
+
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from sccmecextractor.run_manifest import GenomeRecord
+
+QUEUE_FILENAME = "queue.json"
+REPORTS_LOCK = "reports.lock"
+
+# Seconds between heartbeats, and missed beats before a worker is dead
+HEARTBEAT_INTERVAL = 30.0
+STALE_HEARTBEATS = 4
+
+
+class QueueMismatchError(ValueError):
+    """Raised when joining a queue created with different parameters."""
+
+    pass
+
+
+def _write_json(path: str, data):
+    """Write *data* to *path* atomically (temporary file, then rename)."""
+    tmp = f"{path}.{uuid.uuid4().hex}.tmp"
+    with open(tmp, "w") as fh:
+        json.dump(data, fh)
+    os.replace(tmp, path)
+
+
+class WorkQueue:
+    """One worker's view of a shared genome queue in *queue_dir*.
+
+    Use as a context manager, which keeps the heartbeat running; the
+    interface used by ``_ResultWriter`` (``record``, ``record_failure``)
+    matches ``RunManifest``, so published results take the place of local
+    checkpoints.
+    """
+
+    def __init__(self, queue_dir: str, worker_id: Optional[str] = None,
+                 heartbeat_interval: float = HEARTBEAT_INTERVAL,
+                 stale_after: Optional[float] = None):
+        self.queue_dir = queue_dir
+        self.worker_id = worker_id or (
+            f"{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:8]}"
+        )
+        self.heartbeat_interval = heartbeat_interval
+        self.stale_after = (
+            stale_after if stale_after is not None
+            else heartbeat_interval * STALE_HEARTBEATS
+        )
+        self.todo_dir = os.path.join(queue_dir, "todo")
+        self.claimed_dir = os.path.join(queue_dir, "claimed")
+        self.results_dir = os.path.join(queue_dir, "results")
+        self.workers_dir = os.path.join(queue_dir, "workers")
+        self.heartbeat_file = os.path.join(self.workers_dir, self.worker_id)
+        self.my_claims = os.path.join(self.claimed_dir, self.worker_id)
+        self.size = 0
+        # Claimed genomes by name: (rank, task)
+        self._claims: Dict[str, Tuple[str, dict]] = {}
+        self._claims_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._heartbeat = None
+
+    # -- Lifecycle -------------------------------------------------------
+
+    def open(self, tasks: List[dict], params: Dict[str, object],
+             wait: Optional[float] = None) -> bool:
+        """Create the queue from *tasks* (dicts with ``name``,
+        ``fasta_path`` and ``position``, in claim order) or join the
+        existing one; returns True if this worker created it.
+
+        Raises QueueMismatchError if the queue was created with different
+        *params*, and TimeoutError if its creator has not finished setting
+        it up within *wait* seconds (default: *stale_after*).
+        """
+        for d in (self.queue_dir, self.claimed_dir, self.results_dir, self.workers_dir):
+            os.makedirs(d, exist_ok=True)
+        self._beat()
+        self._start_heartbeat()
+
+        params = json.loads(json.dumps(params))
+        queue_file = os.path.join(self.queue_dir, QUEUE_FILENAME)
+        tmp = f"{queue_file}.{self.worker_id}.tmp"
+        with open(tmp, "w") as fh:
+            json.dump({"params": params, "size": len(tasks),
+                       "creator": self.worker_id}, fh)
+        try:
+            os.link(tmp, queue_file)
+            created = True
+        except FileExistsError:
+            created = False
+        finally:
+            os.remove(tmp)
+
+        if created:
+            staging = f"{self.todo_dir}.{self.worker_id}"
+            os.makedirs(staging)
+            for rank, task in enumerate(tasks):
+                with open(os.path.join(staging, f"{rank:08d}"), "w") as fh:
+                    json.dump(task, fh)
+            os.rename(staging, self.todo_dir)
+            self.size = len(tasks)
+            return True
+
+        with open(queue_file) as fh:
+            info = json.load(fh)
+        recorded = info["params"]
+        changed = sorted(
+            key for key in set(recorded) | set(params)
+            if recorded.get(key) != params.get(key)
+        )
+        if changed:
+            raise QueueMismatchError(
+                f"Cannot join queue {self.queue_dir}: parameters differ from its "
+                f"creator's ({', '.join(changed)})"
+            )
+        self.size = info["size"]
+        deadline = time.monotonic() + (wait if wait is not None else self.stale_after)
+        while not os.path.isdir(self.todo_dir):
+            if time.monotonic() > deadline:
+                raise TimeoutError(
+                    f"Queue {self.queue_dir} was not set up by {info['creator']}; "
+                    f"remove it and start again"
+                )
+            time.sleep(min(self.heartbeat_interval, 1.0))
+        return False
+
+    def close(self):
+        """Stop the heartbeat; claims still held are left for reclaiming."""
+        self._stop.set()
+        if self._heartbeat is not None:
+            self._heartbeat.join()
+            self._heartbeat = None
+        try:
+            os.remove(self.heartbeat_file)
+        except FileNotFoundError:
+            pass
+        try:
+            os.rmdir(self.my_claims)
+        except OSError:
+            pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _beat(self):
+        with open(self.heartbeat_file, "a"):
+            pass
+        os.utime(self.heartbeat_file)
+
+    def _start_heartbeat(self):
+        def run():
+            while not self._stop.wait(self.heartbeat_interval):
+                try:
+                    self._beat()
+                except OSError:
+                    pass  # a transient filesystem error; try again next beat
+
+        self._heartbeat = threading.Thread(target=run, daemon=True)
+        self._heartbeat.start()
+
+    # -- Claiming --------------------------------------------------------
+
+    def claim(self) -> Optional[dict]:
+        """Claim the next genome; None when nothing is left to claim."""
+        os.makedirs(self.my_claims, exist_ok=True)
+        for attempt in range(2):
+            for rank in sorted(os.listdir(self.todo_dir)):
+                claimed = os.path.join(self.my_claims, rank)
+                try:
+                    os.rename(os.path.join(self.todo_dir, rank), claimed)
+                except FileNotFoundError:
+                    continue  # claimed by another worker first
+                with open(claimed) as fh:
+                    task = json.load(fh)
+                with self._claims_lock:
+                    self._claims[task["name"]] = (rank, task)
+                return task
+            if not attempt and not self.reclaim():
+                break
+        return None
+
+    def tasks(self) -> Iterator[dict]:
+        """Claim genomes until none are left."""
+        while True:
+            task = self.claim()
+            if task is None:
+                return
+            yield task
+
+    def reclaim(self) -> int:
+        """Return the claims of dead workers to the queue; returns how many."""
+        self._beat()
+        now = os.stat(self.heartbeat_file).st_mtime
+        returned = 0
+        for worker in os.listdir(self.claimed_dir):
+            if worker == self.worker_id:
+                continue
+            try:
+                alive = now - os.stat(os.path.join(self.workers_dir, worker)).st_mtime \
+                    < self.stale_after
+            except FileNotFoundError:
+                alive = False
+            if alive:
+                continue
+            worker_claims = os.path.join(self.claimed_dir, worker)
+            try:
+                ranks = os.listdir(worker_claims)
+            except FileNotFoundError:
+                continue
+            for rank in ranks:
+                claimed = os.path.join(worker_claims, rank)
+                try:
+                    if os.path.exists(os.path.join(self.results_dir, f"{rank}.json")):
+                        # Published before the worker died
+                        os.remove(claimed)
+                    else:
+                        os.rename(claimed, os.path.join(self.todo_dir, rank))
+                        returned += 1
+                except FileNotFoundError:
+                    pass  # reclaimed by another worker first
+            try:
+                os.rmdir(worker_claims)
+            except OSError:
+                pass
+        return returned
+
+    def complete(self) -> bool:
+        """Whether every genome's result has been published."""
+        published = [f for f in os.listdir(self.results_dir) if f.endswith(".json")]
+        return len(published) >= self.size
+
+    def wait_for_work(self, poll_interval: Optional[float] = None) -> bool:
+        """Wait while other workers hold the remaining genomes.
+
+        Returns True when genomes are back in the queue (reclaimed from a
+        dead worker), False once every result is published.
+        """
+        poll_interval = poll_interval or min(self.heartbeat_interval, 10.0)
+        while not self.complete():
+            if self.reclaim() or os.listdir(self.todo_dir):
+                return True
+            time.sleep(poll_interval)
+        return False
+
+    # -- Results ---------------------------------------------------------
+
+    def _publish(self, name: str, record: dict):
+        with self._claims_lock:
+            rank, task = self._claims.pop(name)
+        record = dict(record, name=name, position=task["position"])
+        _write_json(os.path.join(self.results_dir, f"{rank}.json"), record)
+        try:
+            os.remove(os.path.join(self.my_claims, rank))
+        except FileNotFoundError:
+            pass  # reclaimed while this worker was presumed dead
+
+    def record(self, position: int, name: str, input_file: str,
+               fingerprint: Optional[Tuple[int, int]], input_hash: str,
+               stages: List[str], result: dict):
+        """Publish a finished genome (*position* is ignored: genomes keep
+        their queue position)."""
+        size, mtime_ns = fingerprint if fingerprint is not None else (None, None)
+        self._publish(name, dict(
+            input_file=input_file, size=size, mtime_ns=mtime_ns,
+            input_hash=input_hash, stages=stages, result=result,
+        ))
+
+    def record_failure(self, position: int, name: str, result: dict):
+        """Publish a genome that failed, so it is not retried by every worker."""
+        with self._claims_lock:
+            _, task = self._claims[name]
+        self._publish(name, dict(
+            input_file=task["fasta_path"], size=None, mtime_ns=None,
+            input_hash="", stages=[], result=result,
+        ))
+
+    def records(self) -> Iterator[GenomeRecord]:
+        """Every published genome in input order."""
+        records = []
+        for filename in os.listdir(self.results_dir):
+            if not filename.endswith(".json"):
+                continue
+            with open(os.path.join(self.results_dir, filename)) as fh:
+                data = json.load(fh)
+            records.append(GenomeRecord(
+                data["name"], data["position"], data["input_file"], data["size"],
+                data["mtime_ns"], data["input_hash"], data["stages"], data["result"],
+            ))
+        records.sort(key=lambda record: record.position)
+        return iter(records)
+
+    def lock_reports(self, outdir: str) -> bool:
+        """Become the worker that builds the reports (True for one worker
+        only; remove ``reports.lock`` to build them again)."""
+        try:
+            fd = os.open(os.path.join(self.queue_dir, REPORTS_LOCK),
+                         os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+        except FileExistsError:
+            return False
+        with os.fdopen(fd, "w") as fh:
+            json.dump({"worker": self.worker_id, "outdir": os.path.abspath(outdir)}, fh)
+        return True
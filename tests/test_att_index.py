@@ -0,0 +1,70 @@
+#!/usr/bin/env python
+
+"""Tests for att_index.py."""
+
+import pytest
+
+from sccmecextractor.att_index import AttSiteIndex, has_index, index_path
+from sccmecextractor.extract_SCCmec import AttSiteCollection
+
+HEADER = "Input_File\tPattern\tContig\tStart\tEnd\tMatching_Sequence\n"
+
+
+def _row(genome, pattern, contig, start, end):
+    return f"{genome}\t{pattern}\t{contig}\t{start}\t{end}\tACGT\n"
+
+
+@pytest.fixture
+def att_tsv(tmp_path):
+    tsv = tmp_path / "att_sites.tsv"
+    tsv.write_text(
+        HEADER
+        + _row("genome_a", "attR", "contig_1", 100, 118)
+        + _row("genome_b", "attR", "contig_7", 500, 518)
+        + HEADER  # concatenated batch output repeats the header
+        + _row("genome_a", "attL", "contig_1", 40100, 40118)
+    )
+    return tsv
+
+
+class TestAttSiteIndex:
+
+    def test_sites_for_genome_in_file_order(self, att_tsv):
+        index = AttSiteIndex(str(att_tsv))
+        assert index.sites_for("genome_a") == [
+            ("attR", "contig_1", 100, 118),
+            ("attL", "contig_1", 40100, 40118),
+        ]
+        assert index.sites_for("missing") == []
+        assert index.input_files() == ["genome_a", "genome_b"]
+        index.close()
+        assert has_index(str(att_tsv))
+
+    def test_appended_rows_are_picked_up(self, att_tsv):
+        AttSiteIndex(str(att_tsv)).close()
+        with open(att_tsv, "a") as f:
+            f.write(_row("genome_c", "attL", "contig_2", 9000, 9018))
+            f.write("genome_c\tattR\tcontig_2")  # incomplete line being written
+
+        index = AttSiteIndex(str(att_tsv))
+        assert index.sites_for("genome_c") == [("attL", "contig_2", 9000, 9018)]
+        assert len(index.sites_for("genome_a")) == 2
+        index.close()
+
+    def test_rewritten_file_rebuilds(self, att_tsv):
+        AttSiteIndex(str(att_tsv)).close()
+        att_tsv.write_text(HEADER + _row("genome_z", "attR", "c", 1, 19))
+
+        index = AttSiteIndex(str(att_tsv))
+        assert index.input_files() == ["genome_z"]
+        index.close()
+
+    def test_collection_loads_from_index(self, att_tsv):
+        index = AttSiteIndex(str(att_tsv))
+        indexed = AttSiteCollection(str(att_tsv), "genome_a", index)
+        scanned = AttSiteCollection(str(att_tsv), "genome_a")
+        index.close()
+
+        assert [(s.pattern, s.contig, s.start, s.end) for s in indexed.sites] == \
+            [(s.pattern, s.contig, s.start, s.end) for s in scanned.sites]
+        assert index_path(str(att_tsv)).endswith(".idx.sqlite")
@@ -7,8 +7,11 @@ for most tests).
 """
 
 import shutil
+import subprocess
 import tempfile
 import textwrap
+import threading
+import time
 from pathlib import Path
 from unittest.mock import patch
 
@@ -18,10 +21,15 @@ from sccmecextractor.blast_utils import (
     BlastNotFoundError,
     BlastResult,
     BlastRunner,
+    BlastTimeoutError,
+    blast_deadline,
+    blast_settings,
+    configure_blast,
     filter_hits,
     get_best_non_overlapping_hits,
     get_default_ref,
     parse_blast_output,
+    project_hits,
 )
 
 
@@ -224,6 +232,84 @@ class TestBestNonOverlappingHits:
         assert selected[0].qseqid == "ccrA1"
 
 
+def _hit(qseqid, sseqid, sstart, send, qstart=1, qend=None):
+    """Build a BlastResult spanning sstart..send with a gapless alignment."""
+    length = abs(send - sstart) + 1
+    return BlastResult(
+        qseqid=qseqid, sseqid=sseqid, pident=99.0, length=length,
+        mismatch=0, gapopen=0, qstart=qstart,
+        qend=qend if qend is not None else qstart + length - 1,
+        sstart=sstart, send=send, evalue=0.0, bitscore=1000.0,
+    )
+
+
+class TestProjectHits:
+    """Tests for projecting genome hits onto an extracted region."""
+
+    def test_forward_region(self):
+        """Hits inside a forward region are shifted to element coordinates."""
+        hits = [_hit("mecA", "contig_1", 1101, 3107)]
+        projected = project_hits(hits, "contig_1", 1000, 50000, False, "elem")
+
+        assert len(projected) == 1
+        assert projected[0].sseqid == "elem"
+        assert (projected[0].sstart, projected[0].send) == (101, 2107)
+        assert projected[0].length == 2007
+
+    def test_reverse_region_flips_strand(self):
+        """Reverse-complement regions mirror coordinates and strand."""
+        # Element is rc(seq[20:80]) -> genome 21..80, element 1..60
+        hits = [_hit("ccrC1", "contig_1", 30, 40)]
+        projected = project_hits(hits, "contig_1", 80, 20, True, "elem")
+
+        assert len(projected) == 1
+        assert (projected[0].sstart, projected[0].send) == (51, 41)
+
+    def test_outside_region_and_other_contig_dropped(self):
+        """Hits outside the interval or on another contig are discarded."""
+        hits = [
+            _hit("mecA", "contig_1", 60000, 62006),
+            _hit("mecA", "contig_2", 2000, 4006),
+        ]
+        assert project_hits(hits, "contig_1", 1000, 50000, False, "elem") == []
+
+    def test_boundary_hit_clipped(self):
+        """Hits straddling the boundary are clipped and shortened."""
+        hits = [_hit("ccrA1", "contig_1", 901, 1100)]
+        projected = project_hits(hits, "contig_1", 1000, 50000, False, "elem")
+
+        assert len(projected) == 1
+        assert (projected[0].sstart, projected[0].send) == (1, 100)
+        assert projected[0].length == 100
+        assert (projected[0].qstart, projected[0].qend) == (101, 200)
+
+    def test_reverse_strand_hit_clipped(self):
+        """Clipping a minus-strand hit trims the matching query end."""
+        hits = [_hit("ccrA1", "contig_1", 1100, 901)]
+        projected = project_hits(hits, "contig_1", 1000, 50000, False, "elem")
+
+        assert (projected[0].sstart, projected[0].send) == (100, 1)
+        assert (projected[0].qstart, projected[0].qend) == (1, 100)
+
+    def test_region_across_origin(self):
+        """Hits after the origin of a circular contig continue the element."""
+        # Element is seq[900:] + seq[:300] of a 1000 bp contig
+        hits = [_hit("mecA", "contig_1", 951, 1000), _hit("ccrC1", "contig_1", 101, 200)]
+        projected = project_hits(hits, "contig_1", 900, 1300, False, "elem",
+                                 contig_length=1000)
+
+        assert [(h.sstart, h.send) for h in projected] == [(51, 100), (201, 300)]
+
+    def test_reverse_region_across_origin(self):
+        """Reverse regions past the contig end are mirrored as one interval."""
+        # Element is rc(seq[900:] + seq[:300]) of a 1000 bp contig
+        hits = [_hit("ccrC1", "contig_1", 101, 200)]
+        projected = project_hits(hits, "contig_1", 1300, 900, True, "elem",
+                                 contig_length=1000)
+
+        assert [(h.sstart, h.send) for h in projected] == [(200, 101)]
+
+
 class TestBlastInstallation:
     """Tests for BLAST+ installation check."""
 
@@ -246,6 +332,145 @@ class TestBlastInstallation:
                 BlastRunner()
 
 
+class TestRunBlastnTarget:
+    """blastn searches a database or a subject FASTA, never both."""
+
+    @pytest.fixture
+    def runner(self):
+        with patch("sccmecextractor.blast_utils.shutil.which", return_value="/usr/bin/x"):
+            return BlastRunner()
+
+    def test_subject_mode_command(self, runner, tmp_path):
+        out = str(tmp_path / "out.blast6")
+        with patch("sccmecextractor.blast_utils.subprocess.run") as run:
+            runner.run_blastn("query.fasta", None, output=out, subject="element.fasta")
+        cmd = run.call_args.args[0]
+        assert cmd[cmd.index("-subject") + 1] == "element.fasta"
+        assert "-db" not in cmd
+
+    def test_db_mode_command(self, runner, tmp_path):
+        out = str(tmp_path / "out.blast6")
+        with patch("sccmecextractor.blast_utils.subprocess.run") as run:
+            runner.run_blastn("query.fasta", "genome_db", output=out)
+        cmd = run.call_args.args[0]
+        assert cmd[cmd.index("-db") + 1] == "genome_db"
+        assert "-subject" not in cmd
+
+    @pytest.mark.parametrize("db, subject", [(None, None), ("genome_db", "element.fasta")])
+    def test_requires_exactly_one_target(self, runner, db, subject):
+        with pytest.raises(ValueError):
+            runner.run_blastn("query.fasta", db, subject=subject)
+
+
+class TestBlastLimits:
+    """configure_blast sets blastn threads and caps concurrent makeblastdb."""
+
+    @pytest.fixture
+    def runner(self):
+        saved = blast_settings()
+        with patch("sccmecextractor.blast_utils.shutil.which", return_value="/usr/bin/x"):
+            yield BlastRunner()
+        configure_blast(*saved)
+
+    def test_num_threads_for_db_searches_only(self, runner, tmp_path):
+        configure_blast(num_threads=4)
+        out = str(tmp_path / "out.blast6")
+        with patch("sccmecextractor.blast_utils.subprocess.run") as run:
+            runner.run_blastn("query.fasta", "genome_db", output=out)
+            runner.run_blastn("query.fasta", None, output=out, subject="element.fasta")
+        db_cmd, subject_cmd = (call.args[0] for call in run.call_args_list)
+        assert db_cmd[db_cmd.index("-num_threads") + 1] == "4"
+        assert "-num_threads" not in subject_cmd
+
+    def test_single_thread_by_default(self, runner, tmp_path):
+        configure_blast()
+        with patch("sccmecextractor.blast_utils.subprocess.run") as run:
+            runner.run_blastn("query.fasta", "genome_db", output=str(tmp_path / "o"))
+        assert "-num_threads" not in run.call_args.args[0]
+
+    def test_makeblastdb_limit(self, runner):
+        configure_blast(makeblastdb_limit=2)
+        lock = threading.Lock()
+        running = peak = 0
+
+        def fake_run(*args, **kwargs):
+            nonlocal running, peak
+            with lock:
+                running += 1
+                peak = max(peak, running)
+            time.sleep(0.02)
+            with lock:
+                running -= 1
+
+        with patch("sccmecextractor.blast_utils.subprocess.run", fake_run):
+            threads = [
+                threading.Thread(target=runner.create_db, args=("in.fasta", f"db{i}"))
+                for i in range(6)
+            ]
+            for t in threads:
+                t.start()
+            for t in threads:
+                t.join()
+        assert peak == 2
+
+
+class TestBlastTimeouts:
+    """BLAST commands are killed at the configured timeout or deadline."""
+
+    @pytest.fixture
+    def runner(self):
+        saved = blast_settings()
+        with patch("sccmecextractor.blast_utils.shutil.which", return_value="/usr/bin/x"):
+            yield BlastRunner()
+        configure_blast(*saved)
+
+    def test_no_limit_by_default(self, runner, tmp_path):
+        configure_blast()
+        with patch("sccmecextractor.blast_utils.subprocess.run") as run:
+            runner.run_blastn("query.fasta", "genome_db", output=str(tmp_path / "o"))
+        assert run.call_args.kwargs["timeout"] is None
+
+    def test_timeout_raises(self, runner, tmp_path):
+        configure_blast(timeout=5)
+        expired = subprocess.TimeoutExpired("blastn", 5)
+        with patch("sccmecextractor.blast_utils.subprocess.run", side_effect=expired):
+            with pytest.raises(BlastTimeoutError, match="blastn killed after 5s") as info:
+                runner.run_blastn("query.fasta", "genome_db", output=str(tmp_path / "o"))
+        assert not info.value.deadline
+
+    def test_deadline_shortens_timeout(self, runner, tmp_path):
+        configure_blast(timeout=60)
+        with patch("sccmecextractor.blast_utils.subprocess.run") as run:
+            with blast_deadline(time.monotonic() + 5):
+                runner.run_blastn("query.fasta", "genome_db", output=str(tmp_path / "o"))
+            runner.run_blastn("query.fasta", "genome_db", output=str(tmp_path / "o"))
+        first, second = (call.kwargs["timeout"] for call in run.call_args_list)
+        assert 0 < first <= 5 and second == 60
+
+    def test_past_deadline_runs_nothing(self, runner, tmp_path):
+        with patch("sccmecextractor.blast_utils.subprocess.run") as run:
+            with blast_deadline(time.monotonic() - 1):
+                with pytest.raises(BlastTimeoutError, match="time limit") as info:
+                    runner.run_blastn("query.fasta", "genome_db", output=str(tmp_path / "o"))
+        assert info.value.deadline and not run.called
+
+    def test_hung_makeblastdb_killed(self, runner, tmp_path):
+        """A makeblastdb that stops reading its input is killed by the timer."""
+        configure_blast(timeout=0.2)
+        popen = subprocess.Popen
+
+        def hang(cmd, **kwargs):
+            return popen(["sleep", "30"], **kwargs)
+
+        started = time.monotonic()
+        with patch("sccmecextractor.blast_utils.subprocess.Popen", hang):
+            with pytest.raises(BlastTimeoutError, match="makeblastdb killed"):
+                runner.create_db_from_stream(
+                    lambda fh: fh.write(b">c\nACGT\n"), str(tmp_path / "db"), "g",
+                )
+        assert time.monotonic() - started < 10
+
+
 class TestGetDefaultRef:
     """Tests for get_default_ref context manager."""
 
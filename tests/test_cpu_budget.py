@@ -0,0 +1,61 @@
+#!/usr/bin/env python
+
+"""Tests for splitting a CPU budget between workers and BLAST."""
+
+import pytest
+
+from sccmecextractor.cpu_budget import (
+    DEFAULT_BLAST_SHARE,
+    available_cpus,
+    plan_cpu_budget,
+)
+
+
+class TestGenomeSchedulerPlan:
+    """One worker per core; spare cores become blastn threads."""
+
+    def test_one_worker_per_core(self):
+        plan = plan_cpu_budget(32)
+        assert (plan.workers, plan.blast_threads) == (32, 1)
+        assert plan.makeblastdb_slots == 16
+
+    def test_few_genomes_get_blast_threads(self):
+        plan = plan_cpu_budget(64, genomes=4)
+        assert (plan.workers, plan.blast_threads) == (4, 16)
+        assert plan.workers * plan.blast_threads <= 64
+
+    def test_makeblastdb_follows_blast_share(self):
+        assert plan_cpu_budget(16, blast_share=0.25).makeblastdb_slots == 4
+        assert plan_cpu_budget(16, blast_share=0.0).makeblastdb_slots == 1
+
+    def test_invalid_budget(self):
+        with pytest.raises(ValueError):
+            plan_cpu_budget(0)
+
+
+class TestStagedPlan:
+    """Search and analysis cores add up to the budget."""
+
+    @pytest.mark.parametrize("cpus", [2, 8, 33, 128])
+    @pytest.mark.parametrize("share", [0.0, 0.3, DEFAULT_BLAST_SHARE, 0.9, 1.0])
+    def test_budget_not_exceeded(self, cpus, share):
+        plan = plan_cpu_budget(cpus, staged=True, blast_share=share)
+        assert plan.workers >= 1 and plan.blast_workers >= 1
+        assert plan.workers + plan.blast_workers * plan.blast_threads <= cpus
+
+    def test_split_follows_blast_share(self):
+        plan = plan_cpu_budget(40, staged=True, blast_share=0.75)
+        assert (plan.blast_workers, plan.workers) == (30, 10)
+
+    def test_single_cpu(self):
+        plan = plan_cpu_budget(1, staged=True)
+        assert (plan.workers, plan.blast_workers, plan.blast_threads) == (1, 1, 1)
+
+    def test_few_genomes_get_blast_threads(self):
+        plan = plan_cpu_budget(32, staged=True, genomes=2)
+        assert (plan.blast_workers, plan.blast_threads) == (2, 8)
+        assert plan.workers == 2
+
+
+def test_available_cpus():
+    assert available_cpus() >= 1
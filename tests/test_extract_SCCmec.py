@@ -12,10 +12,16 @@ import subprocess
 import sys
 from pathlib import Path
 from unittest.mock import patch
+from Bio import SeqIO
+from Bio.Seq import Seq
+from sccmecextractor.blast_utils import BlastResult
 from sccmecextractor.extract_SCCmec import (
     SCCmecExtractor, InputValidator, AttSite, AttSiteCollection,
-    ExtractionReport, RlmHBlastAdapter,
+    ExtractionReport, RlmHBlastAdapter, collect_genomes, run_batch,
+    ContigLengths, ElementCoordinates, load_genome_sequences,
 )
+from sccmecextractor.att_index import AttSiteIndex
+from sccmecextractor.fasta_shards import ShardReader, ShardWriter
 
 HAS_BLAST = shutil.which("blastn") is not None
 
@@ -786,4 +792,376 @@ class TestAttBOverlap:
         # With min_distance: skips overlapping, returns valid pair
         pair = sites.find_closest_pair(min_distance=1000)
         assert pair is not None
-        assert pair[1].pattern == "cattL"
\ No newline at end of file
+        assert pair[1].pattern == "cattL"
+
+
+class TestSortedSiteIndex:
+    """The sorted per-contig index matches an all-pairs scan."""
+
+    @staticmethod
+    def _brute_closest(sites, min_distance=0):
+        best_pair, best_dist = None, float("inf")
+        for right in [s for s in sites if s.is_right]:
+            for left in [s for s in sites if s.is_left]:
+                if right.contig != left.contig:
+                    continue
+                distance = right.distance_to(left)
+                if min_distance <= distance < best_dist:
+                    best_dist, best_pair = distance, (right, left)
+        return best_pair
+
+    @staticmethod
+    def _collection(sites):
+        collection = AttSiteCollection.__new__(AttSiteCollection)
+        collection.sites = sites
+        return collection
+
+    @pytest.mark.parametrize("seed", range(25))
+    def test_closest_pair_matches_all_pairs(self, seed):
+        import random
+
+        rng = random.Random(seed)
+        sites = []
+        for _ in range(rng.randint(0, 40)):
+            pattern = rng.choice(["attR", "cattR2", "attL", "cattL", "attL2"])
+            start = rng.randrange(0, 5000, 50)  # coarse grid forces ties
+            sites.append(AttSite(pattern, rng.choice(["c1", "c2"]), start, start + 18))
+        collection = self._collection(sites)
+
+        for min_distance in (0, 200, 1000):
+            assert collection.find_closest_pair(min_distance) == \
+                self._brute_closest(sites, min_distance)
+
+    def test_outer_left_site_ties_keep_first(self):
+        sites = [
+            AttSite("attR", "c1", 1000, 1018),
+            AttSite("attL", "c1", 20000, 20018),
+            AttSite("cattL", "c1", 60000, 60018),
+            AttSite("attL2", "c1", 60000, 60018),
+            AttSite("attL", "c2", 90000, 90018),
+        ]
+        collection = self._collection(sites)
+        pair = collection.find_closest_pair()
+        assert pair == (sites[0], sites[1])
+        assert collection.find_outer_left_site(pair, rlmH_start=500) is sites[2]
+        assert collection.find_outer_left_site(pair, rlmH_start=99999) is None
+
+    def test_index_follows_replaced_sites(self):
+        collection = self._collection([AttSite("attL", "c1", 10, 28)])
+        assert len(collection.get_sites_on_contig("c1")) == 1
+        collection.sites = [AttSite("attR", "c2", 10, 28)]
+        assert collection.get_sites_on_contig("c1") == []
+        assert len(collection.get_sites_on_contig("c2")) == 1
+
+
+class TestBatchExtraction:
+    """Batch extraction with a shared att index and a single report writer."""
+
+    @pytest.fixture
+    def batch_inputs(self, test_genome, test_gff, test_tsv, temp_output_dir):
+        genome_dir = temp_output_dir / "genomes"
+        gff_dir = temp_output_dir / "gffs"
+        genome_dir.mkdir()
+        gff_dir.mkdir()
+
+        lines = test_tsv.read_text().strip().split("\n")
+        att_tsv = temp_output_dir / "att_sites.tsv"
+        with open(att_tsv, "w") as f:
+            f.write(lines[0] + "\n")
+            for name in ("genome_b", "genome_a"):
+                shutil.copy(test_genome, genome_dir / f"{name}.fna")
+                shutil.copy(test_gff, gff_dir / f"{name}.gff3")
+                for line in lines[1:]:
+                    f.write(name + line[line.index("\t"):] + "\n")
+
+        return genome_dir, gff_dir, att_tsv
+
+    def test_collect_genomes_from_dirs_and_list(self, batch_inputs, temp_output_dir):
+        genome_dir, _, _ = batch_inputs
+        listing = temp_output_dir / "genomes.txt"
+        listing.write_text(f"# extra genomes\n{genome_dir / 'genome_b.fna'}\n")
+
+        genomes = collect_genomes([str(genome_dir)], manifest=str(listing))
+        assert [Path(g).name for g in genomes] == [
+            "genome_a.fna", "genome_b.fna", "genome_b.fna",
+        ]
+
+    def test_collect_genomes_from_att_index(self, batch_inputs):
+        genome_dir, _, att_tsv = batch_inputs
+        index = AttSiteIndex(str(att_tsv))
+        genomes = collect_genomes([str(genome_dir)], att_index=index)
+        index.close()
+        assert [Path(g).stem for g in genomes] == ["genome_b", "genome_a"]
+
+    @pytest.mark.skipif(not HAS_BLAST, reason="BLAST+ not installed")
+    @pytest.mark.parametrize("threads", [1, 2])
+    def test_reports_written_in_input_order(self, batch_inputs, temp_output_dir, threads):
+        genome_dir, gff_dir, att_tsv = batch_inputs
+        report = temp_output_dir / f"report_{threads}.tsv"
+        sccmec_dir = temp_output_dir / f"sccmec_{threads}"
+        sccmec_dir.mkdir()
+        genomes = [str(genome_dir / "genome_b.fna"), str(genome_dir / "genome_a.fna")]
+
+        results = run_batch(
+            genomes, str(att_tsv), str(sccmec_dir), report_file=str(report),
+            gff_dir=str(gff_dir), threads=threads,
+        )
+
+        assert [r.target for r in results] == ["genome_b", "genome_a"]
+        assert all(r.success for r in results)
+        rows = report.read_text().strip().split("\n")
+        assert rows[0] == ExtractionReport.HEADER
+        assert [row.split("\t")[0] for row in rows[1:]] == ["genome_b", "genome_a"]
+        assert sorted(p.name for p in sccmec_dir.iterdir()) == [
+            "genome_a_SCCmec.fasta", "genome_b_SCCmec.fasta",
+        ]
+
+    def test_single_gff_rejected_for_several_genomes(self, batch_inputs, temp_output_dir):
+        genome_dir, gff_dir, att_tsv = batch_inputs
+        genomes = [str(genome_dir / "genome_b.fna"), str(genome_dir / "genome_a.fna")]
+        gff = str(gff_dir / "genome_b.gff3")
+
+        with pytest.raises(ValueError, match="gff_dir"):
+            run_batch(genomes, str(att_tsv), str(temp_output_dir / "out"), gff=gff)
+
+        result = subprocess.run(
+            [sys.executable, "-m", "sccmecextractor.extract_SCCmec",
+             "-f", *genomes, "-g", gff, "-a", str(att_tsv),
+             "-s", str(temp_output_dir / "out")],
+            capture_output=True, text=True
+        )
+        assert result.returncode == 2
+        assert "--gff-dir" in result.stderr
+        assert not (temp_output_dir / "out").exists()
+
+
+class TestCircularExtraction:
+    """Elements spanning the origin of a circular chromosome."""
+
+    CONTIG_LENGTH = 300_000
+
+    @pytest.fixture
+    def circular_genome(self, temp_output_dir):
+        import random
+
+        rng = random.Random(11)
+        seq = "".join(rng.choice("ACGT") for _ in range(self.CONTIG_LENGTH))
+
+        def write(name, header):
+            fasta = temp_output_dir / f"{name}.fna"
+            with open(fasta, "w") as f:
+                f.write(f">{header}\n")
+                for i in range(0, len(seq), 80):
+                    f.write(seq[i:i + 80] + "\n")
+            return fasta
+
+        return seq, write
+
+    def _extractor(self, temp_output_dir, fasta, rlmh, attr, attl, ccr, **kwargs):
+        tsv = temp_output_dir / f"{fasta.stem}_att.tsv"
+        tsv.write_text(
+            "Input_File\tPattern\tContig\tStart\tEnd\tMatching_Sequence\n"
+            f"{fasta.stem}\tattR\tcontig_1\t{attr}\t{attr + 18}\tN\n"
+            f"{fasta.stem}\tattL\tcontig_1\t{attl}\t{attl + 18}\tN\n"
+        )
+        extractor = SCCmecExtractor(
+            str(fasta), tsv_file=str(tsv),
+            rlmh_positions={"contig_1": [(rlmh, rlmh + 480)]}, **kwargs,
+        )
+        extractor._filtered_ccr_hits = [
+            BlastResult("ccrC1", "contig_1", 99.0, 1000, 0, 0, 1, 1000,
+                        ccr, ccr + 999, 0.0, 1800.0),
+        ]
+        return extractor
+
+    def _row(self, report_file):
+        lines = report_file.read_text().strip().split("\n")
+        return dict(zip(lines[0].split("\t"), lines[1].split("\t")))
+
+    def test_linear_contig_reports_origin_spanning(self, circular_genome, temp_output_dir):
+        _, write = circular_genome
+        fasta = write("linear", "contig_1")
+        report_file = temp_output_dir / "report.tsv"
+        # ccr within the linear span, so only the size check fails
+        extractor = self._extractor(temp_output_dir, fasta, 290_000, 290_500, 20_000, 100_000)
+
+        assert not extractor.extract_sccmec(str(temp_output_dir / "out"),
+                                            report_file=str(report_file))
+        row = self._row(report_file)
+        assert row["Failure_Reason"] == "origin_spanning"
+        assert "--circular" in row["Notes"]
+
+    @pytest.mark.parametrize("header,circular", [
+        ("contig_1 length=300000 circular=true", False),
+        ("contig_1 [topology=circular]", False),
+        ("contig_1", True),
+    ])
+    def test_forward_element_joined_across_origin(self, circular_genome, temp_output_dir,
+                                                  header, circular):
+        seq, write = circular_genome
+        fasta = write("forward", header)
+        report_file = temp_output_dir / "report.tsv"
+        out_dir = temp_output_dir / "out"
+        extractor = self._extractor(temp_output_dir, fasta, 290_000, 290_500, 20_000, 10_000,
+                                    circular=circular)
+
+        assert extractor.extract_sccmec(str(out_dir), report_file=str(report_file))
+        row = self._row(report_file)
+        assert row["Status"] == "extracted"
+        assert row["Element_Size_bp"] == str(self.CONTIG_LENGTH - 290_500 + 20_018)
+        assert row["Contig_Edge_Flags"] == "-"
+        assert "Origin-spanning" in row["Notes"]
+
+        region = extractor.extracted_region
+        assert region.contig_length == self.CONTIG_LENGTH
+        assert not region.reverse_complement
+        record = next(SeqIO.parse(str(out_dir / "forward_SCCmec.fasta"), "fasta"))
+        assert str(record.seq) == seq[289_970:] + seq[:20_048]
+
+    def test_reverse_element_joined_across_origin(self, circular_genome, temp_output_dir):
+        seq, write = circular_genome
+        fasta = write("reverse", "contig_1 circular=true")
+        out_dir = temp_output_dir / "out"
+        extractor = self._extractor(temp_output_dir, fasta, 5_000, 5_500, 280_000, 290_000)
+
+        assert extractor.extract_sccmec(str(out_dir))
+        region = extractor.extracted_region
+        assert region.reverse_complement
+        assert (region.start, region.end) == (5_000 + self.CONTIG_LENGTH + 600, 279_958)
+        record = next(SeqIO.parse(str(out_dir / "reverse_SCCmec.fasta"), "fasta"))
+        expected = Seq(seq[279_958:] + seq[:5_600]).reverse_complement()
+        assert str(record.seq) == str(expected)
+
+    @pytest.mark.parametrize("name, args", [
+        ("forward", (290_000, 290_500, 20_000, 10_000)),
+        ("reverse", (5_000, 5_500, 280_000, 290_000)),
+    ])
+    def test_coordinates_only_splits_at_origin(self, circular_genome, temp_output_dir,
+                                               name, args):
+        """Wrapped elements are two valid BED rows that join to the FASTA."""
+        seq, write = circular_genome
+        fasta = write(name, "contig_1 circular=true")
+        fasta_dir = temp_output_dir / "fasta"
+        assert self._extractor(temp_output_dir, fasta, *args).extract_sccmec(str(fasta_dir))
+        record = next(SeqIO.parse(str(fasta_dir / f"{name}_SCCmec.fasta"), "fasta"))
+
+        bed = temp_output_dir / "coords.bed"
+        extractor = self._extractor(temp_output_dir, fasta, *args, coordinates_only=True)
+        assert extractor.extract_sccmec(str(temp_output_dir / "bed"),
+                                        coordinates_file=str(bed))
+        rows = [line.split("\t") for line in bed.read_text().split("\n")[1:] if line]
+        assert len(rows) == 2
+        joined = ""
+        for contig, start, end, row_name, _, strand, _, _, length in rows:
+            assert 0 <= int(start) < int(end) <= int(length) == self.CONTIG_LENGTH
+            assert row_name == record.id
+            part = Seq(seq[int(start):int(end)])
+            joined += str(part.reverse_complement() if strand == "-" else part)
+        assert joined == str(record.seq)
+
+    def test_ccr_outside_wrapped_element_rejected(self, circular_genome, temp_output_dir):
+        _, write = circular_genome
+        fasta = write("no_ccr", "contig_1 circular=true")
+        extractor = self._extractor(temp_output_dir, fasta, 290_000, 290_500, 20_000, 150_000)
+
+        assert not extractor.extract_sccmec(str(temp_output_dir / "out"))
+
+
+class TestCoordinatesOnly:
+    """Coordinates-only mode writes BED intervals instead of sequences."""
+
+    @staticmethod
+    def _bed_rows(bed):
+        lines = bed.read_text().strip().split("\n")
+        assert lines[0] == ElementCoordinates.HEADER
+        return [line.split("\t") for line in lines[1:]]
+
+    @patch.object(SCCmecExtractor, '_detect_ccr_between', return_value=True)
+    def test_interval_matches_extracted_fasta(self, mock_ccr, test_genome, test_gff,
+                                              test_tsv, temp_output_dir):
+        fasta_dir = temp_output_dir / "fasta"
+        SCCmecExtractor(str(test_genome), str(test_gff), str(test_tsv)).extract_sccmec(
+            str(fasta_dir))
+        record = next(SeqIO.parse(str(fasta_dir / "test_genome_SCCmec.fasta"), "fasta"))
+
+        bed_dir = temp_output_dir / "bed"
+        bed = bed_dir / "coords.bed"
+        extractor = SCCmecExtractor(str(test_genome), str(test_gff), str(test_tsv),
+                                    coordinates_only=True)
+        assert extractor.extract_sccmec(str(bed_dir), coordinates_file=str(bed))
+        assert not list(bed_dir.glob("*.fasta"))
+
+        [row] = self._bed_rows(bed)
+        contig, start, end, name, _, strand, input_file, interval, _ = row
+        assert (name, input_file, interval) == (record.id, "test_genome", "element")
+        assert extractor.extracted_region.record_id == record.id
+
+        genome = SeqIO.to_dict(SeqIO.parse(str(test_genome), "fasta"))
+        region = genome[contig].seq[int(start):int(end)]
+        if strand == "-":
+            region = region.reverse_complement()
+        assert str(region) == str(record.seq)
+
+    @patch.object(SCCmecExtractor, '_detect_ccr_between', return_value=True)
+    def test_composite_writes_inner_and_composite(self, mock_ccr, test_genome, test_gff,
+                                                  composite_tsv, temp_output_dir):
+        bed = temp_output_dir / "coords.bed"
+        extractor = SCCmecExtractor(str(test_genome), str(test_gff), str(composite_tsv),
+                                    composite=True, coordinates_only=True)
+        assert extractor.extract_sccmec(str(temp_output_dir / "out"),
+                                        coordinates_file=str(bed))
+
+        rows = self._bed_rows(bed)
+        assert [row[7] for row in rows] == ["composite", "inner"]
+        assert all(row[5] == "-" for row in rows)
+        composite, inner = rows
+        # Reverse orientation: the outer attL extends the element downwards
+        assert int(composite[1]) < int(inner[1]) and composite[2] == inner[2]
+
+    def test_lengths_only_backend_for_unindexable_fasta(self, tmp_path):
+        fasta = tmp_path / "ragged.fna"
+        fasta.write_text(">c1 circular=true\nACGT\nACGTACGT\nAC\n>c2\nAC\n")
+        genome = load_genome_sequences(str(fasta), lengths_only=True)
+        assert isinstance(genome, ContigLengths)
+        assert genome.get_contig_length("c1") == 14
+        assert genome.get_contig_length("c2") == 2
+        assert genome.get_description("c1") == "c1 circular=true"
+
+
+class TestBundledOutput:
+    """Bundled mode adds elements to shards instead of per-genome files."""
+
+    @patch.object(SCCmecExtractor, '_detect_ccr_between', return_value=True)
+    def test_element_matches_unbundled_fasta(self, mock_ccr, test_genome, test_gff,
+                                             test_tsv, temp_output_dir):
+        fasta_dir = temp_output_dir / "fasta"
+        SCCmecExtractor(str(test_genome), str(test_gff), str(test_tsv)).extract_sccmec(
+            str(fasta_dir))
+        record = next(SeqIO.parse(str(fasta_dir / "test_genome_SCCmec.fasta"), "fasta"))
+
+        bundle_dir = temp_output_dir / "bundle"
+        with ShardWriter(str(bundle_dir)) as writer:
+            extractor = SCCmecExtractor(str(test_genome), str(test_gff), str(test_tsv),
+                                        bundle=writer)
+            assert extractor.extract_sccmec(str(bundle_dir))
+        assert not list(bundle_dir.glob("*.fasta"))
+
+        stored = ShardReader(str(bundle_dir)).fetch("test_genome")
+        assert stored.id == record.id
+        assert str(stored.seq) == str(record.seq)
+
+    @patch.object(SCCmecExtractor, '_detect_ccr_between', return_value=True)
+    def test_stored_input_is_skipped(self, mock_ccr, test_genome, test_gff,
+                                     test_tsv, temp_output_dir):
+        report = temp_output_dir / "report.tsv"
+        with ShardWriter(str(temp_output_dir)) as writer:
+            SCCmecExtractor(str(test_genome), str(test_gff), str(test_tsv),
+                            bundle=writer).extract_sccmec(str(temp_output_dir))
+
+        with ShardWriter(str(temp_output_dir)) as writer:
+            extractor = SCCmecExtractor(str(test_genome), str(test_gff), str(test_tsv),
+                                        bundle=writer)
+            assert not extractor.extract_sccmec(str(temp_output_dir),
+                                                report_file=str(report))
+        assert "\tskipped\t" in report.read_text()
+        assert len(ShardReader(str(temp_output_dir)).shards()) == 1
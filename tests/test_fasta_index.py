@@ -0,0 +1,116 @@
+#!/usr/bin/env python
+
+"""Tests for fasta_index.py and the indexed GenomeSequences backend."""
+
+import random
+
+import pytest
+
+from sccmecextractor.extract_SCCmec import (
+    GenomeSequences, IndexedGenomeSequences, load_genome_sequences,
+)
+from sccmecextractor.fasta_index import (
+    FastaIndexError, IndexedFasta, build_fai, fai_path, read_fai,
+)
+
+
+def _write_fasta(path, records, width=60, newline="\n"):
+    with open(path, "w", newline="") as f:
+        for name, seq in records:
+            f.write(f">{name} some description{newline}")
+            for i in range(0, len(seq), width):
+                f.write(seq[i:i + width] + newline)
+
+
+@pytest.fixture
+def records():
+    rng = random.Random(7)
+    return [
+        ("contig_1", "".join(rng.choice("ACGT") for _ in range(1234))),
+        ("contig_2", "".join(rng.choice("acgtN") for _ in range(60))),
+        ("contig_3", "".join(rng.choice("ACGT") for _ in range(7))),
+    ]
+
+
+class TestFastaIndex:
+
+    @pytest.mark.parametrize("newline", ["\n", "\r\n"])
+    def test_fetch_matches_slicing(self, tmp_path, records, newline):
+        fasta = tmp_path / "genome.fna"
+        _write_fasta(fasta, records, width=50, newline=newline)
+        indexed = IndexedFasta(str(fasta))
+
+        for name, seq in records:
+            assert indexed.length(name) == len(seq)
+            for start, end in [(0, len(seq)), (3, 3), (49, 51), (-30, None),
+                               (-5000, 10), (5, 5000), (40, 20)]:
+                assert indexed.fetch(name, start, end).decode() == seq[start:end]
+        indexed.close()
+
+    def test_fai_written_and_reused(self, tmp_path, records):
+        fasta = tmp_path / "genome.fna"
+        _write_fasta(fasta, records)
+        IndexedFasta(str(fasta)).close()
+
+        entries = read_fai(fai_path(str(fasta)))
+        assert [(e.name, e.length) for e in entries] == [(n, len(s)) for n, s in records]
+        assert entries == build_fai(str(fasta))
+
+    def test_ragged_lines_rejected(self, tmp_path):
+        fasta = tmp_path / "ragged.fna"
+        fasta.write_text(">c1\nACGT\nACGTACGT\nAC\n")
+        with pytest.raises(FastaIndexError):
+            build_fai(str(fasta))
+
+    def test_duplicate_contig_rejected(self, tmp_path, records):
+        fasta = tmp_path / "genome.fna"
+        _write_fasta(fasta, records + [records[0]])
+
+        # Both when the index is built and when the written one is reused
+        for _ in range(2):
+            with pytest.raises(ValueError, match="duplicate contig ID 'contig_1'") as err:
+                IndexedFasta(str(fasta))
+            assert not isinstance(err.value, FastaIndexError)
+        assert len(read_fai(fai_path(str(fasta)))) == 4
+
+
+class TestIndexedGenomeSequences:
+
+    def test_regions_match_parsed_genome(self, tmp_path, records):
+        fasta = tmp_path / "genome.fna"
+        _write_fasta(fasta, records, width=70)
+        parsed = GenomeSequences(str(fasta))
+        indexed = IndexedGenomeSequences(str(fasta))
+
+        for name, seq in records:
+            assert indexed.get_contig_length(name) == parsed.get_contig_length(name)
+            for start, end, rc in [(100, 900, False), (900, 100, True), (-30, 10, False)]:
+                assert str(indexed.extract_region(name, start, end, rc)) == \
+                    str(parsed.extract_region(name, start, end, rc))
+        assert indexed.get_contig_length("missing") is None
+        with pytest.raises(ValueError):
+            indexed.extract_region("missing", 0, 10)
+        indexed.close()
+
+    def test_circular_regions_and_headers_match(self, tmp_path, records):
+        fasta = tmp_path / "genome.fna"
+        _write_fasta(fasta, records, width=70)
+        parsed = GenomeSequences(str(fasta))
+        indexed = IndexedGenomeSequences(str(fasta))
+
+        for name, seq in records:
+            assert indexed.get_description(name) == parsed.get_description(name)
+            n = len(seq)
+            for start, end, rc in [(n - 5, n + 3, False), (n + 3, n - 5, True)]:
+                assert str(indexed.extract_region(name, start, end, rc, circular=True)) == \
+                    str(parsed.extract_region(name, start, end, rc, circular=True))
+        assert str(parsed.extract_region("contig_1", 1230, 1238, circular=True)) == \
+            records[0][1][1230:] + records[0][1][:4]
+        indexed.close()
+
+    def test_falls_back_for_unindexable_fasta(self, tmp_path):
+        fasta = tmp_path / "ragged.fna"
+        fasta.write_text(">c1\nACGT\nACGTACGT\nAC\n")
+        genome = load_genome_sequences(str(fasta))
+        assert isinstance(genome, GenomeSequences)
+        assert genome.get_contig_length("c1") == 14
@@ -0,0 +1,148 @@
+#!/usr/bin/env python
+
+"""Tests for fasta_shards.py."""
+
+import gzip
+
+import pytest
+from Bio import SeqIO, bgzf
+from Bio.Seq import Seq
+from Bio.SeqRecord import SeqRecord
+
+from sccmecextractor.fasta_index import read_fai
+from sccmecextractor.fasta_shards import (
+    RECORD_MAP_FILENAME,
+    RecordCollector,
+    ShardReader,
+    ShardWriter,
+    read_gzi,
+    read_record_map,
+    shard_paths,
+    split_source,
+    shard_source,
+)
+
+
+def _record(i: int, length: int = 150) -> SeqRecord:
+    seq = "".join("ACGT"[(i * 7 + j * 3) % 4] for j in range(length))
+    return SeqRecord(Seq(seq), id=f"contig_{i}_100_{100 + length}",
+                     description=f"SCCmec element genome_{i}")
+
+
+def _write(directory, count, per_shard=3, length=150):
+    with ShardWriter(str(directory), records_per_shard=per_shard) as writer:
+        for i in range(count):
+            writer.add(f"genome_{i}", _record(i, length))
+
+
+class TestShardWriter:
+
+    def test_rotates_shards_and_maps_records(self, tmp_path):
+        _write(tmp_path, 7)
+        shards = shard_paths(str(tmp_path))
+        assert [s.rsplit("/", 1)[1] for s in shards] == [
+            "sccmec_00000.fasta.gz", "sccmec_00001.fasta.gz", "sccmec_00002.fasta.gz",
+        ]
+        locations = read_record_map(str(tmp_path))
+        assert len(locations) == 7
+        assert locations["genome_4"].shard == "sccmec_00001.fasta.gz"
+        assert locations["genome_4"].record_id == _record(4).id
+
+    def test_shard_is_plain_gzip_fasta(self, tmp_path):
+        _write(tmp_path, 3)
+        with gzip.open(shard_paths(str(tmp_path))[0], "rt") as f:
+            records = list(SeqIO.parse(f, "fasta"))
+        assert [str(r.seq) for r in records] == [str(_record(i).seq) for i in range(3)]
+        assert records[0].description == "contig_0_100_250 SCCmec element genome_0"
+
+    def test_fai_offsets_are_uncompressed(self, tmp_path):
+        _write(tmp_path, 3)
+        shard = shard_paths(str(tmp_path))[0]
+        with gzip.open(shard, "rb") as f:
+            data = f.read()
+        for i, entry in enumerate(read_fai(shard + ".fai")):
+            assert entry.length == 150
+            assert data[entry.offset:entry.offset + 60].decode() == str(_record(i).seq[:60])
+
+    def test_gzi_lists_block_starts(self, tmp_path):
+        # Large records force several BGZF blocks per shard
+        _write(tmp_path, 3, length=40_000)
+        shard = shard_paths(str(tmp_path))[0]
+        blocks = read_gzi(shard + ".gzi")
+        with open(shard, "rb") as handle:
+            starts = [start for start, _, _, data_len in bgzf.BgzfBlocks(handle) if data_len]
+        assert len(blocks) > 1
+        assert [c for c, _ in blocks] == starts
+
+    def test_reopen_appends_new_shard(self, tmp_path):
+        _write(tmp_path, 4)
+        with ShardWriter(str(tmp_path), records_per_shard=3) as writer:
+            assert "genome_0" in writer
+            writer.add("late_genome", _record(9))
+        assert read_record_map(str(tmp_path))["late_genome"].shard == "sccmec_00002.fasta.gz"
+        assert len(read_record_map(str(tmp_path))) == 5
+
+    def test_duplicate_input_rejected(self, tmp_path):
+        with ShardWriter(str(tmp_path)) as writer:
+            writer.add("genome_0", _record(0))
+            with pytest.raises(ValueError, match="already stored"):
+                writer.add("genome_0", _record(1))
+
+    def test_discarded_input_is_replaced(self, tmp_path):
+        _write(tmp_path, 2)
+        with ShardWriter(str(tmp_path)) as writer:
+            writer.discard("genome_1")
+            assert "genome_1" not in writer
+            writer.add("genome_1", _record(5))
+        location = read_record_map(str(tmp_path))["genome_1"]
+        assert location.shard == "sccmec_00001.fasta.gz"
+        assert str(ShardReader(str(tmp_path)).fetch("genome_1").seq) == str(_record(5).seq)
+
+    def test_unfinished_shard_is_not_mapped(self, tmp_path):
+        writer = ShardWriter(str(tmp_path), records_per_shard=3)
+        for i in range(4):
+            writer.add(f"genome_{i}", _record(i))
+        # Only the first (full) shard is finished and mapped before close
+        assert len(read_record_map(str(tmp_path))) == 3
+        writer.close()
+        assert len(read_record_map(str(tmp_path))) == 4
+        assert (tmp_path / RECORD_MAP_FILENAME).read_text().count("Input_File") == 1
+
+
+class TestShardReader:
+
+    def test_fetch_round_trips(self, tmp_path):
+        _write(tmp_path, 7, length=40_000)
+        reader = ShardReader(str(tmp_path))
+        for i in (0, 4, 6):
+            expected = _record(i, 40_000)
+            record = reader.fetch(f"genome_{i}")
+            assert record.id == expected.id
+            assert str(record.seq) == str(expected.seq)
+
+    def test_records_in_shard_and_decompress(self, tmp_path):
+        _write(tmp_path, 5)
+        reader = ShardReader(str(tmp_path))
+        assert reader.shards() == ["sccmec_00000.fasta.gz", "sccmec_00001.fasta.gz"]
+        assert [loc.input_file for loc in reader.records_in_shard("sccmec_00001.fasta.gz")] \
+            == ["genome_3", "genome_4"]
+
+        out = tmp_path / "plain.fasta"
+        reader.decompress_shard("sccmec_00001.fasta.gz", str(out))
+        assert [r.id for r in SeqIO.parse(str(out), "fasta")] == [
+            _record(3).id, _record(4).id,
+        ]
+
+
+class TestHelpers:
+
+    def test_record_collector(self):
+        collector = RecordCollector({"done"})
+        assert "done" in collector and "new" not in collector
+        collector.add("new", _record(0))
+        assert collector.records[0][0] == "new"
+
+    def test_source_round_trip(self):
+        source = shard_source("/out/sccmec_00000.fasta.gz", "contig_1_5_10")
+        assert split_source(source) == ("/out/sccmec_00000.fasta.gz", "contig_1_5_10")
+        assert split_source("/data/genome.fna") == ("/data/genome.fna", None)
@@ -0,0 +1,143 @@
+#!/usr/bin/env python
+
+"""Tests for genome_buffer.py."""
+
+import io
+import pickle
+import shutil
+import warnings
+from concurrent.futures import ProcessPoolExecutor
+
+import pytest
+from Bio import SeqIO
+
+from sccmecextractor.blast_utils import BlastRunner, parse_blast_output
+from sccmecextractor.extract_SCCmec import GenomeSequences
+from sccmecextractor.genome_buffer import GenomeBuffer, SharedGenome, as_genome_buffer
+from sccmecextractor.locate_att_sites import AttSiteFinder
+
+HAS_BLAST = shutil.which("blastn") is not None
+
+
+@pytest.fixture
+def genome(test_genome):
+    return GenomeBuffer.from_fasta(str(test_genome))
+
+
+class TestGenomeBuffer:
+
+    def test_contigs_match_seqio(self, genome, test_genome):
+        records = list(SeqIO.parse(str(test_genome), "fasta"))
+        assert genome.contigs == [r.id for r in records]
+        for record in records:
+            assert bytes(genome.view(record.id)) == str(record.seq).encode()
+            assert genome.get_contig_length(record.id) == len(record.seq)
+
+    def test_extract_region_matches_genome_sequences(self, genome, test_genome):
+        parsed = GenomeSequences(str(test_genome))
+        contig = genome.contigs[0]
+        for start, end, rc in [(100, 5000, False), (5000, 100, True), (-50, 20, False)]:
+            assert str(genome.extract_region(contig, start, end, rc)) == \
+                str(parsed.extract_region(contig, start, end, rc))
+        with pytest.raises(ValueError):
+            genome.extract_region("missing", 0, 10)
+
+    def test_circular_region_and_header(self, tmp_path):
+        fasta = tmp_path / "circular.fna"
+        fasta.write_text(">chrom length=12 circular=true\nAACCGGTTACGT\n")
+        genome = GenomeBuffer.from_fasta(str(fasta))
+        assert genome.get_description("chrom") == "chrom length=12 circular=true"
+        assert str(genome.extract_region("chrom", 9, 14, circular=True)) == "CGTAA"
+        assert str(genome.extract_region("chrom", 14, 9, True, circular=True)) == "TTACG"
+        assert str(genome.extract_region("chrom", 9, 14)) == "CGT"
+
+    def test_duplicate_contig_rejected(self, tmp_path):
+        """A repeated ID would leave the first contig unreachable."""
+        fasta = tmp_path / "dup.fna"
+        fasta.write_text(">c1\nACGT\n>c2\nGG\n>c1 again\nTTTT\n")
+        with pytest.raises(ValueError, match="duplicate contig ID 'c1'"):
+            GenomeBuffer.from_fasta(str(fasta))
+
+    def test_digest_ignores_layout(self, tmp_path):
+        wrapped = tmp_path / "wrapped.fna"
+        wrapped.write_text(">c1 first\nACGT\nAC\n>c2\nGG\n")
+        flat = tmp_path / "flat.fna"
+        flat.write_text(">c1\nACGTAC\n>c2\nGG\n")
+        changed = tmp_path / "changed.fna"
+        changed.write_text(">c1\nACGTAC\n>c2\nGA\n")
+        digests = [GenomeBuffer.from_fasta(str(p)).digest() for p in (wrapped, flat, changed)]
+        assert digests[0] == digests[1] != digests[2]
+
+    def test_write_fasta_round_trips(self, genome):
+        out = io.BytesIO()
+        genome.write_fasta(out, line_width=60)
+        records = list(SeqIO.parse(io.StringIO(out.getvalue().decode()), "fasta"))
+        assert [r.id for r in records] == genome.contigs
+        assert all(str(r.seq).encode() == bytes(genome.view(r.id)) for r in records)
+
+    def test_att_scan_matches_string_scan(self, genome, test_genome):
+        """Scanning the buffer in place finds the same sites as str contigs."""
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", UserWarning)
+            from_strings = AttSiteFinder(str(test_genome)).find_all_sites()
+            from_buffer = AttSiteFinder(str(test_genome), genome_buffer=genome).find_all_sites()
+
+        def key(site):
+            return (site.pattern_name, site.contig, site.start, site.end, site.match_seq)
+
+        assert from_strings
+        assert [key(s) for s in from_buffer] == [key(s) for s in from_strings]
+
+    @pytest.mark.skipif(not HAS_BLAST, reason="BLAST+ not installed")
+    def test_blast_db_from_buffer(self, genome, tmp_path):
+        runner = BlastRunner()
+        db = runner.create_db_from_stream(genome.write_fasta, str(tmp_path / "db"), title="g")
+        query = tmp_path / "query.fasta"
+        contig = genome.contigs[0]
+        query.write_text(f">probe\n{genome.extract_region(contig, 1000, 1500)}\n")
+
+        hits = parse_blast_output(runner.run_blastn(str(query), db))
+        assert any(h.sseqid == contig and min(h.sstart, h.send) == 1001 for h in hits)
+
+
+def _scan_in_worker(descriptor):
+    """Runs in a child process: attach and scan without the FASTA."""
+    genome = GenomeBuffer.attach(descriptor)
+    try:
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", UserWarning)
+            finder = AttSiteFinder(descriptor.fasta_file, genome_buffer=genome)
+            sites = [(s.pattern_name, s.contig, s.start) for s in finder.find_all_sites()]
+        region = str(genome.extract_region(genome.contigs[0], 100, 200, True))
+        return sites, region
+    finally:
+        genome.close()
+
+
+class TestSharedGenome:
+
+    def test_descriptor_attaches_to_same_bases(self, genome, test_genome):
+        with SharedGenome(genome) as shared:
+            attached = GenomeBuffer.attach(shared.descriptor)
+            assert attached.contigs == genome.contigs
+            for contig in genome.contigs:
+                assert bytes(attached.view(contig)) == bytes(genome.view(contig))
+            attached.close()
+
+    def test_descriptor_is_small_when_pickled(self, genome):
+        with SharedGenome(genome) as shared:
+            assert len(pickle.dumps(shared.descriptor)) < 1024 < len(genome.data)
+            assert as_genome_buffer(genome) is genome
+
+    def test_worker_process_reads_shared_genome(self, genome, test_genome):
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", UserWarning)
+            expected = [(s.pattern_name, s.contig, s.start)
+                        for s in AttSiteFinder(str(test_genome)).find_all_sites()]
+
+        with SharedGenome(genome) as shared:
+            with ProcessPoolExecutor(max_workers=1) as pool:
+                sites, region = pool.submit(_scan_in_worker, shared.descriptor).result()
+
+        assert sites == expected
+        assert region == str(genome.extract_region(genome.contigs[0], 100, 200, True))
@@ -0,0 +1,118 @@
+#!/usr/bin/env python
+
+"""Tests for hit_store.py (no BLAST+ installation needed)."""
+
+import pytest
+
+from sccmecextractor.blast_utils import BlastResult
+from sccmecextractor.hit_store import HitStore, StoredRegion
+
+
+def _hit(qseqid, sstart, send, sseqid="contig_1"):
+    return BlastResult(
+        qseqid=qseqid, sseqid=sseqid, pident=98.5, length=abs(send - sstart) + 1,
+        mismatch=3, gapopen=0, qstart=1, qend=abs(send - sstart) + 1,
+        sstart=sstart, send=send, evalue=1e-30, bitscore=812.0,
+    )
+
+
+@pytest.fixture
+def store(tmp_path):
+    hit_store = HitStore(str(tmp_path / "hits.sqlite"))
+    yield hit_store
+    hit_store.close()
+
+
+class TestHitStore:
+    """Round-tripping raw hits through the SQLite store."""
+
+    def test_round_trip(self, store):
+        """Hits, source and region are returned exactly as saved."""
+        hits = [_hit("mecA", 5000, 7006), _hit("ccrC1", 9000, 7400)]
+        region = StoredRegion("contig_1", 1000, 60000, True, "genome_contig_1_1000_60000")
+
+        store.save("genome_SCCmec", hits, source="/data/genome.fna", region=region)
+        loaded, source, loaded_region = store.load("genome_SCCmec")
+
+        assert loaded == hits
+        assert source == "/data/genome.fna"
+        assert loaded_region == region
+
+    def test_origin_spanning_region(self, store):
+        """The circular contig length of an origin-spanning region is kept."""
+        region = StoredRegion("contig_1", 290000, 320048, False, "elem", 300000)
+        store.save("genome_SCCmec", [], region=region)
+        assert store.load("genome_SCCmec")[2] == region
+
+    def test_wgs_entry_has_no_region(self, store):
+        """Entries saved without a region load with region None."""
+        store.save("genome", [_hit("mecA", 5000, 7006)])
+        _, source, region = store.load("genome")
+        assert source is None
+        assert region is None
+
+    def test_save_replaces_previous_hits(self, store):
+        """Saving the same input twice keeps only the latest hits."""
+        store.save("genome", [_hit("mecA", 5000, 7006)])
+        store.save("genome", [_hit("ccrA1", 100, 1449)])
+
+        loaded, _, _ = store.load("genome")
+        assert [h.qseqid for h in loaded] == ["ccrA1"]
+        assert store.input_names() == ["genome"]
+
+    def test_input_names_in_insertion_order(self, store):
+        for name in ("b", "a", "c"):
+            store.save(name, [])
+        assert store.input_names() == ["b", "a", "c"]
+
+    def test_resaved_input_keeps_position(self, store):
+        for name in ("b", "a", "c"):
+            store.save(name, [])
+        store.save("b", [_hit("mecA", 5000, 7006)], source="b.fasta")
+
+        assert store.input_names() == ["b", "a", "c"]
+        loaded, source, _ = store.load("b")
+        assert [h.qseqid for h in loaded] == ["mecA"]
+        assert source == "b.fasta"
+
+    def test_missing_input_raises(self, store):
+        with pytest.raises(KeyError):
+            store.load("absent")
+
+    def test_add_hits_appends(self, store):
+        store.save("genome", [_hit("mecA", 5000, 7006)])
+        store.add_hits("genome", [_hit("ccrC1", 9000, 10677)])
+
+        loaded, _, _ = store.load("genome")
+        assert [h.qseqid for h in loaded] == ["mecA", "ccrC1"]
+
+    def test_references_round_trip(self, store):
+        assert store.references() == {}
+        store.set_references({"mecA": "aa", "ccrC1": "bb"})
+        assert store.references() == {"aa": "mecA", "bb": "ccrC1"}
+
+        store.set_references({"mecA": "aa"})
+        assert store.references() == {"aa": "mecA"}
+
+    def test_references_rename_stored_hits(self, store):
+        """Hits follow their sequence's ID; removed references' hits go."""
+        store.set_references({"mecA": "aa", "ccrA1": "bb", "ccrC1": "cc"})
+        store.save("genome", [_hit("mecA", 5000, 7006), _hit("ccrA1", 100, 1449),
+                              _hit("ccrC1", 9000, 10677)])
+
+        # mecA and ccrA1 swap names; ccrC1 is removed
+        store.set_references({"ccrA1": "aa", "mecA": "bb"})
+        loaded, _, _ = store.load("genome")
+        assert [h.qseqid for h in loaded] == ["ccrA1", "mecA"]
+        assert [h.sstart for h in loaded] == [5000, 100]
+
+    def test_reopen_persists(self, tmp_path):
+        """Entries survive closing and reopening the store."""
+        path = str(tmp_path / "hits.sqlite")
+        first = HitStore(path)
+        first.save("genome", [_hit("mecA", 5000, 7006)])
+        first.close()
+
+        second = HitStore(path)
+        assert second.input_names() == ["genome"]
+        second.close()
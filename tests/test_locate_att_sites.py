@@ -365,4 +365,17 @@ class TestNoGffNoBlast:
             finder = AttSiteFinder(str(test_genome))
             user_warnings = [x for x in w if issubclass(x.category, UserWarning)]
             assert len(user_warnings) == 1
-            assert "No GFF file" in str(user_warnings[0].message)
\ No newline at end of file
+            assert "No GFF file" in str(user_warnings[0].message)
+
+class TestPrecomputedRlmH:
+    """rlmH positions found by an earlier stage replace GFF/BLAST detection."""
+
+    def test_matches_gff_filtering(self, test_genome, test_gff):
+        gff_finder = AttSiteFinder(str(test_genome), str(test_gff))
+        positions = gff_finder.gene_parser.rlmH_genes
+        finder = AttSiteFinder(str(test_genome), rlmh_positions=positions)
+
+        assert finder.gene_parser.rlmH_genes == positions
+        expected = gff_finder.filter_sites(gff_finder.find_all_sites())
+        assert [str(s) for s in finder.filter_sites(finder.find_all_sites())] \
+            == [str(s) for s in expected]
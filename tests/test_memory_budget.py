@@ -0,0 +1,99 @@
+#!/usr/bin/env python
+
+"""Tests for memory-aware admission of genomes."""
+
+import os
+import subprocess
+import sys
+import time
+
+import pytest
+
+from sccmecextractor.memory_budget import (
+    GENOME_MEMORY_FACTOR,
+    GENOME_MEMORY_OVERHEAD,
+    MemoryGate,
+    estimate_genome_footprint,
+    parse_size,
+    process_tree_rss,
+)
+
+
+class TestParseSize:
+
+    @pytest.mark.parametrize("value, expected", [
+        ("1024", 1024),
+        ("512M", 512 << 20),
+        ("64G", 64 << 30),
+        ("64gb", 64 << 30),
+        ("1.5T", int(1.5 * (1 << 40))),
+        ("2GiB", 2 << 30),
+    ])
+    def test_units(self, value, expected):
+        assert parse_size(value) == expected
+
+    @pytest.mark.parametrize("value", ["", "lots", "-1G", "0", "12X"])
+    def test_invalid(self, value):
+        with pytest.raises(ValueError):
+            parse_size(value)
+
+
+class TestFootprint:
+
+    def test_scales_with_sequence(self, tmp_path):
+        fasta = tmp_path / "g.fna"
+        fasta.write_text(">c\n" + "A" * 1000 + "\n")
+        size = os.path.getsize(fasta)
+        assert estimate_genome_footprint(str(fasta)) \
+            == int(size * GENOME_MEMORY_FACTOR) + GENOME_MEMORY_OVERHEAD
+        # A genome already in memory is costed by its sequence
+        assert estimate_genome_footprint(str(fasta), sequence_bytes=10) \
+            == int(10 * GENOME_MEMORY_FACTOR) + GENOME_MEMORY_OVERHEAD
+
+
+@pytest.mark.skipif(not os.path.isdir("/proc/self"), reason="needs /proc")
+def test_process_tree_rss_includes_children():
+    own = process_tree_rss()
+    assert own > 0
+    child = subprocess.Popen(
+        [sys.executable, "-c", "import sys; sys.stdin.read()"], stdin=subprocess.PIPE,
+    )
+    try:
+        time.sleep(0.3)  # let the interpreter start
+        assert process_tree_rss() > own
+    finally:
+        child.communicate(b"")
+
+
+class TestMemoryGate:
+    """Genomes are admitted while measured or reserved memory leaves room."""
+
+    def test_reservations_limit_admission(self):
+        gate = MemoryGate(1000, measure=lambda: 100)
+        assert gate.admits(500)
+        gate.acquire(500)
+        assert gate.admits(400)
+        assert not gate.admits(401)
+        gate.release(500)
+        assert gate.admits(900)
+
+    def test_measured_memory_limits_admission(self):
+        rss = {"value": 100}
+        gate = MemoryGate(1000, measure=lambda: rss["value"])
+        gate.acquire(100)
+        rss["value"] = 950
+        assert not gate.admits(100)
+        rss["value"] = 300
+        assert gate.admits(100)
+
+    def test_oversized_genome_runs_alone(self):
+        gate = MemoryGate(1000, measure=lambda: 100)
+        assert gate.admits(5000)
+        gate.acquire(5000)
+        assert not gate.admits(1)
+
+    def test_without_proc(self):
+        gate = MemoryGate(1000, measure=lambda: None)
+        gate.acquire(600)
+        assert gate.used() == 600
+        assert not gate.admits(500)
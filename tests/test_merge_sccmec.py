@@ -0,0 +1,162 @@
+#!/usr/bin/env python
+
+"""Tests for merge_sccmec.py (sharded runs and sccmec-merge)."""
+
+import json
+import subprocess
+import sys
+
+import pytest
+
+from sccmecextractor.extract_SCCmec import ExtractionReport
+from sccmecextractor.merge_sccmec import (
+    SHARD_FILENAME,
+    ShardMergeError,
+    check_shards,
+    merge_shards,
+    parse_shard,
+    shard_of,
+    write_shard_file,
+)
+from sccmecextractor.report_sccmec import read_tsv
+from sccmecextractor.run_manifest import RunManifest
+
+PARAMS = {"composite": False, "gff_dir": None}
+
+
+def _make_shard(path, index, count, genomes, params=PARAMS, finished=None):
+    """A shard output directory as written by ``sccmec-pipeline --shard``;
+    *finished* genomes (default: all) are recorded and reported."""
+    path.mkdir()
+    finished = genomes if finished is None else finished
+    with RunManifest(str(path)) as manifest:
+        manifest.start(dict(params, shard=[index, count]))
+        for position, name in enumerate(finished):
+            manifest.record(position, name, f"{name}.fna", None, "hash", [], {})
+    report = [ExtractionReport.HEADER] + [
+        ExtractionReport(name, status="extracted").to_tsv_row() for name in finished
+    ]
+    (path / "extraction_report.tsv").write_text("\n".join(report) + "\n")
+    typing = ["Input_File\tmec_genes"] + [f"{name}_SCCmec\tmecA" for name in finished]
+    (path / "typing_results.tsv").write_text("\n".join(typing) + "\n")
+    write_shard_file(str(path), (index, count), genomes)
+    return str(path)
+
+
+class TestShardAssignment:
+
+    @pytest.mark.parametrize("value, expected", [("1/1", (1, 1)), ("3/8", (3, 8))])
+    def test_parse(self, value, expected):
+        assert parse_shard(value) == expected
+
+    @pytest.mark.parametrize("value", ["0/4", "5/4", "1/0", "2", "a/b", "1/2/3"])
+    def test_parse_invalid(self, value):
+        with pytest.raises(ValueError):
+            parse_shard(value)
+
+    def test_stable_across_processes(self):
+        """Unlike hash(), the assignment does not depend on PYTHONHASHSEED."""
+        names = [f"g{i}" for i in range(12)]
+        code = (
+            "from sccmecextractor.merge_sccmec import shard_of; "
+            f"print([shard_of(n, 3) for n in {names!r}])"
+        )
+        out = subprocess.run(
+            [sys.executable, "-c", code], capture_output=True, text=True,
+            env={"PYTHONHASHSEED": "123"}, check=True,
+        ).stdout
+        assert out.strip() == str([shard_of(n, 3) for n in names])
+        assert {shard_of(n, 3) for n in names} == {1, 2, 3}
+
+
+class TestCheckShards:
+
+    def test_complete(self, tmp_path):
+        dirs = [
+            _make_shard(tmp_path / "s1", 1, 2, ["g1", "g3"]),
+            _make_shard(tmp_path / "s2", 2, 2, ["g2"]),
+        ]
+        assert check_shards(dirs) == []
+
+    def test_missing_shard(self, tmp_path):
+        dirs = [_make_shard(tmp_path / "s1", 1, 3, ["g1"])]
+        assert check_shards(dirs) == ["Missing shard(s) 2, 3 of 3"]
+
+    def test_unfinished_genomes(self, tmp_path):
+        dirs = [_make_shard(tmp_path / "s1", 1, 1, ["g1", "g2"], finished=["g1"])]
+        [problem] = check_shards(dirs)
+        assert "1 genome(s) not finished (g2)" in problem
+
+    def test_failed_genomes_are_finished(self, tmp_path):
+        shard_dir = _make_shard(tmp_path / "s1", 1, 1, ["g1", "g2"], finished=["g1"])
+        with RunManifest(shard_dir) as manifest:
+            manifest.record_failure(1, "g2", {"status": "timeout"})
+        assert check_shards([shard_dir]) == []
+
+    def test_unfinished_run(self, tmp_path):
+        shard_dir = _make_shard(tmp_path / "s1", 1, 1, ["g1"])
+        (tmp_path / "s1" / SHARD_FILENAME).unlink()
+        [problem] = check_shards([shard_dir])
+        assert "not finished" in problem
+
+    def test_inconsistent_shards(self, tmp_path):
+        dirs = [
+            _make_shard(tmp_path / "s1", 1, 2, ["g1"]),
+            _make_shard(tmp_path / "s2", 1, 2, ["g2"], params=dict(PARAMS, composite=True)),
+            _make_shard(tmp_path / "s3", 2, 3, ["g3"]),
+        ]
+        problems = "\n".join(check_shards(dirs))
+        assert "shard 1/2 also in" in problems
+        assert "different parameters" in problems and "composite" in problems
+        assert "different splits" in problems
+
+
+class TestMergeShards:
+
+    def test_merges_reports(self, tmp_path):
+        dirs = [
+            _make_shard(tmp_path / "s2", 2, 2, ["g2"]),
+            _make_shard(tmp_path / "s1", 1, 2, ["g1", "g3"]),
+        ]
+        outdir = tmp_path / "merged"
+        counts = merge_shards(dirs, str(outdir))
+        assert counts == {
+            "extraction_report.tsv": 3, "typing_results.tsv": 3,
+            "sccmec_unified_report.tsv": 3,
+        }
+
+        # One header, shards in order
+        lines = (outdir / "extraction_report.tsv").read_text().splitlines()
+        assert lines[0] == ExtractionReport.HEADER
+        assert [line.split("\t")[0] for line in lines[1:]] == ["g1", "g3", "g2"]
+        unified = read_tsv(str(outdir / "sccmec_unified_report.tsv"))
+        assert list(unified) == ["g1", "g2", "g3"]
+        assert unified["g2"]["mec_genes"] == "mecA"
+
+    def test_incomplete_refused(self, tmp_path):
+        dirs = [_make_shard(tmp_path / "s1", 1, 2, ["g1"])]
+        with pytest.raises(ShardMergeError, match="Missing shard"):
+            merge_shards(dirs, str(tmp_path / "merged"))
+        assert merge_shards(dirs, str(tmp_path / "merged"), allow_incomplete=True) \
+            ["extraction_report.tsv"] == 1
+
+    def test_cli(self, tmp_path):
+        dirs = [_make_shard(tmp_path / "s1", 1, 1, ["g1"])]
+        result = subprocess.run(
+            [sys.executable, "-m", "sccmecextractor.merge_sccmec", *dirs,
+             "-o", str(tmp_path / "merged")],
+            capture_output=True, text=True,
+        )
+        assert result.returncode == 0, result.stderr
+        assert "extraction_report.tsv: 1 rows" in result.stdout
+
+        (tmp_path / "s1" / SHARD_FILENAME).write_text(
+            json.dumps({"shard": 1, "shards": 2, "genomes": ["g1"]})
+        )
+        result = subprocess.run(
+            [sys.executable, "-m", "sccmecextractor.merge_sccmec", *dirs,
+             "-o", str(tmp_path / "merged")],
+            capture_output=True, text=True,
+        )
+        assert result.returncode == 1
+        assert "Missing shard(s) 2 of 2" in result.stderr
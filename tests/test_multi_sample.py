@@ -0,0 +1,79 @@
+#!/usr/bin/env python
+
+"""Tests for multi_sample.py."""
+
+import gzip
+
+import pytest
+
+from sccmecextractor.multi_sample import SampleIdParser, iter_sample_genomes
+
+
+MULTI_FASTA = (
+    ">S1|contig_1 circular=true\nACGTACGT\nAC\n"
+    ">S1|contig_2\nGGGG\n"
+    ">S2|contig_1\nTTTT\nTT\n"
+)
+
+
+class TestSampleIdParser:
+
+    def test_separator_prefix(self):
+        assert SampleIdParser()("S1|contig_1") == "S1"
+        assert SampleIdParser("_")("GCF_000013425.1_contig_1") == "GCF"
+
+    def test_missing_separator_rejected(self):
+        with pytest.raises(ValueError, match="no sample prefix"):
+            SampleIdParser()("contig_1")
+
+    def test_regex_named_group(self):
+        parser = SampleIdParser(pattern=r"^(?P<sample>GCF_\d+\.\d+)_")
+        assert parser("GCF_000013425.1_contig_1") == "GCF_000013425.1"
+
+    def test_regex_first_group_and_no_match(self):
+        parser = SampleIdParser(pattern=r"^([^.]+)\.")
+        assert parser("sampleA.ctg1") == "sampleA"
+        with pytest.raises(ValueError, match="does not match"):
+            parser("sampleA")
+
+    def test_unsafe_sample_rejected(self):
+        with pytest.raises(ValueError, match="Invalid sample ID"):
+            SampleIdParser(pattern=r"^(.*)\|")("a/b|contig_1")
+
+
+class TestIterSampleGenomes:
+
+    def test_groups_consecutive_contigs(self, tmp_path):
+        fasta = tmp_path / "multi.fna"
+        fasta.write_text(MULTI_FASTA)
+
+        samples = list(iter_sample_genomes(str(fasta), SampleIdParser()))
+
+        assert [sample for sample, _ in samples] == ["S1", "S2"]
+        s1, s2 = samples[0][1], samples[1][1]
+        assert s1.contigs == ["S1|contig_1", "S1|contig_2"]
+        assert bytes(s1.view("S1|contig_1")) == b"ACGTACGTAC"
+        assert bytes(s1.view("S1|contig_2")) == b"GGGG"
+        assert s1.get_description("S1|contig_1") == "S1|contig_1 circular=true"
+        assert s2.contigs == ["S2|contig_1"]
+        assert bytes(s2.view("S2|contig_1")) == b"TTTTTT"
+
+    def test_gzipped_input(self, tmp_path):
+        fasta = tmp_path / "multi.fna.gz"
+        with gzip.open(fasta, "wt") as f:
+            f.write(MULTI_FASTA)
+        assert [s for s, _ in iter_sample_genomes(str(fasta), SampleIdParser())] \
+            == ["S1", "S2"]
+
+    def test_interleaved_samples_rejected(self, tmp_path):
+        fasta = tmp_path / "multi.fna"
+        fasta.write_text(MULTI_FASTA + ">S1|contig_3\nAAAA\n")
+        genomes = iter_sample_genomes(str(fasta), SampleIdParser())
+        with pytest.raises(ValueError, match="not consecutive"):
+            list(genomes)
+
+    def test_duplicate_contig_rejected(self, tmp_path):
+        fasta = tmp_path / "multi.fna"
+        fasta.write_text(">S1|contig_1\nACGT\n>S1|contig_1\nTTTT\n")
+        with pytest.raises(ValueError, match="duplicate contig ID"):
+            list(iter_sample_genomes(str(fasta), SampleIdParser()))
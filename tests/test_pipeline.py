@@ -2,16 +2,36 @@
 
 """Tests for the sccmec-pipeline master command."""
 
+import argparse
+import functools
+import json
 import os
 import shutil
+import signal
 import subprocess
 import sys
 import tempfile
+import threading
+import time
 
 import pytest
 from pathlib import Path
-
-from sccmecextractor.pipeline import resolve_gff, run_pipeline
+from unittest.mock import patch
+
+from sccmecextractor import blast_utils, pipeline
+from sccmecextractor.blast_utils import blast_settings
+from sccmecextractor.extract_SCCmec import ExtractionReport
+from sccmecextractor.genome_buffer import GenomeBuffer
+from sccmecextractor.multi_sample import SampleIdParser
+from sccmecextractor.merge_sccmec import check_shards, merge_shards, shard_of
+from sccmecextractor.report_sccmec import read_tsv
+from sccmecextractor.run_manifest import ManifestMismatchError, RunManifest
+from sccmecextractor.pipeline import (
+    GenomeSearch,
+    estimate_genome_cost,
+    resolve_gff,
+    run_pipeline,
+)
 
 
 # ---------------------------------------------------------------------------
@@ -181,6 +201,711 @@ class TestRunPipeline:
         )
         assert summary["total"] == 2
 
+    def test_multi_sample_fasta(self, tmp_path):
+        """Samples grouped from one FASTA are reported as separate genomes."""
+        text = TEST_GENOME.read_text()
+        multi = tmp_path / "collection.fna"
+        multi.write_text(text.replace(">", ">S1|") + text.replace(">", ">S2|"))
+
+        outdir = tmp_path / "results"
+        summary = run_pipeline(
+            fasta_files=[str(multi)], outdir=str(outdir), blast_rlmh=True,
+            threads=2, sample_parser=SampleIdParser(),
+        )
+        assert summary["total"] == 2
+
+        rows = (outdir / "extraction_report.tsv").read_text().strip().split("\n")[1:]
+        assert sorted(row.split("\t")[0] for row in rows) == ["S1", "S2"]
+        assert (outdir / "att_sites" / "S1_att_sites.tsv").is_file()
+
+    def test_process_executor_matches_threads(self, tmp_path):
+        """Worker processes produce the same reports, in input order."""
+        genome2 = tmp_path / "test_genome_copy.fna"
+        shutil.copy2(str(TEST_GENOME), str(genome2))
+        inputs = [str(TEST_GENOME), str(genome2)]
+
+        outputs = {}
+        for executor in ("thread", "process"):
+            outdir = tmp_path / executor
+            summary = run_pipeline(
+                fasta_files=inputs, outdir=str(outdir), blast_rlmh=True,
+                threads=2, executor=executor,
+            )
+            assert summary["total"] == 2
+            outputs[executor] = summary, [
+                (outdir / name).read_text()
+                for name in ("typing_results.tsv", "sccmec_unified_report.tsv")
+            ]
+        assert outputs["process"] == outputs["thread"]
+
+
+    def test_staged_scheduler_matches_genome_scheduler(self, tmp_path):
+        """Overlapping the stages does not change any output."""
+        genome2 = tmp_path / "test_genome_copy.fna"
+        shutil.copy2(str(TEST_GENOME), str(genome2))
+        inputs = [str(TEST_GENOME), str(genome2)]
+
+        outputs = []
+        for scheduler, executor in (("genome", "thread"), ("staged", "thread"),
+                                    ("staged", "process")):
+            outdir = tmp_path / f"{scheduler}_{executor}"
+            run_pipeline(
+                fasta_files=inputs, outdir=str(outdir), blast_rlmh=True,
+                threads=2, scheduler=scheduler, executor=executor,
+            )
+            outputs.append([
+                (outdir / name).read_text()
+                for name in ("typing_results.tsv", "sccmec_unified_report.tsv")
+            ])
+        assert outputs[1] == outputs[0]
+        assert outputs[2] == outputs[0]
+
+
+# ---------------------------------------------------------------------------
+# TestStagedScheduler — stages mocked, no BLAST needed
+# ---------------------------------------------------------------------------
+
+class TestStagedScheduler:
+    """Searches and analyses overlap, within their limits, in input order."""
+
+    def test_limits_and_ordering(self, tmp_path):
+        lock = threading.Lock()
+        running = {"search": 0, "analyse": 0}
+        peak = {"search": 0, "analyse": 0}
+
+        def track(stage, delta):
+            with lock:
+                running[stage] += delta
+                peak[stage] = max(peak[stage], running[stage])
+
+        def fake_search(fasta_path, index, typer, gff_files, gff_dir, blast_rlmh,
+                        rlmh_ref, total=None, print_lock=None, genome=None,
+                        sample_name=None, genome_timeout=None):
+            track("search", 1)
+            time.sleep(0.01 * (index % 3))
+            track("search", -1)
+            if Path(fasta_path).stem == "g3":
+                raise RuntimeError("makeblastdb failed")
+            return GenomeSearch(fasta_path, index, Path(fasta_path).stem, None,
+                                None, True)
+
+        def fake_analyse(search, *args, collect_reports=False, **kwargs):
+            track("analyse", 1)
+            time.sleep(0.01 * ((search.index + 1) % 3))
+            track("analyse", -1)
+            return {"stem": search.stem, "extracted": True, "success": True,
+                    "typing_result": None,
+                    "reports": [ExtractionReport(search.stem)]}
+
+        inputs = [str(tmp_path / f"g{i}.fna") for i in range(8)]
+        with patch.object(pipeline, "_search_genome", fake_search), \
+                patch.object(pipeline, "_analyse_genome", fake_analyse), \
+                patch.object(pipeline, "SCCmecTyper"):
+            summary = run_pipeline(inputs, str(tmp_path / "out"), threads=3,
+                                   scheduler="staged", blast_workers=2)
+
+        assert {k: summary[k] for k in ("total", "extracted", "failed")} \
+            == {"total": 8, "extracted": 7, "failed": 1}
+        assert peak["search"] <= 2 and peak["analyse"] <= 3
+        report = (tmp_path / "out" / "extraction_report.tsv").read_text()
+        assert [line.split("\t")[0] for line in report.splitlines()[1:]] \
+            == ["g0", "g1", "g2", "g4", "g5", "g6", "g7"]
+
+
+# ---------------------------------------------------------------------------
+# TestWorkOrdering — no BLAST needed
+# ---------------------------------------------------------------------------
+
+class TestWorkOrdering:
+    """Longest-processing-time ordering by estimated genome cost."""
+
+    def test_cost_grows_with_size_contigs_and_missing_gff(self, tmp_path):
+        one = tmp_path / "one.fna"
+        one.write_text(">c1\n" + "A" * 10_000 + "\n")
+        many = tmp_path / "many.fna"
+        many.write_text("".join(f">c{i}\n" + "A" * 100 + "\n" for i in range(100)))
+
+        assert estimate_genome_cost(str(one), has_gff=False) \
+            > estimate_genome_cost(str(one), has_gff=True)
+        # Same amount of sequence, but 100 contigs
+        assert estimate_genome_cost(str(many)) > estimate_genome_cost(str(one))
+
+    def test_lpt_submits_largest_first_and_keeps_output_order(self, tmp_path):
+        inputs = []
+        for i, size in enumerate([100, 5_000, 800, 20_000]):
+            path = tmp_path / f"g{i}.fna"
+            path.write_text(">c\n" + "A" * size + "\n")
+            inputs.append(str(path))
+
+        submitted = []
+
+        def fake_process(fasta_path, index, genome=None, sample_name=None, **kwargs):
+            submitted.append(Path(fasta_path).stem)
+            return {"stem": Path(fasta_path).stem, "extracted": True, "success": True,
+                    "typing_result": {"Input_File": Path(fasta_path).stem},
+                    "seconds": 0.0}
+
+        with patch.object(pipeline, "_process_genome", fake_process), \
+                patch.object(pipeline, "SCCmecTyper") as typer:
+            typer.return_value.header = ["Input_File"]
+            summary = run_pipeline(inputs, str(tmp_path / "out"), order="lpt")
+
+        assert submitted == ["g3", "g1", "g2", "g0"]
+        assert summary["order"] == "lpt"
+        typing = (tmp_path / "out" / "typing_results.tsv").read_text().split()
+        assert typing == ["Input_File", "g0", "g1", "g2", "g3"]
+
+
+# ---------------------------------------------------------------------------
+# TestCpuBudget — no BLAST needed
+# ---------------------------------------------------------------------------
+
+class TestCpuBudget:
+    """--cpus sizes the workers and BLAST limits, calibrating in auto mode."""
+
+    @staticmethod
+    def _inputs(tmp_path, count):
+        return [str(tmp_path / f"g{i}.fna") for i in range(count)]
+
+    def test_auto_calibrates_then_replans(self, tmp_path):
+        seen = []
+
+        def fake_process(fasta_path, index, genome=None, sample_name=None, **kwargs):
+            seen.append((Path(fasta_path).stem, blast_settings()[0]))
+            # 3 of every 4 seconds in BLAST
+            return {"stem": Path(fasta_path).stem, "extracted": True, "success": True,
+                    "typing_result": {"Input_File": Path(fasta_path).stem},
+                    "seconds": 4.0, "blast_seconds": 3.0}
+
+        saved = blast_settings()
+        with patch.object(pipeline, "_process_genome", fake_process), \
+                patch.object(pipeline, "available_cpus", return_value=8), \
+                patch.object(pipeline, "SCCmecTyper") as typer:
+            typer.return_value.header = ["Input_File"]
+            summary = run_pipeline(self._inputs(tmp_path, 5), str(tmp_path / "out"),
+                                   cpus="auto")
+
+        assert summary["total"] == 5
+        # Calibration genomes ran with one blastn thread; the two left share
+        # the 8 cores
+        assert sorted(threads for stem, threads in seen[:3]) == [1, 1, 1]
+        assert [threads for stem, threads in seen[3:]] == [4, 4]
+        assert blast_settings() == saved
+        typing = (tmp_path / "out" / "typing_results.tsv").read_text().split()
+        assert typing == ["Input_File", "g0", "g1", "g2", "g3", "g4"]
+
+    def test_budget_replaces_threads(self, tmp_path):
+        threads = set()
+
+        def fake_process(fasta_path, index, **kwargs):
+            threads.add(threading.current_thread())
+            return {"stem": Path(fasta_path).stem, "typing_result": None}
+
+        with patch.object(pipeline, "_process_genome", fake_process), \
+                patch.object(pipeline, "SCCmecTyper"):
+            summary = run_pipeline(self._inputs(tmp_path, 3), str(tmp_path / "out"),
+                                   threads=16, cpus=1)
+        # A one-core budget runs sequentially despite -t 16
+        assert summary["total"] == 3
+        assert threads == {threading.main_thread()}
+
+    def test_cli_rejects_bad_timeout(self):
+        for value in ("0", "-5", "soon"):
+            with pytest.raises(argparse.ArgumentTypeError):
+                pipeline._seconds_arg(value)
+        assert pipeline._seconds_arg("1.5") == 1.5
+
+    def test_cli_rejects_bad_budget(self):
+        with pytest.raises(argparse.ArgumentTypeError):
+            pipeline._cpu_budget_arg("0")
+        with pytest.raises(argparse.ArgumentTypeError):
+            pipeline._cpu_budget_arg("many")
+        assert pipeline._cpu_budget_arg("auto") == "auto"
+        assert pipeline._cpu_budget_arg("12") == 12
+
+
+# ---------------------------------------------------------------------------
+# TestMemoryBackpressure — no BLAST needed
+# ---------------------------------------------------------------------------
+
+class TestMemoryBackpressure:
+    """--max-memory holds genomes back; outputs stay complete and ordered."""
+
+    @pytest.mark.parametrize("scheduler", ["genome", "staged"])
+    def test_concurrency_limited_by_memory(self, tmp_path, scheduler):
+        lock = threading.Lock()
+        running = peak = 0
+
+        def track(delta):
+            nonlocal running, peak
+            with lock:
+                running += delta
+                peak = max(peak, running)
+
+        def fake_process(fasta_path, index, genome=None, sample_name=None, **kwargs):
+            track(1)
+            time.sleep(0.02)
+            track(-1)
+            return {"stem": Path(fasta_path).stem, "extracted": True, "success": True,
+                    "typing_result": {"Input_File": Path(fasta_path).stem}}
+
+        def fake_search(fasta_path, index, *args, **kwargs):
+            track(1)
+            time.sleep(0.01)
+            return GenomeSearch(fasta_path, index, Path(fasta_path).stem, None,
+                                None, True)
+
+        def fake_analyse(search, *args, **kwargs):
+            time.sleep(0.01)
+            track(-1)
+            return {"stem": search.stem, "extracted": True, "success": True,
+                    "typing_result": {"Input_File": search.stem}}
+
+        # Every genome needs 100 bytes; 250 fit two at a time
+        gate = functools.partial(pipeline.MemoryGate, measure=lambda: 0,
+                                 poll_interval=0.01)
+        inputs = [str(tmp_path / f"g{i}.fna") for i in range(8)]
+        with patch.object(pipeline, "_process_genome", fake_process), \
+                patch.object(pipeline, "_search_genome", fake_search), \
+                patch.object(pipeline, "_analyse_genome", fake_analyse), \
+                patch.object(pipeline, "estimate_genome_footprint", return_value=100), \
+                patch.object(pipeline, "MemoryGate", gate), \
+                patch.object(pipeline, "SCCmecTyper") as typer:
+            typer.return_value.header = ["Input_File"]
+            summary = run_pipeline(inputs, str(tmp_path / "out"), threads=4,
+                                   blast_workers=4, scheduler=scheduler,
+                                   max_memory=250)
+
+        assert summary["total"] == 8
+        assert 1 <= peak <= 2
+        typing = (tmp_path / "out" / "typing_results.tsv").read_text().split()
+        assert typing == ["Input_File"] + [f"g{i}" for i in range(8)]
+
+
+# ---------------------------------------------------------------------------
+# TestResume — no BLAST needed
+# ---------------------------------------------------------------------------
+
+class TestResume:
+    """--resume skips recorded genomes and rebuilds the reports."""
+
+    @staticmethod
+    def _inputs(tmp_path, count):
+        inputs = []
+        for i in range(count):
+            path = tmp_path / f"g{i}.fna"
+            path.write_text(f">c\n{'ACGT' * (i + 1)}\n")
+            inputs.append(str(path))
+        return inputs
+
+    @staticmethod
+    def _fake_process(processed, fail_at=None):
+        def fake(fasta_path, index, genome=None, sample_name=None, **kwargs):
+            stem = Path(fasta_path).stem
+            if stem == fail_at:
+                raise KeyboardInterrupt  # the node is preempted
+            processed.append(stem)
+            return {
+                "stem": stem, "status": "extracted", "extracted": True,
+                "success": True, "typing_result": {"Input_File": stem},
+                "reports": [ExtractionReport(stem, status="extracted")],
+                "input_file": fasta_path,
+                "fingerprint": pipeline.file_fingerprint(fasta_path),
+                "input_hash": GenomeBuffer.from_fasta(fasta_path).digest(),
+                "stages": ["search", "locate", "extract", "type"],
+            }
+        return fake
+
+    def _run(self, inputs, outdir, processed, fail_at=None, **kwargs):
+        with patch.object(pipeline, "_process_genome",
+                          self._fake_process(processed, fail_at)), \
+                patch.object(pipeline, "SCCmecTyper") as typer:
+            typer.return_value.header = ["Input_File"]
+            return run_pipeline(inputs, outdir, **kwargs)
+
+    def test_interrupted_run_resumes(self, tmp_path):
+        inputs = self._inputs(tmp_path, 5)
+        outdir = str(tmp_path / "out")
+        processed = []
+        with pytest.raises(KeyboardInterrupt):
+            self._run(inputs, outdir, processed, fail_at="g3")
+        assert processed == ["g0", "g1", "g2"]
+
+        # A partial att-site file left by the interrupted genome is removed
+        partial = Path(outdir) / "att_sites" / "g3_att_sites.tsv"
+        partial.write_text("partial\n")
+
+        processed.clear()
+        summary = self._run(inputs, outdir, processed, resume=True)
+        assert processed == ["g3", "g4"]
+        assert (summary["total"], summary["resumed"], summary["extracted"]) == (5, 3, 5)
+        assert not partial.exists()
+
+        report = (Path(outdir) / "extraction_report.tsv").read_text().splitlines()
+        assert report[0] == ExtractionReport.HEADER
+        assert [line.split("\t")[0] for line in report[1:]] == [f"g{i}" for i in range(5)]
+        typing = (Path(outdir) / "typing_results.tsv").read_text().split()
+        assert typing == ["Input_File"] + [f"g{i}" for i in range(5)]
+
+    def test_changed_input_is_reprocessed(self, tmp_path):
+        inputs = self._inputs(tmp_path, 3)
+        outdir = str(tmp_path / "out")
+        self._run(inputs, outdir, [])
+
+        Path(inputs[1]).write_text(">c\nTTTTTTTT\n")
+        # Same sequence, new modification time: still recorded
+        Path(inputs[2]).write_text(Path(inputs[2]).read_text())
+        os.utime(inputs[2], ns=(0, 0))
+
+        processed = []
+        summary = self._run(inputs, outdir, processed, resume=True)
+        assert processed == ["g1"]
+        assert summary["resumed"] == 2
+
+    def test_changed_parameters_rejected(self, tmp_path):
+        inputs = self._inputs(tmp_path, 1)
+        outdir = str(tmp_path / "out")
+        self._run(inputs, outdir, [])
+        with pytest.raises(ManifestMismatchError, match="composite"):
+            self._run(inputs, outdir, [], resume=True, composite=True)
+
+    def test_without_resume_everything_reruns(self, tmp_path, capsys):
+        inputs = self._inputs(tmp_path, 2)
+        outdir = str(tmp_path / "out")
+        self._run(inputs, outdir, [])
+        assert "Discarding" not in capsys.readouterr().err
+        processed = []
+        self._run(inputs, outdir, processed)
+        assert processed == ["g0", "g1"]
+        assert "WARNING: Discarding 2 genome checkpoint(s)" in capsys.readouterr().err
+
+
+class TestIncremental:
+    """--incremental processes only genomes missing from the manifest."""
+
+    _inputs = staticmethod(TestResume._inputs)
+    _fake_process = staticmethod(TestResume._fake_process)
+    _run = TestResume._run
+
+    def test_adds_new_genomes(self, tmp_path):
+        inputs = self._inputs(tmp_path, 5)
+        outdir = str(tmp_path / "out")
+        self._run(inputs[:3], outdir, [])
+
+        processed = []
+        # The unified report is merged, not rebuilt from the full reports
+        with patch.object(pipeline, "read_tsv", side_effect=AssertionError):
+            summary = self._run(inputs, outdir, processed, incremental=True)
+        assert processed == ["g3", "g4"]
+        assert (summary["total"], summary["recorded"]) == (2, 3)
+
+        report = (Path(outdir) / "extraction_report.tsv").read_text().splitlines()
+        assert report[0] == ExtractionReport.HEADER
+        assert [line.split("\t")[0] for line in report[1:]] == [f"g{i}" for i in range(5)]
+        typing = (Path(outdir) / "typing_results.tsv").read_text().split()
+        assert typing == ["Input_File"] + [f"g{i}" for i in range(5)]
+        unified = read_tsv(str(Path(outdir) / "sccmec_unified_report.tsv"))
+        assert list(unified) == [f"g{i}" for i in range(5)]
+        assert unified["g4"]["typing_source"] == "sccmec"
+
+        # Nothing new: nothing processed, reports untouched
+        processed.clear()
+        summary = self._run(inputs, outdir, processed, incremental=True)
+        assert processed == [] and summary["total"] == 0
+
+    def test_interrupted_genomes_are_merged_later(self, tmp_path):
+        """Genomes recorded by an interrupted run reach the unified report
+        on the next incremental run."""
+        inputs = self._inputs(tmp_path, 4)
+        outdir = str(tmp_path / "out")
+        self._run(inputs[:1], outdir, [])
+        with pytest.raises(KeyboardInterrupt):
+            self._run(inputs, outdir, [], fail_at="g3", incremental=True)
+
+        processed = []
+        self._run(inputs, outdir, processed, incremental=True)
+        assert processed == ["g3"]
+        unified = read_tsv(str(Path(outdir) / "sccmec_unified_report.tsv"))
+        assert list(unified) == ["g0", "g1", "g2", "g3"]
+
+    def test_changed_parameters_rejected(self, tmp_path):
+        inputs = self._inputs(tmp_path, 2)
+        outdir = str(tmp_path / "out")
+        self._run(inputs[:1], outdir, [])
+        with pytest.raises(ManifestMismatchError):
+            self._run(inputs, outdir, [], incremental=True, circular=True)
+
+    def test_exclusive_with_resume(self, tmp_path):
+        with pytest.raises(ValueError, match="exclusive"):
+            run_pipeline([], str(tmp_path), resume=True, incremental=True)
+
+
+class TestShard:
+    """--shard i/N splits the genomes between runs that sccmec-merge combines."""
+
+    _inputs = staticmethod(TestResume._inputs)
+    _fake_process = staticmethod(TestResume._fake_process)
+    _run = TestResume._run
+
+    def test_shards_partition_genomes(self, tmp_path):
+        inputs = self._inputs(tmp_path, 8)
+        processed, dirs = [], []
+        for i in (1, 2, 3):
+            outdir = str(tmp_path / f"shard{i}")
+            self._run(inputs, outdir, processed, shard=(i, 3))
+            dirs.append(outdir)
+            shard_info = json.loads((Path(outdir) / "shard.json").read_text())
+            assert shard_info["genomes"] == sorted(
+                Path(f).stem for f in inputs if shard_of(Path(f).stem, 3) == i
+            )
+        assert sorted(processed) == sorted(Path(f).stem for f in inputs)
+
+        merged = tmp_path / "merged"
+        merge_shards(dirs, str(merged))
+        unified = read_tsv(str(merged / "sccmec_unified_report.tsv"))
+        assert list(unified) == sorted(Path(f).stem for f in inputs)
+
+    def test_interrupted_shard_is_incomplete(self, tmp_path):
+        inputs = self._inputs(tmp_path, 8)
+        outdir = str(tmp_path / "shard1")
+        self._run(inputs, outdir, [], shard=(1, 1))
+        with pytest.raises(KeyboardInterrupt):
+            self._run(inputs, outdir, [], shard=(1, 1), fail_at="g5")
+        assert "not finished" in check_shards([outdir])[0]
+
+    def test_cli_arg(self):
+        assert pipeline._shard_arg("2/4") == (2, 4)
+        with pytest.raises(argparse.ArgumentTypeError):
+            pipeline._shard_arg("5/4")
+
+
+class TestQueue:
+    """--queue workers share genomes through a directory."""
+
+    _inputs = staticmethod(TestResume._inputs)
+    _fake_process = staticmethod(TestResume._fake_process)
+    _run = TestResume._run
+
+    def _expect_reports(self, outdir, names):
+        report = (Path(outdir) / "extraction_report.tsv").read_text().splitlines()
+        assert report[0] == ExtractionReport.HEADER
+        assert [line.split("\t")[0] for line in report[1:]] == names
+        unified = read_tsv(str(Path(outdir) / "sccmec_unified_report.tsv"))
+        assert list(unified) == sorted(names)
+
+    def test_dead_workers_genomes_are_redone(self, tmp_path):
+        inputs = self._inputs(tmp_path, 5)
+        queue = str(tmp_path / "queue")
+        first, second = [], []
+        with pytest.raises(KeyboardInterrupt):
+            self._run(inputs, str(tmp_path / "w1"), first, fail_at="g2", queue=queue)
+        summary = self._run(inputs, str(tmp_path / "w2"), second, queue=queue)
+
+        assert first == ["g0", "g1"]
+        # The interrupted worker's claim is taken back once the queue is empty
+        assert second == ["g3", "g4", "g2"]
+        assert summary["total"] == 3 and summary["reports_built"]
+        self._expect_reports(tmp_path / "w2", [f"g{i}" for i in range(5)])
+        assert not (Path(tmp_path) / "w1" / "extraction_report.tsv").exists()
+
+    def test_concurrent_workers(self, tmp_path):
+        inputs = self._inputs(tmp_path, 30)
+        queue = str(tmp_path / "queue")
+        processed, summaries = [], []
+        fast_queue = functools.partial(
+            pipeline.WorkQueue, heartbeat_interval=0.05, stale_after=30,
+        )
+
+        def worker(outdir):
+            summaries.append(run_pipeline(inputs, outdir, queue=queue))
+
+        with patch.object(pipeline, "_process_genome", self._fake_process(processed)), \
+                patch.object(pipeline, "SCCmecTyper") as typer, \
+                patch.object(pipeline, "WorkQueue", fast_queue):
+            typer.return_value.header = ["Input_File"]
+            threads = [
+                threading.Thread(target=worker, args=(str(tmp_path / "out"),))
+                for _ in range(3)
+            ]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+        assert sorted(processed) == sorted(Path(f).stem for f in inputs)
+        assert sum(s["total"] for s in summaries) == 30
+        assert [s["reports_built"] for s in summaries].count(True) == 1
+        self._expect_reports(tmp_path / "out", [f"g{i}" for i in range(30)])
+
+    def test_unsupported_combinations(self, tmp_path):
+        with pytest.raises(ValueError, match="queue"):
+            run_pipeline([], str(tmp_path), queue=str(tmp_path / "q"), shard=(1, 2))
+        with pytest.raises(ValueError, match="queue"):
+            run_pipeline([], str(tmp_path), queue=str(tmp_path / "q"), bundle=True)
+
+
+# ---------------------------------------------------------------------------
+# TestGenomeTimeout — no BLAST needed
+# ---------------------------------------------------------------------------
+
+class TestGenomeTimeout:
+    """Genomes over --genome-timeout are recorded as timeouts; the rest finish."""
+
+    _inputs = staticmethod(TestResume._inputs)
+
+    @staticmethod
+    def _fake_searches(hang):
+        def fake(search, genome, typer, rlmh_ref, total, _print):
+            search.genome = GenomeBuffer.from_fasta(search.fasta_path)
+            search.input_hash = search.genome.digest()
+            if search.stem == "g1":
+                hang()
+            search.error = "no rlmH"  # analysis stops after the locate stage
+        return fake
+
+    def _run(self, tmp_path, hang, **kwargs):
+        inputs = self._inputs(tmp_path, 3)
+        outdir = tmp_path / "out"
+        started = time.monotonic()
+        with patch.object(pipeline, "_run_searches", self._fake_searches(hang)), \
+                patch.object(pipeline, "SCCmecTyper") as typer:
+            typer.return_value.header = ["Input_File"]
+            summary = run_pipeline(inputs, str(outdir), genome_timeout=0.5, **kwargs)
+        assert time.monotonic() - started < 20
+        report = outdir / "extraction_report.tsv"
+        return summary, read_tsv(str(report)) if report.exists() else {}
+
+    @pytest.mark.parametrize("threads", [1, 2])
+    def test_blast_command_stopped(self, tmp_path, threads):
+        hang = functools.partial(blast_utils._run_command, ["sleep", "30"])
+        summary, report = self._run(tmp_path, hang, threads=threads)
+
+        assert (summary["total"], summary["timed_out"]) == (3, 1)
+        assert report["g1"]["Status"] == "timeout"
+        assert report["g1"]["Failure_Reason"] == "genome_timeout"
+        assert list(report) == ["g1"]  # the others stop at locate, without a row
+        # Recorded as a failure, which --resume tries again
+        with RunManifest(str(tmp_path / "out")) as manifest:
+            assert manifest.names() == {"g0", "g1", "g2"}
+            assert manifest.get("g1").input_hash == ""
+        summary, report = self._run(tmp_path, lambda: None, threads=threads,
+                                    resume=True)
+        assert (summary["resumed"], summary["timed_out"]) == (2, 0)
+        assert list(report) == []
+
+    def test_python_code_interrupted(self, tmp_path):
+        summary, report = self._run(tmp_path, functools.partial(time.sleep, 30))
+        assert summary["timed_out"] == 1
+        assert report["g1"]["Status"] == "timeout"
+
+    def test_analysis_checked_between_stages(self, tmp_path):
+        [fasta_path] = self._inputs(tmp_path, 1)
+        search = GenomeSearch(fasta_path, 1, "g0", None, None, True,
+                              genome=GenomeBuffer.from_fasta(fasta_path),
+                              deadline=time.monotonic() - 1)
+        with patch.object(pipeline, "AttSiteFinder"):
+            result = pipeline._analyse_genome(
+                search, str(tmp_path), str(tmp_path), "ext.tsv", "amb.tsv",
+                None, None, False, collect_reports=True,
+            )
+        assert result["status"] == "timeout"
+        assert result["reports"][0].failure_reason == "genome_timeout"
+
+
+class TestWorkerRecycling:
+    """Process-mode workers stuck or crashed on a genome are replaced."""
+
+    @staticmethod
+    def _fake_process(fasta_path, index, genome=None, sample_name=None, **kwargs):
+        stem = Path(fasta_path).stem
+        if stem == "g1" and "hang" in fasta_path:
+            # Deaf to the SIGALRM soft limit, so only a kill stops it
+            signal.pthread_sigmask(signal.SIG_BLOCK, {signal.SIGALRM})
+            time.sleep(60)
+        elif stem == "g1":
+            os._exit(1)
+        return {"stem": stem, "status": "extracted", "extracted": True,
+                "success": True, "typing_result": {"Input_File": stem}}
+
+    @staticmethod
+    def _fake_search(fasta_path, index, *args, genome_timeout=None, **kwargs):
+        return GenomeSearch(
+            fasta_path, index, Path(fasta_path).stem, None, None, True,
+            genome=GenomeBuffer.from_fasta(fasta_path),
+            deadline=time.monotonic() + genome_timeout,
+        )
+
+    def _fake_analyse(self, search, *args, **kwargs):
+        return self._fake_process(search.fasta_path, search.index)
+
+    def _run(self, tmp_path, mode, scheduler):
+        (tmp_path / mode).mkdir()
+        inputs = []
+        for i in range(4):
+            path = tmp_path / mode / f"g{i}.fna"
+            path.write_text(">c\nACGT\n")
+            inputs.append(str(path))
+        with patch.object(pipeline, "_process_genome", self._fake_process), \
+                patch.object(pipeline, "_search_genome", self._fake_search), \
+                patch.object(pipeline, "_analyse_genome", self._fake_analyse), \
+                patch.object(pipeline, "SCCmecTyper") as typer, \
+                patch.object(pipeline, "KILL_GRACE", 0), \
+                patch.object(pipeline, "WATCHDOG_INTERVAL", 0.05):
+            typer.return_value.header = ["Input_File"]
+            summary = run_pipeline(inputs, str(tmp_path / "out"), executor="process",
+                                   scheduler=scheduler, threads=1, genome_timeout=0.3)
+        typing = (tmp_path / "out" / "typing_results.tsv").read_text().split()
+        assert typing == ["Input_File", "g0", "g2", "g3"]
+        return summary
+
+    @pytest.mark.parametrize("scheduler", ["genome", "staged"])
+    def test_stuck_worker_killed(self, tmp_path, scheduler):
+        summary = self._run(tmp_path, "hang", scheduler)
+        assert (summary["total"], summary["timed_out"], summary["crashed"]) == (4, 1, 0)
+
+    @pytest.mark.parametrize("scheduler", ["genome", "staged"])
+    def test_crashing_genome_given_up(self, tmp_path, scheduler):
+        summary = self._run(tmp_path, "crash", scheduler)
+        assert (summary["total"], summary["timed_out"], summary["crashed"]) == (4, 0, 1)
+
+
+def test_duplicate_contig_fails_only_its_genome(tmp_path):
+    bad = tmp_path / "bad.fna"
+    bad.write_text(">c1\nACGT\n>c1\nTTTT\n")
+    good = tmp_path / "good.fna"
+    good.write_text(">c1\nACGT\n")
+
+    def fake_searches(search, genome, *args):
+        search.genome = GenomeBuffer.from_fasta(search.fasta_path)
+        search.error = "no rlmH"  # analysis stops after the locate stage
+
+    with patch.object(pipeline, "_run_searches", fake_searches), \
+            patch.object(pipeline, "SCCmecTyper") as typer:
+        typer.return_value.header = ["Input_File"]
+        summary = run_pipeline([str(bad), str(good)], str(tmp_path / "out"))
+    assert summary["total"] == 2
+    with RunManifest(str(tmp_path / "out")) as manifest:
+        assert manifest.get("bad").result["status"] == "error"
+        assert manifest.get("good").result["status"] == "error_locate"
+
+
+def test_select_samples_renumbers():
+    jobs = [(i, "multi.fna", f"s{i}", None) for i in range(4)]
+    keep = lambda name: name not in {"s0", "s2"}
+    assert list(pipeline._select_samples(iter(jobs), keep)) == [
+        (0, "multi.fna", "s1", None), (1, "multi.fna", "s3", None),
+    ]
+
+
+def test_unknown_executor_rejected(tmp_path):
+    with pytest.raises(ValueError, match="Unknown executor"):
+        run_pipeline([str(TEST_GENOME)], str(tmp_path), executor="cluster")
+
+
+def test_unknown_scheduler_rejected(tmp_path):
+    with pytest.raises(ValueError, match="Unknown scheduler"):
+        run_pipeline([str(TEST_GENOME)], str(tmp_path), scheduler="eager")
+
 
 # ---------------------------------------------------------------------------
 # TestCLI — requires BLAST+
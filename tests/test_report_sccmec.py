@@ -13,6 +13,7 @@ from sccmecextractor.report_sccmec import (
     merge_reports,
     normalise_typing_keys,
     read_tsv,
+    update_unified_report,
     write_unified_report,
 )
 
@@ -366,6 +367,45 @@ class TestWriteUnifiedReport:
         assert lines[1].split("\t")[0] == "genome1"
 
 
+# ---------------------------------------------------------------------------
+# TestUpdateUnifiedReport
+# ---------------------------------------------------------------------------
+
+class TestUpdateUnifiedReport:
+    """Tests for update_unified_report."""
+
+    @staticmethod
+    def _merged(*names, status="extracted"):
+        return merge_reports(
+            {n: {"Input_File": n, "Status": status} for n in names}, {},
+        )
+
+    def test_merges_in_order(self, tmp_path):
+        """New rows are inserted in Input_File order among existing ones."""
+        outfile = tmp_path / "report.tsv"
+        write_unified_report(self._merged("g1", "g3", "g5"), str(outfile))
+        update_unified_report(self._merged("g0", "g4", "g6"), str(outfile))
+
+        rows = read_tsv(str(outfile))
+        assert list(rows) == ["g0", "g1", "g3", "g4", "g5", "g6"]
+        assert outfile.read_text().startswith("\t".join(UNIFIED_HEADER) + "\n")
+
+    def test_replaces_existing_rows(self, tmp_path):
+        """A genome already in the report gets the new row."""
+        outfile = tmp_path / "report.tsv"
+        write_unified_report(self._merged("g1", "g2"), str(outfile))
+        update_unified_report(self._merged("g2", status="failed"), str(outfile))
+
+        rows = read_tsv(str(outfile))
+        assert list(rows) == ["g1", "g2"]
+        assert rows["g2"]["Status"] == "failed"
+
+    def test_creates_missing_report(self, tmp_path):
+        outfile = tmp_path / "report.tsv"
+        update_unified_report(self._merged("g1"), str(outfile))
+        assert list(read_tsv(str(outfile))) == ["g1"]
+
+
 # ---------------------------------------------------------------------------
 # TestCLI
 # ---------------------------------------------------------------------------
@@ -0,0 +1,114 @@
+#!/usr/bin/env python
+
+"""Tests for run_manifest.py."""
+
+import pytest
+
+from sccmecextractor.run_manifest import (
+    MANIFEST_FILENAME,
+    ManifestMismatchError,
+    RunManifest,
+    file_fingerprint,
+)
+
+PARAMS = {"composite": False, "gff_files": {"g1": "g1.gff3"}, "gff_dir": None}
+
+
+def _record(manifest, position, name, **result):
+    manifest.record(
+        position, name, f"{name}.fna", (100, 1), f"hash-{name}",
+        ["search", "locate"], dict({"rows": {"extraction": [f"{name}\trow"]}}, **result),
+    )
+
+
+class TestRunManifest:
+
+    def test_records_round_trip_in_position_order(self, tmp_path):
+        with RunManifest(str(tmp_path)) as manifest:
+            manifest.start(PARAMS)
+            _record(manifest, 1, "g1", extracted=True)
+            _record(manifest, 0, "g0", extracted=False)
+
+        assert (tmp_path / MANIFEST_FILENAME).exists()
+        with RunManifest(str(tmp_path)) as manifest:
+            records = list(manifest.records())
+            assert [r.name for r in records] == ["g0", "g1"]
+            g1 = manifest.get("g1")
+            assert (g1.size, g1.mtime_ns, g1.input_hash) == (100, 1, "hash-g1")
+            assert g1.stages == ["search", "locate"]
+            assert g1.result["extracted"] is True
+            assert g1.rows("extraction") == ["g1\trow"]
+            assert g1.rows("ambiguous") == []
+            assert manifest.get("missing") is None
+
+    def test_rerecording_replaces(self, tmp_path):
+        with RunManifest(str(tmp_path)) as manifest:
+            _record(manifest, 0, "g0", extracted=False)
+            _record(manifest, 0, "g0", extracted=True)
+            manifest.set_position("g0", 5)
+            assert [(r.position, r.result["extracted"]) for r in manifest.records()] \
+                == [(5, True)]
+
+    def test_failures_recorded_without_hash(self, tmp_path):
+        with RunManifest(str(tmp_path)) as manifest:
+            manifest.record_failure(0, "g0", {"status": "timeout", "rows": {
+                "extraction": ["g0\ttimeout"]}})
+            record = manifest.get("g0")
+            assert (record.input_hash, record.size, record.stages) == ("", None, [])
+            assert record.result["status"] == "timeout"
+            assert record.rows("extraction") == ["g0\ttimeout"]
+            # A retry that succeeds replaces the failure
+            _record(manifest, 0, "g0")
+            assert manifest.get("g0").input_hash == "hash-g0"
+
+    def test_rollback_journal(self, tmp_path):
+        """No WAL, which needs shared memory that NFS and Lustre lack."""
+        with RunManifest(str(tmp_path)) as manifest:
+            _record(manifest, 0, "g0")
+            assert manifest._conn.execute("PRAGMA journal_mode").fetchone()[0] == "delete"
+        assert sorted(p.name for p in tmp_path.iterdir()) == [MANIFEST_FILENAME]
+
+    def test_unreported_genomes(self, tmp_path):
+        with RunManifest(str(tmp_path)) as manifest:
+            assert manifest.next_position() == 0
+            _record(manifest, 0, "g0")
+            _record(manifest, 1, "g1")
+            manifest.mark_reported(["g0"])
+            assert [r.name for r in manifest.records(unreported=True)] == ["g1"]
+            assert manifest.next_position() == 2
+            # Recording a genome again takes it out of the report
+            _record(manifest, 0, "g0")
+            manifest.mark_reported(["g1"])
+            assert [r.name for r in manifest.records(unreported=True)] == ["g0"]
+            manifest.mark_reported()
+            assert list(manifest.records(unreported=True)) == []
+
+    def test_start_forgets_genomes(self, tmp_path):
+        with RunManifest(str(tmp_path)) as manifest:
+            manifest.start(PARAMS)
+            _record(manifest, 0, "g0")
+            assert manifest.start(dict(PARAMS, composite=True)) == 1
+            assert manifest.names() == set()
+            assert manifest.params()["composite"] is True
+
+    def test_resume_checks_params(self, tmp_path):
+        with RunManifest(str(tmp_path)) as manifest:
+            manifest.start(PARAMS)
+            _record(manifest, 0, "g0")
+        with RunManifest(str(tmp_path)) as manifest:
+            manifest.resume(dict(PARAMS))
+            assert manifest.names() == {"g0"}
+            with pytest.raises(ManifestMismatchError, match="composite"):
+                manifest.resume(dict(PARAMS, composite=True))
+
+    def test_resume_without_params_starts(self, tmp_path):
+        with RunManifest(str(tmp_path)) as manifest:
+            manifest.resume(PARAMS)
+            assert manifest.params() == PARAMS
+
+
+def test_file_fingerprint(tmp_path):
+    path = tmp_path / "g.fna"
+    path.write_text(">c\nACGT\n")
+    size, mtime_ns = file_fingerprint(str(path))
+    assert size == 8 and mtime_ns > 0
@@ -9,10 +9,18 @@ tests that require BLAST+.
 import shutil
 import subprocess
 
+import json
+
 import pytest
 from pathlib import Path
+from unittest.mock import patch
+
+from Bio.Seq import Seq
+from Bio.SeqRecord import SeqRecord
 
 from sccmecextractor.blast_utils import BlastResult
+from sccmecextractor.fasta_shards import ShardReader, ShardWriter
+from sccmecextractor.hit_store import HitStore
 from sccmecextractor.type_sccmec import (
     CcrClassifier,
     CcrComplexLookup,
@@ -20,6 +28,7 @@ from sccmecextractor.type_sccmec import (
     MecClassifier,
     SCCmecTyper,
     TYPING_HEADER,
+    TypingManifest,
     collect_input_files,
 )
 
@@ -238,6 +247,348 @@ class TestOutputFormat:
         assert result["ccr_complex_type"] == "-"
 
 
+class TestTypeFromGenomeHits:
+    """Tests for typing from pre-computed genome-level hits (no BLAST)."""
+
+    @pytest.fixture
+    def typer(self):
+        """SCCmecTyper with the BLAST runner mocked out."""
+        with patch("sccmecextractor.type_sccmec.BlastRunner"):
+            return SCCmecTyper()
+
+    def test_type_region_keeps_only_element_hits(self, typer):
+        """Genes outside the extraction interval are not typed."""
+        mec_len = typer._classifiers["mec"].ref_lengths["mecA"]
+        ccr_len = typer._classifiers["ccr"].ref_lengths["ccrC1"]
+        hits = {
+            "mec": [_make_hit("mecA", "contig_1", 99.0, mec_len, sstart=5000)],
+            "ccr": [_make_hit("ccrC1", "contig_1", 99.0, ccr_len, sstart=900000)],
+        }
+
+        result = typer.type_region(
+            "genome_SCCmec", hits, "contig_1", 1000, 60000, False, "elem",
+        )
+
+        assert result["Input_File"] == "genome_SCCmec"
+        assert result["mec_genes"] == "mecA(full)"
+        assert result["mec_locations"] == f"elem:4000-{3999 + mec_len}"
+        assert result["ccr_genes"] == "-"
+
+    def test_type_hits_matches_wgs(self, typer):
+        """WGS typing uses the same hits without projection."""
+        ccr_len = typer._classifiers["ccr"].ref_lengths["ccrC1"]
+        hits = {
+            "mec": [],
+            "ccr": [_make_hit("ccrC1", "contig_1", 99.0, ccr_len, sstart=900000)],
+        }
+
+        result = typer.type_hits("genome", hits)
+
+        assert result["ccr_complex_type"] == "5"
+        assert result["ccr_locations"].startswith("contig_1:900000-")
+
+
+class TestTypeFromStoredHits:
+    """Re-classification from the hit store reproduces the original call."""
+
+    def test_region_typing_replays_from_store(self, tmp_path):
+        store = HitStore(str(tmp_path / "hits.sqlite"))
+        with patch("sccmecextractor.type_sccmec.BlastRunner"):
+            typer = SCCmecTyper(hit_store=store)
+
+        mec_len = typer._classifiers["mec"].ref_lengths["mecA"]
+        hits = {
+            "mec": [_make_hit("mecA", "contig_1", 99.0, mec_len, sstart=5000)],
+            "ccr": [_make_hit("ccrA1", "contig_1", 60.0, 300, sstart=900000)],
+        }
+        original = typer.type_region(
+            "genome_SCCmec", hits, "contig_1", 1000, 60000, False, "elem",
+            source="genome.fna",
+        )
+
+        offline = SCCmecTyper(hit_store=store, offline=True)
+        assert offline.runner is None
+        assert offline.type_stored("genome_SCCmec") == original
+        store.close()
+
+    def test_stored_hits_reclassified_with_new_thresholds(self, tmp_path):
+        """Unfiltered hits are kept, so lowered thresholds pick them up."""
+        store = HitStore(str(tmp_path / "hits.sqlite"))
+        with patch("sccmecextractor.type_sccmec.BlastRunner"):
+            typer = SCCmecTyper(hit_store=store)
+
+        ccr_len = typer._classifiers["ccr"].ref_lengths["ccrC1"]
+        hits = {"mec": [], "ccr": [_make_hit("ccrC1", "contig_1", 65.0, ccr_len)]}
+        assert typer.type_hits("genome", hits)["ccr_genes"] == "-"
+
+        offline = SCCmecTyper(hit_store=store, offline=True)
+        offline.manifest.get("ccr").novel_pident = 60.0
+        assert offline.type_stored("genome")["ccr_genes"] == "ccrC1(novel_full)"
+        store.close()
+
+
+class TestSubjectMode:
+    """Small inputs are searched as a blastn subject without makeblastdb."""
+
+    def _typer(self, subject_max_size):
+        with patch("sccmecextractor.type_sccmec.BlastRunner"):
+            typer = SCCmecTyper(subject_max_size=subject_max_size)
+        typer.runner.run_blastn.return_value = "/nonexistent.blast6"
+        return typer
+
+    def test_small_input_uses_subject(self, tmp_path):
+        element = tmp_path / "element.fasta"
+        element.write_text(">elem\n" + "ACGT" * 100 + "\n")
+        typer = self._typer(subject_max_size=10_000)
+
+        typer.search_file(str(element))
+
+        typer.runner.create_db.assert_not_called()
+        assert typer.runner.run_blastn.call_args.kwargs["subject"] == str(element)
+
+    def test_large_input_builds_db(self, tmp_path):
+        element = tmp_path / "element.fasta"
+        element.write_text(">elem\n" + "ACGT" * 100 + "\n")
+        typer = self._typer(subject_max_size=0)
+
+        typer.search_file(str(element))
+
+        typer.runner.create_db.assert_called_once()
+        assert "subject" not in typer.runner.run_blastn.call_args.kwargs
+
+
+class TestTypeShard:
+    """Bundled shards are searched once and typed per record."""
+
+    def test_hits_split_by_record(self, tmp_path):
+        with ShardWriter(str(tmp_path)) as writer:
+            for name in ("genome_a", "genome_b"):
+                writer.add(name, SeqRecord(Seq("ACGT" * 50), id=f"{name}_elem",
+                                           description=""))
+        reader = ShardReader(str(tmp_path))
+        store = HitStore(str(tmp_path / "hits.sqlite"))
+        with patch("sccmecextractor.type_sccmec.BlastRunner"):
+            typer = SCCmecTyper(hit_store=store)
+
+        mec_len = typer._classifiers["mec"].ref_lengths["mecA"]
+        hits = [_make_hit("mecA", "genome_b_elem", 99.0, mec_len)]
+        with patch.object(typer, "search_file", return_value=hits) as search:
+            results = typer.type_shard(reader, reader.shards()[0])
+        search.assert_called_once()
+
+        assert [r["Input_File"] for r in results] == ["genome_a_SCCmec", "genome_b_SCCmec"]
+        assert [r["mec_genes"] for r in results] == ["-", "mecA(full)"]
+
+        # Stored sources name the record, so new references only add its hits
+        new_hits = hits + [_make_hit("mecA", "genome_a_elem", 99.0, mec_len)]
+        old_refs = dict(typer._ref_hashes)
+        del old_refs["mecA"]
+        store.set_references(old_refs)
+        with patch.object(typer, "search_file", return_value=new_hits) as search:
+            typer.update_references()
+        search.assert_called_once()
+        assert search.call_args.args[0].endswith(".fasta.gz")
+        assert typer.type_stored("genome_a_SCCmec")["mec_genes"] == "mecA(full)"
+        store.close()
+
+
+class TestIncrementalReferences:
+    """Only references new to the hit store are searched and merged."""
+
+    @pytest.fixture
+    def typer_and_store(self, tmp_path):
+        store = HitStore(str(tmp_path / "hits.sqlite"))
+        with patch("sccmecextractor.type_sccmec.BlastRunner"):
+            typer = SCCmecTyper(hit_store=store)
+        yield typer, store
+        store.close()
+
+    def test_store_records_reference_set(self, typer_and_store):
+        typer, store = typer_and_store
+        assert sorted(store.references().values()) == sorted(typer._ref_hashes)
+        assert typer.new_references() == []
+
+    def test_new_reference_hits_merged(self, typer_and_store, tmp_path):
+        typer, store = typer_and_store
+        source = tmp_path / "genome.fna"
+        source.write_text(">contig_1\nACGT\n")
+
+        mec_len = typer._classifiers["mec"].ref_lengths["mecA"]
+        ccr_len = typer._classifiers["ccr"].ref_lengths["ccrC1"]
+        typer.type_hits(
+            "genome", {"mec": [_make_hit("mecA", "contig_1", 99.0, mec_len)], "ccr": []},
+            source=str(source),
+        )
+
+        # Simulate a store written before ccrC1 joined the references
+        old_refs = dict(typer._ref_hashes)
+        del old_refs["ccrC1"]
+        store.set_references(old_refs)
+        assert typer.new_references() == ["ccrC1"]
+
+        new_hit = _make_hit("ccrC1", "contig_1", 99.0, ccr_len, sstart=20000)
+        with patch.object(typer, "search_file", return_value=[new_hit]) as search:
+            assert typer.update_references() == ["genome"]
+        search.assert_called_once()
+        assert search.call_args.args[0] == str(source)
+
+        assert typer.new_references() == []
+        result = typer.type_stored("genome")
+        assert result["mec_genes"] == "mecA(full)"
+        assert result["ccr_genes"] == "ccrC1(full)"
+
+    def test_changed_reference_sequence_keeps_new_hits(self, typer_and_store, tmp_path):
+        """A reference whose sequence changed under the same ID is searched
+        again; its old hits are replaced, not merged or lost."""
+        typer, store = typer_and_store
+        source = tmp_path / "genome.fna"
+        source.write_text(">contig_1\nACGT\n")
+
+        mec_len = typer._classifiers["mec"].ref_lengths["mecA"]
+        ccr_len = typer._classifiers["ccr"].ref_lengths["ccrC1"]
+        typer.type_hits(
+            "genome",
+            {"mec": [_make_hit("mecA", "contig_1", 99.0, mec_len)],
+             "ccr": [_make_hit("ccrC1", "contig_1", 99.0, ccr_len, sstart=20000)]},
+            source=str(source),
+        )
+
+        # Simulate a store searched with an older mecA sequence
+        old_refs = dict(typer._ref_hashes)
+        old_refs["mecA"] = "0" * 64
+        store.set_references(old_refs)
+        assert typer.new_references() == ["mecA"]
+
+        new_hit = _make_hit("mecA", "contig_1", 99.0, mec_len, sstart=40000)
+        with patch.object(typer, "search_file", return_value=[new_hit]):
+            assert typer.update_references() == ["genome"]
+
+        assert typer.new_references() == []
+        hits, _, _ = store.load("genome")
+        assert sorted((h.qseqid, h.sstart) for h in hits) == [
+            ("ccrC1", 20000), ("mecA", 40000),
+        ]
+        result = typer.type_stored("genome")
+        assert result["mec_genes"] == "mecA(full)"
+        assert result["ccr_genes"] == "ccrC1(full)"
+
+    def test_renamed_reference_keeps_hits(self, typer_and_store):
+        """Stored hits follow a reference renamed without sequence change."""
+        typer, store = typer_and_store
+        mec_len = typer._classifiers["mec"].ref_lengths["mecA"]
+        store.save("genome", [_make_hit("mecA_old", "contig_1", 99.0, mec_len)])
+
+        renamed = dict(typer._ref_hashes)
+        renamed["mecA_old"] = renamed.pop("mecA")
+        store.set_references(renamed)
+
+        assert typer.new_references() == []
+        assert typer.type_stored("genome")["mec_genes"] == "mecA(full)"
+
+        # Recording the current names keeps the hit under its new ID
+        assert typer.update_references() == []
+        assert store.references() == {h: r for r, h in typer._ref_hashes.items()}
+        assert typer.type_stored("genome")["mec_genes"] == "mecA(full)"
+
+    def test_removed_reference_hits_dropped(self, typer_and_store):
+        typer, store = typer_and_store
+        mec_len = typer._classifiers["mec"].ref_lengths["mecA"]
+        store.save("genome", [_make_hit("mecA", "contig_1", 99.0, mec_len)])
+
+        changed = dict(typer._ref_hashes)
+        changed["mecA"] = "0" * 64
+        store.set_references(changed)
+
+        assert typer.type_stored("genome")["mec_genes"] == "-"
+
+
+class TestTypingManifest:
+    """Tests for manifest-driven gene-family typing."""
+
+    @pytest.fixture
+    def extended_manifest(self, tmp_path):
+        """Bundled mec/ccr families plus a mec-complex family."""
+        (tmp_path / "mec_complex.fasta").write_text(
+            ">mecR1\n" + "ACGT" * 250 + "\n>IS431\n" + "TTGCA" * 160 + "\n"
+        )
+        manifest = json.loads(
+            (Path(__file__).parents[1] / "src" / "sccmecextractor" / "data"
+             / "typing_manifest.json").read_text()
+        )
+        manifest["families"].append({
+            "name": "mec_complex",
+            "reference": "mec_complex.fasta",
+            "confirmed_pident": 90.0,
+            "novel_pident": 80.0,
+        })
+        path = tmp_path / "manifest.json"
+        path.write_text(json.dumps(manifest))
+        return path
+
+    def test_default_header_unchanged(self):
+        """Bundled manifest reproduces the established typing columns."""
+        assert TypingManifest.load().header == [
+            "Input_File", "mec_genes", "mec_identity", "mec_coverage",
+            "mec_locations", "ccr_genes", "ccr_allotypes", "ccr_identity",
+            "ccr_locations", "ccr_complex_type",
+        ]
+
+    def test_extra_family_adds_columns(self, extended_manifest):
+        """Extra families append their columns after the defaults."""
+        header = TypingManifest.load(str(extended_manifest)).header
+        assert header[:len(TYPING_HEADER)] == TYPING_HEADER
+        assert header[len(TYPING_HEADER):] == [
+            "mec_complex_genes", "mec_complex_identity",
+            "mec_complex_coverage", "mec_complex_locations",
+        ]
+
+    def test_single_search_partitioned_by_family(self, extended_manifest):
+        """Hits from the combined search are routed to their family."""
+        with patch("sccmecextractor.type_sccmec.BlastRunner"):
+            typer = SCCmecTyper(manifest=str(extended_manifest))
+
+        hits = typer.partition_hits([
+            _make_hit("mecA", "contig_1", 99.0, 2000),
+            _make_hit("ccrC1", "contig_1", 99.0, 1600, sstart=10000),
+            _make_hit("mecR1", "contig_1", 95.0, 1000, sstart=5000),
+        ])
+        assert [h.qseqid for h in hits["mec"]] == ["mecA"]
+        assert [h.qseqid for h in hits["ccr"]] == ["ccrC1"]
+        assert [h.qseqid for h in hits["mec_complex"]] == ["mecR1"]
+
+        result = typer.type_hits("genome", hits)
+        assert result["mec_complex_genes"] == "mecR1(full)"
+
+    def test_duplicate_reference_ids_rejected(self, tmp_path):
+        """A reference ID shared by two families is an error."""
+        (tmp_path / "dup.fasta").write_text(">mecA\nACGTACGT\n")
+        manifest = {"families": [
+            {"name": "mec", "reference": "bundled:mec_genes_allotypes.fasta",
+             "confirmed_pident": 95.0, "novel_pident": 75.0},
+            {"name": "dup", "reference": "dup.fasta",
+             "confirmed_pident": 95.0, "novel_pident": 75.0},
+        ]}
+        path = tmp_path / "manifest.json"
+        path.write_text(json.dumps(manifest))
+
+        with patch("sccmecextractor.type_sccmec.BlastRunner"):
+            with pytest.raises(ValueError, match="mecA"):
+                SCCmecTyper(manifest=str(path))
+
+    def test_unknown_column_rejected(self, tmp_path):
+        """Unsupported output columns are reported at load time."""
+        manifest = {"families": [
+            {"name": "mec", "reference": "bundled:mec_genes_allotypes.fasta",
+             "confirmed_pident": 95.0, "novel_pident": 75.0,
+             "columns": ["genes", "colour"]},
+        ]}
+        path = tmp_path / "manifest.json"
+        path.write_text(json.dumps(manifest))
+
+        with pytest.raises(ValueError, match="colour"):
+            TypingManifest.load(str(path))
+
+
 @pytest.mark.skipif(not HAS_BLAST, reason="BLAST+ not installed")
 class TestSCCmecTyperIntegration:
     """Integration tests requiring BLAST+."""
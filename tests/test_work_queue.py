@@ -0,0 +1,151 @@
+#!/usr/bin/env python
+
+"""Tests for the shared-filesystem work queue."""
+
+import os
+import threading
+
+import pytest
+
+from sccmecextractor.work_queue import QueueMismatchError, WorkQueue
+
+PARAMS = {"composite": False}
+
+
+def _tasks(count):
+    return [{"name": f"g{i}", "fasta_path": f"g{i}.fna", "position": i}
+            for i in range(count)]
+
+
+@pytest.fixture
+def make_worker(tmp_path):
+    """Workers on one queue; slow heartbeats so none beat during a test."""
+    workers = []
+
+    def make(worker_id, tasks=None, params=PARAMS):
+        worker = WorkQueue(str(tmp_path / "queue"), worker_id, heartbeat_interval=60)
+        workers.append(worker)
+        worker.open(_tasks(4) if tasks is None else tasks, params)
+        return worker
+
+    yield make
+    for worker in workers:
+        worker.close()
+
+
+def _publish(worker, task):
+    worker.record(0, task["name"], task["fasta_path"], None, "hash", [], {"stem": task["name"]})
+
+
+def _age(worker, seconds):
+    """Make *worker*'s heartbeat *seconds* old."""
+    mtime = os.stat(worker.heartbeat_file).st_mtime - seconds
+    os.utime(worker.heartbeat_file, (mtime, mtime))
+
+
+class TestOpen:
+
+    def test_first_worker_creates(self, tmp_path):
+        with WorkQueue(str(tmp_path / "q"), "a") as a, WorkQueue(str(tmp_path / "q"), "b") as b:
+            assert a.open(_tasks(3), PARAMS)
+            # A joining worker's inputs are ignored
+            assert not b.open(_tasks(5), PARAMS)
+            assert a.size == b.size == 3
+
+    def test_parameters_checked(self, make_worker):
+        make_worker("a")
+        with pytest.raises(QueueMismatchError, match="composite"):
+            make_worker("b", params={"composite": True})
+
+    def test_unfinished_setup_times_out(self, tmp_path):
+        with WorkQueue(str(tmp_path / "q"), "a") as a:
+            a.open(_tasks(1), PARAMS)
+            os.rename(a.todo_dir, a.todo_dir + ".gone")
+            with WorkQueue(str(tmp_path / "q"), "b") as b:
+                with pytest.raises(TimeoutError):
+                    b.open([], PARAMS, wait=0.1)
+
+
+class TestClaims:
+
+    def test_claims_in_queue_order(self, make_worker):
+        worker = make_worker("a")
+        assert [task["name"] for task in worker.tasks()] == ["g0", "g1", "g2", "g3"]
+        assert worker.claim() is None
+
+    def test_claims_are_exclusive(self, make_worker):
+        make_worker("init", tasks=_tasks(200))
+        workers = [make_worker(f"w{i}") for i in range(4)]
+        claimed = {worker.worker_id: [] for worker in workers}
+
+        def drain(worker):
+            claimed[worker.worker_id].extend(t["name"] for t in worker.tasks())
+
+        threads = [threading.Thread(target=drain, args=(w,)) for w in workers]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        names = [name for names in claimed.values() for name in names]
+        assert sorted(names) == sorted(t["name"] for t in _tasks(200))
+
+    def test_publishing_completes(self, make_worker):
+        worker = make_worker("a", tasks=_tasks(2))
+        first, second = worker.tasks()
+        _publish(worker, first)
+        worker.record_failure(1, second["name"], {"status": "error"})
+        assert worker.complete()
+        assert os.listdir(worker.my_claims) == []
+        records = list(worker.records())
+        assert [(r.name, r.position, r.input_hash) for r in records] \
+            == [("g0", 0, "hash"), ("g1", 1, "")]
+        assert records[1].result == {"status": "error"}
+        assert not worker.wait_for_work()
+
+
+class TestReclaim:
+
+    def test_dead_workers_claims_return(self, make_worker):
+        a = make_worker("a")
+        b = make_worker("b")
+        task = a.claim()
+        assert b.reclaim() == 0  # a is alive
+
+        _age(a, 3600)
+        assert b.reclaim() == 1
+        assert [t["name"] for t in b.tasks()] == ["g0", "g1", "g2", "g3"]
+        assert task["name"] == "g0"
+
+    def test_closed_worker_is_dead(self, make_worker):
+        a = make_worker("a")
+        a.claim()
+        a.close()
+        b = make_worker("b")
+        assert [t["name"] for t in b.tasks()][-1] == "g0"
+
+    def test_published_claims_are_not_redone(self, make_worker):
+        a = make_worker("a", tasks=_tasks(1))
+        b = make_worker("b")
+        task = a.claim()
+        _publish(a, task)
+        # Died between publishing and removing its claim
+        os.makedirs(a.my_claims, exist_ok=True)
+        open(os.path.join(a.my_claims, "00000000"), "w").close()
+        _age(a, 3600)
+        assert b.reclaim() == 0
+        assert b.claim() is None and b.complete()
+
+    def test_wait_for_work_returns_reclaimed(self, make_worker):
+        a = make_worker("a", tasks=_tasks(1))
+        b = make_worker("b")
+        a.claim()
+        _age(a, 3600)
+        assert b.wait_for_work(poll_interval=0.01)
+        assert b.claim()["name"] == "g0"
+
+
+def test_one_worker_builds_reports(make_worker, tmp_path):
+    a = make_worker("a")
+    b = make_worker("b")
+    assert a.lock_reports(str(tmp_path / "out"))
+    assert not b.lock_reports(str(tmp_path / "out"))